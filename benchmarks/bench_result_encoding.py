@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: query result encodings — JSON rows vs columnar JSON vs MessagePack.
+
+Builds a synthetic taxonomy-like table, serves it through the real app
+(in-process TestClient, query cache off) and reports payload size,
+end-to-end time (request + decode) and server-side time per encoding.
+
+Usage:
+  python benchmarks/bench_result_encoding.py [--rows 100000] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SCODA_QUERY_CACHE_BYTES'] = '0'
+
+from starlette.testclient import TestClient  # noqa: E402
+
+from scoda_engine import binary_format  # noqa: E402
+from scoda_engine.app import app  # noqa: E402
+from scoda_engine_core import get_registry  # noqa: E402
+
+RANKS = ('Class', 'Order', 'Family', 'Genus', 'Species')
+
+
+def build_db(path, rows):
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE taxa (id INTEGER PRIMARY KEY, parent_id INTEGER, name TEXT,
+                           rank TEXT, author TEXT, year INTEGER, score REAL);
+        CREATE TABLE ui_queries (id INTEGER PRIMARY KEY, name TEXT UNIQUE,
+                                 description TEXT, sql TEXT, params_json TEXT,
+                                 created_at TEXT);
+    """)
+    conn.executemany(
+        "INSERT INTO taxa VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((i, i // 10 or None, f'Taxon{i:07d}', RANKS[i % len(RANKS)],
+          None if i % 7 == 0 else f'AUTHOR{i % 997}', 1800 + i % 220, i * 0.25)
+         for i in range(1, rows + 1)))
+    conn.execute("INSERT INTO ui_queries (name, description, sql, created_at) "
+                 "VALUES ('taxa_all', '', 'SELECT * FROM taxa ORDER BY id', '2026-01-01')")
+    conn.commit()
+    conn.close()
+
+
+ENCODINGS = {
+    'json rows': ({}, {}, lambda r: json.loads(r.content)),
+    'json columnar': ({'format': 'columnar'}, {}, lambda r: json.loads(r.content)),
+    'msgpack': ({}, {'Accept': binary_format.MEDIA_TYPE},
+                lambda r: binary_format.decode_result(r.content)),
+}
+
+
+def run(rows, repeat):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        build_db(db_path, rows)
+        get_registry().register_db('bench', db_path, os.path.join(tmp, 'bench_overlay.db'))
+        url = '/api/bench/queries/taxa_all/execute'
+        results = {}
+        with TestClient(app) as client:
+            for name, (params, headers, decode) in ENCODINGS.items():
+                client.get(url, params=params, headers=headers)  # warm up
+                total, decoding = [], []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    response = client.get(url, params=params, headers=headers)
+                    received = time.perf_counter()
+                    decode(response)
+                    done = time.perf_counter()
+                    total.append(done - start)
+                    decoding.append(done - received)
+                results[name] = {
+                    'bytes': len(response.content),
+                    'end_to_end_s': statistics.median(total),
+                    'server_s': statistics.median(t - d for t, d in zip(total, decoding)),
+                    'decode_s': statistics.median(decoding),
+                }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    if args.json:
+        print(json.dumps({'rows': args.rows, 'results': results}, indent=2))
+        return
+    base = results['json rows']
+    print(f"{args.rows} rows, median of {args.repeat}")
+    print(f"{'encoding':<15}{'bytes':>12}{'size':>8}{'server ms':>11}{'decode ms':>11}{'total ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<15}{r['bytes']:>12,}{r['bytes'] / base['bytes']:>8.0%}"
+              f"{r['server_s'] * 1000:>11.1f}{r['decode_s'] * 1000:>11.1f}"
+              f"{r['end_to_end_s'] * 1000:>10.1f}")
+    print("\nDecode times are for the Python client; browsers decode MessagePack with "
+          "decodeMsgpackResult in static/js/app.js.")
+
+
+if __name__ == '__main__':
+    main()
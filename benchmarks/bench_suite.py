@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite: package open, get_db, named queries, composite detail,
+tree endpoint and MCP tools on a synthetic package (see generate_package.py).
+
+Packages are generated once per (taxa, seed) into the work directory and
+reused.  Requests go through the real app in-process (TestClient) with the
+query result cache, response compression and the slow-query log off, so
+every request executes its SQL.  MCP tools are called through the server's
+call_tool handler (no transport).
+
+Measurements (milliseconds; median, p95, min and mean of --repeat runs):
+  open.<package>          ScodaPackage open + data.db extraction/verification
+  get_db.pooled           PackageRegistry.get_db() + close() with the pool
+  get_db.fresh            the same with pooling off (connect + ATTACH overlay/deps)
+  query.<name>            GET /api/benchbase/queries/<name>/execute
+  composite.taxon_detail  GET /api/benchbase/composite/taxon_detail?id=...
+  tree.composite_tree     GET /api/benchmeta/meta/composite-tree?node_id=...
+  tree.children           lazy expansion of tree nodes (taxon_children)
+  mcp.<tool>              MCP tool call
+
+Tree measurements also report throughput (``per_s``, sequential requests).
+
+Usage:
+  python benchmarks/bench_suite.py [--taxa 100k] [--repeat 20] [--output results.json]
+  python benchmarks/bench_suite.py --taxa 100k --baseline benchmarks/baselines/100k.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('SCODA_QUERY_CACHE_BYTES', '0')
+os.environ.setdefault('SCODA_COMPRESS', '0')
+os.environ.setdefault('SCODA_SLOW_QUERY_MS', '0')
+
+from starlette.testclient import TestClient  # noqa: E402
+
+import compare_results  # noqa: E402
+import generate_package as gen  # noqa: E402
+from scoda_engine import __version__ as ENGINE_VERSION  # noqa: E402
+from scoda_engine import mcp_server  # noqa: E402
+from scoda_engine.app import app  # noqa: E402
+from scoda_engine_core import (PackageRegistry, ScodaPackage, _reset_registry,  # noqa: E402
+                               get_registry, register_scoda_path)
+
+SAMPLES = 50    # distinct parameter values cycled through per measurement
+
+
+def summarize(samples: list) -> dict:
+    """Timing statistics in milliseconds for a list of durations in seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    p95 = statistics.quantiles(ms, n=20, method='inclusive')[-1] if len(ms) > 1 else ms[0]
+    return {
+        'n': len(ms),
+        'median_ms': round(statistics.median(ms), 4),
+        'p95_ms': round(p95, 4),
+        'min_ms': round(ms[0], 4),
+        'mean_ms': round(statistics.fmean(ms), 4),
+    }
+
+
+def measure(fn, repeat: int, args=(None,), warmup: int = 1) -> list:
+    """Call fn(arg) ``repeat`` times cycling through args; return durations."""
+    for i in range(warmup):
+        fn(args[i % len(args)])
+    samples = []
+    for i in range(repeat):
+        arg = args[i % len(args)]
+        start = time.perf_counter()
+        fn(arg)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _throughput(stats: dict, samples: list) -> dict:
+    return dict(stats, per_s=round(len(samples) / sum(samples), 1))
+
+
+class Suite:
+    """Runs all measurements against the packages described by ``info``."""
+
+    def __init__(self, info: dict, repeat: int, seed: int = 1):
+        self.info = info
+        self.repeat = repeat
+        self.results = {}
+        rng = random.Random(seed)
+
+        def sample(rank, count=SAMPLES):
+            start, size = info['levels'][rank]
+            return [start + rng.randrange(size) for _ in range(min(count, size))] if size else []
+
+        self.families = sample('Family')
+        self.genera = sample('Genus')
+        self.details = sample('Genus', SAMPLES // 2) + sample('Species', SAMPLES // 2)
+        self.patterns = [f'{gen._latin(rng.randrange(400)).capitalize()}%'
+                         for _ in range(SAMPLES)]
+
+    def record(self, name, samples, throughput=False):
+        stats = summarize(samples)
+        self.results[name] = _throughput(stats, samples) if throughput else stats
+
+    def run(self) -> dict:
+        self.bench_open()
+        _reset_registry()
+        register_scoda_path(self.info['packages'][gen.PACKAGE])
+        get_registry().register_path(self.info['packages'][gen.META_PACKAGE])
+        try:
+            self.bench_get_db()
+            with TestClient(app) as client:
+                self.bench_queries(client)
+                self.bench_composite(client)
+                self.bench_tree(client)
+            self.bench_mcp()
+        finally:
+            _reset_registry()
+        return self.results
+
+    def bench_open(self):
+        for name in (gen.PACKAGE, gen.DEPENDENCY):
+            path = self.info['packages'][name]
+
+            def open_package(_):
+                with ScodaPackage(path) as pkg:
+                    pkg.db_path
+            self.record(f'open.{name}', measure(open_package, self.repeat, warmup=0))
+
+    def bench_get_db(self):
+        registry = get_registry()
+        self.record('get_db.pooled',
+                    measure(lambda _: registry.get_db(gen.PACKAGE).close(), self.repeat))
+        fresh = PackageRegistry(pool_max=0)
+        try:
+            fresh.register_path(self.info['packages'][gen.PACKAGE])
+            self.record('get_db.fresh',
+                        measure(lambda _: fresh.get_db(gen.PACKAGE).close(), self.repeat))
+        finally:
+            fresh.close_all()
+
+    def _get(self, client, url, params=None):
+        response = client.get(url, params=params)
+        if response.status_code != 200:
+            raise RuntimeError(f'GET {url} {params}: {response.status_code} {response.text[:200]}')
+        return response
+
+    def bench_queries(self, client):
+        base = f'/api/{gen.PACKAGE}/queries'
+        cases = {
+            'taxonomy_tree': [{}],
+            'genera_list': [{}],
+            'genera_list.page': [{'limit': 50, 'offset': 0, 'sort': 'name'}],
+            'rank_statistics': [{}],
+            'taxon_children': [{'taxon_id': i} for i in self.families],
+            'taxon_detail': [{'taxon_id': i} for i in self.details],
+            'taxon_search': [{'pattern': p} for p in self.patterns],
+        }
+        for name, params in cases.items():
+            query = name.split('.')[0]
+            url = f'{base}/{query}/execute'
+            self.record(f'query.{name}',
+                        measure(lambda p: self._get(client, url, p), self.repeat, params))
+
+    def bench_composite(self, client):
+        url = f'/api/{gen.PACKAGE}/composite/taxon_detail'
+        self.record('composite.taxon_detail',
+                    measure(lambda i: self._get(client, url, {'id': i}), self.repeat,
+                            self.details))
+
+    def bench_tree(self, client):
+        url = f'/api/{gen.META_PACKAGE}/meta/composite-tree'
+        nodes = [node['id'] for node in self._get(client, url).json()['nodes']
+                 if node['has_data']]
+        self.record('tree.composite_tree',
+                    measure(lambda n: self._get(client, url, {'node_id': n}), self.repeat,
+                            nodes), throughput=True)
+        children = f'/api/{gen.PACKAGE}/queries/taxon_children/execute'
+        parents = self.families + self.genera
+        self.record('tree.children',
+                    measure(lambda i: self._get(client, children, {'taxon_id': i}),
+                            self.repeat, parents), throughput=True)
+
+    def bench_mcp(self):
+        loop = asyncio.new_event_loop()
+
+        def call(name, arguments):
+            content = loop.run_until_complete(mcp_server.call_tool(name, arguments))
+            if '"error"' in content[0].text[:200]:
+                raise RuntimeError(f'MCP {name}: {content[0].text[:200]}')
+
+        cases = {
+            'search_taxa': [{'pattern': p} for p in self.patterns],
+            'get_children': [{'taxon_id': i} for i in self.families],
+            'get_taxon_detail': [{'taxon_id': i} for i in self.details],
+            'execute_named_query': [{'query_name': 'rank_statistics'}],
+        }
+        try:
+            for name, arguments in cases.items():
+                self.record(f'mcp.{name}',
+                            measure(lambda a: call(name, a), self.repeat, arguments))
+        finally:
+            loop.close()
+
+
+def run(taxa, repeat, seed=1, work_dir=None, compression='deflated', regenerate=False) -> dict:
+    """Generate (or reuse) packages and run the suite; returns the result document."""
+    work_dir = work_dir or os.path.join(tempfile.gettempdir(), 'scoda-bench',
+                                        f'{taxa}-s{seed}-{compression}')
+    info = gen.load_or_generate(work_dir, taxa, seed, compression, regenerate)
+    start = time.perf_counter()
+    results = Suite(info, repeat, seed).run()
+    return {
+        'suite': 'scoda-engine',
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'engine_version': ENGINE_VERSION,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'taxa': taxa,
+        'seed': seed,
+        'repeat': repeat,
+        'packages': {name: {'bytes': info['sizes'][name]} for name in info['packages']},
+        'duration_s': round(time.perf_counter() - start, 2),
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--taxa', type=gen.parse_count, default=gen.parse_count('100k'),
+                        help='package scale, e.g. 10k, 100k, 1M (default: 100k)')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--compression', choices=('deflated', 'stored'), default='deflated')
+    parser.add_argument('--work-dir', help='where generated packages are kept '
+                                           '(default: $TMPDIR/scoda-bench/...)')
+    parser.add_argument('--regenerate', action='store_true')
+    parser.add_argument('--output', help='write results JSON to this file')
+    parser.add_argument('--baseline', help='compare against this results JSON; '
+                                           'exit 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=compare_results.DEFAULT_TOLERANCE)
+    parser.add_argument('--json', action='store_true', help='print results as JSON')
+    args = parser.parse_args(argv)
+
+    document = run(args.taxa, args.repeat, args.seed, args.work_dir, args.compression,
+                   args.regenerate)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+            f.write('\n')
+    if args.json:
+        print(json.dumps(document, indent=2))
+    else:
+        print(f"{args.taxa:,} taxa, {args.repeat} runs each ({document['duration_s']:.1f}s)")
+        print(f"{'measurement':<32}{'median ms':>11}{'p95 ms':>10}{'min ms':>10}{'req/s':>9}")
+        for name, r in document['results'].items():
+            per_s = f"{r['per_s']:,.0f}" if 'per_s' in r else ''
+            print(f"{name:<32}{r['median_ms']:>11.2f}{r['p95_ms']:>10.2f}"
+                  f"{r['min_ms']:>10.2f}{per_s:>9}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare_results.compare(baseline, document, args.tolerance)
+        print()
+        print(compare_results.format_rows(rows))
+        if compare_results.regressions(rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Compare benchmark results (bench_suite.py --output) against a baseline.
+
+A measurement regresses when its median is more than ``tolerance`` slower
+than the baseline's and the difference exceeds ``min_delta_ms`` (timer
+noise on sub-millisecond operations).  Exits 1 if anything regressed.
+
+Usage:
+  python benchmarks/compare_results.py BASELINE.json CURRENT.json [--tolerance 0.25]
+"""
+
+import argparse
+import json
+import sys
+
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_MIN_DELTA_MS = 0.2
+
+
+def compare(baseline: dict, current: dict, tolerance: float = DEFAULT_TOLERANCE,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> list:
+    """One row per measurement present in either result set.
+
+    Rows are ``{'name', 'baseline_ms', 'current_ms', 'change', 'status'}``
+    with status ``ok``, ``regression``, ``improvement``, ``new`` or ``missing``.
+    """
+    if baseline.get('taxa') != current.get('taxa'):
+        raise ValueError(f"Scale differs: baseline has {baseline.get('taxa')} taxa, "
+                         f"current has {current.get('taxa')}")
+    before, after = baseline['results'], current['results']
+    rows = []
+    for name in sorted(set(before) | set(after)):
+        if name not in after:
+            rows.append({'name': name, 'baseline_ms': before[name]['median_ms'],
+                         'current_ms': None, 'change': None, 'status': 'missing'})
+            continue
+        if name not in before:
+            rows.append({'name': name, 'baseline_ms': None,
+                         'current_ms': after[name]['median_ms'], 'change': None,
+                         'status': 'new'})
+            continue
+        old, new = before[name]['median_ms'], after[name]['median_ms']
+        change = (new - old) / old if old else 0.0
+        status = 'ok'
+        if abs(new - old) > min_delta_ms:
+            if change > tolerance:
+                status = 'regression'
+            elif change < -tolerance:
+                status = 'improvement'
+        rows.append({'name': name, 'baseline_ms': old, 'current_ms': new,
+                     'change': round(change, 4), 'status': status})
+    return rows
+
+
+def format_rows(rows: list) -> str:
+    def ms(value):
+        return f'{value:,.2f}' if value is not None else '-'
+
+    lines = [f"{'measurement':<40}{'baseline ms':>13}{'current ms':>13}{'change':>9}  status"]
+    for row in rows:
+        change = f"{row['change']:+.0%}" if row['change'] is not None else '-'
+        lines.append(f"{row['name']:<40}{ms(row['baseline_ms']):>13}"
+                     f"{ms(row['current_ms']):>13}{change:>9}  {row['status']}")
+    return '\n'.join(lines)
+
+
+def regressions(rows: list) -> list:
+    return [row for row in rows if row['status'] == 'regression']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown as a fraction (default: 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.tolerance, args.min_delta_ms)
+    print(format_rows(rows))
+    failed = regressions(rows)
+    if failed:
+        print(f"\n{len(failed)} regression(s) over {args.tolerance:.0%}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,593 @@
+#!/usr/bin/env python3
+"""
+Synthetic .scoda package generator for benchmarks.
+
+Builds a trilobase-like taxonomy package at a configurable scale together
+with the packages it is served with:
+
+  benchbase.scoda  — taxon hierarchy (Class → Order → Family → Genus →
+                     Species), two classification profiles in
+                     classification_edge_cache, bibliography, synonyms and
+                     localities; ui_queries, a ui_manifest with tree, table
+                     and composite detail views, and mcp_tools.json
+  benchcore.scoda  — dependency package (countries, formations, temporal
+                     ranges), ATTACHed to benchbase as ``pc``
+  benchmeta.scoda  — meta-package whose tree nodes bind the Orders of
+                     benchbase (served by /api/benchmeta/meta/composite-tree)
+
+Output is deterministic for a given (taxa, seed).
+
+Usage:
+  python benchmarks/generate_package.py OUT_DIR [--taxa 100k] [--seed 1]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoda_engine_core import ScodaPackage  # noqa: E402
+
+PACKAGE = 'benchbase'
+DEPENDENCY = 'benchcore'
+DEPENDENCY_ALIAS = 'pc'
+META_PACKAGE = 'benchmeta'
+VERSION = '1.0.0'
+
+RANKS = ('Class', 'Order', 'Family', 'Genus', 'Species')
+SYLLABLES = ('ol', 'en', 'ar', 'ca', 'ph', 'ty', 'ro', 'ma', 'li', 'do',
+             'ste', 'bra', 'cri', 'gno', 'pla', 'thy', 'xe', 'zo', 'qui', 'vel')
+GENUS_SUFFIXES = ('us', 'ia', 'aspis', 'ella', 'ops', 'ites')
+AUTHORS = ('Walcott', 'Barrande', 'Raymond', 'Hupé', 'Whittington', 'Lu',
+           'Öpik', 'Jell', 'Fortey', 'Kobayashi', 'Lane', 'Chatterton')
+PERIODS = (('LCAM', 'Lower Cambrian', 538.8, 509.0), ('MCAM', 'Middle Cambrian', 509.0, 497.0),
+           ('UCAM', 'Upper Cambrian', 497.0, 485.4), ('LORD', 'Lower Ordovician', 485.4, 470.0),
+           ('MORD', 'Middle Ordovician', 470.0, 458.4), ('UORD', 'Upper Ordovician', 458.4, 443.8),
+           ('SIL', 'Silurian', 443.8, 419.2), ('DEV', 'Devonian', 419.2, 358.9),
+           ('CARB', 'Carboniferous', 358.9, 298.9), ('PERM', 'Permian', 298.9, 251.9))
+COUNTRIES = 250
+FORMATIONS = 5000
+
+
+def parse_count(value) -> int:
+    """Parse '10k', '1.5M' or '250000' into an integer."""
+    text = str(value).strip().lower().replace('_', '')
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def rank_sizes(taxa: int) -> list:
+    """[(rank, count)] with a branching factor of about taxa ** 0.25 per level."""
+    branching = max(2, round(taxa ** 0.25))
+    sizes = [1, branching, branching ** 2, branching ** 3]
+    return list(zip(RANKS, sizes + [max(0, taxa - sum(sizes))]))
+
+
+def _latin(n: int) -> str:
+    parts = []
+    n += len(SYLLABLES)   # at least two syllables
+    while n:
+        n, digit = divmod(n, len(SYLLABLES))
+        parts.append(SYLLABLES[digit])
+    return ''.join(parts)
+
+
+def _name(rank: str, index: int, parent_name: str) -> str:
+    stem = _latin(index).capitalize()
+    if rank == 'Class':
+        return 'Benchozoa'
+    if rank == 'Order':
+        return stem + 'ida'
+    if rank == 'Family':
+        return stem + 'idae'
+    if rank == 'Genus':
+        return stem + GENUS_SUFFIXES[index % len(GENUS_SUFFIXES)]
+    return f"{parent_name} {_latin(index)}i"
+
+
+# ---------------------------------------------------------------------------
+# Dependency package
+# ---------------------------------------------------------------------------
+
+def build_dependency_db(path, seed):
+    rng = random.Random(seed)
+    conn = _new_db(path)
+    conn.executescript("""
+        CREATE TABLE countries (id INTEGER PRIMARY KEY, name TEXT NOT NULL, code TEXT);
+        CREATE TABLE formations (id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+                                 country_id INTEGER REFERENCES countries(id),
+                                 period_code TEXT, lithology TEXT);
+        CREATE TABLE temporal_ranges (code TEXT PRIMARY KEY, name TEXT NOT NULL,
+                                      start_mya REAL, end_mya REAL);
+        CREATE INDEX idx_formations_country ON formations(country_id);
+    """)
+    conn.executemany("INSERT INTO countries VALUES (?, ?, ?)",
+                     ((i, f'Country {_latin(i).capitalize()}', f'C{i:03d}')
+                      for i in range(1, COUNTRIES + 1)))
+    conn.executemany("INSERT INTO formations VALUES (?, ?, ?, ?, ?)",
+                     ((i, f'{_latin(i).capitalize()} Formation', rng.randint(1, COUNTRIES),
+                       rng.choice(PERIODS)[0], rng.choice(('shale', 'limestone', 'sandstone')))
+                      for i in range(1, FORMATIONS + 1)))
+    conn.executemany("INSERT INTO temporal_ranges VALUES (?, ?, ?, ?)", PERIODS)
+    _add_metadata(conn, DEPENDENCY, 'Bench Core', 'Shared geography and stratigraphy')
+    conn.commit()
+    conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Main package
+# ---------------------------------------------------------------------------
+
+MAIN_SCHEMA = """
+    CREATE TABLE taxon (id INTEGER PRIMARY KEY, name TEXT NOT NULL, rank TEXT NOT NULL,
+                        author TEXT, year INTEGER, is_valid INTEGER NOT NULL DEFAULT 1,
+                        temporal_code TEXT, notes TEXT);
+    CREATE TABLE classification_profile (id INTEGER PRIMARY KEY, name TEXT NOT NULL,
+                                         description TEXT, is_default INTEGER DEFAULT 0);
+    CREATE TABLE classification_edge_cache (profile_id INTEGER NOT NULL,
+                                            child_id INTEGER NOT NULL,
+                                            parent_id INTEGER,
+                                            PRIMARY KEY (profile_id, child_id));
+    CREATE TABLE bibliography (id INTEGER PRIMARY KEY, authors TEXT NOT NULL, year INTEGER,
+                               title TEXT, journal TEXT);
+    CREATE TABLE taxon_bibliography (taxon_id INTEGER NOT NULL, bibliography_id INTEGER NOT NULL,
+                                     relationship TEXT);
+    CREATE TABLE synonym (id INTEGER PRIMARY KEY, junior_taxon_id INTEGER NOT NULL,
+                          senior_taxon_id INTEGER NOT NULL, synonym_type TEXT);
+    CREATE TABLE taxon_locality (taxon_id INTEGER NOT NULL, country_id INTEGER,
+                                 formation_id INTEGER);
+"""
+
+MAIN_INDEXES = """
+    CREATE INDEX idx_taxon_name ON taxon(name);
+    CREATE INDEX idx_taxon_rank ON taxon(rank);
+    CREATE INDEX idx_edge_parent ON classification_edge_cache(profile_id, parent_id);
+    CREATE INDEX idx_taxon_bib_taxon ON taxon_bibliography(taxon_id);
+    CREATE INDEX idx_synonym_junior ON synonym(junior_taxon_id);
+    CREATE INDEX idx_synonym_senior ON synonym(senior_taxon_id);
+    CREATE INDEX idx_locality_taxon ON taxon_locality(taxon_id);
+"""
+
+UI_QUERIES = {
+    'taxonomy_tree': (
+        'Classification tree above species level',
+        "SELECT t.id, t.name, t.rank, e.parent_id, t.author, t.year "
+        "FROM classification_edge_cache e JOIN taxon t ON t.id = e.child_id "
+        "WHERE e.profile_id = COALESCE(:profile_id, 1) AND t.rank <> 'Species' ORDER BY t.name",
+        {'profile_id': 'integer'}),
+    'taxon_children': (
+        'Direct children of a taxon in a classification profile',
+        "SELECT t.id, t.name, t.rank, t.author, t.year, t.is_valid "
+        "FROM classification_edge_cache e JOIN taxon t ON t.id = e.child_id "
+        "WHERE e.profile_id = COALESCE(:profile_id, 1) AND e.parent_id = :taxon_id "
+        "ORDER BY t.name",
+        {'taxon_id': 'integer', 'profile_id': 'integer'}),
+    'genera_list': (
+        'All genera',
+        "SELECT id, name, author, year, is_valid, temporal_code FROM taxon "
+        "WHERE rank = 'Genus' ORDER BY name",
+        None),
+    'taxon_search': (
+        'Taxa whose name contains a pattern',
+        "SELECT id, name, rank, author, year FROM taxon WHERE name LIKE :pattern "
+        "ORDER BY name LIMIT 100",
+        {'pattern': 'string'}),
+    'rank_statistics': (
+        'Taxon counts per rank',
+        "SELECT rank, COUNT(*) AS count, SUM(is_valid) AS valid FROM taxon GROUP BY rank",
+        None),
+    'taxon_detail': (
+        'Full detail of a taxon with its parent',
+        "SELECT t.*, p.id AS parent_id, p.name AS parent_name, p.rank AS parent_rank, "
+        "tr.name AS temporal_name "
+        "FROM taxon t "
+        "LEFT JOIN classification_edge_cache e ON e.child_id = t.id AND e.profile_id = 1 "
+        "LEFT JOIN taxon p ON p.id = e.parent_id "
+        f"LEFT JOIN {DEPENDENCY_ALIAS}.temporal_ranges tr ON tr.code = t.temporal_code "
+        "WHERE t.id = :taxon_id",
+        {'taxon_id': 'integer'}),
+    'taxon_hierarchy': (
+        'Ancestors of a taxon (walk up the edge cache)',
+        "WITH RECURSIVE ancestors(id, depth) AS ("
+        "SELECT parent_id, 1 FROM classification_edge_cache "
+        "WHERE profile_id = 1 AND child_id = :taxon_id "
+        "UNION ALL SELECT e.parent_id, a.depth + 1 FROM classification_edge_cache e "
+        "JOIN ancestors a ON e.child_id = a.id AND e.profile_id = 1 "
+        "WHERE e.parent_id IS NOT NULL) "
+        "SELECT t.id, t.name, t.rank FROM ancestors a JOIN taxon t ON t.id = a.id "
+        "ORDER BY a.depth DESC",
+        {'taxon_id': 'integer'}),
+    'taxon_synonyms': (
+        'Synonyms of a taxon',
+        "SELECT s.id, s.synonym_type, j.id AS junior_id, j.name AS junior_name, "
+        "j.author AS junior_author FROM synonym s JOIN taxon j ON j.id = s.junior_taxon_id "
+        "WHERE s.senior_taxon_id = :taxon_id ORDER BY j.name",
+        {'taxon_id': 'integer'}),
+    'taxon_bibliography': (
+        'References of a taxon',
+        "SELECT b.id, b.authors, b.year, b.title, b.journal, tb.relationship "
+        "FROM taxon_bibliography tb JOIN bibliography b ON b.id = tb.bibliography_id "
+        "WHERE tb.taxon_id = :taxon_id ORDER BY b.year",
+        {'taxon_id': 'integer'}),
+    'taxon_locations': (
+        'Localities of a taxon (countries and formations from the dependency package)',
+        "SELECT c.name AS country, f.name AS formation, f.period_code "
+        "FROM taxon_locality l "
+        f"LEFT JOIN {DEPENDENCY_ALIAS}.countries c ON c.id = l.country_id "
+        f"LEFT JOIN {DEPENDENCY_ALIAS}.formations f ON f.id = l.formation_id "
+        "WHERE l.taxon_id = :taxon_id ORDER BY c.name",
+        {'taxon_id': 'integer'}),
+}
+
+MANIFEST = {
+    "default_view": "taxonomy_tree",
+    "views": {
+        "taxonomy_tree": {
+            "type": "hierarchy",
+            "display": "tree",
+            "title": "Taxonomy",
+            "description": "Classification hierarchy",
+            "source_query": "taxonomy_tree",
+            "icon": "bi-diagram-3",
+            "hierarchy_options": {"id_key": "id", "parent_key": "parent_id",
+                                  "label_key": "name", "rank_key": "rank",
+                                  "sort_by": "label", "order_key": "id"},
+            "tree_display": {
+                "leaf_rank": "Genus",
+                "on_node_info": {"detail_view": "taxon_detail", "id_key": "id"},
+                "item_query": "taxon_children",
+                "item_param": "taxon_id",
+                "item_columns": [{"key": "name", "label": "Name"},
+                                 {"key": "author", "label": "Author"},
+                                 {"key": "year", "label": "Year"}],
+                "on_item_click": {"detail_view": "taxon_detail", "id_key": "id"},
+                "item_valid_filter": {"key": "is_valid", "label": "Valid only",
+                                      "default": True},
+            },
+        },
+        "genera_table": {
+            "type": "table",
+            "title": "Genera",
+            "description": "All genera",
+            "source_query": "genera_list",
+            "icon": "bi-table",
+            "columns": [
+                {"key": "name", "label": "Genus", "sortable": True, "searchable": True},
+                {"key": "author", "label": "Author", "sortable": True, "searchable": True},
+                {"key": "year", "label": "Year", "sortable": True, "searchable": False},
+                {"key": "temporal_code", "label": "Range", "sortable": True,
+                 "searchable": False},
+                {"key": "is_valid", "label": "Valid", "sortable": True, "searchable": False,
+                 "type": "boolean"},
+            ],
+            "default_sort": {"key": "name", "direction": "asc"},
+            "searchable": True,
+            "on_row_click": {"detail_view": "taxon_detail", "id_key": "id"},
+        },
+        "rank_table": {
+            "type": "table",
+            "title": "Ranks",
+            "description": "Taxon counts per rank",
+            "source_query": "rank_statistics",
+            "icon": "bi-bar-chart",
+            "columns": [{"key": "rank", "label": "Rank", "sortable": True},
+                        {"key": "count", "label": "Taxa", "sortable": True},
+                        {"key": "valid", "label": "Valid", "sortable": True}],
+        },
+        "taxon_detail": {
+            "type": "detail",
+            "title": "Taxon Detail",
+            "source": "/api/composite/taxon_detail?id={id}",
+            "source_query": "taxon_detail",
+            "source_param": "taxon_id",
+            "sub_queries": {
+                "hierarchy": {"query": "taxon_hierarchy", "params": {"taxon_id": "id"}},
+                "children": {"query": "taxon_children", "params": {"taxon_id": "id"}},
+                "synonyms": {"query": "taxon_synonyms", "params": {"taxon_id": "id"}},
+                "bibliography": {"query": "taxon_bibliography", "params": {"taxon_id": "id"}},
+                "locations": {"query": "taxon_locations", "params": {"taxon_id": "id"}},
+            },
+            "title_template": {"format": "{name} {author}"},
+            "sections": [
+                {"title": "Basic Information", "type": "field_grid",
+                 "fields": [{"key": "name", "label": "Name"},
+                            {"key": "rank", "label": "Rank"},
+                            {"key": "author", "label": "Author"},
+                            {"key": "year", "label": "Year"},
+                            {"key": "temporal_name", "label": "Range"},
+                            {"key": "parent_name", "label": "Parent", "format": "link",
+                             "link": {"detail_view": "taxon_detail", "id_path": "parent_id"}}]},
+                {"title": "Classification", "type": "linked_table", "data_key": "hierarchy",
+                 "columns": [{"key": "rank", "label": "Rank"}, {"key": "name", "label": "Name"}],
+                 "on_row_click": {"detail_view": "taxon_detail", "id_key": "id"}},
+                {"title": "Children ({count})", "type": "linked_table", "data_key": "children",
+                 "condition": "children",
+                 "columns": [{"key": "name", "label": "Name"}, {"key": "author", "label": "Author"}],
+                 "on_row_click": {"detail_view": "taxon_detail", "id_key": "id"}},
+                {"title": "Synonyms", "type": "linked_table", "data_key": "synonyms",
+                 "condition": "synonyms",
+                 "columns": [{"key": "junior_name", "label": "Name"},
+                             {"key": "synonym_type", "label": "Type"}]},
+                {"title": "Bibliography", "type": "linked_table", "data_key": "bibliography",
+                 "columns": [{"key": "authors", "label": "Authors"},
+                             {"key": "year", "label": "Year"},
+                             {"key": "title", "label": "Title"}]},
+                {"title": "Localities", "type": "linked_table", "data_key": "locations",
+                 "columns": [{"key": "country", "label": "Country"},
+                             {"key": "formation", "label": "Formation"}]},
+                {"title": "My Notes", "type": "annotations", "entity_type": "taxon"},
+            ],
+        },
+    },
+}
+
+MCP_TOOLS = {
+    "format_version": "1.0",
+    "tools": [
+        {"name": "search_taxa",
+         "description": "Search taxa by name pattern (SQL LIKE)",
+         "input_schema": {"type": "object",
+                          "properties": {"pattern": {"type": "string"},
+                                         "limit": {"type": "integer", "default": 20}},
+                          "required": ["pattern"]},
+         "query_type": "single",
+         "sql": "SELECT id, name, rank, author, year FROM taxon WHERE name LIKE :pattern "
+                "ORDER BY name LIMIT :limit",
+         "default_params": {"limit": 20}},
+        {"name": "get_children",
+         "description": "Direct children of a taxon",
+         "input_schema": {"type": "object",
+                          "properties": {"taxon_id": {"type": "integer"}},
+                          "required": ["taxon_id"]},
+         "query_type": "named_query",
+         "named_query": "taxon_children",
+         "param_mapping": {"taxon_id": "taxon_id"}},
+        {"name": "get_taxon_detail",
+         "description": "Full taxon detail with hierarchy, synonyms and references",
+         "input_schema": {"type": "object",
+                          "properties": {"taxon_id": {"type": "integer"}},
+                          "required": ["taxon_id"]},
+         "query_type": "composite",
+         "view_name": "taxon_detail",
+         "param_mapping": {"taxon_id": "taxon_id"}},
+    ],
+}
+
+
+def build_main_db(path, taxa, seed):
+    """Create the benchbase data DB; returns {rank: (first_id, count)}."""
+    rng = random.Random(seed)
+    conn = _new_db(path)
+    conn.executescript(MAIN_SCHEMA)
+
+    levels = {}
+    names = [None]          # names[id], parents looked up for species names
+    next_id = 1
+    previous = None
+    for rank, count in rank_sizes(taxa):
+        levels[rank] = (next_id, count)
+        rows = []
+        for k in range(count):
+            taxon_id = next_id + k
+            parent = previous[0] + k * previous[1] // count if previous else None
+            name = _name(rank, taxon_id, names[parent] if parent else None)
+            names.append(name)
+            rows.append((taxon_id, name, rank, rng.choice(AUTHORS), rng.randint(1820, 2020),
+                         0 if rng.random() < 0.08 else 1, rng.choice(PERIODS)[0],
+                         None if rng.random() < 0.7 else 'Type material lost'))
+        conn.executemany("INSERT INTO taxon VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        previous = (next_id, count)
+        next_id += count
+    total = next_id - 1
+
+    conn.executemany("INSERT INTO classification_profile VALUES (?, ?, ?, ?)", [
+        (1, 'default', 'Default classification', 1),
+        (2, 'alternative', 'Alternative family placement of some genera', 0)])
+    conn.executemany("INSERT INTO classification_edge_cache VALUES (1, ?, ?)",
+                     _edges(levels))
+    families = levels['Family']
+    conn.executemany(
+        "INSERT INTO classification_edge_cache VALUES (2, ?, ?)",
+        ((child, families[0] + rng.randrange(families[1])
+          if parent and levels['Genus'][0] <= child < sum(levels['Genus'])
+          and rng.random() < 0.1 else parent)
+         for child, parent in _edges(levels)))
+
+    references = max(1, total // 10)
+    conn.executemany("INSERT INTO bibliography VALUES (?, ?, ?, ?, ?)",
+                     ((i, f'{rng.choice(AUTHORS)}, {chr(65 + i % 26)}.', rng.randint(1820, 2020),
+                       f'On the {_latin(i)} fauna of {_latin(i * 7)}',
+                       rng.choice(('J. Paleontol.', 'Palaeontology', 'Geol. Mag.')))
+                      for i in range(1, references + 1)))
+    conn.executemany("INSERT INTO taxon_bibliography VALUES (?, ?, ?)",
+                     ((i, rng.randint(1, references),
+                       'original_description' if j == 0 else 'revision')
+                      for i in range(1, total + 1) for j in range(1 + (i % 5 == 0))))
+    conn.executemany("INSERT INTO synonym (junior_taxon_id, senior_taxon_id, synonym_type) "
+                     "VALUES (?, ?, ?)",
+                     ((rng.randint(1, total), rng.randint(1, total),
+                       rng.choice(('junior subjective', 'junior objective', 'preoccupied')))
+                      for _ in range(total // 20)))
+    genus_start = levels['Genus'][0]
+    conn.executemany("INSERT INTO taxon_locality VALUES (?, ?, ?)",
+                     ((i, rng.randint(1, COUNTRIES), rng.randint(1, FORMATIONS))
+                      for i in range(genus_start, total + 1) if i % 2 == 0))
+    conn.executescript(MAIN_INDEXES)
+
+    conn.executescript("""
+        CREATE TABLE provenance (id INTEGER PRIMARY KEY, source_type TEXT NOT NULL,
+                                 citation TEXT NOT NULL, description TEXT, year INTEGER,
+                                 url TEXT);
+        CREATE TABLE ui_display_intent (id INTEGER PRIMARY KEY, entity TEXT NOT NULL,
+                                        default_view TEXT NOT NULL, description TEXT,
+                                        source_query TEXT, priority INTEGER DEFAULT 0);
+        CREATE TABLE ui_queries (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE,
+                                 description TEXT, sql TEXT NOT NULL, params_json TEXT,
+                                 created_at TEXT NOT NULL);
+        CREATE TABLE ui_manifest (name TEXT PRIMARY KEY, description TEXT,
+                                  manifest_json TEXT NOT NULL, created_at TEXT NOT NULL);
+        INSERT INTO provenance VALUES (1, 'synthetic', 'SCODA benchmark generator',
+                                       'Generated data', 2026, NULL);
+        INSERT INTO ui_display_intent VALUES (1, 'taxon', 'tree', 'Classification',
+                                              'taxonomy_tree', 0);
+        INSERT INTO ui_display_intent VALUES (2, 'taxon', 'table', 'Genus listing',
+                                              'genera_list', 1);
+    """)
+    conn.executemany(
+        "INSERT INTO ui_queries (name, description, sql, params_json, created_at) "
+        "VALUES (?, ?, ?, ?, '2026-01-01T00:00:00')",
+        ((name, description, sql, json.dumps(params) if params else None)
+         for name, (description, sql, params) in UI_QUERIES.items()))
+    conn.execute("INSERT INTO ui_manifest VALUES ('default', 'Benchmark manifest', ?, "
+                 "'2026-01-01T00:00:00')", (json.dumps(MANIFEST),))
+    _add_metadata(conn, PACKAGE, 'Bench Base', f'Synthetic taxonomy with {total} taxa')
+    conn.commit()
+    conn.close()
+    return levels
+
+
+def _edges(levels):
+    """(child_id, parent_id) of the default classification."""
+    previous = None
+    for rank in RANKS:
+        start, count = levels[rank]
+        for k in range(count):
+            yield start + k, previous[0] + k * previous[1] // count if previous else None
+        previous = (start, count)
+
+
+# ---------------------------------------------------------------------------
+# Meta-package
+# ---------------------------------------------------------------------------
+
+def build_meta_package(path, main_db_path):
+    conn = sqlite3.connect(main_db_path)
+    orders = conn.execute("SELECT id, name FROM taxon WHERE rank = 'Order' ORDER BY id").fetchall()
+    root = conn.execute("SELECT name FROM taxon WHERE rank = 'Class'").fetchone()[0]
+    conn.close()
+    nodes = [{"id": "node:root", "label": root, "rank": "class"}]
+    bindings = []
+    for taxon_id, name in orders:
+        node_id = f"node:order:{taxon_id}"
+        nodes.append({"id": node_id, "label": name, "rank": "order", "parent": "node:root"})
+        bindings.append({"node_id": node_id, "package_id": PACKAGE,
+                         "root_taxon": {"name": name, "rank": "Order"},
+                         "binding_type": "subtree", "priority": 1})
+    manifest = {
+        "format": "scoda",
+        "format_version": "1.0",
+        "name": META_PACKAGE,
+        "version": VERSION,
+        "title": "Bench Meta - Composite classification",
+        "kind": "meta-package",
+        "dependencies": [{"name": PACKAGE, "version": f">={VERSION}", "required": False}],
+        "entry_points": [{"node_id": "node:root", "label": root, "default_view": "tree"}],
+        "meta_tree_file": "meta_tree.json",
+        "package_bindings_file": "package_bindings.json",
+    }
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('manifest.json', json.dumps(manifest, indent=2))
+        zf.writestr('meta_tree.json', json.dumps({"schema_version": "1.0", "nodes": nodes}))
+        zf.writestr('package_bindings.json',
+                    json.dumps({"schema_version": "1.0", "bindings": bindings}))
+
+
+# ---------------------------------------------------------------------------
+# Packaging
+# ---------------------------------------------------------------------------
+
+def _new_db(path):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    return conn
+
+
+def _add_metadata(conn, artifact_id, name, description):
+    conn.execute("CREATE TABLE artifact_metadata (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.executemany("INSERT INTO artifact_metadata VALUES (?, ?)", [
+        ('artifact_id', artifact_id), ('name', name), ('version', VERSION),
+        ('schema_version', '1.0'), ('description', description), ('license', 'CC0-1.0')])
+
+
+def generate(out_dir, taxa, seed=1, compression='deflated') -> dict:
+    """Write the three packages into out_dir.
+
+    Returns ``{'packages': {name: path}, 'levels': {rank: [first_id, count]}, ...}``;
+    the same dict is stored as ``generated.json`` in out_dir.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    paths = {name: os.path.join(out_dir, f'{name}.scoda')
+             for name in (PACKAGE, DEPENDENCY, META_PACKAGE)}
+    with tempfile.TemporaryDirectory(dir=out_dir) as tmp:
+        dep_db = os.path.join(tmp, 'dependency.db')
+        build_dependency_db(dep_db, seed)
+        ScodaPackage.create(dep_db, paths[DEPENDENCY], compression=compression)
+
+        main_db = os.path.join(tmp, 'main.db')
+        levels = build_main_db(main_db, taxa, seed)
+        tools_path = os.path.join(tmp, 'mcp_tools.json')
+        with open(tools_path, 'w') as f:
+            json.dump(MCP_TOOLS, f)
+        ScodaPackage.create(main_db, paths[PACKAGE], compression=compression,
+                            mcp_tools_path=tools_path,
+                            metadata={'dependencies': [{
+                                'name': DEPENDENCY, 'alias': DEPENDENCY_ALIAS,
+                                'version': f'>={VERSION}', 'required': True}]})
+        build_meta_package(paths[META_PACKAGE], main_db)
+
+    info = {
+        'taxa': taxa,
+        'seed': seed,
+        'compression': compression,
+        'levels': {rank: list(level) for rank, level in levels.items()},
+        'packages': paths,
+        'sizes': {name: os.path.getsize(path) for name, path in paths.items()},
+        'generate_s': round(time.perf_counter() - start, 2),
+    }
+    with open(os.path.join(out_dir, 'generated.json'), 'w') as f:
+        json.dump(info, f, indent=2)
+    return info
+
+
+def load_or_generate(out_dir, taxa, seed=1, compression='deflated', regenerate=False) -> dict:
+    """generate() unless out_dir already holds packages for the same parameters."""
+    marker = os.path.join(out_dir, 'generated.json')
+    if not regenerate and os.path.exists(marker):
+        with open(marker) as f:
+            info = json.load(f)
+        if ((info['taxa'], info['seed'], info['compression']) == (taxa, seed, compression)
+                and all(os.path.exists(path) for path in info['packages'].values())):
+            return info
+    return generate(out_dir, taxa, seed, compression)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('out_dir')
+    parser.add_argument('--taxa', type=parse_count, default=parse_count('100k'),
+                        help='number of taxa, e.g. 10k, 100k, 1M (default: 100k)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--compression', choices=('deflated', 'stored'), default='deflated')
+    args = parser.parse_args(argv)
+
+    info = generate(args.out_dir, args.taxa, args.seed, args.compression)
+    print(f"Generated {args.taxa:,} taxa in {info['generate_s']:.1f}s")
+    for name, path in info['packages'].items():
+        print(f"  {path}  {info['sizes'][name] / 1e6:,.1f} MB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""
+conn_pool.py — per-package SQLite connection pool (pure stdlib)
+
+Opening a package connection is not free: sqlite3.connect, an overlay
+existence check, dependency resolution and one ATTACH per overlay and
+dependency.  For small queries that setup dominates request latency.
+ConnectionPool keeps fully prepared connections (overlay and dependencies
+already attached, page cache warm) and hands them out again.
+
+Pooled connections are real ``sqlite3.Connection`` objects (a subclass),
+so callers keep using them unchanged: ``close()`` returns the connection
+to its pool instead of closing it.  Closing a connection that is already
+back in the pool is a no-op.
+
+Sizing:
+  - ``min_size`` connections are opened on first use and kept idle.
+  - At most ``max_size`` connections are kept idle.  Demand above that is
+    served by overflow connections that are really closed on release, so
+    acquire() never blocks (important for async FastAPI dependencies).
+
+Environment variables (read by the default PackageRegistry):
+  SCODA_POOL_MIN — connections kept warm per package (default: 1)
+  SCODA_POOL_MAX — idle connections kept per package (default: 8, 0 = no pooling)
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_SIZE = 1
+DEFAULT_MAX_SIZE = 8
+DEFAULT_HEALTH_CHECK_INTERVAL = 30.0
+
+
+class PooledConnection(sqlite3.Connection):
+    """sqlite3.Connection whose close() returns it to its pool."""
+
+    _pool = None
+    _generation = 0
+    _last_used = 0.0
+    _checked_out = False
+
+    def close(self):
+        pool = self._pool
+        if pool is None:
+            super().close()
+        else:
+            pool.release(self)
+
+    def _really_close(self):
+        self._pool = None
+        try:
+            super().close()
+        except sqlite3.Error:
+            pass
+
+
+class ConnectionPool:
+    """Pool of prepared connections for one package.
+
+    Args:
+        connect: Callable ``connect(factory)`` that opens a connection with
+            ``sqlite3.connect(..., factory=factory)`` and prepares it
+            (row_factory, ATTACH overlay/dependencies).
+        min_size: Connections opened on first acquire and kept warm.
+        max_size: Maximum idle connections retained.
+        health_check_interval: Connections idle longer than this many
+            seconds are probed with ``SELECT 1`` before reuse.
+        name: Label used in log messages.
+    """
+
+    def __init__(self, connect, min_size=DEFAULT_MIN_SIZE, max_size=DEFAULT_MAX_SIZE,
+                 health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL, name=''):
+        self._connect = connect
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.health_check_interval = health_check_interval
+        self.name = name
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._in_use = 0
+        self._primed = False
+        self._closed = False
+        self._stats = {'created': 0, 'reused': 0, 'overflow': 0, 'discarded': 0}
+
+    def _new_connection(self):
+        conn = self._connect(PooledConnection)
+        conn._pool = self
+        conn._generation = self._generation
+        with self._lock:
+            self._stats['created'] += 1
+        return conn
+
+    def _healthy(self, conn):
+        if time.monotonic() - conn._last_used < self.health_check_interval:
+            return True
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error as e:
+            logger.warning("Pool %s: dropping broken connection: %s", self.name, e)
+            return False
+
+    def acquire(self):
+        """Return a ready connection (reused when possible, never blocks)."""
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError(f"Connection pool closed: {self.name}")
+                conn = self._idle.pop() if self._idle else None
+                self._in_use += 1
+                prime = not self._primed
+                self._primed = True
+            if conn is None:
+                break
+            if self._healthy(conn):
+                with self._lock:
+                    self._stats['reused'] += 1
+                    conn._checked_out = True
+                return conn
+            with self._lock:
+                self._in_use -= 1
+                self._stats['discarded'] += 1
+            conn._really_close()
+
+        try:
+            conn = self._new_connection()
+        except Exception:
+            with self._lock:
+                self._in_use -= 1
+                if prime:
+                    self._primed = False
+            raise
+        conn._checked_out = True
+        if prime:
+            self._prime()
+        return conn
+
+    def _prime(self):
+        """Open connections up to min_size so later requests find them warm."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) + self._in_use >= self.min_size:
+                    return
+            conn = self._new_connection()
+            conn._last_used = time.monotonic()
+            with self._lock:
+                if self._closed or conn._generation != self._generation:
+                    keep = False
+                else:
+                    self._idle.append(conn)
+                    keep = True
+            if not keep:
+                conn._really_close()
+                return
+
+    def release(self, conn):
+        """Return a connection to the pool (or close it if not reusable).
+
+        Idempotent: releasing a connection that is not checked out does nothing.
+        """
+        if conn._pool is not self:
+            return
+        with self._lock:
+            if not conn._checked_out:
+                return
+            conn._checked_out = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+            reusable = True
+        except sqlite3.Error:
+            reusable = False
+        conn._last_used = time.monotonic()
+        with self._lock:
+            self._in_use = max(0, self._in_use - 1)
+            if (reusable and not self._closed
+                    and conn._generation == self._generation
+                    and len(self._idle) < self.max_size):
+                self._idle.append(conn)
+                return
+            if reusable and conn._generation == self._generation and not self._closed:
+                self._stats['overflow'] += 1
+        conn._really_close()
+
+    def invalidate(self):
+        """Drop all idle connections; in-use ones are closed when released."""
+        with self._lock:
+            self._generation += 1
+            self._primed = False
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn._really_close()
+
+    def close(self):
+        """Close the pool and every idle connection."""
+        with self._lock:
+            self._closed = True
+        self.invalidate()
+
+    def stats(self):
+        """Return a snapshot of pool counters."""
+        with self._lock:
+            return dict(self._stats, idle=len(self._idle), in_use=self._in_use,
+                        min_size=self.min_size, max_size=self.max_size)
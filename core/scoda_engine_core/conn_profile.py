@@ -0,0 +1,132 @@
+"""
+conn_profile.py — SQLite connection profiles for canonical package data (pure stdlib)
+
+Canonical data (data.db of a package and of its dependencies) is never
+written in viewer mode.  The ``readonly`` profile opens it through a
+``file:...?mode=ro&immutable=1`` URI, so SQLite skips file locking and
+change detection, and memory-maps it so every worker shares the same
+pages through the OS page cache.  The overlay database is always
+attached read-write.
+
+Profiles:
+  default  — read-write canonical DB, SQLite default pragmas (admin mode)
+  readonly — immutable canonical/dependency DBs, mmap 256 MiB,
+             64 MiB page cache, in-memory temp store
+
+Environment variables (each overrides the chosen profile):
+  SCODA_DB_PROFILE     — "default" or "readonly" (default: default)
+  SCODA_DB_MMAP_SIZE   — PRAGMA mmap_size in bytes, e.g. "256M"
+  SCODA_DB_CACHE_SIZE  — PRAGMA cache_size (negative = KiB, as in SQLite)
+  SCODA_DB_TEMP_STORE  — PRAGMA temp_store: default, file or memory
+  SCODA_DB_QUERY_ONLY  — "1" sets PRAGMA query_only (also blocks overlay
+                         writes such as preferences and annotations)
+"""
+
+import os
+import pathlib
+import re
+import sqlite3
+
+_TEMP_STORE = {'default': 0, 'file': 1, 'memory': 2}
+_SIZE_RE = re.compile(r'^\s*(\d+)\s*([KMG]?)B?\s*$', re.IGNORECASE)
+
+
+def _parse_bytes(value):
+    m = _SIZE_RE.match(value)
+    if not m:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(m.group(1)) * 1024 ** ' KMG'.index(m.group(2).upper() or ' ')
+
+
+class ConnectionProfile:
+    """How canonical and dependency databases are opened and tuned.
+
+    Args:
+        immutable: Open canonical and dependency DBs with
+            ``mode=ro&immutable=1`` (must only be used when nothing writes them).
+        mmap_size: PRAGMA mmap_size for canonical and dependency schemas.
+        cache_size: PRAGMA cache_size for canonical and dependency schemas.
+        temp_store: PRAGMA temp_store ('default', 'file' or 'memory').
+        query_only: PRAGMA query_only for the whole connection.
+    """
+
+    PRESETS = {
+        'default': {},
+        'readonly': {
+            'immutable': True,
+            'mmap_size': 256 * 1024 ** 2,
+            'cache_size': -64 * 1024,
+            'temp_store': 'memory',
+        },
+    }
+
+    def __init__(self, immutable=False, mmap_size=None, cache_size=None,
+                 temp_store=None, query_only=False):
+        if temp_store is not None and temp_store not in _TEMP_STORE:
+            raise ValueError(f"Invalid temp_store: {temp_store!r}")
+        self.immutable = immutable
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.temp_store = temp_store
+        self.query_only = query_only
+
+    @classmethod
+    def preset(cls, name):
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown DB profile: {name!r} "
+                             f"(expected one of {', '.join(cls.PRESETS)})")
+        return cls(**cls.PRESETS[name])
+
+    @classmethod
+    def from_env(cls, default='default'):
+        """Build a profile from SCODA_DB_* environment variables."""
+        env = os.environ
+        profile = cls.preset(env.get('SCODA_DB_PROFILE', '').strip() or default)
+        if env.get('SCODA_DB_MMAP_SIZE', '').strip():
+            profile.mmap_size = _parse_bytes(env['SCODA_DB_MMAP_SIZE'])
+        if env.get('SCODA_DB_CACHE_SIZE', '').strip():
+            profile.cache_size = int(env['SCODA_DB_CACHE_SIZE'])
+        if env.get('SCODA_DB_TEMP_STORE', '').strip():
+            profile = cls(profile.immutable, profile.mmap_size, profile.cache_size,
+                          env['SCODA_DB_TEMP_STORE'].strip().lower(), profile.query_only)
+        if env.get('SCODA_DB_QUERY_ONLY', '').strip():
+            profile.query_only = env['SCODA_DB_QUERY_ONLY'].strip() == '1'
+        return profile
+
+    def database(self, path):
+        """Return the name to pass to connect()/ATTACH for a canonical DB."""
+        if not self.immutable:
+            return path
+        return pathlib.Path(os.path.abspath(path)).as_uri() + '?mode=ro&immutable=1'
+
+    def connect(self, path, factory=sqlite3.Connection):
+        """Open a canonical database with this profile."""
+        conn = sqlite3.connect(self.database(path), check_same_thread=False,
+                               factory=factory, uri=self.immutable)
+        self.tune(conn, 'main')
+        if self.temp_store is not None:
+            conn.execute(f"PRAGMA temp_store = {_TEMP_STORE[self.temp_store]}")
+        return conn
+
+    def attach(self, conn, path, alias):
+        """ATTACH a dependency database with this profile."""
+        name = self.database(path).replace("'", "''")
+        conn.execute(f"ATTACH DATABASE '{name}' AS {alias}")
+        self.tune(conn, alias)
+
+    def tune(self, conn, schema):
+        """Apply the per-schema pragmas (mmap_size, cache_size)."""
+        if self.mmap_size is not None:
+            conn.execute(f"PRAGMA {schema}.mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            conn.execute(f"PRAGMA {schema}.cache_size = {int(self.cache_size)}")
+
+    def finish(self, conn):
+        """Apply connection-wide settings once all databases are attached."""
+        if self.query_only:
+            conn.execute("PRAGMA query_only = 1")
+
+    def __repr__(self):
+        return (f"ConnectionProfile(immutable={self.immutable}, mmap_size={self.mmap_size}, "
+                f"cache_size={self.cache_size}, temp_store={self.temp_store!r}, "
+                f"query_only={self.query_only})")
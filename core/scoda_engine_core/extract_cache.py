@@ -0,0 +1,509 @@
+"""
+extract_cache.py — persistent, checksum-keyed data.db extraction cache (pure stdlib)
+
+Opening a .scoda package normally extracts data.db into a fresh temp
+directory and re-hashes it.  With several large packages and many
+gunicorn workers that is minutes of decompress + SHA-256 work on every
+restart.  This module keeps extracted databases on disk, keyed by the
+manifest's ``data_checksum_sha256``, so a matching entry is reused
+without extracting or hashing again.
+
+Layout (one flat directory):
+  <cache_dir>/
+  ├── <sha256>.db      # verified, read-only extracted data.db
+  ├── <sha256>.lock    # per-entry lock file (held shared while in use);
+  │                    # its mtime records the entry's last use
+  ├── <sha256>.populate  # serializes extraction of a missing entry
+  └── .<sha256>.*.tmp  # in-progress extraction (renamed atomically)
+
+Concurrency:
+  - Populating an entry holds an exclusive lock on ``<sha256>.populate``
+    (never on the entry lock, which open packages keep shared); the data
+    is streamed into a temp file in the same directory, hashed on the fly
+    and moved into place with ``os.replace``.  Concurrent openers of a
+    missing entry wait only for that extraction, then share it.
+  - Every open ScodaPackage holds a shared lock on its entry, taken once
+    the entry exists, so LRU eviction (which needs the exclusive lock)
+    never removes a database that a live process is using.
+  - Lock files are never deleted: a process blocked on a lock file that
+    was unlinked would lock an inode no other process can see anymore.
+  - Cache hits record recency on the lock file, never on the database,
+    whose size/mtime identify the data generation (query caches, ETags).
+  - On Windows (no shared flock) eviction relies on the OS refusing to
+    delete files that are still open.
+
+Environment variables:
+  SCODA_CACHE_DIR        — enable the cache in this directory
+  SCODA_CACHE_MAX_BYTES  — size budget, e.g. "10G", "500M" (default: 10G)
+
+CLI:
+  python -m scoda_engine_core.extract_cache list
+  python -m scoda_engine_core.extract_cache prune [--max-bytes 5G] [--older-than DAYS] [--all]
+  python -m scoda_engine_core.extract_cache warm /data/packages/
+"""
+
+import glob as glob_mod
+import hashlib
+import json
+import logging
+import os
+import re
+import stat
+import sys
+import tempfile
+import time
+import zipfile
+
+from .scoda_package import (
+    ScodaChecksumError, _copy_byte_range, _sha256_file, _stored_data_offset,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+
+_CHECKSUM_RE = re.compile(r'^[0-9a-f]{64}$')
+_STALE_TMP_SECONDS = 3600
+_COPY_CHUNK = 1024 * 1024
+
+
+# ---------------------------------------------------------------------------
+# Cross-process file lock
+# ---------------------------------------------------------------------------
+
+class _FileLock:
+    """Advisory lock on a lock file (fcntl.flock on POSIX, msvcrt on Windows).
+
+    Supports shared and exclusive modes on POSIX.  On Windows every lock
+    is exclusive, so shared acquisition is a no-op there.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = None
+
+    def _open(self):
+        if self._fh is None:
+            self._fh = open(self.path, 'a+b')
+
+    def acquire(self, exclusive=True, blocking=True):
+        """Acquire the lock. Returns False if non-blocking and busy."""
+        self._open()
+        if os.name == 'nt':
+            if not exclusive:
+                return True
+            import msvcrt
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            self._fh.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._fh.fileno(), mode, 1)
+                    return True
+                except OSError:
+                    if not blocking:
+                        return False
+                    time.sleep(0.05)
+        import fcntl
+        flags = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        if not blocking:
+            flags |= fcntl.LOCK_NB
+        try:
+            fcntl.flock(self._fh.fileno(), flags)
+        except BlockingIOError:
+            return False
+        return True
+
+    def release(self):
+        """Release the lock and close the lock file handle."""
+        if self._fh is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._fh.seek(0)
+                try:
+                    msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+                except OSError:
+                    pass
+            else:
+                import fcntl
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._fh.close()
+            self._fh = None
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+class CacheEntry:
+    """A cache entry in use by an open package.
+
+    Holds a shared lock on the entry until release() so that eviction in
+    any process skips it.
+    """
+
+    def __init__(self, checksum, path, lock):
+        self.checksum = checksum
+        self.path = path
+        self._lock = lock
+
+    def release(self):
+        if self._lock:
+            self._lock.release()
+            self._lock = None
+
+
+class ExtractionCache:
+    """On-disk cache of extracted data.db files keyed by SHA-256."""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir: Directory for cached databases (created if missing).
+            max_bytes: LRU size budget in bytes; 0 or None = unbounded.
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_bytes = max_bytes or 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def entry_path(self, checksum):
+        return os.path.join(self.cache_dir, f'{checksum}.db')
+
+    def _lock_path(self, checksum):
+        return os.path.join(self.cache_dir, f'{checksum}.lock')
+
+    def _populate_lock_path(self, checksum):
+        return os.path.join(self.cache_dir, f'{checksum}.populate')
+
+    def acquire(self, checksum, zf, member):
+        """Return a CacheEntry for ``checksum``, extracting ``member`` on a miss.
+
+        On a hit the entry is reused as-is (no extraction, no hashing) and
+        the mtime of its lock file is bumped for LRU.  On a miss the member is streamed from
+        the open ZipFile into a temp file, hashed while copying, verified
+        against ``checksum`` and atomically renamed into place.
+
+        Raises:
+            ValueError: If checksum is not a SHA-256 hex digest.
+            ScodaChecksumError: If the extracted data does not match.
+        """
+        checksum = checksum.lower()
+        if not _CHECKSUM_RE.match(checksum):
+            raise ValueError(f"Invalid cache key (not a SHA-256 digest): {checksum!r}")
+
+        path = self.entry_path(checksum)
+        populated = False
+        while True:
+            lock = _FileLock(self._lock_path(checksum))
+            lock.acquire(exclusive=False)
+            if os.path.exists(path):
+                break
+            # Miss: drop the shared lock (other openers keep theirs for as
+            # long as their package is open) and extract under the populate
+            # lock; re-check, another process may have populated the entry
+            # while we waited.  Loop to take the shared lock on the result,
+            # in case it was evicted in between.
+            lock.release()
+            populate_lock = _FileLock(self._populate_lock_path(checksum))
+            populate_lock.acquire(exclusive=True)
+            try:
+                if not os.path.exists(path):
+                    self._populate(checksum, zf, member, path)
+                    populated = True
+            finally:
+                populate_lock.release()
+
+        if not populated:
+            logger.info("Extraction cache hit: %s", checksum[:12])
+            _touch(self._lock_path(checksum))
+        entry = CacheEntry(checksum, path, lock)
+        if self.max_bytes:
+            self.evict(self.max_bytes)
+        return entry
+
+    def _populate(self, checksum, zf, member, path):
+        """Extract + hash ``member`` into a temp file, then rename to ``path``.
+
+        STORED members are cloned from the archive byte range and hashed
+        afterwards; compressed members are hashed while streaming.
+        """
+        start = time.monotonic()
+        info = zf.getinfo(member)
+        offset = _stored_data_offset(zf, info)
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{checksum}.', suffix='.tmp',
+                                        dir=self.cache_dir)
+        try:
+            if offset is not None:
+                os.close(fd)
+                _copy_byte_range(zf.filename, offset, info.file_size, tmp_path)
+                digest = _sha256_file(tmp_path)
+            else:
+                sha256 = hashlib.sha256()
+                with os.fdopen(fd, 'wb') as out, zf.open(info) as src:
+                    while True:
+                        chunk = src.read(_COPY_CHUNK)
+                        if not chunk:
+                            break
+                        sha256.update(chunk)
+                        out.write(chunk)
+                    out.flush()
+                    os.fsync(out.fileno())
+                digest = sha256.hexdigest()
+            if digest != checksum:
+                raise ScodaChecksumError(
+                    f"Checksum mismatch while populating cache entry {checksum[:12]}")
+            os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(tmp_path, path)
+        except BaseException:
+            _remove(tmp_path)
+            raise
+        logger.info("Extraction cache populated: %s (%.1f MB in %.2fs)",
+                    checksum[:12], os.path.getsize(path) / 1e6,
+                    time.monotonic() - start)
+
+    def entries(self):
+        """List cache entries, most recently used first.
+
+        ``last_used`` is the later of the database's mtime (population)
+        and its lock file's mtime (last hit).
+
+        Returns:
+            list of dicts with keys: checksum, path, size, last_used (epoch).
+        """
+        result = []
+        for path in glob_mod.glob(os.path.join(self.cache_dir, '*.db')):
+            checksum = os.path.splitext(os.path.basename(path))[0]
+            if not _CHECKSUM_RE.match(checksum):
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            try:
+                last_used = max(st.st_mtime, os.path.getmtime(self._lock_path(checksum)))
+            except OSError:
+                last_used = st.st_mtime
+            result.append({
+                'checksum': checksum,
+                'path': path,
+                'size': st.st_size,
+                'last_used': last_used,
+            })
+        result.sort(key=lambda e: e['last_used'], reverse=True)
+        return result
+
+    def total_bytes(self):
+        return sum(e['size'] for e in self.entries())
+
+    def _try_remove_entry(self, checksum):
+        """Remove an entry unless another package holds it. Returns True if removed.
+
+        The lock files stay (see the module docstring).
+        """
+        lock = _FileLock(self._lock_path(checksum))
+        if not lock.acquire(exclusive=True, blocking=False):
+            return False
+        try:
+            return _remove(self.entry_path(checksum))
+        finally:
+            lock.release()
+
+    def evict(self, max_bytes):
+        """Remove least recently used entries until the cache fits ``max_bytes``.
+
+        Entries held open by any process are skipped.
+
+        Returns:
+            list of evicted checksums.
+        """
+        entries = self.entries()
+        total = sum(e['size'] for e in entries)
+        evicted = []
+        for entry in reversed(entries):  # oldest first
+            if total <= max_bytes:
+                break
+            if self._try_remove_entry(entry['checksum']):
+                total -= entry['size']
+                evicted.append(entry['checksum'])
+                logger.info("Extraction cache evicted: %s (%.1f MB)",
+                            entry['checksum'][:12], entry['size'] / 1e6)
+        if total > max_bytes:
+            logger.warning("Extraction cache over budget (%d > %d bytes): "
+                           "remaining entries are in use", total, max_bytes)
+        return evicted
+
+    def prune(self, max_bytes=None, older_than=None, remove_all=False):
+        """Remove stale temp files and entries by age and/or size budget.
+
+        Args:
+            max_bytes: Evict LRU entries down to this size (default: self.max_bytes).
+            older_than: Also remove entries not used for this many seconds.
+            remove_all: Remove every entry that is not in use.
+
+        Returns:
+            list of removed checksums.
+        """
+        now = time.time()
+        for tmp in glob_mod.glob(os.path.join(self.cache_dir, '.*.tmp')):
+            try:
+                if now - os.path.getmtime(tmp) > _STALE_TMP_SECONDS:
+                    _remove(tmp)
+            except OSError:
+                pass
+
+        removed = []
+        if remove_all or older_than is not None:
+            for entry in self.entries():
+                if remove_all or now - entry['last_used'] > older_than:
+                    if self._try_remove_entry(entry['checksum']):
+                        removed.append(entry['checksum'])
+
+        budget = self.max_bytes if max_bytes is None else max_bytes
+        if budget:
+            removed.extend(self.evict(budget))
+        return removed
+
+    def warm(self, scoda_path):
+        """Populate the cache for a .scoda file without keeping it open.
+
+        Returns:
+            The checksum of the cached entry, or None if the package has
+            no data.db / no checksum (meta-packages, legacy packages).
+        """
+        with zipfile.ZipFile(scoda_path, 'r') as zf:
+            manifest = json.loads(zf.read('manifest.json'))
+            if manifest.get('kind') == 'meta-package':
+                return None
+            checksum = manifest.get('data_checksum_sha256', '')
+            if not checksum:
+                return None
+            entry = self.acquire(checksum, zf, manifest.get('data_file', 'data.db'))
+            entry.release()
+        return checksum
+
+
+def _touch(path):
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def _remove(path):
+    """Remove a file (clearing the read-only bit first for Windows)."""
+    try:
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+    except OSError:
+        pass
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.debug("Could not remove %s: %s", path, e)
+        return False
+
+
+def _parse_size(value):
+    """Parse a byte size such as "10G", "512M", "1048576" into an int."""
+    value = str(value).strip().upper()
+    if value.endswith('B'):
+        value = value[:-1]
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    if value and value[-1] in units:
+        return int(float(value[:-1]) * units[value[-1]])
+    return int(value)
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide ExtractionCache, or None if SCODA_CACHE_DIR is unset."""
+    global _default_cache
+    cache_dir = os.environ.get('SCODA_CACHE_DIR', '').strip()
+    if not cache_dir:
+        return None
+    if _default_cache is None or _default_cache.cache_dir != os.path.abspath(cache_dir):
+        max_env = os.environ.get('SCODA_CACHE_MAX_BYTES', '').strip()
+        max_bytes = _parse_size(max_env) if max_env else DEFAULT_MAX_BYTES
+        _default_cache = ExtractionCache(cache_dir, max_bytes=max_bytes)
+    return _default_cache
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog='python -m scoda_engine_core.extract_cache',
+        description='Manage the SCODA data.db extraction cache')
+    parser.add_argument('--cache-dir', default=os.environ.get('SCODA_CACHE_DIR'),
+                        help='Cache directory (default: $SCODA_CACHE_DIR)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List cache entries (most recently used first)')
+
+    p_prune = sub.add_parser('prune', help='Evict entries by size budget and/or age')
+    p_prune.add_argument('--max-bytes', type=_parse_size, default=None,
+                         help='Size budget, e.g. 5G (default: $SCODA_CACHE_MAX_BYTES or 10G)')
+    p_prune.add_argument('--older-than', type=float, default=None, metavar='DAYS',
+                         help='Remove entries unused for more than DAYS days')
+    p_prune.add_argument('--all', action='store_true',
+                         help='Remove every entry that is not in use')
+
+    p_warm = sub.add_parser('warm', help='Pre-populate the cache from .scoda files')
+    p_warm.add_argument('paths', nargs='+',
+                        help='.scoda files or directories containing them')
+
+    args = parser.parse_args(argv)
+    if not args.cache_dir:
+        parser.error('--cache-dir or SCODA_CACHE_DIR is required')
+
+    max_env = os.environ.get('SCODA_CACHE_MAX_BYTES', '').strip()
+    cache = ExtractionCache(args.cache_dir,
+                            max_bytes=_parse_size(max_env) if max_env else DEFAULT_MAX_BYTES)
+
+    if args.command == 'list':
+        entries = cache.entries()
+        for e in entries:
+            used = time.strftime('%Y-%m-%d %H:%M', time.localtime(e['last_used']))
+            print(f"{e['checksum']}  {e['size'] / 1e6:10.1f} MB  {used}")
+        total = sum(e['size'] for e in entries)
+        print(f"\n{len(entries)} entr{'y' if len(entries) == 1 else 'ies'}, "
+              f"{total / 1e6:.1f} MB (budget {cache.max_bytes / 1e6:.1f} MB)")
+        return 0
+
+    if args.command == 'prune':
+        older = args.older_than * 86400 if args.older_than is not None else None
+        removed = cache.prune(max_bytes=args.max_bytes, older_than=older,
+                              remove_all=args.all)
+        print(f"Removed {len(removed)} entr{'y' if len(removed) == 1 else 'ies'}")
+        return 0
+
+    # warm
+    status = 0
+    for path in args.paths:
+        files = (sorted(glob_mod.glob(os.path.join(path, '*.scoda')))
+                 if os.path.isdir(path) else [path])
+        for scoda_path in files:
+            try:
+                checksum = cache.warm(scoda_path)
+            except (OSError, ValueError, KeyError, zipfile.BadZipFile,
+                    ScodaChecksumError) as e:
+                print(f"  ERROR: {os.path.basename(scoda_path)}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            label = checksum[:12] if checksum else '(no data.db checksum, skipped)'
+            print(f"  {os.path.basename(scoda_path)}: {label}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
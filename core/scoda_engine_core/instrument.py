@@ -0,0 +1,65 @@
+"""
+instrument.py — timing hooks for package loading and DB access (pure stdlib)
+
+The core library has no metrics dependency.  Instead it reports durations
+of interesting operations to observers that an embedding application
+registers (scoda_engine.metrics exports them to Prometheus)::
+
+    from scoda_engine_core import instrument
+
+    def on_event(event, seconds, labels):
+        print(event, labels, seconds)
+
+    instrument.add_observer(on_event)
+
+Events:
+  package_load     — ScodaPackage data.db extraction + verification (package)
+  package_extract  — copying data.db out of the ZIP or the extraction
+                     cache (package, source: "zip" or "cache")
+  connection_setup — PackageRegistry.get_db() (package)
+  connection_open  — opening a new connection with overlay/dependencies
+                     ATTACHed, pooled or not (package)
+
+With no observers registered, observe() is a no-op.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+_observers = []
+
+
+def add_observer(callback):
+    """Register ``callback(event, seconds, labels)``."""
+    if callback not in _observers:
+        _observers.append(callback)
+
+
+def remove_observer(callback):
+    if callback in _observers:
+        _observers.remove(callback)
+
+
+def observe(event, seconds, **labels):
+    """Report that ``event`` took ``seconds``; observer errors are logged."""
+    for callback in list(_observers):
+        try:
+            callback(event, seconds, labels)
+        except Exception:
+            logger.exception("Observer failed for %s", event)
+
+
+@contextmanager
+def timed(event, **labels):
+    """Observe the duration of the ``with`` block (also when it raises)."""
+    if not _observers:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(event, time.perf_counter() - start, **labels)
@@ -18,14 +18,23 @@ import glob as glob_mod
 import hashlib
 import json
 import logging
+import mmap
 import os
 import shutil
 import sqlite3
+import struct
 import sys
 import tempfile
+import threading
+import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
+from . import instrument
+from .conn_pool import ConnectionPool, DEFAULT_MIN_SIZE, DEFAULT_MAX_SIZE
+from .conn_profile import ConnectionProfile
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,27 +61,54 @@ class ScodaDependencyError(ScodaPackageError):
 class ScodaPackage:
     """Read/write .scoda ZIP-based data packages."""
 
-    def __init__(self, scoda_path, verify_checksum=True):
+    def __init__(self, scoda_path, verify_checksum=True, extraction_cache=None,
+                 lazy=False, ledger=None, reverify=None):
         """Open an existing .scoda package.
 
         Extracts data.db to a temp file for SQLite access.
         Temp file is cleaned up on close() or at process exit.
 
+        When an extraction cache is configured (``extraction_cache`` argument
+        or the SCODA_CACHE_DIR environment variable), data.db is instead
+        served from the persistent cache keyed by the manifest checksum:
+        a hit skips both extraction and hashing.
+
+        When a verification ledger is configured (``ledger`` argument or
+        SCODA_VERIFY_LEDGER), a .scoda file whose (path, size, mtime_ns,
+        inode, checksum) identity was already verified is not hashed again.
+
         Args:
             scoda_path: Path to the .scoda file.
             verify_checksum: If True, verify data.db SHA-256 against manifest.
                 Raises ScodaChecksumError on mismatch. Default True.
+            extraction_cache: Optional ExtractionCache instance. Defaults to
+                the SCODA_CACHE_DIR cache (or no cache if unset).
+            lazy: If True, only the manifest is read now; data.db is
+                extracted and verified on first access to ``db_path``
+                (so checksum errors surface there instead of here).
+            ledger: Optional VerificationLedger. Defaults to the
+                SCODA_VERIFY_LEDGER ledger (or none if unset).
+            reverify: If True, ignore the ledger and cached extractions and
+                hash data.db again. Defaults to SCODA_REVERIFY=1.
         """
         self.scoda_path = os.path.abspath(scoda_path)
         if not os.path.exists(self.scoda_path):
             raise FileNotFoundError(f".scoda file not found: {self.scoda_path}")
 
         logger.info("Opening .scoda package: %s", os.path.basename(self.scoda_path))
-        self._tmp_dir = tempfile.mkdtemp(prefix="scoda_")
+        self._tmp_dir = None
+        self._cache_entry = None
+        self._db_path = None
+        self._loaded = False
+        self._load_error = None
+        self._load_lock = threading.Lock()
+        self._verify = verify_checksum
+        self._extraction_cache = extraction_cache
+        self._ledger = ledger
+        self._reverify = reverify
         try:
             self._zf = zipfile.ZipFile(self.scoda_path, 'r')
         except zipfile.BadZipFile:
-            shutil.rmtree(self._tmp_dir, ignore_errors=True)
             raise ValueError(
                 f"Invalid .scoda package (not a ZIP file): "
                 f"{os.path.basename(self.scoda_path)}")
@@ -94,28 +130,104 @@ class ScodaPackage:
 
         # Meta-packages have no data.db
         if self.is_meta_package:
-            self.db_path = None
+            self._loaded = True
             logger.info("Meta-package loaded: %s (no data.db)", self.name)
         else:
-            # Extract data.db to temp directory
-            data_file = self.manifest.get('data_file', 'data.db')
+            self._data_file = self.manifest.get('data_file', 'data.db')
             try:
-                self._zf.extract(data_file, self._tmp_dir)
+                self._zf.getinfo(self._data_file)
             except KeyError:
                 self.close()
-                raise ValueError(f"Invalid .scoda package: missing {data_file}")
-
-            self.db_path = os.path.join(self._tmp_dir, data_file)
-
-            # Verify checksum (Phase 3: spec step 6)
-            if verify_checksum and not self.verify_checksum():
-                self.close()
-                raise ScodaChecksumError(
-                    f"Checksum mismatch for {os.path.basename(scoda_path)}")
+                raise ValueError(f"Invalid .scoda package: missing {self._data_file}")
+            if not lazy:
+                self._load_data()
 
         # Register cleanup
         atexit.register(self.close)
 
+    @property
+    def db_path(self):
+        """Path to the extracted data.db (None for meta-packages).
+
+        For lazily opened packages the first access extracts and verifies
+        data.db; concurrent first accesses wait for a single extraction.
+        """
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    if self._load_error is not None:
+                        raise self._load_error
+                    self._load_data()
+        return self._db_path
+
+    @property
+    def is_loaded(self):
+        """True once data.db has been extracted (always True for meta-packages)."""
+        return self._loaded
+
+    def _load_data(self):
+        """Extract (or fetch from cache) and verify data.db."""
+        data_file = self._data_file
+        extraction_cache = self._extraction_cache
+        start = time.perf_counter()
+        if extraction_cache is None:
+            from .extract_cache import get_default_cache
+            extraction_cache = get_default_cache()
+        ledger = self._resolve_ledger()
+        reverify = self._reverify
+        if reverify is None:
+            from .verify_ledger import reverify_requested
+            reverify = reverify_requested()
+        verify = self._verify and bool(self.data_checksum)
+        trusted = (verify and not reverify and ledger is not None
+                   and ledger.is_verified(self.scoda_path, self.data_checksum))
+
+        try:
+            if extraction_cache is not None and self.data_checksum:
+                # Persistent cache: entries are verified when populated
+                try:
+                    with instrument.timed('package_extract', package=self.name,
+                                          source='cache'):
+                        self._cache_entry = extraction_cache.acquire(
+                            self.data_checksum, self._zf, data_file)
+                except ScodaChecksumError:
+                    raise ScodaChecksumError(
+                        f"Checksum mismatch for {os.path.basename(self.scoda_path)}")
+                db_path = self._cache_entry.path
+                if (reverify and verify
+                        and _sha256_file(db_path) != self.data_checksum):
+                    raise ScodaChecksumError(
+                        f"Checksum mismatch for cached data of "
+                        f"{os.path.basename(self.scoda_path)}")
+            else:
+                # Extract data.db to temp directory
+                self._tmp_dir = tempfile.mkdtemp(prefix="scoda_")
+                db_path = os.path.join(self._tmp_dir, data_file)
+                with instrument.timed('package_extract', package=self.name, source='zip'):
+                    _extract_member(self._zf, data_file, db_path)
+
+                # Verify checksum (Phase 3: spec step 6), unless the ledger
+                # already vouches for this exact file
+                if trusted:
+                    logger.debug("Checksum trusted from ledger: %s",
+                                 os.path.basename(self.scoda_path))
+                elif verify and _sha256_file(db_path) != self.data_checksum:
+                    raise ScodaChecksumError(
+                        f"Checksum mismatch for {os.path.basename(self.scoda_path)}")
+            if verify and ledger is not None and not trusted:
+                ledger.record(self.scoda_path, self.data_checksum)
+        except Exception as e:
+            self._load_error = e
+            self.close()
+            raise
+
+        self._db_path = db_path
+        self._loaded = True
+        elapsed = time.perf_counter() - start
+        instrument.observe('package_load', elapsed, package=self.name)
+        logger.info("Loaded package '%s' (%s) in %.2fs", self.name,
+                    os.path.basename(self.scoda_path), elapsed)
+
     @property
     def version(self):
         return self.manifest.get('version', 'unknown')
@@ -155,6 +267,39 @@ class ScodaPackage:
         actual = _sha256_file(self.db_path)
         return actual == self.data_checksum
 
+    def reverify(self):
+        """Re-hash the loaded data.db and quarantine the package on mismatch.
+
+        Used by the background re-verification scheduler. On success the
+        ledger record is refreshed; on mismatch later ``db_path`` accesses
+        raise ScodaChecksumError. Packages not loaded yet are skipped.
+
+        Returns:
+            True if data.db still matches the manifest (or was not checked).
+        """
+        if not self._loaded or self._load_error is not None:
+            return self._load_error is None
+        if self.verify_checksum():
+            ledger = self._resolve_ledger()
+            if ledger is not None and self.data_checksum:
+                ledger.record(self.scoda_path, self.data_checksum)
+            return True
+        logger.error("Re-verification failed for %s: data.db no longer matches "
+                     "the manifest checksum", os.path.basename(self.scoda_path))
+        self._load_error = ScodaChecksumError(
+            f"Checksum mismatch for {os.path.basename(self.scoda_path)}")
+        self._loaded = False
+        ledger = self._resolve_ledger()
+        if ledger is not None:
+            ledger.forget(self.scoda_path)
+        return False
+
+    def _resolve_ledger(self):
+        if self._ledger is not None:
+            return self._ledger
+        from .verify_ledger import get_default_ledger
+        return get_default_ledger()
+
     @property
     def meta_tree(self):
         """Load meta_tree.json from meta-package. Returns dict or None."""
@@ -213,7 +358,11 @@ class ScodaPackage:
         return self.manifest.get('has_reference_spa', False)
 
     def close(self):
-        """Clean up temp files."""
+        """Clean up temp files and release the extraction cache entry."""
+        if getattr(self, '_cache_entry', None):
+            self._cache_entry.release()
+            self._cache_entry = None
+
         if hasattr(self, '_zf') and self._zf:
             try:
                 self._zf.close()
@@ -236,7 +385,7 @@ class ScodaPackage:
 
     @staticmethod
     def create(db_path, output_path, metadata=None, extra_assets=None,
-               mcp_tools_path=None, changelog_path=None):
+               mcp_tools_path=None, changelog_path=None, compression='deflated'):
         """Create a .scoda package from a SQLite database.
 
         Args:
@@ -246,6 +395,9 @@ class ScodaPackage:
             extra_assets: Optional dict of {archive_path: local_path} for additional files.
             mcp_tools_path: Optional path to mcp_tools.json to include in the package.
             changelog_path: Optional path to CHANGELOG.md to include in the package.
+            compression: 'deflated' (default, smallest download) or 'stored'.
+                'stored' writes data.db uncompressed and page-aligned so it
+                can be opened without decompression (see _extract_member).
 
         Returns:
             Path to the created .scoda file.
@@ -255,6 +407,9 @@ class ScodaPackage:
 
         if not os.path.exists(db_path):
             raise FileNotFoundError(f"Database not found: {db_path}")
+        if compression not in ('deflated', 'stored'):
+            raise ValueError(f"Unknown compression: {compression!r} "
+                             f"(expected 'deflated' or 'stored')")
 
         # Read metadata from DB
         conn = sqlite3.connect(db_path)
@@ -304,7 +459,10 @@ class ScodaPackage:
         # Create ZIP
         with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zf:
             zf.writestr('manifest.json', json.dumps(manifest, indent=2, ensure_ascii=False))
-            zf.write(db_path, 'data.db')
+            if compression == 'stored':
+                _write_aligned_stored(zf, db_path, 'data.db')
+            else:
+                zf.write(db_path, 'data.db')
             # Create empty assets/ directory entry
             zf.writestr('assets/', '')
             # Add MCP tools definition
@@ -328,9 +486,76 @@ class ScodaPackage:
 class PackageRegistry:
     """Discover and manage multiple .scoda packages."""
 
-    def __init__(self):
+    def __init__(self, lazy=False, max_workers=None, pool_min=DEFAULT_MIN_SIZE,
+                 pool_max=DEFAULT_MAX_SIZE, profile=None):
+        """
+        Args:
+            lazy: If True, scan()/register_path() read only each manifest;
+                data.db is extracted and verified on the first get_db()
+                for that package.
+            max_workers: Size of the thread pool used to extract and verify
+                packages concurrently (default: min(4, CPU count)).
+                1 loads packages serially.
+            pool_min: Connections kept warm per package (see conn_pool).
+            pool_max: Idle connections retained per package; 0 disables
+                pooling and get_db() opens a fresh connection every time.
+            profile: ConnectionProfile for canonical and dependency DBs
+                (default: plain read-write connections).
+        """
         self._packages = {}   # name → {pkg: ScodaPackage, db_path, overlay_path, deps: [...]}
         self._scan_dir = None
+        self.lazy = lazy
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.pool_min = pool_min
+        self.pool_max = pool_max
+        self.profile = profile or ConnectionProfile()
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    def _parallel(self, func, items):
+        """Apply func to each item on a bounded thread pool.
+
+        zlib decompression and hashlib release the GIL, so extraction and
+        SHA-256 verification of several packages overlap. Returns results
+        in input order; an exception raised by func is returned in place
+        of its result.
+        """
+        def _call(item):
+            try:
+                return func(item)
+            except Exception as e:
+                return e
+
+        workers = min(self.max_workers, len(items))
+        if workers <= 1:
+            return [_call(item) for item in items]
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix='scoda-load') as pool:
+            return list(pool.map(_call, items))
+
+    def _open(self, scoda_path):
+        return ScodaPackage(scoda_path, lazy=self.lazy)
+
+    @staticmethod
+    def _scoda_entry(pkg, overlay_path):
+        """Build a registry entry for a ScodaPackage (db_path resolved via pkg)."""
+        return {
+            'pkg': pkg,
+            'db_path': None,
+            'overlay_path': overlay_path,
+            'deps': pkg.manifest.get('dependencies', []),
+        }
+
+    @staticmethod
+    def _entry_db_path(entry):
+        """Return the canonical DB path of an entry.
+
+        For lazily opened packages this triggers extraction + verification
+        on first use (thread-safe, see ScodaPackage.db_path).
+        """
+        if entry['pkg'] is not None:
+            return entry['pkg'].db_path
+        return entry['db_path']
 
     def scan(self, directory):
         """Scan directory for *.scoda files and register each package."""
@@ -341,23 +566,25 @@ class PackageRegistry:
         # Find .scoda files
         scoda_files = sorted(glob_mod.glob(os.path.join(directory, '*.scoda')))
 
-        for scoda_path in scoda_files:
-            try:
-                pkg = ScodaPackage(scoda_path)
-                name = pkg.name
-                overlay_path = os.path.join(directory, f'{name}_overlay.db')
-                deps = pkg.manifest.get('dependencies', [])
-                self._packages[name] = {
-                    'pkg': pkg,
-                    'db_path': pkg.db_path,
-                    'overlay_path': overlay_path,
-                    'deps': deps,
-                }
-            except (ValueError, FileNotFoundError, ScodaChecksumError,
-                    zipfile.BadZipFile) as e:
+        # Open (extract + verify) concurrently, then register in file order so
+        # every dependency is in the registry before any get_db() runs.
+        start = time.perf_counter()
+        results = self._parallel(self._open, scoda_files)
+        for scoda_path, pkg in zip(scoda_files, results):
+            if isinstance(pkg, (ValueError, FileNotFoundError, ScodaChecksumError,
+                                zipfile.BadZipFile)):
                 logger.warning("Skipping invalid package %s: %s",
-                               os.path.basename(scoda_path), e)
+                               os.path.basename(scoda_path), pkg)
                 continue  # skip invalid packages
+            if isinstance(pkg, Exception):
+                raise pkg
+            overlay_path = os.path.join(directory, f'{pkg.name}_overlay.db')
+            self._packages[pkg.name] = self._scoda_entry(pkg, overlay_path)
+        self.invalidate_pools()
+        if scoda_files:
+            logger.info("Scanned %d package file(s) in %.2fs (%d worker(s))",
+                        len(scoda_files), time.perf_counter() - start,
+                        min(self.max_workers, len(scoda_files)))
 
         # Fallback: if no .scoda found, look for *.db files
         if not self._packages:
@@ -381,19 +608,20 @@ class PackageRegistry:
         Args:
             name: Package name
 
+        Connections come from the package's pool when pooling is enabled
+        (pool_max > 0); calling close() on them returns them to the pool.
+
         Returns:
             sqlite3.Connection with row_factory=sqlite3.Row
 
         Raises:
             KeyError: If package not found
+            ScodaChecksumError: If a lazily opened package fails verification
         """
         if name not in self._packages:
             raise KeyError(f'Package not found: {name}')
 
-        entry = self._packages[name]
-        db_path = entry['db_path']
-        overlay_path = entry['overlay_path']
-        pkg = entry['pkg']
+        pkg = self._packages[name]['pkg']
 
         # Meta-packages: no data.db, return lightweight in-memory connection
         # Individual member packages are accessed via get_db(member_name) as needed
@@ -402,10 +630,26 @@ class PackageRegistry:
             conn.row_factory = sqlite3.Row
             return conn
 
+        with instrument.timed('connection_setup', package=name):
+            if self.pool_max > 0:
+                return self._get_pool(name).acquire()
+            return self._connect(name)
+
+    def _connect(self, name, factory=sqlite3.Connection):
+        """Open a new connection for a package with overlay and deps ATTACHed."""
+        with instrument.timed('connection_open', package=name):
+            return self._open_connection(name, factory)
+
+    def _open_connection(self, name, factory):
+        entry = self._packages[name]
+        overlay_path = entry['overlay_path']
+        db_path = self._entry_db_path(entry)
+
         # Ensure overlay DB exists
         _ensure_overlay_for_package(db_path, overlay_path)
 
-        conn = sqlite3.connect(db_path, check_same_thread=False)
+        profile = self.profile
+        conn = profile.connect(db_path, factory=factory)
         conn.row_factory = sqlite3.Row
         conn.execute(f"ATTACH DATABASE '{overlay_path}' AS overlay")
         logger.debug("get_db(%s): attached overlay", name)
@@ -413,17 +657,99 @@ class PackageRegistry:
         # Resolve and attach dependencies with validation
         validated_deps = self._resolve_and_validate_deps(name)
         for alias, dep_db_path in validated_deps:
-            conn.execute(f"ATTACH DATABASE '{dep_db_path}' AS {alias}")
+            profile.attach(conn, dep_db_path, alias)
             logger.debug("get_db(%s): attached dependency as %s", name, alias)
 
         # Attach raw dependency DBs (from register_db / testing)
         for alias, dep_path in entry.get('_extra_dbs', {}).items():
             if os.path.exists(dep_path):
-                conn.execute(f"ATTACH DATABASE '{dep_path}' AS {alias}")
+                profile.attach(conn, dep_path, alias)
                 logger.debug("get_db(%s): attached extra_db as %s", name, alias)
 
+        profile.finish(conn)
         return conn
 
+    def set_profile(self, profile):
+        """Switch the connection profile used for canonical/dependency DBs."""
+        self.profile = profile
+        self.invalidate_pools()
+
+    def _get_pool(self, name):
+        with self._pools_lock:
+            pool = self._pools.get(name)
+            if pool is None:
+                pool = ConnectionPool(
+                    lambda factory: self._connect(name, factory),
+                    min_size=self.pool_min, max_size=self.pool_max, name=name)
+                self._pools[name] = pool
+            return pool
+
+    def invalidate_pools(self, name=None):
+        """Discard pooled connections (all packages, or one package).
+
+        Called whenever packages are (re-)registered, since a pooled
+        connection has the old data.db and dependency paths attached.
+        """
+        with self._pools_lock:
+            if name is None:
+                pools, self._pools = list(self._pools.values()), {}
+            else:
+                pool = self._pools.pop(name, None)
+                pools = [pool] if pool else []
+        for pool in pools:
+            pool.close()
+
+    def pool_stats(self):
+        """Return {name: stats} for every package connection pool."""
+        with self._pools_lock:
+            pools = dict(self._pools)
+        return {name: pool.stats() for name, pool in pools.items()}
+
+    def data_token(self, name, live=False, _seen=None):
+        """Identify the canonical data a package's responses derive from.
+
+        Computed without opening a connection: packages with a
+        ``data_checksum_sha256`` are identified by it (the same on every
+        host), raw DBs and packages without a checksum by file size, mtime
+        and SQLite change counter. Dependencies are included recursively.
+
+        Pass ``live=True`` when canonical DBs are writable (admin mode):
+        writes to an extracted data.db do not change the manifest
+        checksum, so loaded packages are then identified by the file
+        token of their data.db instead.
+
+        Raises:
+            KeyError: If package not found
+        """
+        entry = self._packages[name]
+        seen = _seen or set()
+        seen.add(name)
+        pkg = entry['pkg']
+        if live and pkg is not None and pkg.is_loaded:
+            token = [('file', _sqlite_file_token(pkg.db_path))]
+        elif pkg is not None and pkg.data_checksum:
+            token = [('sha256', pkg.data_checksum)]
+        elif pkg is not None:
+            token = [('file', _sqlite_file_token(pkg.scoda_path))]
+        else:
+            token = [('file', _sqlite_file_token(entry['db_path']))]
+        for dep in entry['deps']:
+            dep_name = dep.get('name')
+            if dep_name in self._packages and dep_name not in seen:
+                token.append((dep_name, self.data_token(dep_name, live, seen)))
+        for alias, dep_path in sorted(entry.get('_extra_dbs', {}).items()):
+            token.append((alias, _sqlite_file_token(dep_path)))
+        return tuple(token)
+
+    def overlay_token(self, name):
+        """(size, SQLite change counter) of a package's overlay DB, or None.
+
+        Raises:
+            KeyError: If package not found
+        """
+        token = _sqlite_file_token(self._packages[name]['overlay_path'])
+        return token and (token[0], token[2])
+
     def _resolve_and_validate_deps(self, name):
         """Resolve and validate dependencies for a package.
 
@@ -462,7 +788,7 @@ class PackageRegistry:
                         dep_name, actual_version, version_constraint)
                     continue
 
-            result.append((alias, self._packages[dep_name]['db_path']))
+            result.append((alias, self._entry_db_path(self._packages[dep_name])))
         return result
 
     def list_packages(self):
@@ -504,7 +830,9 @@ class PackageRegistry:
             'has_dependencies': len(entry['deps']) > 0,
             'source_type': 'scoda' if pkg else 'db',
             'kind': pkg.kind if pkg else 'package',
-            'db_path': entry['db_path'],
+            'db_path': (entry['db_path'] if pkg is None
+                        else pkg.db_path if pkg.is_loaded else None),
+            'loaded': pkg is None or pkg.is_loaded,
             'overlay_path': entry['overlay_path'],
             'deps': entry['deps'],
             'manifest': pkg.manifest if pkg else None,
@@ -549,30 +877,18 @@ class PackageRegistry:
         if not os.path.exists(scoda_path):
             raise FileNotFoundError(f".scoda file not found: {scoda_path}")
 
-        pkg = ScodaPackage(scoda_path)
+        # Read the manifest first to learn the dependencies, then load the
+        # package data and its dependencies concurrently.
+        pkg = ScodaPackage(scoda_path, lazy=True)
         name = pkg.name
         scoda_dir = os.path.dirname(scoda_path)
-
-        # Close existing package with same name
-        if name in self._packages:
-            old = self._packages[name]
-            if old['pkg']:
-                old['pkg'].close()
-
-        overlay_path = os.path.join(scoda_dir, f'{name}_overlay.db')
         deps = pkg.manifest.get('dependencies', [])
 
-        self._packages[name] = {
-            'pkg': pkg,
-            'db_path': pkg.db_path,
-            'overlay_path': overlay_path,
-            'deps': deps,
-        }
-
         # Scan the same directory for dependency packages
+        dep_jobs = []
         for dep in deps:
             dep_name = dep.get('name')
-            if not dep_name or dep_name in self._packages:
+            if not dep_name or dep_name == name or dep_name in self._packages:
                 continue
             dep_scoda = os.path.join(scoda_dir, f'{dep_name}.scoda')
             if not os.path.exists(dep_scoda):
@@ -580,17 +896,43 @@ class PackageRegistry:
                     os.path.join(scoda_dir, f'{dep_name}-*.scoda')))
                 dep_scoda = candidates[-1] if candidates else dep_scoda
             if os.path.exists(dep_scoda):
-                try:
-                    dep_pkg = ScodaPackage(dep_scoda)
-                    dep_overlay = os.path.join(scoda_dir, f'{dep_pkg.name}_overlay.db')
-                    self._packages[dep_pkg.name] = {
-                        'pkg': dep_pkg,
-                        'db_path': dep_pkg.db_path,
-                        'overlay_path': dep_overlay,
-                        'deps': dep_pkg.manifest.get('dependencies', []),
-                    }
-                except (ValueError, ScodaChecksumError) as e:
-                    logger.warning("Skipping dependency '%s': %s", dep_name, e)
+                dep_jobs.append((dep_name, dep_scoda))
+
+        def _load(job):
+            if job is pkg:
+                if not self.lazy:
+                    pkg.db_path  # extract + verify now
+                return pkg
+            return self._open(job[1])
+
+        results = self._parallel(_load, [pkg] + dep_jobs)
+        if isinstance(results[0], Exception):
+            pkg.close()
+            for dep_pkg in results[1:]:
+                if isinstance(dep_pkg, ScodaPackage):
+                    dep_pkg.close()
+            raise results[0]
+
+        # Pooled connections still point at the old data.db / dependencies
+        self.invalidate_pools()
+
+        # Close existing package with same name
+        if name in self._packages:
+            old = self._packages[name]
+            if old['pkg']:
+                old['pkg'].close()
+
+        overlay_path = os.path.join(scoda_dir, f'{name}_overlay.db')
+        self._packages[name] = self._scoda_entry(pkg, overlay_path)
+
+        for (dep_name, _), dep_pkg in zip(dep_jobs, results[1:]):
+            if isinstance(dep_pkg, (ValueError, ScodaChecksumError)):
+                logger.warning("Skipping dependency '%s': %s", dep_name, dep_pkg)
+                continue
+            if isinstance(dep_pkg, Exception):
+                raise dep_pkg
+            dep_overlay = os.path.join(scoda_dir, f'{dep_pkg.name}_overlay.db')
+            self._packages[dep_pkg.name] = self._scoda_entry(dep_pkg, dep_overlay)
 
         logger.info("Registered package '%s' from %s", name, scoda_path)
         return name
@@ -607,6 +949,7 @@ class PackageRegistry:
             overlay_path: Path to the overlay database.
             extra_dbs: Optional dict of {alias: path} for dependency databases.
         """
+        self.invalidate_pools()
         self._packages[name] = {
             'pkg': None,
             'db_path': db_path,
@@ -615,14 +958,48 @@ class PackageRegistry:
             '_extra_dbs': extra_dbs or {},
         }
 
+    def reverify(self):
+        """Re-hash every loaded package's data.db against its manifest.
+
+        Packages that fail are quarantined (get_db() raises
+        ScodaChecksumError). Lazily registered packages that have not been
+        loaded yet are skipped; they are verified on first use.
+
+        Returns:
+            dict: {name: bool} for each package that was checked.
+        """
+        results = {}
+        for name, entry in list(self._packages.items()):
+            pkg = entry['pkg']
+            if pkg is None or pkg.is_meta_package or not pkg.is_loaded:
+                continue
+            results[name] = pkg.reverify()
+        if not all(results.values()):
+            # Quarantined packages must stop serving from warm connections
+            self.invalidate_pools()
+        return results
+
     def close_all(self):
-        """Close all ScodaPackage instances."""
+        """Close all ScodaPackage instances and connection pools."""
+        self.invalidate_pools()
         for entry in self._packages.values():
             if entry['pkg']:
                 entry['pkg'].close()
         self._packages.clear()
 
 
+def _sqlite_file_token(path):
+    """(size, mtime_ns, header change counter) of a file, or None if unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            f.seek(24)
+            counter = f.read(4)
+    except (OSError, TypeError):
+        return None
+    return st.st_size, st.st_mtime_ns, counter
+
+
 def _ensure_overlay_for_package(canonical_db_path, overlay_path):
     """Create overlay DB for a package if it doesn't exist."""
     if os.path.exists(overlay_path):
@@ -684,6 +1061,23 @@ def _ensure_overlay_for_package(canonical_db_path, overlay_path):
 _registry = None
 
 
+def _new_default_registry():
+    """Create the default registry from the environment.
+
+    SCODA_LAZY_LOAD=1 enables lazy package loading; SCODA_LOAD_WORKERS sets
+    the number of packages extracted/verified concurrently; SCODA_POOL_MIN /
+    SCODA_POOL_MAX size the per-package connection pools; SCODA_DB_PROFILE
+    and SCODA_DB_* select the connection profile (see conn_profile).
+    """
+    lazy = os.environ.get('SCODA_LAZY_LOAD', '0').strip() == '1'
+    workers = os.environ.get('SCODA_LOAD_WORKERS', '').strip()
+    pool_min = int(os.environ.get('SCODA_POOL_MIN', DEFAULT_MIN_SIZE))
+    pool_max = int(os.environ.get('SCODA_POOL_MAX', DEFAULT_MAX_SIZE))
+    return PackageRegistry(lazy=lazy, max_workers=int(workers) if workers else None,
+                           pool_min=pool_min, pool_max=pool_max,
+                           profile=ConnectionProfile.from_env())
+
+
 def get_registry():
     """Get the default PackageRegistry (lazy-initialized).
 
@@ -693,7 +1087,7 @@ def get_registry():
     """
     global _registry
     if _registry is None:
-        _registry = PackageRegistry()
+        _registry = _new_default_registry()
         env_pkg = os.environ.get('SCODA_PACKAGE_PATH')
         if env_pkg:
             try:
@@ -731,7 +1125,7 @@ def register_scoda_path(scoda_path):
     """
     global _registry
     if _registry is None:
-        _registry = PackageRegistry()
+        _registry = _new_default_registry()
     name = _registry.register_path(scoda_path)
     set_active_package(name)
     return name
@@ -1057,7 +1451,7 @@ def get_db():
     _resolve_paths()
     ensure_overlay_db()
 
-    conn = sqlite3.connect(_canonical_db)
+    conn = sqlite3.connect(_canonical_db, check_same_thread=False)
     conn.row_factory = sqlite3.Row
     conn.execute(f"ATTACH DATABASE '{_overlay_db}' AS overlay")
 
@@ -1165,13 +1559,128 @@ def _check_version_constraint(actual_version, constraint_str):
     return True
 
 
+# ZIP_STORED data.db members are aligned to this boundary so the byte range
+# can be cloned block-for-block (reflink on XFS/btrfs) and mmapped.
+_STORED_ALIGNMENT = 4096
+_ZIP_ALIGN_EXTRA_ID = 0xD935  # padding extra-field id (same as Android zipalign)
+_ZIP_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+
+
+def _write_aligned_stored(zf, src_path, arcname, alignment=_STORED_ALIGNMENT):
+    """Write a file as a ZIP_STORED member whose data starts on an alignment boundary.
+
+    Pads the local header's extra field so that the member data offset is
+    a multiple of ``alignment``.
+    """
+    zinfo = zipfile.ZipInfo.from_file(src_path, arcname)
+    zinfo.compress_type = zipfile.ZIP_STORED
+    zinfo.compress_size = 0  # placeholders until written, as in ZipFile.open('w')
+    zinfo.CRC = 0
+    # Same rule ZipFile._open_to_write() applies, so header sizes match
+    zip64 = zinfo.file_size * 1.05 > zipfile.ZIP64_LIMIT
+    header_offset = zf.fp.tell()
+    zinfo.extra = b''
+    base = len(zinfo.FileHeader(zip64)) + 4  # + padding block header
+    pad = -(header_offset + base) % alignment
+    zinfo.extra = struct.pack('<HH', _ZIP_ALIGN_EXTRA_ID, pad) + b'\0' * pad
+    with open(src_path, 'rb') as src, zf.open(zinfo, 'w', force_zip64=zip64) as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+def _stored_data_offset(zf, info):
+    """Return the absolute offset of a ZIP_STORED member's data, or None.
+
+    Returns None for compressed or encrypted members, which must go
+    through zipfile's decompressing reader.
+    """
+    if (not zf.filename or info.compress_type != zipfile.ZIP_STORED
+            or info.flag_bits & 0x1):
+        return None
+    with open(zf.filename, 'rb') as f:
+        f.seek(info.header_offset)
+        header = f.read(_ZIP_LOCAL_HEADER.size)
+    if len(header) != _ZIP_LOCAL_HEADER.size:
+        return None
+    fields = _ZIP_LOCAL_HEADER.unpack(header)
+    if fields[0] != b'PK\x03\x04':
+        return None
+    name_len, extra_len = fields[10], fields[11]
+    return info.header_offset + _ZIP_LOCAL_HEADER.size + name_len + extra_len
+
+
+def _copy_byte_range(src_path, offset, length, dest_path):
+    """Copy ``length`` bytes at ``offset`` of src_path into a new file.
+
+    Uses os.copy_file_range where available: the copy stays in the kernel
+    and, on copy-on-write filesystems with block-aligned ranges, shares
+    extents instead of duplicating data. Falls back to buffered copying.
+    """
+    copied = 0
+    with open(src_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while copied < length:
+                    n = os.copy_file_range(src.fileno(), dst.fileno(),
+                                           length - copied, offset + copied, copied)
+                    if n == 0:
+                        break
+                    copied += n
+            except OSError:
+                pass  # EXDEV / ENOSYS / EINVAL etc. — finish with plain copy
+        src.seek(offset + copied)
+        dst.seek(copied)
+        remaining = length - copied
+        while remaining > 0:
+            chunk = src.read(min(1024 * 1024, remaining))
+            if not chunk:
+                raise ValueError("Truncated .scoda archive")
+            dst.write(chunk)
+            remaining -= len(chunk)
+
+
+def _extract_member(zf, member, dest_path):
+    """Extract a ZIP member to dest_path.
+
+    ZIP_STORED members are cloned straight from the archive byte range
+    (no decompression); other members go through ZipFile.open().
+    """
+    info = zf.getinfo(member)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    offset = _stored_data_offset(zf, info)
+    if offset is not None:
+        logger.debug("%s is STORED at offset %d; copying byte range", member, offset)
+        _copy_byte_range(zf.filename, offset, info.file_size, dest_path)
+        return
+    with zf.open(info) as src, open(dest_path, 'wb') as dst:
+        shutil.copyfileobj(src, dst, 1024 * 1024)
+
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
 def _sha256_file(file_path):
-    """Calculate SHA-256 of a file."""
+    """Calculate SHA-256 of a file.
+
+    Hashes straight out of an mmap in large slices (hashlib releases the
+    GIL for big buffers, so parallel package loads overlap); falls back to
+    buffered reads where mmap is unavailable (empty files, special files).
+    """
     sha256 = hashlib.sha256()
     with open(file_path, 'rb') as f:
+        try:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            mm = None
+        if mm is not None:
+            with mm, memoryview(mm) as view:
+                for start in range(0, len(view), _HASH_CHUNK):
+                    sha256.update(view[start:start + _HASH_CHUNK])
+            return sha256.hexdigest()
+        buf = bytearray(_HASH_CHUNK)
+        view = memoryview(buf)
         while True:
-            chunk = f.read(8192)
-            if not chunk:
+            n = f.readinto(buf)
+            if not n:
                 break
-            sha256.update(chunk)
+            sha256.update(view[:n])
     return sha256.hexdigest()
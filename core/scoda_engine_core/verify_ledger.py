@@ -0,0 +1,221 @@
+"""
+verify_ledger.py — trusted-checksum ledger for .scoda packages (pure stdlib)
+
+Verifying data.db against the manifest's ``data_checksum_sha256`` means
+hashing the whole database on every open.  The ledger is a small SQLite
+sidecar that records each successful verification together with the
+identity of the .scoda file it came from:
+
+    (scoda path, size, mtime_ns, inode, manifest checksum)
+
+Later opens — in this or any other process — skip the SHA-256 pass while
+that identity is unchanged.  Replacing, touching or rewriting the file
+changes size/mtime/inode and forces a fresh verification.
+
+Environment variables:
+  SCODA_VERIFY_LEDGER — path of the ledger database (enables the ledger)
+  SCODA_REVERIFY      — "1" ignores recorded verifications and hashes again
+
+CLI:
+  python -m scoda_engine_core.verify_ledger list
+  python -m scoda_engine_core.verify_ledger verify [--reverify] /data/packages/
+  python -m scoda_engine_core.verify_ledger forget [PATH ...]
+"""
+
+import glob as glob_mod
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verified (
+    scoda_path  TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    inode       INTEGER NOT NULL,
+    checksum    TEXT NOT NULL,
+    verified_at REAL NOT NULL
+)
+"""
+
+
+def file_identity(scoda_path):
+    """Return (abs path, size, mtime_ns, inode) for a .scoda file."""
+    path = os.path.abspath(scoda_path)
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns, st.st_ino
+
+
+class VerificationLedger:
+    """SQLite-backed record of verified .scoda files."""
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def is_verified(self, scoda_path, checksum):
+        """True if scoda_path was verified against checksum and is unchanged."""
+        if not checksum:
+            return False
+        try:
+            path, size, mtime_ns, inode = file_identity(scoda_path)
+        except OSError:
+            return False
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT 1 FROM verified WHERE scoda_path = ? AND size = ? "
+                    "AND mtime_ns = ? AND inode = ? AND checksum = ?",
+                    (path, size, mtime_ns, inode, checksum)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("Verification ledger unreadable (%s): %s", self.path, e)
+            return False
+        return row is not None
+
+    def record(self, scoda_path, checksum):
+        """Record a successful verification of scoda_path."""
+        path, size, mtime_ns, inode = file_identity(scoda_path)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        conn.execute(
+                            "INSERT OR REPLACE INTO verified VALUES (?, ?, ?, ?, ?, ?)",
+                            (path, size, mtime_ns, inode, checksum, time.time()))
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            logger.warning("Could not update verification ledger (%s): %s", self.path, e)
+
+    def forget(self, scoda_path=None):
+        """Drop the record for scoda_path (or every record). Returns rows removed."""
+        with self._lock:
+            conn = self._connect()
+            try:
+                with conn:
+                    if scoda_path is None:
+                        cur = conn.execute("DELETE FROM verified")
+                    else:
+                        cur = conn.execute("DELETE FROM verified WHERE scoda_path = ?",
+                                           (os.path.abspath(scoda_path),))
+                return cur.rowcount
+            finally:
+                conn.close()
+
+    def entries(self):
+        """Return all records, most recently verified first."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM verified ORDER BY verified_at DESC").fetchall()
+        finally:
+            conn.close()
+        return [dict(r) for r in rows]
+
+
+_default_ledger = None
+
+
+def get_default_ledger():
+    """Return the process-wide ledger, or None if SCODA_VERIFY_LEDGER is unset."""
+    global _default_ledger
+    path = os.environ.get('SCODA_VERIFY_LEDGER', '').strip()
+    if not path:
+        return None
+    if _default_ledger is None or _default_ledger.path != os.path.abspath(path):
+        _default_ledger = VerificationLedger(path)
+    return _default_ledger
+
+
+def reverify_requested():
+    """True if SCODA_REVERIFY=1 asks to ignore recorded verifications."""
+    return os.environ.get('SCODA_REVERIFY', '0').strip() == '1'
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main(argv=None):
+    import argparse
+
+    from .scoda_package import ScodaPackage, ScodaPackageError
+
+    parser = argparse.ArgumentParser(
+        prog='python -m scoda_engine_core.verify_ledger',
+        description='Manage the SCODA trusted-checksum ledger')
+    parser.add_argument('--ledger', default=os.environ.get('SCODA_VERIFY_LEDGER'),
+                        help='Ledger database (default: $SCODA_VERIFY_LEDGER)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('list', help='List verified packages')
+
+    p_verify = sub.add_parser('verify', help='Verify .scoda files and record them')
+    p_verify.add_argument('paths', nargs='+',
+                          help='.scoda files or directories containing them')
+    p_verify.add_argument('--reverify', action='store_true',
+                          help='Hash again even if the file is already recorded')
+
+    p_forget = sub.add_parser('forget', help='Drop records (all if no path is given)')
+    p_forget.add_argument('paths', nargs='*')
+
+    args = parser.parse_args(argv)
+    if not args.ledger:
+        parser.error('--ledger or SCODA_VERIFY_LEDGER is required')
+    ledger = VerificationLedger(args.ledger)
+
+    if args.command == 'list':
+        entries = ledger.entries()
+        for e in entries:
+            when = time.strftime('%Y-%m-%d %H:%M', time.localtime(e['verified_at']))
+            print(f"{e['checksum'][:16]}  {when}  {e['scoda_path']}")
+        print(f"\n{len(entries)} verified package(s)")
+        return 0
+
+    if args.command == 'forget':
+        removed = sum(ledger.forget(p) for p in args.paths) if args.paths \
+            else ledger.forget()
+        print(f"Removed {removed} record(s)")
+        return 0
+
+    # verify
+    status = 0
+    for path in args.paths:
+        files = (sorted(glob_mod.glob(os.path.join(path, '*.scoda')))
+                 if os.path.isdir(path) else [path])
+        for scoda_path in files:
+            try:
+                with ScodaPackage(scoda_path, ledger=ledger, reverify=args.reverify):
+                    pass
+            except (OSError, ValueError, ScodaPackageError) as e:
+                print(f"  ERROR: {os.path.basename(scoda_path)}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            print(f"  OK: {os.path.basename(scoda_path)}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
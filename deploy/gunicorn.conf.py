@@ -11,6 +11,24 @@ workers = int(os.environ.get("SCODA_WORKERS", "2"))
 # Bind address (all interfaces — no nginx proxy)
 bind = f"0.0.0.0:{os.environ.get('SCODA_PORT', '8081')}"
 
+# SQLite connection profile for package data (see scoda_engine_core.conn_profile).
+# Workers inherit these; "readonly" opens canonical DBs immutable + mmap'd so
+# all workers share one copy of the pages through the OS page cache.
+os.environ.setdefault("SCODA_DB_PROFILE", "readonly")
+os.environ.setdefault("SCODA_DB_MMAP_SIZE", "256M")
+
+# Prometheus /metrics: workers write snapshots to a shared directory
+# (see scoda_engine.metrics), emptied when the master starts. It is created
+# mode 0700 and owned by the worker user below.
+os.environ.setdefault("SCODA_METRICS_DIR", "/tmp/scoda-metrics")
+
+
+def on_starting(server):
+    from scoda_engine.metrics import prepare_directory
+    prepare_directory(os.environ["SCODA_METRICS_DIR"],
+                      uid=server.cfg.uid, gid=server.cfg.gid)
+
+
 # Drop privileges to non-root user
 user = "scoda"
 group = "scoda"
@@ -8,26 +8,43 @@ remain at the app level.
 """
 
 from fastapi import FastAPI, Request, HTTPException, Depends, APIRouter
-from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
+from fastapi.responses import (JSONResponse, HTMLResponse, RedirectResponse, Response,
+                               StreamingResponse)
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import Any, Optional
+import base64
 import json
 import logging
 import os
+import re
 import sqlite3
+import threading
 import time
+from urllib.parse import parse_qsl
 
 logger = logging.getLogger(__name__)
 
-from scoda_engine_core import get_registry
+from scoda_engine_core import get_registry, ScodaPackageError
 from scoda_engine import __version__ as ENGINE_VERSION
+from scoda_engine import binary_format
+from scoda_engine import compression
+from scoda_engine import exec_plan
+from scoda_engine import http_cache
+from scoda_engine import index_advisor
+from scoda_engine import metrics
+from scoda_engine import query_cache
+from scoda_engine import query_limits
+from scoda_engine import query_stream
+from scoda_engine import result_format
+from scoda_engine import server_timing
+from scoda_engine import slow_query
+from scoda_engine import static_assets
 
 ENGINE_NAME = os.environ.get('SCODA_ENGINE_NAME', 'SCODA Desktop')
 
-app = FastAPI(title=ENGINE_NAME)
+app = FastAPI(title=ENGINE_NAME, default_response_class=server_timing.TimedJSONResponse)
 
 # Admin/Viewer mode — set via SCODA_MODE env var or _set_scoda_mode()
 SCODA_MODE = os.environ.get('SCODA_MODE', 'viewer')
@@ -44,19 +61,61 @@ def _require_admin():
     if SCODA_MODE != 'admin':
         raise HTTPException(status_code=403, detail="Admin mode required")
 
+# Named-query result cache (SCODA_QUERY_CACHE_BYTES, 0 disables)
+_query_cache = query_cache.QueryCache.from_env()
+
 # Tables that are SCODA metadata — excluded from auto-discovery
 SCODA_META_TABLES = {'artifact_metadata', 'provenance', 'schema_descriptions',
                      'ui_display_intent', 'ui_queries', 'ui_manifest'}
 
+# ETag / conditional GET for per-package responses (see http_cache).
+# Added before CORS so that 304 responses get CORS headers too.
+app.add_middleware(http_cache.ConditionalGetMiddleware,
+                   validator=lambda scope: _http_cache_validator(scope))
+
+# gzip/brotli (see compression); inside CORS, outside conditional GET so
+# that it sees the ETag and can serve cached compressed bodies pre-routing.
+# No body cache in admin mode: canonical data is written there.
+_compressed_cache = compression.CompressedBodyCache.from_env()
+if compression.enabled_from_env():
+    app.add_middleware(compression.CompressionMiddleware, cache=_compressed_cache,
+                       validator=lambda scope: _http_cache_validator(scope),
+                       min_size=compression.min_size_from_env(),
+                       use_cache=lambda: SCODA_MODE != 'admin')
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["Content-Type"],
+    allow_headers=["Content-Type", "If-None-Match", server_timing.REQUEST_HEADER],
+    expose_headers=["ETag", "Server-Timing"],
 )
 
+# Server-Timing phase breakdown (see server_timing); outside CORS and
+# compression so that every sampled response gets the header
+server_timing.mode()    # fail at startup on a bad SCODA_SERVER_TIMING
+app.add_middleware(server_timing.ServerTimingMiddleware)
+
+# Request latency per route template (see metrics); outermost, so 304s and
+# compression are included
+if metrics.enabled():
+    app.add_middleware(metrics.MetricsMiddleware, routes=lambda: app.routes)
+    metrics.register_cache('query_result', lambda: (_query_cache.hits, _query_cache.misses))
+    metrics.register_cache('compressed_body',
+                           lambda: (_compressed_cache.hits, _compressed_cache.misses))
+    metrics.add_source('scoda_query_interrupted_total', 'counter',
+                       'Queries interrupted by their time/step budget', ('reason',),
+                       lambda: {(reason,): count for reason, count
+                                in query_limits.stats()['interrupted'].items()})
+
+_STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+# Content-hashed asset URLs: templates call asset_url('js/app.js')
+_assets = static_assets.AssetManifest(_STATIC_DIR)
+
 templates = Jinja2Templates(directory=os.path.join(os.path.dirname(__file__), "templates"))
-app.mount("/static", StaticFiles(directory=os.path.join(os.path.dirname(__file__), "static")), name="static")
+templates.env.globals['asset_url'] = _assets.url
+app.mount("/static", static_assets.FingerprintedStaticFiles(directory=_STATIC_DIR, manifest=_assets),
+          name="static")
 
 
 # ---------------------------------------------------------------------------
@@ -91,6 +150,10 @@ class QueryResult(BaseModel):
     columns: list[str]
     row_count: int
     rows: list[dict[str, Any]]
+    total_count: Optional[int] = None
+    limit: Optional[int] = None
+    offset: Optional[int] = None
+    next_cursor: Optional[str] = None
 
 class PackageInfo(BaseModel):
     name: str = ""
@@ -199,8 +262,33 @@ def _auto_generate_manifest(conn):
     }
 
 
+# Parsed manifests and entity schemas per canonical DB generation
+# (query_cache.db_token: path, size, mtime and change counter of every
+# non-overlay database). Re-registering a package or an admin write to
+# ui_manifest changes the token, so stale entries are never served.
+def _generation_cached(conn, kind, loader, token=None):
+    """Return loader() memoized per (canonical DB generation, kind).
+
+    Pass ``token`` when the caller already computed it.
+    """
+    if token is None:
+        token = query_cache.db_token(conn, include_overlay=False)
+    return query_cache.generations.get(token, kind, loader)
+
+
 def _fetch_manifest(conn):
-    """Fetch UI manifest from a DB connection.
+    """Fetch UI manifest from a DB connection (cached per DB generation).
+
+    Returns a shallow copy; the nested 'manifest' dict is shared and must
+    not be modified.
+    """
+    with server_timing.phase('manifest', 'manifest load'):
+        result = _generation_cached(conn, 'manifest', lambda: _load_manifest(conn))
+    return dict(result) if result else result
+
+
+def _load_manifest(conn):
+    """Read and parse the UI manifest.
 
     Falls back to auto-generating a manifest from DB schema if ui_manifest
     table is missing or has no 'default' row.
@@ -320,59 +408,582 @@ def _fetch_queries(conn):
     } for q in cursor.fetchall()]
 
 
-def _execute_query(conn, query_name, params):
-    """Execute a named query and return result dict or error tuple.
+def _resolve_query(cursor, query_name, params, paged=False):
+    """Resolve a named query to ``(sql, params, page)``.
 
     Auto-generated queries (prefix ``auto__``) are handled directly
-    without looking up ``ui_queries``.
+    without looking up ``ui_queries``. With ``paged=True`` the paging
+    controls in params (limit, offset, cursor, sort, dir, q, q_cols,
+    filter[col]) are moved into ``page``; see _run_paged_query.
+
+    Returns None if the query does not exist. Raises ValueError for an
+    invalid params declaration or paging control.
+    """
+    # Auto-generated queries ("auto__{table}_list") are checked against
+    # sqlite_master (SQL injection prevention) and take no parameters
+    query = exec_plan.compile_query(cursor, query_name)
+    if query is None:
+        return None
+    if query.error:
+        logger.error("Query '%s' failed: %s", query_name, query.error)
+        raise ValueError(query.error)
+    page = _pop_page_params(query.sql, params) if paged else {}
+    # Missing optional params are bound to None so COALESCE(:param, default) works
+    return query.sql, query.bind(params), _parse_page_params(page)
+
+
+def _execute_query(conn, query_name, params, paged=False, fmt='rows'):
+    """Execute a named query and return result dict or error tuple.
+
+    See _resolve_query for auto-generated queries and paging controls.
+    ``fmt`` selects the row encoding (see result_format); compact formats
+    are built from plain tuples. Successful results are served from and
+    stored in the query result cache (see query_cache).
     """
     cursor = conn.cursor()
+    try:
+        resolved = _resolve_query(cursor, query_name, params, paged)
+    except ValueError as e:
+        return {'error': str(e)}
+    if resolved is None:
+        return None
+    sql, params, page = resolved
+    return _run_query(conn, query_name, sql, params, page, fmt)
 
-    # Auto-generated query: "auto__{table}_list"
-    if query_name.startswith('auto__') and query_name.endswith('_list'):
-        table = query_name[6:-5]  # "auto__countries_list" → "countries"
-        # Verify table exists (SQL injection prevention)
-        cursor.execute(
-            "SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
-        if not cursor.fetchone():
-            return None
+
+def _execute_compiled(conn, query, params, fmt='rows'):
+    """Execute a CompiledQuery (see exec_plan) like _execute_query, unpaged."""
+    if query is None:
+        return None
+    if query.error:
+        return {'error': query.error}
+    return _run_query(conn, query.name, query.sql, query.bind(params), {}, fmt)
+
+
+def _run_query(conn, query_name, sql, params, page, fmt):
+    """Execute resolved SQL through the query result cache.
+
+    Queries the index advisor routed to a sidecar of indexed table copies
+    run on a sidecar connection (see index_advisor). Execution is bounded
+    by the query's budget; an interrupted query returns the error dict of
+    query_limits.QueryInterrupted (``status`` 503). Executions over the
+    slow-query threshold are logged with their plan (see slow_query).
+    """
+    # Generation of the canonical DBs, shared by every lookup below
+    token = query_cache.db_token(conn, include_overlay=False)
+    cache_key = _query_cache_key(conn, token, query_name, sql, params, page, fmt)
+    if cache_key is not None:
+        cached = _query_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+    budget = _query_budget(conn, query_name, token)
+    sidecar = index_advisor.sidecar_for(conn, query_name, token)
+    routed = sidecar.acquire(conn) if sidecar is not None else None
+    try:
+        # Statement that actually ran: paging wraps sql (see _run_paged_query)
+        executed = {'sql': sql, 'params': params}
+        start = time.perf_counter()
+        result = _execute_limited(routed or conn, budget, query_name, sql, params, page, fmt,
+                                  executed)
+        elapsed = time.perf_counter() - start
+        metrics.observe_query(query_name, elapsed, result.get('row_count'))
+        slow_query.check(routed or conn, 'named', query_name, executed['sql'],
+                         executed['params'], elapsed, result.get('row_count'),
+                         result.get('error'))
+    finally:
+        if routed is not None:
+            sidecar.release(routed)
+    if 'error' in result:
+        return result
+
+    if cache_key is not None:
+        _query_cache.put(cache_key, result)
+        return dict(result)
+    return result
+
+
+def _execute_limited(conn, budget, query_name, sql, params, page, fmt, executed=None):
+    """Run resolved SQL on conn within budget; returns a result or error dict.
+
+    ``executed`` (a dict), if given, receives the ``sql`` and ``params`` of
+    the paged statement when paging wraps the query.
+    """
+    cursor = conn.cursor()
+    if fmt != 'rows':
+        cursor.row_factory = None
+    try:
+        with query_limits.Limiter(conn, budget, query_name):
+            if page:
+                return _run_paged_query(cursor, query_name, sql, params, page, fmt,
+                                        executed)
+            with server_timing.phase('sql', query_name):
+                cursor.execute(sql, params)
+            with server_timing.phase('rows', query_name):
+                columns = [desc[0] for desc in cursor.description]
+                rows = cursor.fetchall()
+                result = {
+                    'query': query_name,
+                    'columns': columns,
+                    'row_count': len(rows),
+                    'total_count': len(rows),
+                }
+                result.update(_shape_rows(columns, rows, fmt))
+            return result
+    except query_limits.QueryInterrupted as e:
+        return e.to_dict()
+    except ValueError as e:
+        return {'error': str(e)}
+    except Exception as e:
+        logger.error("Query '%s' failed: %s", query_name, e)
+        return {'error': str(e)}
+
+
+def _query_budget(conn, query_name, token):
+    """Time/step budget of a named query (see query_limits)."""
+    return query_limits.budget_for(query_name, query_limits.cached_overrides(conn, token))
+
+
+def _error_response(result):
+    """JSON error response with the result's ``status`` (default 400)."""
+    return JSONResponse(result, status_code=result.get('status', 400))
+
+
+def _limited(limiter, chunks):
+    """Iterate chunks with limiter active only while producing each one."""
+    while True:
+        with limiter:
+            chunk = next(chunks, None)
+        if chunk is None:
+            return
+        yield chunk
+
+
+def _stream_query(open_db, query_name, params, fmt):
+    """Execute a named query and stream its rows (see query_stream).
+
+    Runs on a connection of its own from ``open_db()`` rather than the
+    request's dependency connection, which may be released before the
+    body is sent; it is closed after the last row or on disconnect.
+    Streamed results bypass the query result cache. The query budget
+    covers producing the rows, not waiting on the client; a budget
+    exhausted mid-stream aborts the response.
+    """
+    conn = open_db()
+    try:
+        cursor = conn.cursor()
+        resolved = _resolve_query(cursor, query_name, params, paged=True)
+        if resolved is None:
+            conn.close()
+            return JSONResponse({'error': f'Query not found: {query_name}'}, status_code=404)
+        sql, params, page = resolved
+        token = query_cache.db_token(conn, include_overlay=False)
+        limiter = query_limits.Limiter(conn, _query_budget(conn, query_name, token), query_name)
+        total = None
+        with limiter:
+            if page:
+                sql, params, total = _build_paged_query(cursor, sql, params, page)
+            cursor.execute(sql, params)
+    except query_limits.QueryInterrupted as e:
+        conn.close()
+        return _error_response(e.to_dict())
+    except Exception as e:
+        if not isinstance(e, ValueError):
+            logger.error("Query '%s' failed: %s", query_name, e)
+        conn.close()
+        return JSONResponse({'error': str(e)}, status_code=400)
+
+    columns = [desc[0] for desc in cursor.description]
+    offset = page.get('offset', 0)
+
+    def tail(row_count):
+        # Same fields as a QueryResult response
+        fields = {'row_count': row_count, 'total_count': row_count,
+                  'limit': None, 'offset': None, 'next_cursor': None}
+        if page:
+            end = offset + row_count
+            fields.update(total_count=total, limit=page.get('limit'), offset=offset,
+                          next_cursor=_encode_cursor(end) if end < total else None)
+        return fields
+
+    batch_size = query_stream.batch_rows()
+
+    def body():
         try:
-            cursor.execute(f"SELECT * FROM [{table}]")
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
-            return {
-                'query': query_name,
-                'columns': columns,
-                'row_count': len(rows),
-                'rows': [dict(r) for r in rows]
-            }
-        except Exception as e:
-            return {'error': str(e)}
+            if fmt == 'ndjson':
+                chunks = query_stream.encode_ndjson(cursor, batch_size)
+            else:
+                chunks = query_stream.encode_json(
+                    cursor, {'query': query_name, 'columns': columns}, tail, batch_size)
+            yield from _limited(limiter, chunks)
+        except (sqlite3.Error, query_limits.QueryInterrupted) as e:
+            logger.error("Streaming query '%s' failed: %s", query_name, e)
+            raise
+        finally:
+            conn.close()
+
+    media_type = (query_stream.NDJSON_MEDIA_TYPE if fmt == 'ndjson'
+                  else 'application/json')
+    headers = {'X-Query-Columns': json.dumps(columns)} if fmt == 'ndjson' else None
+    return StreamingResponse(body(), media_type=media_type, headers=headers)
+
 
-    # Standard named query from ui_queries
-    cursor.execute("SELECT sql, params_json FROM ui_queries WHERE name = ?", (query_name,))
-    query = cursor.fetchone()
-    if not query:
+def _ui_manifest_json(conn):
+    """Return the raw 'default' UI manifest dict, or None (no auto-generation)."""
+    try:
+        row = conn.execute(
+            "SELECT manifest_json FROM ui_manifest WHERE name = 'default'").fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, json.JSONDecodeError):
         return None
+
+
+_PAGE_CONTROLS = ('limit', 'offset', 'cursor', 'sort', 'dir', 'q', 'q_cols')
+_FILTER_PARAM_RE = re.compile(r'^filter\[(.+)\]$')
+
+
+def _pop_page_params(sql, params):
+    """Move paging/sort/filter controls out of the request params.
+
+    A control the named SQL binds itself (e.g. ``:limit``) stays a query
+    parameter.
+    """
+    bound = query_cache.bound_params(sql)
+    page = {}
+    for key in list(params):
+        m = _FILTER_PARAM_RE.match(key)
+        if m:
+            page.setdefault('filters', {})[m.group(1)] = params.pop(key)
+        elif key in _PAGE_CONTROLS and key not in bound:
+            page[key] = params.pop(key)
+    return page
+
+
+def _encode_cursor(offset):
+    return base64.urlsafe_b64encode(f'o:{offset}'.encode()).decode().rstrip('=')
+
+
+def _decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        kind, value = raw.split(':', 1)
+        if kind == 'o' and int(value) >= 0:
+            return int(value)
+    except (ValueError, UnicodeDecodeError):
+        pass
+    raise ValueError(f'Invalid cursor: {cursor}')
+
+
+def _parse_page_params(page):
+    """Validate raw paging controls into {limit, offset, sort, dir, q, q_cols, filters}."""
+    if not page:
+        return {}
+    parsed = {}
     try:
-        # Fill missing optional params with None so COALESCE(:param, default) works
-        if query['params_json']:
-            declared = json.loads(query['params_json'])
-            for pname in declared:
-                if pname not in params:
-                    params[pname] = None
-        cursor.execute(query['sql'], params)
+        if page.get('limit') not in (None, ''):
+            parsed['limit'] = int(page['limit'])
+            if parsed['limit'] < 0:
+                raise ValueError
+        parsed['offset'] = int(page.get('offset') or 0)
+        if parsed['offset'] < 0:
+            raise ValueError
+    except ValueError:
+        raise ValueError('limit and offset must be non-negative integers')
+    if page.get('cursor'):
+        parsed['offset'] = _decode_cursor(page['cursor'])
+    if page.get('sort'):
+        parsed['sort'] = page['sort']
+        direction = (page.get('dir') or 'asc').lower()
+        if direction not in ('asc', 'desc'):
+            raise ValueError("dir must be 'asc' or 'desc'")
+        parsed['dir'] = direction
+    if page.get('q'):
+        parsed['q'] = page['q']
+        if page.get('q_cols'):
+            parsed['q_cols'] = [c for c in page['q_cols'].split(',') if c]
+    if page.get('filters'):
+        parsed['filters'] = page['filters']
+    return parsed
+
+
+def _quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _build_paged_query(cursor, sql, params, page):
+    """Wrap a named query as a subquery with filter/sort/limit applied.
+
+    Column names in sort/filters are validated against the query's own
+    result columns; values are always bound. Returns ``(sql, binds,
+    total_count)`` where total_count counts the rows matching the filters.
+    """
+    base = sql.strip().rstrip(';')
+    cursor.execute(f"SELECT * FROM ({base}) LIMIT 0", params)
+    columns = [desc[0] for desc in cursor.description]
+
+    def column(name):
+        if name not in columns:
+            raise ValueError(f'Unknown column: {name}')
+        return _quote_ident(name)
+
+    binds = dict(params)
+    where = []
+    for i, (col, value) in enumerate(page.get('filters', {}).items()):
+        where.append(f"{column(col)} = :__filter{i}")
+        binds[f'__filter{i}'] = value
+    if 'q' in page:
+        search_cols = page.get('q_cols') or columns
+        escaped = page['q'].replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        binds['__q'] = f'%{escaped}%'
+        where.append('(' + ' OR '.join(
+            f"{column(c)} LIKE :__q ESCAPE '\\'" for c in search_cols) + ')')
+    where_sql = f" WHERE {' AND '.join(where)}" if where else ''
+
+    total = cursor.execute(
+        f"SELECT COUNT(*) FROM ({base}){where_sql}", binds).fetchone()[0]
+
+    order_sql = ''
+    if 'sort' in page:
+        order_sql = f" ORDER BY {column(page['sort'])} {page['dir'].upper()}"
+    limit = page.get('limit')
+    binds['__limit'] = -1 if limit is None else limit
+    binds['__offset'] = page.get('offset', 0)
+    paged_sql = (f"SELECT * FROM ({base}){where_sql}{order_sql} "
+                 f"LIMIT :__limit OFFSET :__offset")
+    return paged_sql, binds, total
+
+
+def _run_paged_query(cursor, query_name, sql, params, page, fmt='rows', executed=None):
+    """Run a named query with paging controls applied (see _build_paged_query).
+
+    Returns a result dict with ``total_count`` and ``next_cursor``. The
+    wrapped statement and its binds are recorded in ``executed`` if given.
+    """
+    with server_timing.phase('sql', f'{query_name} count'):
+        paged_sql, binds, total = _build_paged_query(cursor, sql, params, page)
+    if executed is not None:
+        executed.update(sql=paged_sql, params=binds)
+    with server_timing.phase('sql', query_name):
+        cursor.execute(paged_sql, binds)
+    with server_timing.phase('rows', query_name):
         columns = [desc[0] for desc in cursor.description]
         rows = cursor.fetchall()
-        return {
+
+        offset = page.get('offset', 0)
+        end = offset + len(rows)
+        result = {
             'query': query_name,
             'columns': columns,
             'row_count': len(rows),
-            'rows': [dict(row) for row in rows]
+            'total_count': total,
+            'limit': page.get('limit'),
+            'offset': offset,
+            'next_cursor': _encode_cursor(end) if end < total else None,
         }
-    except Exception as e:
-        logger.error("Query '%s' failed: %s", query_name, e)
-        return {'error': str(e)}
+        result.update(_shape_rows(columns, rows, fmt))
+    return result
+
+
+def _shape_rows(columns, rows, fmt):
+    """Encode fetched rows for a result dict (sqlite3.Row for 'rows', else tuples)."""
+    if fmt == 'rows':
+        return {'rows': [dict(row) for row in rows]}
+    return dict(result_format.shape(columns, rows, fmt), format=fmt)
+
+
+def _nested_rows(result, fmt):
+    """Rows of a sub-query result as embedded in composite/entity detail.
+
+    A missing or failed sub-query yields no rows.
+    """
+    key = 'data' if fmt == 'columnar' else 'rows'
+    if result is None or 'error' in result:
+        result = {'columns': [], key: []}
+    if fmt == 'rows':
+        return result['rows']
+    return {'columns': result['columns'], key: result[key]}
+
+
+_view_plans_lock = threading.Lock()
+
+
+def _view_plan(conn, key, compile_plan):
+    """Return the ViewPlan for key, compiling it once per DB generation.
+
+    ``compile_plan(cursor)`` builds the plan (see exec_plan). Plans whose
+    main query does not exist are not kept, so arbitrary entity names in
+    URLs cannot grow the cache.
+    """
+    plans = _generation_cached(conn, 'view_plans', dict)
+    plan = plans.get(key)
+    if plan is None:
+        plan = compile_plan(conn.cursor())
+        if plan.main is not None:
+            with _view_plans_lock:
+                plans[key] = plan
+    return plan
+
+
+def _composite_plan(conn, view_name):
+    """(plan, None) for a manifest composite view, or (None, error response)."""
+    manifest_data = _fetch_manifest(conn)
+    if not manifest_data:
+        return None, JSONResponse({'error': 'No manifest found'}, status_code=404)
+    view = manifest_data['manifest'].get('views', {}).get(view_name)
+    if not view or view.get('type') != 'detail' or 'source_query' not in view:
+        logger.warning("Composite detail view not found: %s", view_name)
+        return None, JSONResponse({'error': f'Detail view not found: {view_name}'},
+                                  status_code=404)
+    plan = _view_plan(conn, ('composite', view_name),
+                      lambda cursor: exec_plan.compile_composite(cursor, view_name, view))
+    return plan, None
+
+
+def _entity_plan(conn, entity_name):
+    """ViewPlan for an entity detail, or None if ``{entity}_detail`` does not exist."""
+    plan = _view_plan(conn, ('entity', entity_name),
+                      lambda cursor: exec_plan.compile_entity(cursor, entity_name))
+    return plan if plan.main is not None else None
+
+
+def _run_view_plan(conn, plan, entity_id, request_params, fmt, open_conn=None):
+    """Bind and execute a compiled ViewPlan.
+
+    Returns ``(data, None)`` or ``(None, error response)``. The main record
+    stays a flat object; sub-query rows are encoded per fmt. Independent
+    sub-queries run concurrently on connections from ``open_conn()``
+    (see exec_plan.run_steps).
+    """
+    forwarded = request_params if plan.forward_params else {}
+    main_params = dict(forwarded)
+    main_params[plan.id_param] = entity_id
+    result = _execute_compiled(conn, plan.main, main_params)
+    if result and 'error' in result:
+        return None, _error_response(result)
+    if result is None or result.get('row_count', 0) == 0:
+        return None, JSONResponse({'error': 'Not found'}, status_code=404)
+    interrupted = []
+
+    def execute(connection, step, params):
+        return _execute_compiled(connection, step.query, params, fmt)
+
+    def merge(data, step, sub_result):
+        if sub_result and sub_result.get('status') == query_limits.STATUS:
+            interrupted.append(sub_result)
+        if plan.skip_failed and (sub_result is None or 'error' in sub_result):
+            return
+        data[step.key] = _nested_rows(sub_result, fmt)
+
+    data = exec_plan.run_steps(plan, entity_id, dict(result['rows'][0]), forwarded,
+                               execute, merge, conn, open_conn)
+    if interrupted:
+        # Partial detail would look complete; report the budget instead
+        return None, _error_response(interrupted[0])
+    return data, None
+
+
+def _pop_format(params):
+    """Remove and validate the ``format`` request parameter."""
+    return result_format.parse_format(params.pop('format', None))
+
+
+def _result_response(result, fmt):
+    """Return a query result; compact formats skip response-model validation."""
+    if fmt == 'rows':
+        return result
+    return result_format.CompactJSONResponse(result)
+
+
+BATCH_MAX_QUERIES = 100
+
+
+def _run_batch(conn, queries, binary=False, open_conn=None):
+    """Execute the items of a batch request and return their results by id.
+
+    Each item runs like /queries/{name}/execute (paging controls, ``format``
+    and the query result cache apply); a failed item gets ``error`` and
+    the HTTP ``status`` it would have had on its own. Items with the same
+    query and parameters are executed once. Named queries are read-only,
+    so distinct items fan out over extra connections (exec_plan.fan_out),
+    at most SCODA_COMPOSITE_PARALLEL at a time. With ``binary`` every
+    result is columnar, encoded for MessagePack.
+    """
+    unique = {}                 # (query, params JSON) → index into jobs
+    jobs, slots = [], []
+    for item in queries:
+        key = (item.query, json.dumps(item.params, sort_keys=True, default=str))
+        if key not in unique:
+            unique[key] = len(jobs)
+            jobs.append(item)
+        slots.append(unique[key])
+    results = [None] * len(jobs)
+
+    def run(connection, index):
+        item = jobs[index]
+        params = dict(item.params)
+        try:
+            fmt = _pop_format(params)
+        except ValueError as e:
+            results[index] = {'error': str(e), 'status': 400}
+            return
+        if binary:
+            fmt = 'columnar'
+        result = _execute_query(connection, item.query, params, paged=True, fmt=fmt)
+        if result is None:
+            result = {'error': f'Query not found: {item.query}', 'status': 404}
+        elif 'error' in result:
+            result = dict({'status': 400}, **result)
+        elif binary:
+            result = binary_format.result_document(result)
+        results[index] = result
+
+    exec_plan.fan_out(range(len(jobs)), run, conn, exec_plan.parallel_from_env(), open_conn)
+    return {_batch_id(item, position): results[slot]
+            for position, (item, slot) in enumerate(zip(queries, slots))}
+
+
+def _batch_id(item, position):
+    return item.id if item.id is not None else str(position)
+
+
+def _batch_response(conn, body, request, open_conn):
+    """Validate a batch request, run it and encode the response."""
+    if len(body.queries) > BATCH_MAX_QUERIES:
+        return JSONResponse({'error': f'At most {BATCH_MAX_QUERIES} queries per batch'},
+                            status_code=400)
+    ids = [_batch_id(item, i) for i, item in enumerate(body.queries)]
+    if len(set(ids)) != len(ids):
+        return JSONResponse({'error': 'Duplicate query id in batch'}, status_code=400)
+    binary = binary_format.accepts_msgpack(request.headers.get('accept'))
+    results = _run_batch(conn, body.queries, binary, open_conn)
+    if binary:
+        return Response(binary_format.pack({'results': results}),
+                        media_type=binary_format.MEDIA_TYPE)
+    return result_format.CompactJSONResponse({'results': results})
+
+
+def _query_cache_key(conn, canonical, query_name, sql, params, page=None, fmt='rows'):
+    """Cache key for a query execution, or None if it must not be cached.
+
+    ``canonical`` is the connection's db_token without the overlay.
+    """
+    if not _query_cache.enabled:
+        return None
+    if canonical is None:
+        return None
+    excluded = _query_cache.policy(canonical, lambda: _ui_manifest_json(conn))
+    if excluded is None or query_name in excluded:
+        return None
+    token = canonical
+    if query_cache.reads_overlay(sql):
+        token = query_cache.db_token(conn, include_overlay=True)
+        if token is None:
+            return None
+    page_key = tuple(sorted(
+        (k, tuple(sorted(v.items())) if isinstance(v, dict) else
+         tuple(v) if isinstance(v, list) else v)
+        for k, v in (page or {}).items()))
+    return token, query_name, query_cache.normalize_params(sql, params), page_key, fmt
 
 
 def _fetch_annotations(conn, entity_type, entity_id):
@@ -461,10 +1072,17 @@ async def get_package_db(package: str):
     Looks up the package in the global PackageRegistry.
     The connection is automatically closed when the request finishes.
     """
+    metrics.current_package.set(package)
+    with server_timing.phase('registry', 'registry lookup'):
+        registry = get_registry()
     try:
-        conn = get_registry().get_db(package)
+        conn = registry.get_db(package)
     except KeyError:
         raise HTTPException(status_code=404, detail=f"Package not found: {package}")
+    except ScodaPackageError as e:
+        # Lazily loaded package failed extraction/verification on first use
+        logger.error("Package '%s' failed to load: %s", package, e)
+        raise HTTPException(status_code=503, detail=f"Package unavailable: {package}")
     try:
         yield conn
     finally:
@@ -488,7 +1106,7 @@ def api_generic_detail(query_name: str, request: Request,
     if result is None:
         return JSONResponse({'error': f'Query not found: {query_name}'}, status_code=404)
     if 'error' in result:
-        return JSONResponse(result, status_code=400)
+        return _error_response(result)
     if result['row_count'] == 0:
         return JSONResponse({'error': 'Not found'}, status_code=404)
     return result['rows'][0]
@@ -496,51 +1114,32 @@ def api_generic_detail(query_name: str, request: Request,
 
 @pkg_router.get('/composite/{view_name}',
                 responses={400: {"model": ErrorResponse}, 404: {"model": ErrorResponse}})
-def api_composite_detail(view_name: str, request: Request,
+def api_composite_detail(package: str, view_name: str, request: Request,
                          conn: sqlite3.Connection = Depends(get_package_db)):
-    """Execute manifest-defined composite detail query."""
+    """Execute manifest-defined composite detail query.
+
+    ``format=columnar|compact`` encodes each sub-query's rows compactly
+    (see result_format); the main record stays a flat object.
+    """
     entity_id = request.query_params.get('id')
     if not entity_id:
         return JSONResponse({'error': 'id parameter required'}, status_code=400)
-
-    manifest_data = _fetch_manifest(conn)
-    if not manifest_data:
-        return JSONResponse({'error': 'No manifest found'}, status_code=404)
-
-    views = manifest_data['manifest'].get('views', {})
-    view = views.get(view_name)
-    if not view or view.get('type') != 'detail' or 'source_query' not in view:
-        logger.warning("Composite detail view not found: %s", view_name)
-        return JSONResponse({'error': f'Detail view not found: {view_name}'}, status_code=404)
-
-    # Main query — merge request query_params so optional params (e.g. profile_id) are forwarded
-    source_param = view.get('source_param', 'id')
-    main_params = dict(request.query_params)
-    main_params[source_param] = entity_id
-    result = _execute_query(conn, view['source_query'], main_params)
-    if result and 'error' in result:
-        return JSONResponse(result, status_code=400)
-    if result is None or result.get('row_count', 0) == 0:
-        return JSONResponse({'error': 'Not found'}, status_code=404)
-
-    data = dict(result['rows'][0])
-
-    # Sub-queries — also forward request query_params for optional bindings
     extra_params = dict(request.query_params)
-    for key, sub_def in view.get('sub_queries', {}).items():
-        params = dict(extra_params)
-        for param_name, value_source in sub_def.get('params', {}).items():
-            if value_source == 'id':
-                params[param_name] = entity_id
-            elif value_source.startswith('result.'):
-                field = value_source[7:]
-                params[param_name] = data.get(field, '')
-            else:
-                params[param_name] = value_source
-        sub_result = _execute_query(conn, sub_def['query'], params)
-        data[key] = sub_result['rows'] if sub_result and 'rows' in sub_result else []
+    try:
+        fmt = _pop_format(extra_params)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
 
-    return data
+    plan, error = _composite_plan(conn, view_name)
+    if error is not None:
+        return error
+    # Request query_params are forwarded to every query for optional
+    # bindings (e.g. profile_id)
+    data, error = _run_view_plan(conn, plan, entity_id, extra_params, fmt,
+                                 lambda: get_registry().get_db(package))
+    if error is not None:
+        return error
+    return _result_response(data, fmt)
 
 
 @pkg_router.get('/auto/detail/{table_name}',
@@ -597,6 +1196,35 @@ def api_queries(conn: sqlite3.Connection = Depends(get_package_db)):
     return _fetch_queries(conn)
 
 
+@pkg_router.get('/plans')
+def api_view_plans(conn: sqlite3.Connection = Depends(get_package_db)):
+    """Compiled execution plans (see exec_plan) for introspection.
+
+    ``composite``: manifest detail views served by /composite/{view};
+    ``entity``: entities with an ``{entity}_detail`` query, served by
+    /{entity}/{id}. Each plan lists resolved SQL, parameter bindings and
+    the result key of every sub-query.
+    """
+    composite = {}
+    manifest_data = _fetch_manifest(conn)
+    views = manifest_data['manifest'].get('views', {}) if manifest_data else {}
+    for view_name, view in views.items():
+        if view.get('type') == 'detail' and 'source_query' in view:
+            plan, _ = _composite_plan(conn, view_name)
+            composite[view_name] = plan.describe()
+    entity = {}
+    try:
+        names = [r[0] for r in conn.execute(
+            "SELECT name FROM ui_queries WHERE substr(name, -7) = '_detail' ORDER BY name")]
+    except sqlite3.Error:
+        names = []
+    for name in names:
+        plan = _entity_plan(conn, name[:-len('_detail')])
+        if plan is not None:
+            entity[plan.name] = plan.describe()
+    return {'composite': composite, 'entity': entity}
+
+
 @pkg_router.get('/manifest', response_model=ManifestResponse,
                 responses={404: {"model": ErrorResponse}})
 def api_manifest(package: str, conn: sqlite3.Connection = Depends(get_package_db)):
@@ -648,16 +1276,66 @@ def api_manifest(package: str, conn: sqlite3.Connection = Depends(get_package_db
 
 @pkg_router.get('/queries/{name}/execute', response_model=QueryResult,
                 responses={404: {"model": ErrorResponse}, 400: {"model": ErrorResponse}})
-def api_query_execute(name: str, request: Request,
+def api_query_execute(package: str, name: str, request: Request,
                       conn: sqlite3.Connection = Depends(get_package_db)):
-    """Execute a named query with optional parameters"""
+    """Execute a named query with optional parameters.
+
+    Optional paging controls: ``limit``, ``offset`` or ``cursor``,
+    ``sort`` + ``dir``, ``q`` (+ ``q_cols``) substring search and
+    ``filter[column]=value`` equality filters.
+
+    ``Accept: application/x-ndjson`` or ``stream=1`` streams rows as
+    NDJSON; ``stream=json`` streams the regular JSON document.
+    ``Accept: application/msgpack`` returns the columnar result as
+    typed MessagePack (see binary_format).
+    """
     params = dict(request.query_params)
-    result = _execute_query(conn, name, params)
+    try:
+        fmt = query_stream.stream_format(request.headers.get('accept'),
+                                         params.pop('stream', None))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    if fmt:
+        return _stream_query(lambda: get_registry().get_db(package), name, params, fmt)
+    try:
+        fmt = _pop_format(params)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    binary = binary_format.accepts_msgpack(request.headers.get('accept'))
+    if binary:
+        fmt = 'columnar'
+    result = _execute_query(conn, name, params, paged=True, fmt=fmt)
     if result is None:
         return JSONResponse({'error': f'Query not found: {name}'}, status_code=404)
     if 'error' in result:
-        return JSONResponse(result, status_code=400)
-    return result
+        return _error_response(result)
+    if binary:
+        return binary_format.MsgpackResponse(result)
+    return _result_response(result, fmt)
+
+
+class BatchQuery(BaseModel):
+    id: Optional[str] = None
+    query: str
+    params: dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    queries: list[BatchQuery]
+
+
+@pkg_router.post('/batch', responses={400: {"model": ErrorResponse}})
+def api_query_batch(package: str, body: BatchRequest, request: Request,
+                    conn: sqlite3.Connection = Depends(get_package_db)):
+    """Execute several named queries in one round trip.
+
+    Body: ``{"queries": [{"id": "a", "query": "name", "params": {...}}]}``.
+    Returns ``{"results": {id: result}}``; an item without ``id`` is keyed
+    by its position. Each result is what /queries/{name}/execute would
+    return for the item, or ``{"error": ..., "status": ...}``.
+    ``Accept: application/msgpack`` returns every result columnar as
+    typed MessagePack.
+    """
+    return _batch_response(conn, body, request, lambda: get_registry().get_db(package))
 
 
 @pkg_router.get('/annotations/{entity_type}/{entity_id}', response_model=list[AnnotationItem])
@@ -762,7 +1440,11 @@ from .crud_engine import CrudEngine
 
 
 def _get_entity_schemas(conn) -> dict[str, EntitySchema]:
-    """Load editable_entities from manifest and parse into schemas."""
+    """Load editable_entities from manifest and parse into schemas (cached)."""
+    return _generation_cached(conn, 'entity_schemas', lambda: _load_entity_schemas(conn))
+
+
+def _load_entity_schemas(conn) -> dict[str, EntitySchema]:
     manifest_data = _fetch_manifest(conn)
     if not manifest_data:
         return {}
@@ -1105,52 +1787,27 @@ def api_meta_composite_tree(package: str, node_id: str = None):
 
 @pkg_router.get('/{entity_name}/{entity_id}',
                 responses={404: {"model": ErrorResponse}, 400: {"model": ErrorResponse}})
-def api_entity_detail(entity_name: str, entity_id: str,
+def api_entity_detail(package: str, entity_name: str, entity_id: str, request: Request,
                       conn: sqlite3.Connection = Depends(get_package_db)):
     """Resolve manifest source URLs (e.g. /api/{pkg}/genus/683).
 
     Executes the ``{entity}_detail`` named query and attaches results from
-    sub-queries whose names start with ``{entity}_``.
+    sub-queries whose names start with ``{entity}_``, encoded per
+    ``format`` as in composite detail.
     """
-    detail_query = f'{entity_name}_detail'
-    param_name = f'{entity_name}_id'
-
-    result = _execute_query(conn, detail_query, {param_name: entity_id})
-    if result is None:
-        return JSONResponse({'error': f'Query not found: {detail_query}'}, status_code=404)
-    if 'error' in result:
-        return JSONResponse(result, status_code=400)
-    if result.get('row_count', 0) == 0:
-        return JSONResponse({'error': 'Not found'}, status_code=404)
-
-    data = dict(result['rows'][0])
-
-    # Discover sub-queries: {entity}_* (excluding _detail itself)
-    cursor = conn.cursor()
-    cursor.execute(
-        "SELECT name, params_json FROM ui_queries WHERE name LIKE ? AND name != ?",
-        (f'{entity_name}_%', detail_query))
-    sub_queries = cursor.fetchall()
-
-    for sq in sub_queries:
-        sub_name = sq['name']
-        # Derive the data key: "genus_hierarchy" → "hierarchy"
-        data_key = sub_name[len(entity_name) + 1:]
-        params_def = json.loads(sq['params_json']) if sq['params_json'] else {}
-        params = {}
-        for pn in params_def:
-            if pn == param_name:
-                params[pn] = entity_id
-            elif pn in data:
-                # param name found in main result — pass through
-                params[pn] = data[pn]
-            else:
-                params[pn] = ''
-        sub_result = _execute_query(conn, sub_name, params)
-        if sub_result and 'rows' in sub_result:
-            data[data_key] = sub_result['rows']
-
-    return data
+    try:
+        fmt = result_format.parse_format(request.query_params.get('format'))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    plan = _entity_plan(conn, entity_name)
+    if plan is None:
+        return JSONResponse({'error': f'Query not found: {entity_name}_detail'},
+                            status_code=404)
+    data, error = _run_view_plan(conn, plan, entity_id, {}, fmt,
+                                 lambda: get_registry().get_db(package))
+    if error is not None:
+        return error
+    return _result_response(data, fmt)
 
 
 # ---------------------------------------------------------------------------
@@ -1160,18 +1817,22 @@ def api_entity_detail(entity_name: str, entity_id: str,
 legacy_router = APIRouter(prefix="/api")
 
 
-def get_legacy_db():
-    """Resolve DB for legacy /api/... routes (no package in URL)."""
+def _open_legacy_db():
+    """Open a DB connection for legacy /api/... routes (no package in URL)."""
     from scoda_engine_core.scoda_package import get_active_package_name, get_db
     active = get_active_package_name()
     if active:
         try:
-            conn = get_registry().get_db(active)
+            return get_registry().get_db(active)
         except KeyError:
-            conn = get_db()
-    else:
-        # Testing mode or single-package: use direct get_db()
-        conn = get_db()
+            return get_db()
+    # Testing mode or single-package: use direct get_db()
+    return get_db()
+
+
+def get_legacy_db():
+    """Resolve DB for legacy /api/... routes (no package in URL)."""
+    conn = _open_legacy_db()
     try:
         yield conn
     finally:
@@ -1195,12 +1856,33 @@ def legacy_queries(conn: sqlite3.Connection = Depends(get_legacy_db)):
 def legacy_query_execute(query_name: str, request: Request,
                          conn: sqlite3.Connection = Depends(get_legacy_db)):
     params = dict(request.query_params)
-    result = _execute_query(conn, query_name, params)
+    try:
+        fmt = query_stream.stream_format(request.headers.get('accept'),
+                                         params.pop('stream', None))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    if fmt:
+        return _stream_query(_open_legacy_db, query_name, params, fmt)
+    try:
+        fmt = _pop_format(params)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    binary = binary_format.accepts_msgpack(request.headers.get('accept'))
+    if binary:
+        fmt = 'columnar'
+    result = _execute_query(conn, query_name, params, paged=True, fmt=fmt)
     if result is None:
         return JSONResponse({'error': f'Query not found: {query_name}'}, status_code=404)
     if 'error' in result:
-        return JSONResponse(result, status_code=400)
-    return result
+        return _error_response(result)
+    if binary:
+        return binary_format.MsgpackResponse(result)
+    return _result_response(result, fmt)
+
+@legacy_router.post('/batch')
+def legacy_query_batch(body: BatchRequest, request: Request,
+                       conn: sqlite3.Connection = Depends(get_legacy_db)):
+    return _batch_response(conn, body, request, _open_legacy_db)
 
 @legacy_router.get('/detail/{query_name}')
 def legacy_detail(query_name: str, request: Request,
@@ -1210,7 +1892,7 @@ def legacy_detail(query_name: str, request: Request,
     if result is None:
         return JSONResponse({'error': f'Query not found: {query_name}'}, status_code=404)
     if 'error' in result:
-        return JSONResponse(result, status_code=400)
+        return _error_response(result)
     if result['row_count'] == 0:
         return JSONResponse({'error': 'Not found'}, status_code=404)
     return result['rows'][0]
@@ -1221,33 +1903,18 @@ def legacy_composite(view_name: str, request: Request,
     entity_id = request.query_params.get('id')
     if not entity_id:
         return JSONResponse({'error': 'id parameter required'}, status_code=400)
-    manifest_data = _fetch_manifest(conn)
-    if not manifest_data:
-        return JSONResponse({'error': 'No manifest found'}, status_code=404)
-    views = manifest_data['manifest'].get('views', {})
-    view = views.get(view_name)
-    if not view or view.get('type') != 'detail' or 'source_query' not in view:
-        return JSONResponse({'error': f'Detail view not found: {view_name}'}, status_code=404)
-    source_param = view.get('source_param', 'id')
-    main_params = dict(request.query_params)
-    main_params[source_param] = entity_id
-    result = _execute_query(conn, view['source_query'], main_params)
-    if result is None or result.get('row_count', 0) == 0:
-        return JSONResponse({'error': 'Not found'}, status_code=404)
-    data = dict(result['rows'][0])
     extra_params = dict(request.query_params)
-    for key, sub_def in view.get('sub_queries', {}).items():
-        params = dict(extra_params)
-        for param_name, value_source in sub_def.get('params', {}).items():
-            if value_source == 'id':
-                params[param_name] = entity_id
-            elif value_source.startswith('result.'):
-                params[param_name] = data.get(value_source[7:], '')
-            else:
-                params[param_name] = value_source
-        sub_result = _execute_query(conn, sub_def['query'], params)
-        data[key] = sub_result['rows'] if sub_result and 'rows' in sub_result else []
-    return data
+    try:
+        fmt = _pop_format(extra_params)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    plan, error = _composite_plan(conn, view_name)
+    if error is not None:
+        return error
+    data, error = _run_view_plan(conn, plan, entity_id, extra_params, fmt, _open_legacy_db)
+    if error is not None:
+        return error
+    return _result_response(data, fmt)
 
 @legacy_router.get('/preferences')
 def legacy_preferences(conn: sqlite3.Connection = Depends(get_legacy_db)):
@@ -1272,6 +1939,49 @@ app.include_router(legacy_router)
 app.include_router(pkg_router)
 
 
+_HTTP_ETAGS = http_cache.enabled_from_env()
+_HTTP_MAX_AGE = http_cache.max_age_from_env()
+# Per-package routes whose content comes from the overlay (user state)
+_OVERLAY_ROUTES = {'annotations', 'preferences'}
+_LEGACY_SEGMENTS = {route.path.split('/')[2] for route in legacy_router.routes}
+
+
+def _http_cache_validator(scope):
+    """(ETag, Cache-Control) for a per-package GET, or None.
+
+    Computed from registry metadata and file headers only — no
+    connection is opened — so a matching If-None-Match costs no SQL.
+    """
+    if not _HTTP_ETAGS:
+        return None
+    parts = scope['path'].split('/')
+    if len(parts) < 3 or parts[1] != 'api':
+        return None
+    if parts[2] in _LEGACY_SEGMENTS:
+        from scoda_engine_core.scoda_package import get_active_package_name
+        name, route = get_active_package_name(), parts[2]
+        if name is None:
+            return None
+    elif len(parts) >= 4:
+        name, route = parts[2], parts[3]
+    else:
+        return None
+    registry = get_registry()
+    try:
+        # Admin writes go to the extracted data.db, not the checksummed package
+        data = registry.data_token(name, live=SCODA_MODE == 'admin')
+        overlay = registry.overlay_token(name)
+    except KeyError:
+        return None
+    headers = dict(scope.get('headers', []))
+    query = tuple(sorted(parse_qsl(scope.get('query_string', b'').decode('latin-1'),
+                                   keep_blank_values=True)))
+    etag = http_cache.make_etag(ENGINE_VERSION, SCODA_MODE, name, data, overlay,
+                                scope['path'], query, headers.get(b'accept', b''))
+    private = SCODA_MODE == 'admin' or route in _OVERLAY_ROUTES
+    return etag, http_cache.cache_control(private, _HTTP_MAX_AGE)
+
+
 # ---------------------------------------------------------------------------
 # Global endpoints (package-independent)
 # ---------------------------------------------------------------------------
@@ -1282,6 +1992,51 @@ def api_packages():
     return get_registry().list_packages()
 
 
+@app.get('/api/query-cache')
+def api_query_cache_stats():
+    """Named-query result cache counters (hits, misses, bytes, ...)."""
+    return _query_cache.stats()
+
+
+@app.get('/metrics', include_in_schema=False)
+def prometheus_metrics():
+    """Prometheus text exposition of all workers' metrics (see metrics)."""
+    if not metrics.enabled():
+        raise HTTPException(status_code=404, detail="Metrics disabled")
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get('/api/query-limits')
+def api_query_limits_stats():
+    """Default query budgets and interruption counters (see query_limits)."""
+    return query_limits.stats()
+
+
+@app.get('/api/slow-queries')
+def api_slow_queries(limit: int = 20, sort: str = 'total_ms'):
+    """Slowest queries of this worker, aggregated (admin mode; see slow_query)."""
+    _require_admin()
+    try:
+        offenders = slow_query.top(limit, sort)
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    return {'threshold_ms': slow_query.threshold_ms(), 'queries': offenders}
+
+
+@app.delete('/api/slow-queries')
+def api_slow_queries_reset():
+    """Clear the slow-query aggregates (admin mode)."""
+    _require_admin()
+    slow_query.reset()
+    return {'message': 'Slow-query statistics cleared'}
+
+
+@app.get('/api/index-advisor')
+def api_index_advisor_stats():
+    """Index advisor sidecars per package: path, routed queries and hits."""
+    return index_advisor.stats()
+
+
 @app.get('/healthz')
 def healthz():
     """Health check endpoint."""
@@ -1330,9 +2085,7 @@ def index(request: Request):
             pass  # landing.html fetches /api/packages, filtering done client-side
 
     # Multiple top-level packages (or zero): landing page
-    return templates.TemplateResponse(request, "landing.html", {
-        "cache_bust": int(time.time()),
-    })
+    return templates.TemplateResponse(request, "landing.html", {})
 
 
 @app.get('/{package}/', response_class=HTMLResponse, include_in_schema=False)
@@ -1345,7 +2098,6 @@ def package_index(request: Request, package: str):
     except KeyError:
         raise HTTPException(status_code=404, detail=f"Package not found: {package}")
     return templates.TemplateResponse(request, "index.html", {
-        "cache_bust": int(time.time()),
         "package_name": package,
     })
 
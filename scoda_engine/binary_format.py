@@ -0,0 +1,361 @@
+"""
+Binary Format — MessagePack encoding of columnar query results.
+
+Query execution endpoints answer ``Accept: application/msgpack`` with the
+columnar result (see result_format) encoded as MessagePack instead of
+JSON text.  Each column is typed from its values (``cursor.description``
+carries only names in sqlite3, so the SQLite storage class is sniffed)
+and dense columns are sent as one packed ext value instead of one
+MessagePack item per cell:
+
+  ext 1 — float64 column       header + little-endian float64[count]
+  ext 2 — int32 column         header + little-endian int32[count]
+  ext 3 — text column          header + uint32 offsets[count + 1] + UTF-8
+
+  header = uint32 count (LE), uint8 has_nulls,
+           then ceil(count / 8) bitmap bytes if has_nulls (bit i set = null)
+
+Blob, mixed-type and out-of-range integer columns are plain MessagePack
+arrays.  The document also carries ``types``: one of integer, real,
+text, blob, null or mixed per column.
+
+Pure Python, no msgpack dependency: pack() covers the types SQLite
+returns, unpack()/decode_result() mirror the JavaScript decoder in
+static/js/app.js.
+"""
+
+from __future__ import annotations
+
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from fastapi.responses import Response
+
+from scoda_engine import server_timing
+
+MEDIA_TYPE = 'application/msgpack'
+_MEDIA_TYPES = (MEDIA_TYPE, 'application/x-msgpack', 'application/vnd.msgpack')
+
+EXT_FLOAT64 = 1
+EXT_INT32 = 2
+EXT_TEXT = 3
+
+_INT32_MIN, _INT32_MAX = -2 ** 31, 2 ** 31 - 1
+_SAFE_INT = 2 ** 53
+_BIG_ENDIAN = sys.byteorder == 'big'
+_UINT32 = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def accepts_msgpack(accept: str | None) -> bool:
+    """True if the Accept header lists a MessagePack media type (q > 0)."""
+    if not accept:
+        return False
+    for part in accept.split(','):
+        media, _, rest = part.partition(';')
+        if media.strip().lower() not in _MEDIA_TYPES:
+            continue
+        q = 1.0
+        for param in rest.split(';'):
+            key, _, value = param.partition('=')
+            if key.strip() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            return True
+    return False
+
+
+# ---------------------------------------------------------------------------
+# Type sniffing and column encoding
+# ---------------------------------------------------------------------------
+
+_STORAGE_CLASS = {int: 'integer', float: 'real', str: 'text', bytes: 'blob'}
+
+
+def sniff_type(values) -> str:
+    """SQLite storage class shared by all non-NULL values of a column."""
+    kinds = {_STORAGE_CLASS.get(t, 'mixed') for t in set(map(type, values))
+             if t is not type(None)}
+    if not kinds:
+        return 'null'
+    if kinds == {'integer', 'real'}:
+        return 'real'
+    return kinds.pop() if len(kinds) == 1 else 'mixed'
+
+
+def _native(arr) -> bytes:
+    if _BIG_ENDIAN:
+        arr.byteswap()
+    return arr.tobytes()
+
+
+def _header(values, has_nulls: bool) -> bytes:
+    if not has_nulls:
+        return struct.pack('<IB', len(values), 0)
+    bitmap = bytearray((len(values) + 7) // 8)
+    for i, v in enumerate(values):
+        if v is None:
+            bitmap[i >> 3] |= 1 << (i & 7)
+    return struct.pack('<IB', len(values), 1) + bytes(bitmap)
+
+
+def encode_column(values, kind: str):
+    """Encode one column: an ExtType for dense types, else the plain list."""
+    has_nulls = None in values
+    if kind in ('integer', 'real'):
+        numbers = [0 if v is None else v for v in values] if has_nulls else values
+        low, high = min(numbers), max(numbers)
+        if kind == 'integer' and _INT32_MIN <= low and high <= _INT32_MAX:
+            return ExtType(EXT_INT32, _header(values, has_nulls) + _native(array('i', numbers)))
+        if kind == 'real' or (-_SAFE_INT <= low and high <= _SAFE_INT):
+            return ExtType(EXT_FLOAT64, _header(values, has_nulls) + _native(array('d', numbers)))
+    elif kind == 'text':
+        strings = ['' if v is None else v for v in values] if has_nulls else values
+        text = ''.join(strings)
+        if text.isascii():
+            # One character per byte: offsets come straight from str lengths
+            chunks, payload = strings, text.encode('ascii')
+        else:
+            chunks = [v.encode('utf-8') for v in strings]
+            payload = b''.join(chunks)
+        offsets = array(_UINT32, accumulate(map(len, chunks), initial=0))
+        return ExtType(EXT_TEXT, _header(values, has_nulls) + _native(offsets) + payload)
+    return list(values)
+
+
+def encode_result(result: dict) -> bytes:
+    """MessagePack-encode a columnar query result dict (with ``data``)."""
+    return pack(result_document(result))
+
+
+def result_document(result: dict) -> dict:
+    """A columnar result with its columns as typed extensions, ready for pack()."""
+    doc = {k: v for k, v in result.items() if k not in ('data', 'format')}
+    data = result.get('data', [])
+    types = [sniff_type(col) for col in data]
+    doc['format'] = 'columnar'
+    doc['types'] = types
+    doc['data'] = [encode_column(col, kind) for col, kind in zip(data, types)]
+    return doc
+
+
+class MsgpackResponse(Response):
+    media_type = MEDIA_TYPE
+
+    def render(self, content) -> bytes:
+        with server_timing.phase('serialize', 'msgpack'):
+            return encode_result(content)
+
+
+# ---------------------------------------------------------------------------
+# MessagePack
+# ---------------------------------------------------------------------------
+
+class ExtType:
+    """MessagePack extension value (type code + raw payload)."""
+
+    __slots__ = ('code', 'data')
+
+    def __init__(self, code: int, data: bytes):
+        self.code = code
+        self.data = data
+
+    def __eq__(self, other):
+        return isinstance(other, ExtType) and (self.code, self.data) == (other.code, other.data)
+
+
+def _pack_int(v, out):
+    if 0 <= v < 128:
+        out.append(v)
+    elif -32 <= v < 0:
+        out.append(v & 0xff)
+    elif 0 <= v <= 0xffffffff:
+        if v <= 0xff:
+            out += struct.pack('>BB', 0xcc, v)
+        elif v <= 0xffff:
+            out += struct.pack('>BH', 0xcd, v)
+        else:
+            out += struct.pack('>BI', 0xce, v)
+    elif 0 <= v <= 0xffffffffffffffff:
+        out += struct.pack('>BQ', 0xcf, v)
+    elif -2 ** 31 <= v < 0:
+        if v >= -128:
+            out += struct.pack('>Bb', 0xd0, v)
+        elif v >= -32768:
+            out += struct.pack('>Bh', 0xd1, v)
+        else:
+            out += struct.pack('>Bi', 0xd2, v)
+    elif -2 ** 63 <= v < 0:
+        out += struct.pack('>Bq', 0xd3, v)
+    else:
+        raise OverflowError(f"Integer out of MessagePack range: {v}")
+
+
+def _pack_len(n, out, fix, fix_max, codes):
+    if fix is not None and n <= fix_max:
+        out.append(fix | n)
+    elif codes[0] is not None and n <= 0xff:
+        out += struct.pack('>BB', codes[0], n)
+    elif n <= 0xffff:
+        out += struct.pack('>BH', codes[1], n)
+    else:
+        out += struct.pack('>BI', codes[2], n)
+
+
+def _pack(obj, out):
+    if obj is None:
+        out.append(0xc0)
+    elif obj is True:
+        out.append(0xc3)
+    elif obj is False:
+        out.append(0xc2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out += struct.pack('>Bd', 0xcb, obj)
+    elif isinstance(obj, str):
+        raw = obj.encode('utf-8')
+        _pack_len(len(raw), out, 0xa0, 31, (0xd9, 0xda, 0xdb))
+        out += raw
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        raw = bytes(obj)
+        _pack_len(len(raw), out, None, -1, (0xc4, 0xc5, 0xc6))
+        out += raw
+    elif isinstance(obj, (list, tuple)):
+        _pack_len(len(obj), out, 0x90, 15, (None, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        _pack_len(len(obj), out, 0x80, 15, (None, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    elif isinstance(obj, ExtType):
+        _pack_len(len(obj.data), out, None, -1, (0xc7, 0xc8, 0xc9))
+        out += struct.pack('>b', obj.code)
+        out += obj.data
+    else:
+        _pack(str(obj), out)
+
+
+def pack(obj) -> bytes:
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpack(data: bytes):
+    """Decode one MessagePack value; ExtType values are returned as-is."""
+    value, end = _unpack(memoryview(data), 0)
+    if end != len(data):
+        raise ValueError("Trailing data after MessagePack value")
+    return value
+
+
+def _unpack(buf, pos):
+    b = buf[pos]
+    pos += 1
+    if b <= 0x7f:
+        return b, pos
+    if b >= 0xe0:
+        return b - 0x100, pos
+    if 0x80 <= b <= 0x8f:
+        return _unpack_map(buf, pos, b & 0x0f)
+    if 0x90 <= b <= 0x9f:
+        return _unpack_array(buf, pos, b & 0x0f)
+    if 0xa0 <= b <= 0xbf:
+        n = b & 0x1f
+        return str(buf[pos:pos + n], 'utf-8'), pos + n
+    if b == 0xc0:
+        return None, pos
+    if b in (0xc2, 0xc3):
+        return b == 0xc3, pos
+    fmt = _FIXED.get(b)
+    if fmt:
+        size = struct.calcsize(fmt)
+        return struct.unpack_from(fmt, buf, pos)[0], pos + size
+    kind, fmt = _SIZED[b]
+    n = struct.unpack_from(fmt, buf, pos)[0]
+    pos += struct.calcsize(fmt)
+    if kind == 'str':
+        return str(buf[pos:pos + n], 'utf-8'), pos + n
+    if kind == 'bin':
+        return bytes(buf[pos:pos + n]), pos + n
+    if kind == 'array':
+        return _unpack_array(buf, pos, n)
+    if kind == 'map':
+        return _unpack_map(buf, pos, n)
+    code = struct.unpack_from('>b', buf, pos)[0]
+    return ExtType(code, bytes(buf[pos + 1:pos + 1 + n])), pos + 1 + n
+
+
+_FIXED = {0xca: '>f', 0xcb: '>d', 0xcc: '>B', 0xcd: '>H', 0xce: '>I', 0xcf: '>Q',
+          0xd0: '>b', 0xd1: '>h', 0xd2: '>i', 0xd3: '>q'}
+_SIZED = {0xd9: ('str', '>B'), 0xda: ('str', '>H'), 0xdb: ('str', '>I'),
+          0xc4: ('bin', '>B'), 0xc5: ('bin', '>H'), 0xc6: ('bin', '>I'),
+          0xdc: ('array', '>H'), 0xdd: ('array', '>I'),
+          0xde: ('map', '>H'), 0xdf: ('map', '>I'),
+          0xc7: ('ext', '>B'), 0xc8: ('ext', '>H'), 0xc9: ('ext', '>I')}
+
+
+def _unpack_array(buf, pos, n):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(buf, pos)
+        items.append(item)
+    return items, pos
+
+
+def _unpack_map(buf, pos, n):
+    items = {}
+    for _ in range(n):
+        key, pos = _unpack(buf, pos)
+        items[key], pos = _unpack(buf, pos)
+    return items, pos
+
+
+def decode_column(value, kind: str) -> list:
+    """Turn an encoded column (see encode_column) back into a list."""
+    if not isinstance(value, ExtType):
+        return value
+    payload = value.data
+    count, has_nulls = struct.unpack_from('<IB', payload, 0)
+    pos = 5
+    nulls = None
+    if has_nulls:
+        nbytes = (count + 7) // 8
+        nulls = payload[pos:pos + nbytes]
+        pos += nbytes
+    if value.code == EXT_TEXT:
+        offsets = array(_UINT32)
+        offsets.frombytes(payload[pos:pos + 4 * (count + 1)])
+        if _BIG_ENDIAN:
+            offsets.byteswap()
+        raw = payload[pos + 4 * (count + 1):]
+        text = raw.decode('utf-8')
+        if len(text) == len(raw):
+            values = [text[offsets[i]:offsets[i + 1]] for i in range(count)]
+        else:
+            values = [raw[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(count)]
+    else:
+        values = array('d' if value.code == EXT_FLOAT64 else 'i')
+        values.frombytes(payload[pos:pos + values.itemsize * count])
+        if _BIG_ENDIAN:
+            values.byteswap()
+        values = [int(v) for v in values] if kind == 'integer' else values.tolist()
+    if nulls:
+        for i in range(count):
+            if nulls[i >> 3] & (1 << (i & 7)):
+                values[i] = None
+    return values
+
+
+def decode_result(data: bytes) -> dict:
+    """Decode a MessagePack query result into the columnar JSON shape."""
+    doc = unpack(data)
+    doc['data'] = [decode_column(col, kind) for col, kind in zip(doc['data'], doc['types'])]
+    return doc
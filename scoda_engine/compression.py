@@ -0,0 +1,478 @@
+"""
+Compression — gzip/brotli responses negotiated from ``Accept-Encoding``.
+
+CompressionMiddleware compresses JSON, MessagePack, NDJSON and text
+responses to GET and POST (batch query) requests:
+
+  - responses with a Content-Length are compressed whole; when they carry
+    an ETag the compressed body is kept in a byte-budgeted LRU keyed by
+    (path, ETag, encoding), so repeated hits do not recompress;
+  - if the ETag can be computed before routing (http_cache validator), a
+    cached compressed body is sent without running the route at all.
+    This is only sound while the ETag covers every store the route reads;
+    ``use_cache`` turns the cache off otherwise (admin mode, where CRUD
+    writes go to canonical data);
+  - streamed responses (NDJSON, incremental JSON) are compressed chunk by
+    chunk with a sync flush, so rows still reach the client as they come.
+
+Compressed representations get a weak ETag (``W/"..."``); conditional GET
+compares weakly, so revalidation keeps working.
+
+Static files can be precompressed at build time::
+
+    python -m scoda_engine.compression [STATIC_DIR] [--clean]
+
+which writes ``.gz`` (and ``.br`` when the ``brotli`` module is available)
+next to each file.  PrecompressedStaticFiles serves those siblings as long
+as they are not older than the file they were made from.
+
+Brotli is optional: without the ``brotli`` module only gzip is offered.
+
+Environment variables:
+  SCODA_COMPRESS             — "0" disables response compression
+  SCODA_COMPRESS_MIN_BYTES   — smallest body worth compressing (default: 1024)
+  SCODA_COMPRESS_CACHE_BYTES — compressed-body cache budget (default: 32M, 0 = off)
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import logging
+import mimetypes
+import os
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+from scoda_engine import http_cache
+from scoda_engine.query_cache import _parse_size
+
+try:
+    import brotli
+except ImportError:     # optional dependency
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MIN_BYTES = 1024
+DEFAULT_CACHE_BYTES = 32 * 1024 ** 2
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+_COMPRESSIBLE = ('text/', 'application/json', 'application/javascript',
+                 'application/msgpack', 'application/x-ndjson', 'application/xml',
+                 'image/svg+xml')
+
+
+def encodings() -> tuple:
+    """Supported encodings, most preferred first."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def accepted_encodings(accept_encoding: str | None, supported=None) -> list:
+    """Encodings from supported (default: encodings()) the client accepts, best first."""
+    if not accept_encoding:
+        return []
+    accepted = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name.strip().lower()] = q
+    wildcard = accepted.get('*', 0.0)
+    ranked = [(accepted.get(e, wildcard), -i, e)
+              for i, e in enumerate(supported if supported is not None else encodings())]
+    return [e for q, _, e in sorted(ranked, reverse=True) if q > 0]
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """Pick 'br' or 'gzip' from an Accept-Encoding header (None = identity)."""
+    accepted = accepted_encodings(accept_encoding)
+    return accepted[0] if accepted else None
+
+
+def is_compressible(content_type: str | None) -> bool:
+    return bool(content_type) and content_type.startswith(_COMPRESSIBLE)
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=BROTLI_QUALITY if level is None else level)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL if level is None else level, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk."""
+
+    def __init__(self, encoding: str):
+        if encoding == 'br':
+            self._obj = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._chunk = lambda data: self._obj.process(data) + self._obj.flush()
+            self._finish = self._obj.finish
+        else:
+            self._obj = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._chunk = lambda data: (self._obj.compress(data)
+                                        + self._obj.flush(zlib.Z_SYNC_FLUSH))
+            self._finish = self._obj.flush
+
+    def chunk(self, data: bytes) -> bytes:
+        return self._chunk(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+class CompressedBodyCache:
+    """Thread-safe LRU of compressed response bodies bounded by a byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()   # key → (status, headers, body)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'CompressedBodyCache':
+        value = os.environ.get('SCODA_COMPRESS_CACHE_BYTES', '').strip()
+        return cls(_parse_size(value) if value else DEFAULT_CACHE_BYTES)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, status: int, headers: list, body: bytes):
+        size = len(body)
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            self._entries[key] = (status, headers, body)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+def _weak(etag: str) -> str:
+    return etag if etag.startswith('W/') else 'W/' + etag
+
+
+def _add_vary(headers: MutableHeaders):
+    vary = headers.get('vary')
+    if not vary:
+        headers['vary'] = 'Accept-Encoding'
+    elif 'accept-encoding' not in vary.lower():
+        headers['vary'] = vary + ', Accept-Encoding'
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses for clients that accept it.
+
+    Args:
+        app: The wrapped ASGI application.
+        cache: CompressedBodyCache for bodies of responses with an ETag.
+        validator: Optional http_cache validator; when it yields an ETag
+            before routing, a cached compressed body is served directly.
+        min_size: Bodies smaller than this are sent uncompressed.
+        use_cache: Optional callable; when it returns False the body cache
+            is neither read nor filled (the ETag may not reflect all writes).
+    """
+
+    def __init__(self, app, cache: CompressedBodyCache | None = None, validator=None,
+                 min_size: int = DEFAULT_MIN_BYTES, use_cache=None):
+        self.app = app
+        self.cache = cache if cache is not None else CompressedBodyCache(0)
+        self.validator = validator
+        self.min_size = min_size
+        self.use_cache = use_cache
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] not in ('GET', 'POST'):
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get('accept-encoding'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        cached_bodies = self.cache.enabled and (self.use_cache is None or self.use_cache())
+        if self.validator is not None and cached_bodies and scope['method'] == 'GET':
+            validated = http_cache.validate(scope, self.validator)
+            if validated is not None and not http_cache.etag_matches(
+                    request_headers.get('if-none-match'), validated[0]):
+                cached = self.cache.get((scope['path'], validated[0], encoding))
+                if cached is not None:
+                    status, headers, body = cached
+                    # Outer middlewares (CORS) edit headers in place: send a copy
+                    await send({'type': 'http.response.start', 'status': status,
+                                'headers': list(headers)})
+                    await send({'type': 'http.response.body', 'body': body})
+                    return
+
+        responder = _CompressingSender(self, scope, send, encoding, cached_bodies)
+        await self.app(scope, receive, responder)
+
+
+class _CompressingSender:
+    """Per-request ``send`` wrapper doing the actual compression."""
+
+    def __init__(self, middleware: CompressionMiddleware, scope, send, encoding: str,
+                 cached_bodies: bool = True):
+        self.middleware = middleware
+        self.path = scope['path']
+        self.send = send
+        self.encoding = encoding
+        self.cached_bodies = cached_bodies
+        self.start = None
+        self.mode = None        # 'buffer', 'stream' or 'pass'
+        self.body = []
+        self.stream = None
+
+    async def __call__(self, message):
+        if message['type'] == 'http.response.start':
+            self._begin(message)
+            if self.mode == 'pass':
+                await self._send_start()
+            return
+        if message['type'] != 'http.response.body':
+            await self.send(message)
+            return
+
+        more = message.get('more_body', False)
+        if self.mode == 'pass':
+            await self.send(message)
+        elif self.mode == 'buffer':
+            self.body.append(message.get('body', b''))
+            if not more:
+                await self._send_buffered()
+        else:
+            if self.stream is None:
+                self.stream = _StreamCompressor(self.encoding)
+                await self._send_start()
+            data = self.stream.chunk(message.get('body', b''))
+            if not more:
+                data += self.stream.finish()
+            if data or not more:
+                await self.send({'type': 'http.response.body', 'body': data,
+                                 'more_body': more})
+
+    def _begin(self, message):
+        headers = MutableHeaders(raw=list(message.get('headers', [])))
+        self.start = message
+        self.headers = headers
+        status = message['status']
+        if status == 304:
+            _add_vary(headers)
+            self.mode = 'pass'
+        elif (status != 200 or 'content-encoding' in headers
+                or not is_compressible(headers.get('content-type'))):
+            self.mode = 'pass'
+        elif 'content-length' in headers:
+            self.mode = 'pass' if int(headers['content-length']) < self.middleware.min_size \
+                else 'buffer'
+        else:
+            self.mode = 'stream'
+            self._mark_compressed(headers)
+
+    async def _send_start(self):
+        await self.send(dict(self.start, headers=list(self.headers.raw)))
+
+    def _mark_compressed(self, headers: MutableHeaders):
+        headers['content-encoding'] = self.encoding
+        _add_vary(headers)
+        if 'etag' in headers:
+            headers['etag'] = _weak(headers['etag'])
+        if 'content-length' in headers:
+            del headers['content-length']
+
+    async def _send_buffered(self):
+        body = b''.join(self.body)
+        headers = self.headers
+        etag = headers.get('etag')
+        cache = self.middleware.cache
+        key = (self.path, etag, self.encoding)
+        etag = etag if self.cached_bodies else None
+        cached = cache.get(key) if etag and cache.enabled else None
+        if cached is not None:
+            await self.send(dict(self.start, headers=list(cached[1])))
+            await self.send({'type': 'http.response.body', 'body': cached[2]})
+            return
+        compressed = compress(body, self.encoding)
+        if len(compressed) >= len(body):
+            await self._send_start()
+            await self.send({'type': 'http.response.body', 'body': body})
+            return
+        self._mark_compressed(headers)
+        headers['content-length'] = str(len(compressed))
+        if etag and 'no-store' not in headers.get('cache-control', ''):
+            cache.put(key, self.start['status'], list(headers.raw), compressed)
+        await self._send_start()
+        await self.send({'type': 'http.response.body', 'body': compressed})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles that serves ``name.br`` / ``name.gz`` siblings when present.
+
+    A sibling is used only when the client accepts its encoding and it is
+    at least as new as the original file; otherwise the file is served as
+    usual (and compressed on the fly by CompressionMiddleware).
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        # .br siblings may have been built elsewhere: serving them needs no brotli
+        for candidate in accepted_encodings(request_headers.get('accept-encoding'),
+                                            ('br', 'gzip')):
+            sibling = str(full_path) + SUFFIXES[candidate]
+            try:
+                sibling_stat = os.stat(sibling)
+            except OSError:
+                continue
+            if sibling_stat.st_mtime < stat_result.st_mtime:
+                continue
+            media_type = mimetypes.guess_type(str(full_path))[0] or 'text/plain'
+            response = FileResponse(sibling, status_code=status_code, media_type=media_type,
+                                    stat_result=sibling_stat,
+                                    headers={'content-encoding': candidate,
+                                             'vary': 'Accept-Encoding'})
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+        return super().file_response(full_path, stat_result, scope, status_code)
+
+
+def enabled_from_env() -> bool:
+    return os.environ.get('SCODA_COMPRESS', '1').strip() != '0'
+
+
+def min_size_from_env() -> int:
+    value = os.environ.get('SCODA_COMPRESS_MIN_BYTES', '').strip()
+    return max(0, int(value)) if value else DEFAULT_MIN_BYTES
+
+
+# ---------------------------------------------------------------------------
+# Build-time precompression of static files
+# ---------------------------------------------------------------------------
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+
+
+def precompress_dir(directory: str, min_size: int = DEFAULT_MIN_BYTES) -> list:
+    """Write .gz/.br siblings for compressible files under directory.
+
+    Uses maximum compression levels (done once, at build time).  Siblings
+    that would not be smaller than the original are not written.  Returns
+    the paths written.
+    """
+    written = []
+    for root, _, files in os.walk(directory):
+        for filename in sorted(files):
+            if filename.endswith(tuple(SUFFIXES.values())):
+                continue
+            path = os.path.join(root, filename)
+            if not is_compressible(mimetypes.guess_type(filename)[0]):
+                continue
+            with open(path, 'rb') as f:
+                body = f.read()
+            if len(body) < min_size:
+                continue
+            for encoding in encodings():
+                data = compress(body, encoding, level=11 if encoding == 'br' else 9)
+                if len(data) >= len(body):
+                    continue
+                target = path + SUFFIXES[encoding]
+                with open(target, 'wb') as f:
+                    f.write(data)
+                written.append(target)
+    return written
+
+
+def clean_dir(directory: str) -> list:
+    """Remove precompressed siblings under directory; returns removed paths."""
+    removed = []
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            base, ext = os.path.splitext(filename)
+            if ext in SUFFIXES.values() and base in files:
+                path = os.path.join(root, filename)
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Precompress static files (.gz, and .br when brotli is installed)')
+    parser.add_argument('directory', nargs='?', default=STATIC_DIR,
+                        help='Directory to precompress (default: engine static files)')
+    parser.add_argument('--clean', action='store_true',
+                        help='Remove precompressed files instead of writing them')
+    parser.add_argument('--min-bytes', type=int, default=DEFAULT_MIN_BYTES,
+                        help=f'Skip files smaller than this (default: {DEFAULT_MIN_BYTES})')
+    args = parser.parse_args(argv)
+
+    if args.clean:
+        paths = clean_dir(args.directory)
+        print(f"Removed {len(paths)} precompressed file(s) from {args.directory}")
+        return 0
+    if brotli is None:
+        print("brotli module not installed — writing .gz only", file=sys.stderr)
+    paths = precompress_dir(args.directory, args.min_bytes)
+    for path in paths:
+        print(f"  {os.path.relpath(path, args.directory)}")
+    print(f"Wrote {len(paths)} precompressed file(s) in {args.directory}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,14 +2,18 @@
 CRUD Engine — generic Create/Read/Update/Delete operations driven by EntitySchema.
 
 All SQL uses parameterized queries. Field names are validated against the schema
-whitelist before inclusion in SQL statements.
+whitelist before inclusion in SQL statements. Statements over the slow-query
+threshold are logged as ``{table}.{operation}`` (see slow_query).
 """
 
 from __future__ import annotations
 
 import logging
 import sqlite3
+from contextlib import contextmanager
 
+from . import server_timing
+from . import slow_query
 from .entity_schema import EntitySchema, validate_input
 
 logger = logging.getLogger(__name__)
@@ -20,6 +24,13 @@ class CrudEngine:
         self.conn = conn
         self.schema = schema
 
+    @contextmanager
+    def _watch(self, operation: str, sql: str, params=None):
+        query = f'{self.schema.table}.{operation}'
+        with server_timing.phase('sql', query), \
+                slow_query.watch(self.conn, 'crud', query, sql, params) as probe:
+            yield probe
+
     def create(self, data: dict) -> dict:
         """INSERT a new row and return the created record."""
         errors = validate_input(self.schema, data, 'create')
@@ -54,7 +65,9 @@ class CrudEngine:
                f"VALUES ({', '.join(placeholders)})")
 
         cursor = self.conn.cursor()
-        cursor.execute(sql, vals)
+        with self._watch('create', sql, vals) as probe:
+            cursor.execute(sql, vals)
+            probe.rows = cursor.rowcount
         pk_value = cursor.lastrowid
 
         # Execute hooks
@@ -67,8 +80,10 @@ class CrudEngine:
         """SELECT a single row by PK."""
         sql = f"SELECT * FROM [{self.schema.table}] WHERE [{self.schema.pk}] = ?"
         cursor = self.conn.cursor()
-        cursor.execute(sql, (pk_value,))
-        row = cursor.fetchone()
+        with self._watch('read', sql, (pk_value,)) as probe:
+            cursor.execute(sql, (pk_value,))
+            row = cursor.fetchone()
+            probe.rows = int(row is not None)
         return dict(row) if row else None
 
     def update(self, pk_value, data: dict) -> dict | None:
@@ -110,7 +125,9 @@ class CrudEngine:
                f"WHERE [{self.schema.pk}] = ?")
 
         cursor = self.conn.cursor()
-        cursor.execute(sql, vals)
+        with self._watch('update', sql, vals) as probe:
+            cursor.execute(sql, vals)
+            probe.rows = cursor.rowcount
 
         # Execute hooks
         self._execute_hooks(data, 'update')
@@ -126,7 +143,9 @@ class CrudEngine:
 
         sql = f"DELETE FROM [{self.schema.table}] WHERE [{self.schema.pk}] = ?"
         cursor = self.conn.cursor()
-        cursor.execute(sql, (pk_value,))
+        with self._watch('delete', sql, (pk_value,)) as probe:
+            cursor.execute(sql, (pk_value,))
+            probe.rows = cursor.rowcount
 
         # Execute hooks
         self._execute_hooks(existing, 'delete')
@@ -158,16 +177,19 @@ class CrudEngine:
         # Count
         count_sql = f"SELECT COUNT(*) FROM [{self.schema.table}]{where_clause}"
         cursor = self.conn.cursor()
-        cursor.execute(count_sql, params)
-        total = cursor.fetchone()[0]
+        with self._watch('count', count_sql, params):
+            cursor.execute(count_sql, params)
+            total = cursor.fetchone()[0]
 
         # Fetch page
         offset = (page - 1) * per_page
         data_sql = (f"SELECT * FROM [{self.schema.table}]{where_clause} "
                     f"ORDER BY [{self.schema.pk}] "
                     f"LIMIT ? OFFSET ?")
-        cursor.execute(data_sql, params + [per_page, offset])
-        rows = [dict(r) for r in cursor.fetchall()]
+        with self._watch('list', data_sql, params + [per_page, offset]) as probe:
+            cursor.execute(data_sql, params + [per_page, offset])
+            rows = [dict(r) for r in cursor.fetchall()]
+            probe.rows = len(rows)
 
         return {
             'rows': rows,
@@ -250,7 +272,8 @@ class CrudEngine:
             sql = hook.get('sql')
             if sql:
                 try:
-                    cursor.execute(sql)
+                    with self._watch(f"hook.{hook.get('name', '?')}", sql):
+                        cursor.execute(sql)
                 except Exception as e:
                     logger.error("Hook '%s' failed: %s", hook.get('name', '?'), e)
 
@@ -293,5 +316,8 @@ class CrudEngine:
         params.append(limit)
 
         cursor = self.conn.cursor()
-        cursor.execute(sql, params)
-        return [dict(r) for r in cursor.fetchall()]
+        with self._watch('search', sql, params) as probe:
+            cursor.execute(sql, params)
+            rows = [dict(r) for r in cursor.fetchall()]
+            probe.rows = len(rows)
+        return rows
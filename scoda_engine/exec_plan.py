@@ -0,0 +1,347 @@
+"""
+Execution Plans — compiled entity-detail and composite view definitions.
+
+A composite view (manifest ``views.{name}`` with ``source_query`` and
+``sub_queries``) or an entity detail (``{entity}_detail`` plus the
+``{entity}_*`` queries in ui_queries) is compiled once per package
+generation into a ViewPlan:
+
+  - every named query resolved to its SQL text and declared parameters;
+  - every sub-query parameter turned into a Binding (the entity id, a
+    field of the main row, or a literal);
+  - the key each sub-query result is stored under.
+
+Request handling then only binds values and executes.  Plans are plain
+data; ``ViewPlan.describe()`` is what the plan introspection endpoint
+returns.
+
+Sub-queries run in waves (run_steps): a step whose ``result.<field>``
+binding names the key of an earlier step runs after it; the steps of a
+wave fan out over extra connections in a shared thread pool, at most
+``max_parallel`` at a time (manifest view option, default
+SCODA_COMPOSITE_PARALLEL).  Results are merged in declaration order, so
+the response is the same as with sequential execution.  The same fan-out
+(fan_out) runs the items of a batch query request.
+
+Environment variables:
+  SCODA_COMPOSITE_PARALLEL — sub-queries run concurrently per request
+                             (default: 4, 1 = sequential)
+  SCODA_COMPOSITE_THREADS  — shared sub-query thread pool size (default: 8)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_PARALLEL = 4
+DEFAULT_THREADS = 8
+
+
+@dataclass(frozen=True)
+class CompiledQuery:
+    name: str
+    sql: str
+    declared: tuple = ()        # params bound to None when the request omits them
+    auto: bool = False          # auto__{table}_list: takes no parameters
+    error: str | None = None    # invalid params_json
+
+    def bind(self, params: dict) -> dict:
+        """Parameters to execute with: request params plus declared defaults."""
+        if self.auto:
+            return {}
+        bound = dict(params)
+        for name in self.declared:
+            bound.setdefault(name, None)
+        return bound
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'sql': self.sql, 'params': list(self.declared),
+                'auto': self.auto, 'error': self.error}
+
+
+@dataclass(frozen=True)
+class Binding:
+    param: str
+    source: str                 # 'id', 'field' (main row, '' if absent) or 'literal'
+    value: Any = None           # field name or literal value
+
+    def resolve(self, entity_id, row: dict):
+        if self.source == 'id':
+            return entity_id
+        if self.source == 'field':
+            return row.get(self.value, '')
+        return self.value
+
+
+@dataclass(frozen=True)
+class Step:
+    key: str                    # result key in the response
+    query_name: str
+    query: CompiledQuery | None  # None: the query does not exist
+    bindings: tuple = ()
+    after: tuple = ()           # indices of earlier steps whose results it binds
+
+    def params(self, entity_id, row: dict, request_params: dict) -> dict:
+        params = dict(request_params)
+        for binding in self.bindings:
+            params[binding.param] = binding.resolve(entity_id, row)
+        return params
+
+    def describe(self) -> dict:
+        return {
+            'key': self.key,
+            'query': self.query.describe() if self.query else {'name': self.query_name,
+                                                               'missing': True},
+            'bindings': {b.param: _describe_binding(b) for b in self.bindings},
+            'after': list(self.after),
+        }
+
+
+@dataclass(frozen=True)
+class ViewPlan:
+    kind: str                   # 'composite' or 'entity'
+    name: str
+    main: CompiledQuery | None
+    main_query: str
+    id_param: str
+    forward_params: bool        # request params are passed to every query
+    steps: tuple = ()
+    skip_failed: bool = False   # omit failed sub-queries instead of empty rows
+    max_parallel: int | None = None  # per-view cap (None: SCODA_COMPOSITE_PARALLEL)
+
+    @property
+    def waves(self) -> list:
+        """Step indices grouped so each group only depends on earlier groups."""
+        levels = []
+        for step in self.steps:
+            levels.append(1 + max((levels[j] for j in step.after), default=-1))
+        waves = [[] for _ in range(max(levels, default=-1) + 1)]
+        for index, level in enumerate(levels):
+            waves[level].append(index)
+        return waves
+
+    def describe(self) -> dict:
+        return {
+            'kind': self.kind,
+            'name': self.name,
+            'main': self.main.describe() if self.main else {'name': self.main_query,
+                                                            'missing': True},
+            'id_param': self.id_param,
+            'forward_request_params': self.forward_params,
+            'steps': [step.describe() for step in self.steps],
+            'waves': self.waves,
+            'max_parallel': self.max_parallel or parallel_from_env(),
+        }
+
+
+def _describe_binding(binding: Binding) -> str:
+    if binding.source == 'id':
+        return 'id'
+    if binding.source == 'field':
+        return f'result.{binding.value}'
+    return repr(binding.value)
+
+
+def _link_steps(steps: list) -> tuple:
+    """Fill Step.after: a field binding reads the latest earlier step with that key."""
+    linked = []
+    for index, step in enumerate(steps):
+        after = set()
+        for binding in step.bindings:
+            if binding.source != 'field':
+                continue
+            for j in range(index - 1, -1, -1):
+                if steps[j].key == binding.value:
+                    after.add(j)
+                    break
+        linked.append(Step(step.key, step.query_name, step.query, step.bindings,
+                           tuple(sorted(after))))
+    return tuple(linked)
+
+
+def compile_query(cursor, name: str) -> CompiledQuery | None:
+    """Resolve a named query (or ``auto__{table}_list``); None if it does not exist."""
+    if name.startswith('auto__') and name.endswith('_list'):
+        table = name[6:-5]
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+        if not cursor.fetchone():
+            return None
+        return CompiledQuery(name, f"SELECT * FROM [{table}]", auto=True)
+    cursor.execute("SELECT sql, params_json FROM ui_queries WHERE name = ?", (name,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    sql, params_json = row[0], row[1]
+    if not params_json:
+        return CompiledQuery(name, sql)
+    try:
+        declared = tuple(json.loads(params_json))
+    except (json.JSONDecodeError, TypeError) as e:
+        return CompiledQuery(name, sql, error=str(e))
+    return CompiledQuery(name, sql, declared)
+
+
+def compile_composite(cursor, view_name: str, view: dict) -> ViewPlan:
+    """Compile a manifest detail view with ``source_query`` and ``sub_queries``."""
+    steps = []
+    for key, sub_def in view.get('sub_queries', {}).items():
+        bindings = []
+        for param, source in sub_def.get('params', {}).items():
+            if source == 'id':
+                bindings.append(Binding(param, 'id'))
+            elif isinstance(source, str) and source.startswith('result.'):
+                bindings.append(Binding(param, 'field', source[7:]))
+            else:
+                bindings.append(Binding(param, 'literal', source))
+        steps.append(Step(key, sub_def['query'], compile_query(cursor, sub_def['query']),
+                          tuple(bindings)))
+    max_parallel = view.get('max_parallel')
+    return ViewPlan('composite', view_name, compile_query(cursor, view['source_query']),
+                    view['source_query'], view.get('source_param', 'id'),
+                    forward_params=True, steps=_link_steps(steps),
+                    max_parallel=int(max_parallel) if max_parallel else None)
+
+
+def compile_entity(cursor, entity_name: str) -> ViewPlan:
+    """Compile ``{entity}_detail`` and its ``{entity}_*`` sub-queries.
+
+    Each sub-query's result is stored under its name without the entity
+    prefix ("genus_hierarchy" → "hierarchy"). Its declared parameters are
+    bound to the entity id (``{entity}_id``) or to the main row's field of
+    the same name.
+    """
+    detail_query = f'{entity_name}_detail'
+    id_param = f'{entity_name}_id'
+    cursor.execute(
+        "SELECT name FROM ui_queries WHERE name LIKE ? AND name != ?",
+        (f'{entity_name}_%', detail_query))
+    steps = []
+    for (sub_name,) in cursor.fetchall():
+        query = compile_query(cursor, sub_name)
+        bindings = tuple(Binding(p, 'id') if p == id_param else Binding(p, 'field', p)
+                         for p in (query.declared if query else ()))
+        steps.append(Step(sub_name[len(entity_name) + 1:], sub_name, query, bindings))
+    return ViewPlan('entity', entity_name, compile_query(cursor, detail_query), detail_query,
+                    id_param, forward_params=False, steps=_link_steps(steps), skip_failed=True)
+
+
+# ---------------------------------------------------------------------------
+# Sub-query execution
+# ---------------------------------------------------------------------------
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def parallel_from_env() -> int:
+    value = os.environ.get('SCODA_COMPOSITE_PARALLEL', '').strip()
+    return max(1, int(value)) if value else DEFAULT_PARALLEL
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            value = os.environ.get('SCODA_COMPOSITE_THREADS', '').strip()
+            _executor = ThreadPoolExecutor(max_workers=max(1, int(value) if value else
+                                                           DEFAULT_THREADS),
+                                           thread_name_prefix='scoda-subquery')
+        return _executor
+
+
+def fan_out(indices, run, conn, cap: int, open_conn=None) -> None:
+    """Call ``run(connection, index)`` for every index, at most cap at a time.
+
+    The calling thread works on conn; up to ``cap - 1`` pool workers each
+    open one extra connection with ``open_conn()`` (closed after use) and
+    take indices from a shared iterator until none are left.  Workers run
+    in a copy of the caller's contextvars context.  Exceptions raised by
+    run propagate.
+    """
+    indices = list(indices)
+    if cap <= 1 or len(indices) <= 1 or open_conn is None:
+        for index in indices:
+            run(conn, index)
+        return
+    pending = iter(indices)
+    lock = threading.Lock()
+
+    def next_index():
+        with lock:
+            return next(pending, None)
+
+    def worker():
+        index = next_index()
+        if index is None:
+            return
+        extra = open_conn()
+        try:
+            while index is not None:
+                run(extra, index)
+                index = next_index()
+        finally:
+            extra.close()
+
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, worker)
+               for _ in range(min(cap, len(indices)) - 1)]
+    index = next_index()
+    while index is not None:
+        run(conn, index)
+        index = next_index()
+    for future in futures:
+        future.cancel()
+    wait(futures)
+    for future in futures:
+        if not future.cancelled():
+            future.result()
+
+
+def run_steps(plan: ViewPlan, entity_id, row: dict, request_params: dict,
+              execute, merge, conn, open_conn=None) -> dict:
+    """Execute plan.steps and return the merged record.
+
+    Args:
+        plan: Compiled ViewPlan.
+        entity_id: The requested id.
+        row: Main record (not modified).
+        request_params: Forwarded to every sub-query (already filtered by
+            the caller for plans that do not forward).
+        execute: ``execute(conn, step, params) -> result``.
+        merge: ``merge(data, step, result)`` stores a result into the record.
+        conn: Connection used by the calling thread.
+        open_conn: Opens an extra connection for a worker (closed after
+            use); without it every step runs on conn.
+    """
+    results = {}
+    settled = {}                # results of completed waves
+    steps = plan.steps
+
+    def run(connection, index):
+        step = steps[index]
+        source = row
+        if step.after:
+            # The record as sequential execution would have it at this step
+            source = dict(row)
+            for j in range(index):
+                if j in settled:
+                    merge(source, steps[j], settled[j])
+        results[index] = execute(connection, step,
+                                 step.params(entity_id, source, request_params))
+
+    cap = plan.max_parallel or parallel_from_env()
+    for wave in plan.waves:
+        settled = dict(results)
+        fan_out(wave, run, conn, cap, open_conn)
+
+    data = dict(row)
+    for index, step in enumerate(steps):
+        if index in results:
+            merge(data, step, results[index])
+    return data
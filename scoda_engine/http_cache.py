@@ -0,0 +1,130 @@
+"""
+HTTP Cache — ETags and conditional GET for package-derived API responses.
+
+A per-package GET response depends only on the package data, its overlay,
+the route and the request (query params, Accept).  ConditionalGetMiddleware
+asks a validator for a strong ETag built from those *before* the request
+reaches a route, so a matching ``If-None-Match`` is answered with 304
+without opening a connection or running SQL.  200 responses carry the
+ETag plus ``Cache-Control`` so browsers and CDNs can store and revalidate
+them.
+
+Cache-Control:
+  canonical routes  public, no-cache  (or public, max-age=N — see below)
+  overlay routes    private, no-cache (annotations, preferences; admin mode)
+
+Environment variables:
+  SCODA_HTTP_MAX_AGE — seconds browsers/CDNs may reuse a canonical response
+                       without revalidating (default: 0 = always revalidate;
+                       revalidation is a 304 that runs no SQL)
+  SCODA_HTTP_ETAGS   — "0" disables ETags and conditional GET
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+
+from starlette.datastructures import Headers
+
+logger = logging.getLogger(__name__)
+
+_SCOPE_KEY = 'scoda.http_cache'
+
+
+def max_age_from_env() -> int:
+    value = os.environ.get('SCODA_HTTP_MAX_AGE', '').strip()
+    return max(0, int(value)) if value else 0
+
+
+def enabled_from_env() -> bool:
+    return os.environ.get('SCODA_HTTP_ETAGS', '1').strip() != '0'
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from the repr of parts."""
+    return '"' + hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak comparison, as RFC 9110 requires)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def validate(scope, validator):
+    """Run ``validator(scope)`` once per request; the result is kept in scope.
+
+    Lets several middlewares (conditional GET, compression) share one
+    ETag computation.  A failing validator counts as None.
+    """
+    if _SCOPE_KEY not in scope:
+        try:
+            scope[_SCOPE_KEY] = validator(scope)
+        except Exception:
+            logger.exception("ETag validator failed for %s", scope.get('path'))
+            scope[_SCOPE_KEY] = None
+    return scope[_SCOPE_KEY]
+
+
+def cache_control(private: bool, max_age: int = 0) -> str:
+    if private:
+        return 'private, no-cache'
+    if max_age > 0:
+        return f'public, max-age={max_age}'
+    return 'public, no-cache'
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding ETags and answering If-None-Match with 304.
+
+    Plain ASGI (not BaseHTTPMiddleware) so streamed bodies pass through
+    untouched.
+
+    Args:
+        app: The wrapped ASGI application.
+        validator: ``validator(scope) -> (etag, cache_control)`` for GET
+            requests, or None to leave the request alone.
+    """
+
+    def __init__(self, app, validator):
+        self.app = app
+        self.validator = validator
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or scope['method'] != 'GET':
+            await self.app(scope, receive, send)
+            return
+        validated = validate(scope, self.validator)
+        if validated is None:
+            await self.app(scope, receive, send)
+            return
+
+        etag, control = validated
+        extra = [(b'etag', etag.encode('latin-1')),
+                 (b'cache-control', control.encode('latin-1')),
+                 (b'vary', b'Accept')]
+        if etag_matches(Headers(scope=scope).get('if-none-match'), etag):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': extra})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        async def send_with_etag(message):
+            if message['type'] == 'http.response.start' and message['status'] == 200:
+                headers = list(message.get('headers', []))
+                present = {name.lower() for name, _ in headers}
+                headers.extend(h for h in extra if h[0] not in present)
+                message = dict(message, headers=headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
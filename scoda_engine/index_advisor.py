@@ -0,0 +1,780 @@
+"""
+Index Advisor — EXPLAIN QUERY PLAN analysis of named queries.
+
+Canonical package data is immutable, so a package is served with exactly
+the indexes its author created.  The advisor runs ``EXPLAIN QUERY PLAN``
+for every ``ui_queries`` entry, with representative parameters, and
+reports:
+
+  - full scans of package tables (``SCAN items``, also through an index);
+  - temporary B-trees built for ORDER BY, GROUP BY or DISTINCT.
+
+For a scanned table it proposes an index from the query's predicates on
+that table: equality columns, then the ORDER BY / GROUP BY columns (or
+the first range column), then the other columns the query reads from the
+table when that keeps the index covering (at most MAX_INDEX_COLUMNS).
+Proposals an existing index already provides are dropped.
+
+The query text is matched with regular expressions, not parsed.  Quoted
+identifiers that are plain words (``"items"``, ``[items]``, backquoted) are
+understood like unquoted ones; a query with any other quoted identifier
+(spaces, punctuation, SQL keywords) still gets its findings but no
+proposal, with the reason in ``QueryAdvice.unsupported``.
+
+Sidecar database: copies of the tables that need new indexes, with their
+original schema and indexes plus the proposed ones, ANALYZEd.  Its file
+name carries a hash of the package data token (sha256 checksum, or file
+identity for raw DBs) and of the canonical DB's generation (size and
+SQLite change counter), so a new package version or a write to the data
+gets a new sidecar.  A named query whose plan has fewer findings on the
+sidecar is routed to it: it runs on a connection whose main database is
+the sidecar, with the canonical database attached as ``scoda_data`` and
+the overlay and dependencies under their usual names.  Unqualified table
+names resolve to the indexed copies first.  Queries are routed only while
+the canonical DB still has the generation the sidecar was copied from, so
+after an admin-mode write they run on the canonical data again.
+
+Usage:
+    python -m scoda_engine.index_advisor PACKAGE.scoda|DATA.db [--json] [--sidecar PATH]
+
+Environment variables (server startup, see serve_web):
+  SCODA_INDEX_ADVISOR — "report" logs findings for every package at startup;
+                        "sidecar" also builds or loads sidecars and routes queries
+  SCODA_INDEX_DIR     — sidecar directory (default: next to each package's overlay DB)
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from dataclasses import dataclass, field
+
+from scoda_engine import query_cache
+
+logger = logging.getLogger(__name__)
+
+MAX_INDEX_COLUMNS = 6
+SIDECAR_SUFFIX = '.index.db'
+SIDECAR_META_TABLE = 'scoda_index_sidecar'
+SIDECAR_ALIAS = 'scoda_data'      # canonical DB on a routed connection
+MAX_IDLE_CONNECTIONS = 8
+SIDECAR_VERSION = 1             # part of the sidecar key: bump when proposals change
+
+_TYPE_SAMPLES = {'integer': 1, 'int': 1, 'real': 1.0, 'float': 1.0, 'number': 1,
+                 'text': 'a', 'string': 'a', 'str': 'a'}
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_COMMENT_RE = re.compile(r'--[^\n]*|/\*.*?\*/', re.DOTALL)
+_IDENT = r'(?:"[^"]+"|\[[^\]]+\]|`[^`]+`|[A-Za-z_][\w.]*)'
+_CLAUSE_END = (r'(?=\b(?:WHERE|GROUP|ORDER|LIMIT|HAVING|UNION|EXCEPT|INTERSECT|WINDOW|'
+               r'LEFT|RIGHT|FULL|INNER|CROSS|NATURAL|JOIN|ON|USING)\b|\)|;|$)')
+_FROM_RE = re.compile(r'\bFROM\s+(.+?)' + _CLAUSE_END, re.IGNORECASE | re.DOTALL)
+_JOIN_RE = re.compile(r'\bJOIN\s+(' + _IDENT + r')(?:\s+(?:AS\s+)?(?!ON\b|USING\b)(\w+))?',
+                      re.IGNORECASE)
+_SOURCE_RE = re.compile(r'^\s*(' + _IDENT + r')(?:\s+(?:AS\s+)?(\w+))?\s*$', re.IGNORECASE)
+_ORDER_RE = re.compile(r'\b(ORDER|GROUP)\s+BY\s+(.+?)(?=\bLIMIT\b|\bHAVING\b|\bWINDOW\b|'
+                       r'\bORDER\b|\)|;|$)', re.IGNORECASE | re.DOTALL)
+_TERM_RE = re.compile(r'^(?:(\w+)\.)?"?(\w+)"?(?:\s+COLLATE\s+\w+)?(?:\s+(?:ASC|DESC))?'
+                      r'(?:\s+NULLS\s+(?:FIRST|LAST))?$', re.IGNORECASE)
+_SCAN_RE = re.compile(r'^SCAN (?:TABLE )?(.+?)(?: AS \S+)?(?: USING .*)?$')
+_TEMP_RE = re.compile(r'^USE TEMP B-TREE FOR (.+)$')
+_EQ_OPS = {'=', '==', 'IN', 'IS'}
+_RANGE_OPS = {'<', '>', '<=', '>=', 'BETWEEN'}
+_LEFT_OP = r'\s*(==|<=|>=|<>|!=|=|<|>|\bIN\b|\bIS\b(?!\s+NOT)|\bBETWEEN\b)'
+_RIGHT_OP = r'(==|<=|>=|=|<|>)\s*'
+_CONSTANT_START = set(":@$?'(-0123456789") | {'N', 'n'}     # parameter, literal, list
+_CONSTANT_END = r"(?:[:@$]\w+|\?\d*|''|\d|\bNULL)\s*$"
+_MAIN_RE = re.compile(r'\bmain\s*\.', re.IGNORECASE)
+_KEYWORDS = {'WHERE', 'ON', 'USING', 'LEFT', 'RIGHT', 'FULL', 'INNER', 'CROSS',
+             'NATURAL', 'JOIN', 'GROUP', 'ORDER', 'LIMIT', 'HAVING', 'UNION',
+             'WINDOW', 'EXCEPT', 'INTERSECT', 'OUTER'}
+_QUOTED_RE = re.compile(r'"([^"]*)"|\[([^\]]*)\]|`([^`]*)`')
+_SQL_WORDS = _KEYWORDS | {'SELECT', 'FROM', 'AS', 'AND', 'OR', 'NOT', 'IN', 'IS', 'BY',
+                          'ASC', 'DESC', 'NULL', 'DISTINCT', 'BETWEEN', 'LIKE', 'CASE',
+                          'WHEN', 'THEN', 'ELSE', 'END', 'WITH', 'ALL', 'EXISTS', 'COLLATE'}
+
+
+@dataclass(frozen=True)
+class Finding:
+    kind: str                   # 'scan' or 'temp_btree'
+    detail: str                 # EXPLAIN QUERY PLAN line
+    table: str | None = None    # package table (scan findings)
+
+    def describe(self) -> dict:
+        return {'kind': self.kind, 'detail': self.detail, 'table': self.table}
+
+
+@dataclass(frozen=True)
+class IndexProposal:
+    table: str
+    columns: tuple
+    covering: bool = False
+
+    @property
+    def name(self) -> str:
+        digest = hashlib.sha1(repr((self.table, self.columns)).encode()).hexdigest()[:8]
+        return f'advisor_{re.sub(r"[^A-Za-z0-9_]", "_", self.table)}_{digest}'
+
+    @property
+    def sql(self) -> str:
+        columns = ', '.join(_quote(c) for c in self.columns)
+        return f'CREATE INDEX IF NOT EXISTS {_quote(self.name)} ON {_quote(self.table)} ({columns})'
+
+    def describe(self) -> dict:
+        return {'table': self.table, 'columns': list(self.columns),
+                'covering': self.covering, 'sql': self.sql}
+
+
+@dataclass
+class QueryAdvice:
+    name: str
+    sql: str
+    params: dict = field(default_factory=dict)     # representative parameters
+    plan: list = field(default_factory=list)
+    findings: list = field(default_factory=list)
+    proposals: list = field(default_factory=list)
+    error: str | None = None
+    unsupported: str | None = None     # why no index was proposed for the findings
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'plan': self.plan,
+                'findings': [f.describe() for f in self.findings],
+                'proposals': [p.describe() for p in self.proposals], 'error': self.error,
+                'unsupported': self.unsupported}
+
+
+@dataclass
+class Report:
+    queries: list = field(default_factory=list)
+
+    @property
+    def flagged(self) -> list:
+        return [q for q in self.queries if q.findings]
+
+    @property
+    def proposals(self) -> list:
+        """Distinct proposals of all queries, in first-seen order.
+
+        A proposal whose columns lead another proposal's on the same table
+        is dropped: the longer index serves both queries.
+        """
+        seen = {}
+        for query in self.queries:
+            for proposal in query.proposals:
+                seen.setdefault((proposal.table, proposal.columns), proposal)
+        return [p for p in seen.values()
+                if not any(o.table == p.table and len(o.columns) > len(p.columns)
+                           and o.columns[:len(p.columns)] == p.columns for o in seen.values())]
+
+    def describe(self) -> dict:
+        return {'queries': [q.describe() for q in self.queries],
+                'flagged': [q.name for q in self.flagged],
+                'proposals': [p.describe() for p in self.proposals]}
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unquote(name: str) -> str:
+    if name[:1] in '"[`' and len(name) > 1:
+        return name[1:-1]
+    return name
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def representative_params(sql: str, params_json: str | None) -> dict:
+    """Parameters to EXPLAIN a named query with.
+
+    Declared values that name a type ("integer", "text", ...) become a
+    sample of that type, other scalar declared values are used as given;
+    everything else is bound to NULL (plans do not depend on the values
+    without sqlite_stat4).
+    """
+    declared = {}
+    if params_json:
+        try:
+            declared = json.loads(params_json)
+        except (json.JSONDecodeError, TypeError):
+            declared = {}
+    if not isinstance(declared, dict):
+        declared = {}
+    params = {}
+    for name in query_cache.bound_params(sql):
+        value = declared.get(name)
+        if isinstance(value, str) and value.lower() in _TYPE_SAMPLES:
+            value = _TYPE_SAMPLES[value.lower()]
+        elif not isinstance(value, (str, int, float)):
+            value = None
+        params[name] = value
+    return params
+
+
+def explain(conn, sql: str, params: dict) -> list:
+    """EXPLAIN QUERY PLAN detail lines."""
+    return [row[3] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql, params).fetchall()]
+
+
+class _Schema:
+    """Tables, columns and indexes of a connection's main database."""
+
+    def __init__(self, conn, schema='main'):
+        self.conn = conn
+        self.schema = schema
+        self.tables = {r[0] for r in conn.execute(
+            f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table' "
+            "AND name NOT LIKE 'sqlite_%'")}
+        self._columns = {}
+        self._indexes = {}
+
+    def columns(self, table: str) -> list:
+        if table not in self._columns:
+            self._columns[table] = [r[1] for r in self.conn.execute(
+                f'PRAGMA {self.schema}.table_info({_quote(table)})')]
+        return self._columns[table]
+
+    def rowid_column(self, table: str) -> str | None:
+        pk = [r for r in self.conn.execute(f'PRAGMA {self.schema}.table_info({_quote(table)})')
+              if r[5]]
+        if len(pk) == 1 and (pk[0][2] or '').upper() == 'INTEGER':
+            return pk[0][1]
+        return None
+
+    def indexes(self, table: str) -> list:
+        """Column tuples of the table's existing indexes."""
+        if table not in self._indexes:
+            indexes = []
+            for row in self.conn.execute(f'PRAGMA {self.schema}.index_list({_quote(table)})'):
+                info = self.conn.execute(
+                    f'PRAGMA {self.schema}.index_info({_quote(row[1])})').fetchall()
+                indexes.append(tuple(r[2] for r in sorted(info)))
+            self._indexes[table] = indexes
+        return self._indexes[table]
+
+
+def _strip_sql(sql: str) -> str:
+    """SQL without comments and string contents, plain-word identifiers unquoted."""
+    def unquote(m):
+        name = next(g for g in m.groups() if g is not None)
+        if re.fullmatch(r'[A-Za-z_]\w*', name) and name.upper() not in _SQL_WORDS:
+            return name
+        return m.group(0)
+    return _QUOTED_RE.sub(unquote, _STRING_RE.sub("''", _COMMENT_RE.sub(' ', sql)))
+
+
+def _sources(sql: str, schema: _Schema) -> dict:
+    """alias or table name → package table, for the FROM/JOIN items of sql."""
+    sources = {}
+
+    def add(name, alias):
+        table = _unquote(name)
+        if table not in schema.tables:
+            return
+        sources[table] = table
+        if alias and alias.upper() not in _KEYWORDS:
+            sources[alias] = table
+
+    for m in _FROM_RE.finditer(sql):
+        for item in m.group(1).split(','):
+            source = _SOURCE_RE.match(item)
+            if source:
+                add(source.group(1), source.group(2))
+    for m in _JOIN_RE.finditer(sql):
+        add(m.group(1), m.group(2))
+    return sources
+
+
+def _column_refs(sql: str, table: str, names: list, schema: _Schema, sources: dict):
+    """(column, operator) pairs of the predicates on table, plus all columns read.
+
+    ``names`` are the aliases of table in the query.  Unqualified columns
+    count when no other table of the query has a column of that name.
+    """
+    columns = schema.columns(table)
+    others = {c for t in set(sources.values()) if t != table for c in schema.columns(t)}
+    qualifier = '|'.join(re.escape(n) for n in names)
+    predicates, read = [], []
+    patterns = [rf'\b(?:{qualifier})\."?(\w+)"?']
+    patterns.append(r'(?<![\w.:@$"])(\w+)\b(?!\s*[.(])')
+    for index, pattern in enumerate(patterns):
+        for m in re.finditer(pattern, sql):
+            column = m.group(1)
+            if column not in columns or (index == 1 and column in others):
+                continue
+            read.append(column)
+            after = re.match(_LEFT_OP + r'\s*(.?)', sql[m.end():], re.IGNORECASE)
+            before = re.search(r'(\S?)\s*' + _RIGHT_OP + r'$', sql[:m.start()])
+            if after:
+                join = after.group(2) not in _CONSTANT_START
+                predicates.append((join, m.start(), column, after.group(1).upper()))
+            elif before:
+                join = not re.search(_CONSTANT_END, sql[:before.start(2)])
+                predicates.append((join, m.start(), column, before.group(2)))
+    # Columns compared with parameters or literals first, join columns last
+    predicates.sort()
+    return [(c, op) for _, _, c, op in predicates], list(dict.fromkeys(read))
+
+
+def _order_columns(sql: str, table: str, names: list, schema: _Schema) -> list:
+    """ORDER BY (else GROUP BY) columns of sql if all belong to table."""
+    columns = schema.columns(table)
+    for clause in ('ORDER', 'GROUP'):
+        for m in _ORDER_RE.finditer(sql):
+            if m.group(1).upper() != clause:
+                continue
+            terms = []
+            for term in m.group(2).split(','):
+                t = _TERM_RE.match(term.strip())
+                if not t or (t.group(1) and t.group(1) not in names) or t.group(2) not in columns:
+                    terms = []
+                    break
+                terms.append(t.group(2))
+            if terms:
+                return list(dict.fromkeys(terms))
+    return []
+
+
+def propose_index(sql: str, table: str, schema: _Schema, sources: dict) -> IndexProposal | None:
+    """Index proposal for a scanned table (None if nothing would help)."""
+    names = [alias for alias, t in sources.items() if t == table]
+    predicates, read = _column_refs(sql, table, names, schema, sources)
+    eq = list(dict.fromkeys(c for c, op in predicates if op in _EQ_OPS))
+    ranges = [c for c, op in predicates if op in _RANGE_OPS and c not in eq]
+    order = [c for c in _order_columns(sql, table, names, schema) if c not in eq]
+    columns = eq + (order or ranges[:1])
+    rowid = schema.rowid_column(table)
+    if rowid in columns[:1]:
+        return None             # already the rowid lookup
+    columns = [c for c in columns if c != rowid][:MAX_INDEX_COLUMNS]
+    if not columns:
+        return None
+    covering = False
+    star = re.search(r'SELECT\s+(?:DISTINCT\s+)?\*|\b(?:%s)\.\*' % '|'.join(
+        re.escape(n) for n in names), sql, re.IGNORECASE)
+    if not star:
+        extra = [c for c in read if c not in columns and c != rowid]
+        if len(columns) + len(extra) <= MAX_INDEX_COLUMNS:
+            columns += extra
+            covering = True
+    for existing in schema.indexes(table):
+        if existing[:len(columns)] == tuple(columns):
+            return None
+    return IndexProposal(table, tuple(columns), covering)
+
+
+def findings_from_plan(plan: list, sources: dict) -> list:
+    findings = []
+    for detail in plan:
+        scan = _SCAN_RE.match(detail)
+        if scan and scan.group(1) in sources:
+            findings.append(Finding('scan', detail, sources[scan.group(1)]))
+        elif _TEMP_RE.match(detail):
+            findings.append(Finding('temp_btree', detail))
+    return findings
+
+
+def analyze_query(conn, name: str, sql: str, params_json: str | None,
+                  schema: _Schema | None = None) -> QueryAdvice:
+    """EXPLAIN one named query and propose indexes for its scanned tables."""
+    schema = schema or _Schema(conn)
+    advice = QueryAdvice(name, sql, representative_params(sql, params_json))
+    try:
+        advice.plan = explain(conn, sql, advice.params)
+    except sqlite3.Error as e:
+        advice.error = str(e)
+        return advice
+    stripped = _strip_sql(sql)
+    sources = _sources(stripped, schema)
+    advice.findings = findings_from_plan(advice.plan, sources)
+    quoted = _QUOTED_RE.search(stripped)
+    if quoted and advice.findings:
+        # The column matching below would miss or misattribute it
+        advice.unsupported = f'quoted identifier {quoted.group(0)}'
+        return advice
+    for table in dict.fromkeys(f.table for f in advice.findings if f.kind == 'scan'):
+        proposal = propose_index(stripped, table, schema, sources)
+        if proposal is not None:
+            advice.proposals.append(proposal)
+    return advice
+
+
+def analyze(conn) -> Report:
+    """Analyze every ui_queries entry of the connection's package."""
+    report = Report()
+    try:
+        rows = conn.execute("SELECT name, sql, params_json FROM ui_queries ORDER BY name").fetchall()
+    except sqlite3.Error:
+        return report
+    schema = _Schema(conn)
+    for name, sql, params_json in rows:
+        report.queries.append(analyze_query(conn, name, sql, params_json, schema))
+    return report
+
+
+# ---------------------------------------------------------------------------
+# Sidecar databases
+# ---------------------------------------------------------------------------
+
+def sidecar_path(directory: str, package: str, data_token) -> str:
+    key = hashlib.sha256(repr(data_token).encode()).hexdigest()[:16]
+    return os.path.join(directory, f'{package}.{key}{SIDECAR_SUFFIX}')
+
+
+def _main_path(conn) -> str | None:
+    for row in conn.execute('PRAGMA database_list'):
+        if row[1] == 'main':
+            return row[2] or None
+    return None
+
+
+def _generation(path: str | None):
+    """(size, SQLite change counter) of a canonical DB, or None.
+
+    The same for every extraction of a package, different after any write.
+    """
+    token = query_cache._file_token(path) if path else None
+    return token and (token[0], token[2])
+
+
+def _uri(path: str, immutable: bool = False) -> str:
+    return f'file:{path}?mode=ro' + ('&immutable=1' if immutable else '')
+
+
+def build_sidecar(conn, path: str, report: Report) -> list:
+    """Write a sidecar with indexed copies of the tables report proposes indexes for.
+
+    The file is built next to path and renamed into place, so a reader
+    never sees a partial sidecar. Returns the proposals applied.
+
+    Raises:
+        ValueError: If the connection's main database is not a file.
+    """
+    source = _main_path(conn)
+    if source is None:
+        raise ValueError('Sidecars need a file-backed package database')
+    tables = _Schema(conn).tables
+    tmp = f'{path}.tmp-{os.getpid()}-{threading.get_ident()}'
+    side = sqlite3.connect(f'file:{tmp}', uri=True)
+    applied = []
+    try:
+        side.execute('ATTACH DATABASE ? AS src', (_uri(source),))
+        side.execute(f'CREATE TABLE {SIDECAR_META_TABLE} (key TEXT PRIMARY KEY, value TEXT)')
+        copied = set()
+        for proposal in report.proposals:
+            table = proposal.table
+            if table not in tables:
+                continue
+            if table not in copied:
+                row = side.execute("SELECT sql FROM src.sqlite_master WHERE type = 'table' "
+                                   "AND name = ?", (table,)).fetchone()
+                if not row or not row[0] or row[0].upper().startswith('CREATE VIRTUAL'):
+                    continue
+                side.execute(row[0])
+                side.execute(f'INSERT INTO main.{_quote(table)} SELECT * FROM src.{_quote(table)}')
+                for (index_sql,) in side.execute(
+                        "SELECT sql FROM src.sqlite_master WHERE type = 'index' "
+                        "AND tbl_name = ? AND sql IS NOT NULL", (table,)).fetchall():
+                    side.execute(index_sql)
+                copied.add(table)
+            side.execute(proposal.sql)
+            applied.append(proposal)
+        side.execute(f'INSERT INTO {SIDECAR_META_TABLE} VALUES (?, ?)',
+                     ('indexes', json.dumps([p.describe() for p in applied])))
+        side.commit()
+        side.execute('DETACH DATABASE src')
+        side.execute('ANALYZE')
+        side.commit()
+    except BaseException:
+        side.close()
+        os.unlink(tmp)
+        raise
+    side.close()
+    os.replace(tmp, path)
+    return applied
+
+
+class _RoutedConnection(sqlite3.Connection):
+    signature = None            # databases attached, as in the request connection
+
+
+class IndexSidecar:
+    """A sidecar database and the named queries routed to it.
+
+    Args:
+        path: Sidecar database file.
+        canonical_path: The package's canonical DB (main of its connections).
+        routes: Names of the queries executed on the sidecar.
+        package: Package name (for stats).
+        generation: _generation() of the canonical DB the tables were copied
+            from; queries are not routed once it changes.
+    """
+
+    def __init__(self, path: str, canonical_path: str, routes=(), package: str | None = None,
+                 generation=None):
+        self.path = path
+        self.canonical_path = canonical_path
+        self.routes = frozenset(routes)
+        self.package = package
+        self.generation = generation
+        self.hits = 0
+        self._idle = {}         # signature → idle routed connections
+        self._lock = threading.Lock()
+
+    def acquire(self, conn) -> sqlite3.Connection:
+        """A sidecar connection attaching the same databases as conn."""
+        signature = tuple((row[1], row[2]) for row in conn.execute('PRAGMA database_list')
+                          if row[1] != 'temp' and row[2])
+        with self._lock:
+            idle = self._idle.get(signature)
+            if idle:
+                return idle.pop()
+        routed = sqlite3.connect(_uri(self.path, immutable=True), uri=True,
+                                 check_same_thread=False, factory=_RoutedConnection)
+        routed.row_factory = sqlite3.Row
+        routed.signature = signature
+        for name, path in signature:
+            alias = SIDECAR_ALIAS if name == 'main' else name
+            routed.execute(f'ATTACH DATABASE ? AS {_quote(alias)}', (_uri(path),))
+        return routed
+
+    def release(self, routed):
+        with self._lock:
+            idle = self._idle.setdefault(routed.signature, [])
+            if len(idle) < MAX_IDLE_CONNECTIONS:
+                idle.append(routed)
+                return
+        routed.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for routed in connections:
+                routed.close()
+
+    def stats(self) -> dict:
+        return {'path': self.path, 'routes': sorted(self.routes), 'hits': self.hits}
+
+
+def load_sidecar(conn, path: str, report: Report, generation=None) -> IndexSidecar:
+    """Open a built sidecar and route the flagged queries whose plans it improves.
+
+    ``generation`` is the canonical DB's _generation() the sidecar was
+    built from (default: the current one). Queries naming ``main.``
+    explicitly are never routed (main is the sidecar on a routed connection).
+    """
+    canonical = _main_path(conn)
+    sidecar = IndexSidecar(path, canonical,
+                           generation=generation or _generation(canonical))
+    routed = sidecar.acquire(conn)
+    schema = _Schema(conn)
+    routes = []
+    try:
+        for query in report.flagged:
+            if _MAIN_RE.search(query.sql):
+                continue
+            try:
+                plan = explain(routed, query.sql, query.params)
+            except sqlite3.Error:
+                continue
+            stripped = _strip_sql(query.sql)
+            if len(findings_from_plan(plan, _sources(stripped, schema))) < len(query.findings):
+                routes.append(query.name)
+    finally:
+        routed.close()
+    sidecar.routes = frozenset(routes)
+    return sidecar
+
+
+# ---------------------------------------------------------------------------
+# Routing
+# ---------------------------------------------------------------------------
+
+_sidecars = {}                  # canonical DB path → IndexSidecar
+_sidecars_lock = threading.Lock()
+_lookups = query_cache.GenerationCache()   # db_token → routable IndexSidecar or None
+
+
+def register(sidecar: IndexSidecar):
+    """Route the sidecar's queries for connections to its canonical DB."""
+    with _sidecars_lock:
+        previous = _sidecars.get(sidecar.canonical_path)
+        _sidecars[sidecar.canonical_path] = sidecar
+    _lookups.clear()
+    if previous is not None and previous is not sidecar:
+        previous.close()
+
+
+def clear():
+    with _sidecars_lock:
+        sidecars = list(_sidecars.values())
+        _sidecars.clear()
+    _lookups.clear()
+    for sidecar in sidecars:
+        sidecar.close()
+
+
+def sidecar_for(conn, query_name: str, token=None) -> IndexSidecar | None:
+    """The sidecar query_name is routed to for conn's package, if any.
+
+    ``token`` is ``query_cache.db_token(conn, include_overlay=False)`` when
+    the caller already has it. The lookup is memoized per token; a sidecar
+    whose canonical DB was written since it was built is not used.
+    """
+    if not _sidecars:
+        return None
+    if token is None:
+        token = query_cache.db_token(conn, include_overlay=False)
+    sidecar = _lookups.get(token, 'sidecar', lambda: _lookup(token))
+    if sidecar is None or query_name not in sidecar.routes:
+        return None
+    with sidecar._lock:
+        sidecar.hits += 1
+    return sidecar
+
+
+def _lookup(token) -> IndexSidecar | None:
+    main = next((entry for entry in token or () if entry[0] == 'main'), None)
+    if main is None:
+        return None
+    with _sidecars_lock:
+        sidecar = _sidecars.get(main[1])
+    if sidecar is None:
+        return None
+    if sidecar.generation != (main[2], main[4]):
+        logger.info("Index advisor: %s changed since its sidecar was built; "
+                    "queries run on the package data", sidecar.package or main[1])
+        return None
+    return sidecar
+
+
+def stats() -> dict:
+    with _sidecars_lock:
+        sidecars = list(_sidecars.values())
+    return {sidecar.package or sidecar.canonical_path: sidecar.stats() for sidecar in sidecars}
+
+
+def _remove_stale(directory: str, package: str, keep: str):
+    for path in glob.glob(os.path.join(glob.escape(directory),
+                                       f'{glob.escape(package)}.*{SIDECAR_SUFFIX}')):
+        if path != keep:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def startup(registry, mode: str = 'report', directory: str | None = None) -> dict:
+    """Analyze every registered package; returns {name: Report}.
+
+    With mode ``sidecar``, packages with index proposals get a sidecar
+    (built once per package data token and generation, then reused) and their improved
+    queries are routed to it. Lazily loaded packages are loaded here.
+    """
+    reports = {}
+    for info in registry.list_packages():
+        name = info['name']
+        try:
+            conn = registry.get_db(name)
+        except Exception as e:
+            logger.warning("Index advisor: %s unavailable: %s", name, e)
+            continue
+        try:
+            report = analyze(conn)
+            reports[name] = report
+            _log_report(name, report)
+            if mode == 'sidecar' and report.proposals:
+                attached = {row[1]: row[2] for row in conn.execute('PRAGMA database_list')}
+                target = directory or os.path.dirname(attached.get('overlay') or '')
+                if not target:
+                    continue
+                generation = _generation(_main_path(conn))
+                path = sidecar_path(target, name, (SIDECAR_VERSION, registry.data_token(name),
+                                                   generation))
+                if not os.path.exists(path):
+                    _remove_stale(target, name, path)
+                    build_sidecar(conn, path, report)
+                    logger.info("Index advisor: built %s", path)
+                sidecar = load_sidecar(conn, path, report, generation)
+                sidecar.package = name
+                register(sidecar)
+                logger.info("Index advisor: %s routes %d query(ies) to %s",
+                            name, len(sidecar.routes), os.path.basename(path))
+        except (sqlite3.Error, OSError, ValueError) as e:
+            logger.warning("Index advisor: %s: %s", name, e)
+        finally:
+            conn.close()
+    return reports
+
+
+def _log_report(name: str, report: Report):
+    logger.info("Index advisor: %s — %d of %d queries flagged, %d index(es) proposed",
+                name, len(report.flagged), len(report.queries), len(report.proposals))
+    for query in report.flagged:
+        logger.info("  %s: %s", query.name, '; '.join(f.detail for f in query.findings))
+
+
+def format_report(report: Report) -> str:
+    lines = []
+    for query in report.queries:
+        if query.error:
+            lines.append(f'{query.name}: error: {query.error}')
+            continue
+        if not query.findings:
+            continue
+        lines.append(f'{query.name}:')
+        lines.extend(f'  {finding.detail}' for finding in query.findings)
+        lines.extend(f'  → {proposal.sql}' for proposal in query.proposals)
+        if query.unsupported:
+            lines.append(f'  (no proposal: {query.unsupported})')
+    lines.append(f'{len(report.flagged)} of {len(report.queries)} queries flagged, '
+                 f'{len(report.proposals)} index(es) proposed')
+    lines.extend(f'{proposal.sql};' for proposal in report.proposals)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="EXPLAIN QUERY PLAN analysis of a package's named queries")
+    parser.add_argument('path', help='.scoda package or SQLite database')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    parser.add_argument('--sidecar', metavar='PATH',
+                        help='Build a sidecar database with the proposed indexes')
+    args = parser.parse_args(argv)
+
+    pkg = None
+    db_path = args.path
+    if args.path.endswith('.scoda'):
+        from scoda_engine_core import ScodaPackage
+        pkg = ScodaPackage(args.path)
+        db_path = pkg.db_path
+    conn = sqlite3.connect(_uri(os.path.abspath(db_path)), uri=True)
+    try:
+        report = analyze(conn)
+        applied = build_sidecar(conn, os.path.abspath(args.sidecar), report) \
+            if args.sidecar else None
+    finally:
+        conn.close()
+        if pkg is not None:
+            pkg.close()
+    if args.json:
+        print(json.dumps(report.describe(), indent=2))
+    else:
+        print(format_report(report))
+    if applied is not None:
+        print(f"Wrote {args.sidecar} ({len(applied)} index(es))")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,6 +18,10 @@ import uvicorn
 logger = logging.getLogger(__name__)
 
 from scoda_engine_core import get_db, ensure_overlay_db, get_mcp_tools
+from scoda_engine import exec_plan
+from scoda_engine import query_cache
+from scoda_engine import query_limits
+from scoda_engine import slow_query
 
 def row_to_dict(row):
     return dict(row)
@@ -65,10 +69,15 @@ def _execute_named_query_internal(conn, query_name, params=None):
     db_params = json.loads(query_row['params_json']) if query_row['params_json'] else {}
     merged_params = {**db_params, **params}
 
+    token = query_cache.db_token(conn, include_overlay=False)
+    budget = query_limits.budget_for(query_name, query_limits.cached_overrides(conn, token))
     try:
-        cursor.execute(sql_query, merged_params)
-        columns = [desc[0] for desc in cursor.description]
-        rows = cursor.fetchall()
+        with slow_query.watch(conn, 'named', query_name, sql_query, merged_params) as probe, \
+                query_limits.Limiter(conn, budget, query_name):
+            cursor.execute(sql_query, merged_params)
+            columns = [desc[0] for desc in cursor.description]
+            rows = cursor.fetchall()
+            probe.rows = len(rows)
         logger.debug("Named query '%s' returned %d rows", query_name, len(rows))
         return {
             'query': query_name,
@@ -76,6 +85,8 @@ def _execute_named_query_internal(conn, query_name, params=None):
             'row_count': len(rows),
             'rows': [row_to_dict(row) for row in rows]
         }
+    except query_limits.QueryInterrupted as e:
+        return e.to_dict()
     except Exception as e:
         logger.error("Named query '%s' failed: %s", query_name, e)
         return {"error": f"Error executing named query '{query_name}': {str(e)}"}
@@ -85,7 +96,8 @@ def _execute_composite_for_mcp(conn, view_name, entity_id):
     """Execute a composite detail query (same logic as app.py composite endpoint).
 
     Reads the manifest, finds the view definition, executes source_query + sub_queries,
-    and returns a merged dict.
+    and returns a merged dict. Independent sub-queries run concurrently
+    (see exec_plan.run_steps).
     """
     cursor = conn.cursor()
 
@@ -109,22 +121,24 @@ def _execute_composite_for_mcp(conn, view_name, entity_id):
     if 'error' in result:
         return result
 
-    data = dict(result['rows'][0])
-
     # Sub-queries
-    for key, sub_def in view.get('sub_queries', {}).items():
-        params = {}
-        for param_name, value_source in sub_def.get('params', {}).items():
-            if value_source == 'id':
-                params[param_name] = entity_id
-            elif value_source.startswith('result.'):
-                field = value_source[7:]
-                params[param_name] = data.get(field, '')
-            else:
-                params[param_name] = value_source
-        sub_result = _execute_named_query_internal(conn, sub_def['query'], params)
-        data[key] = sub_result['rows'] if sub_result and 'rows' in sub_result else []
+    plan = exec_plan.compile_composite(cursor, view_name, view)
+
+    def execute(connection, step, params):
+        return _execute_named_query_internal(connection, step.query_name, params)
 
+    interrupted = []
+
+    def merge(data, step, sub_result):
+        if sub_result and sub_result.get('status') == query_limits.STATUS:
+            interrupted.append(sub_result)
+        data[step.key] = sub_result['rows'] if sub_result and 'rows' in sub_result else []
+
+    data = exec_plan.run_steps(plan, entity_id, dict(result['rows'][0]), {},
+                               execute, merge, conn, get_db)
+    if interrupted:
+        # Partial detail would look complete; report the budget instead
+        return interrupted[0]
     return data
 
 
@@ -150,10 +164,21 @@ def _execute_dynamic_tool(tool_def, arguments):
             params = dict(tool_def.get('default_params', {}))
             params.update(arguments)
 
+            # Tool-level timeout_ms / max_steps override the manifest's
+            name = tool_def.get('name', 'single')
+            token = query_cache.db_token(conn, include_overlay=False)
+            budget = query_limits.budget_for(name, query_limits.cached_overrides(conn, token),
+                                             tool_def)
             cursor = conn.cursor()
-            cursor.execute(sql, params)
-            columns = [desc[0] for desc in cursor.description]
-            rows = cursor.fetchall()
+            try:
+                with slow_query.watch(conn, 'mcp', name, sql, params) as probe, \
+                        query_limits.Limiter(conn, budget, name):
+                    cursor.execute(sql, params)
+                    columns = [desc[0] for desc in cursor.description]
+                    rows = cursor.fetchall()
+                    probe.rows = len(rows)
+            except query_limits.QueryInterrupted as e:
+                return e.to_dict()
             return {
                 'columns': columns,
                 'row_count': len(rows),
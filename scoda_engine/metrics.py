@@ -0,0 +1,455 @@
+"""
+Metrics — Prometheus text exposition of request, query and package timings.
+
+``GET /metrics`` returns every metric in the Prometheus text format
+(version 0.0.4).  Histograms and counters are kept in process memory and
+cost a dict update per observation:
+
+  scoda_http_request_duration_seconds{method,route,status}  route = template,
+                                                             e.g. /api/{package}/item/{id}
+  scoda_query_duration_seconds{package,query}    named-query execution (cache misses)
+  scoda_query_rows{package,query}                rows returned per execution
+  scoda_connection_setup_seconds{package}        PackageRegistry.get_db()
+  scoda_package_load_seconds{package}            data.db extraction + verification
+  scoda_package_extract_seconds{package,source}  copy out of the ZIP / extraction cache
+  scoda_hub_sync_duration_seconds{outcome}       Hub sync runs (serve_web)
+  scoda_hub_sync_packages_total                  packages downloaded by Hub sync
+  scoda_cache_hits_total{cache}, scoda_cache_misses_total{cache}
+  scoda_cache_hit_ratio{cache}                   hits / lookups over all workers
+
+Package timings come from scoda_engine_core.instrument events.  Values
+owned by other modules (cache counters, query interruptions) are read at
+collection time from sources registered with add_source().
+
+Several worker processes (gunicorn, ``uvicorn --workers``) each keep their
+own values.  With SCODA_METRICS_DIR set, every process writes a snapshot
+``metrics-<pid>.json`` to that shared directory every
+SCODA_METRICS_FLUSH_SECONDS and at exit; /metrics sums the snapshots of
+all processes, including exited ones, so counters never go backwards.
+Empty the directory when the server starts (prepare_directory(); the
+gunicorn config and ``scoda-web`` do this).
+
+Environment variables:
+  SCODA_METRICS — Set to "0" to disable collection and the /metrics endpoint
+  SCODA_METRICS_DIR — Snapshot directory shared by worker processes
+  SCODA_METRICS_FLUSH_SECONDS — Snapshot interval (default: 5)
+"""
+
+from __future__ import annotations
+
+import atexit
+import bisect
+import contextvars
+import glob
+import json
+import logging
+import math
+import os
+import stat
+import tempfile
+import threading
+import time
+
+from starlette.routing import Match
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_FLUSH_SECONDS = 5.0
+SNAPSHOT_PREFIX = 'metrics-'
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+SLOW_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000, 1000000)
+
+# Package of the current request (set by the per-package DB dependency);
+# query metrics are labelled with it.
+current_package = contextvars.ContextVar('scoda_metrics_package', default='')
+
+_enabled = os.environ.get('SCODA_METRICS', '1').strip() != '0'
+_metrics: dict = {}             # name → Counter / Histogram
+_sources: dict = {}             # name → (kind, help, labels, [values callables])
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+        _metrics[name] = self
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def values(self) -> dict:
+        with self._lock:
+            return {key: (list(value) if isinstance(value, list) else value)
+                    for key, value in self._values.items()}
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        if not _enabled:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _started()
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        """Count value in its bucket; per key the state is [bucket counts..., count, sum]."""
+        if not _enabled:
+            return
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0, 0.0]
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += 1
+            state[-1] += value
+        _started()
+
+
+REQUEST_SECONDS = Histogram('scoda_http_request_duration_seconds',
+                            'HTTP request latency by route template',
+                            ('method', 'route', 'status'))
+QUERY_SECONDS = Histogram('scoda_query_duration_seconds',
+                          'Named query execution time (result cache misses)',
+                          ('package', 'query'))
+QUERY_ROWS = Histogram('scoda_query_rows', 'Rows returned per named query execution',
+                       ('package', 'query'), buckets=ROW_BUCKETS)
+CONNECTION_SECONDS = Histogram('scoda_connection_setup_seconds',
+                               'Time to obtain a package DB connection (get_db)',
+                               ('package',))
+PACKAGE_LOAD_SECONDS = Histogram('scoda_package_load_seconds',
+                                 'data.db extraction and verification per package load',
+                                 ('package',), buckets=SLOW_BUCKETS)
+PACKAGE_EXTRACT_SECONDS = Histogram('scoda_package_extract_seconds',
+                                    'Copying data.db out of the ZIP or extraction cache',
+                                    ('package', 'source'), buckets=SLOW_BUCKETS)
+HUB_SYNC_SECONDS = Histogram('scoda_hub_sync_duration_seconds', 'Hub sync run duration',
+                             ('outcome',), buckets=SLOW_BUCKETS)
+HUB_SYNC_PACKAGES = Counter('scoda_hub_sync_packages_total',
+                            'Packages downloaded by Hub sync')
+
+_CORE_EVENTS = {
+    'connection_setup': CONNECTION_SECONDS,
+    'package_load': PACKAGE_LOAD_SECONDS,
+    'package_extract': PACKAGE_EXTRACT_SECONDS,
+}
+
+
+def _on_core_event(event, seconds, labels):
+    histogram = _CORE_EVENTS.get(event)
+    if histogram is not None:
+        histogram.observe(seconds, **labels)
+
+
+def observe_query(query: str, seconds: float, rows: int | None = None):
+    """Record a named query execution for the current package."""
+    if not _enabled:
+        return
+    package = current_package.get()
+    QUERY_SECONDS.observe(seconds, package=package, query=query)
+    if rows is not None:
+        QUERY_ROWS.observe(rows, package=package, query=query)
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    The route is read from the scope after routing (``scope['route']``).
+    Responses sent before routing (304s, cached compressed bodies) are
+    matched against ``routes()``; requests no route matches are labelled
+    ``<unmatched>``.  Streaming responses are timed until their last
+    body chunk.
+    """
+
+    def __init__(self, app, routes=None):
+        self.app = app
+        self.routes = routes
+
+    def _route(self, scope) -> str:
+        route = scope.get('route')
+        if route is None and self.routes is not None:
+            for candidate in self.routes():
+                if candidate.matches(scope)[0] == Match.FULL:
+                    route = candidate
+                    break
+        return getattr(route, 'path', None) or '<unmatched>'
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not _enabled:
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope['method'],
+                                    route=self._route(scope), status=status[0])
+
+
+def add_source(name: str, kind: str, help: str, labels: tuple, values):
+    """Export values owned elsewhere; ``values()`` returns {label tuple: number}.
+
+    Sources registered under the same name are merged.
+    """
+    entry = _sources.setdefault(name, (kind, help, tuple(labels), []))
+    entry[3].append(values)
+
+
+def register_cache(name: str, counts):
+    """Export a cache's hit ratio; ``counts()`` returns (hits, misses)."""
+    add_source('scoda_cache_hits_total', 'counter', 'Cache hits', ('cache',),
+               lambda: {(name,): counts()[0]})
+    add_source('scoda_cache_misses_total', 'counter', 'Cache misses', ('cache',),
+               lambda: {(name,): counts()[1]})
+
+
+# ---------------------------------------------------------------------------
+# Snapshots and multi-process aggregation
+# ---------------------------------------------------------------------------
+
+def snapshot() -> dict:
+    """This process's values as a JSON-serializable document."""
+    document = {}
+    for metric in list(_metrics.values()):
+        entry = {'kind': metric.kind, 'help': metric.help, 'labels': list(metric.labels),
+                 'values': [[list(key), value] for key, value in metric.values().items()]}
+        if isinstance(metric, Histogram):
+            entry['buckets'] = list(metric.buckets)
+        document[metric.name] = entry
+    for name, (kind, help, labels, callables) in list(_sources.items()):
+        values = {}
+        for values_of in callables:
+            try:
+                for key, value in values_of().items():
+                    values[key] = values.get(key, 0) + value
+            except Exception:
+                logger.exception("Metric source %s failed", name)
+        document[name] = {'kind': kind, 'help': help, 'labels': list(labels),
+                          'values': [[list(key), value] for key, value in values.items()]}
+    return document
+
+
+def _merge(into: dict, document: dict):
+    for name, entry in document.items():
+        target = into.setdefault(name, dict(entry, values={}))
+        if entry.get('buckets') != target.get('buckets'):
+            continue            # bucket layout changed between versions
+        values = target['values']
+        for key, value in (entry['values'].items() if isinstance(entry['values'], dict)
+                           else ((tuple(k), v) for k, v in entry['values'])):
+            if key not in values:
+                values[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(value, list):
+                values[key] = [a + b for a, b in zip(values[key], value)]
+            else:
+                values[key] += value
+
+
+def collect() -> dict:
+    """Merged values of this process and, with a directory, every other one."""
+    merged = {}
+    directory = _directory()
+    if directory:
+        flush()
+        for path in sorted(glob.glob(os.path.join(directory, SNAPSHOT_PREFIX + '*.json'))):
+            try:
+                with open(path) as f:
+                    _merge(merged, json.load(f))
+            except (OSError, ValueError) as e:
+                logger.warning("Skipping metrics snapshot %s: %s", path, e)
+    else:
+        _merge(merged, snapshot())
+    _add_hit_ratio(merged)
+    return merged
+
+
+def _add_hit_ratio(merged: dict):
+    hits = merged.get('scoda_cache_hits_total', {}).get('values', {})
+    misses = merged.get('scoda_cache_misses_total', {}).get('values', {})
+    ratios = {}
+    for key, hit in hits.items():
+        lookups = hit + misses.get(key, 0)
+        ratios[key] = hit / lookups if lookups else 0.0
+    if ratios:
+        merged['scoda_cache_hit_ratio'] = {'kind': 'gauge', 'labels': ['cache'],
+                                           'help': 'Cache hits / lookups', 'values': ratios}
+
+
+# ---------------------------------------------------------------------------
+# Text format
+# ---------------------------------------------------------------------------
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, key, extra=()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, key)]
+    pairs += [f'{n}="{v}"' for n, v in extra]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+        return repr(value)
+    return str(value)
+
+
+def render(merged: dict | None = None) -> str:
+    """Prometheus text exposition of collect() (or the given merged values)."""
+    if merged is None:
+        merged = collect()
+    lines = []
+    for name in sorted(merged):
+        entry = merged[name]
+        if not entry['values']:
+            continue
+        names = entry['labels']
+        lines.append(f'# HELP {name} {entry["help"]}')
+        lines.append(f'# TYPE {name} {entry["kind"]}')
+        for key in sorted(entry['values']):
+            value = entry['values'][key]
+            if entry['kind'] != 'histogram':
+                lines.append(f'{name}{_labels(names, key)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(entry['buckets'], value):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(names, key, [("le", _number(float(bound)))])}'
+                             f' {cumulative}')
+            lines.append(f'{name}_bucket{_labels(names, key, [("le", "+Inf")])} {value[-2]}')
+            lines.append(f'{name}_sum{_labels(names, key)} {_number(float(value[-1]))}')
+            lines.append(f'{name}_count{_labels(names, key)} {value[-2]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ---------------------------------------------------------------------------
+# Per-process snapshot files
+# ---------------------------------------------------------------------------
+
+_flusher_pid = None
+_flusher_lock = threading.Lock()
+
+
+def _directory() -> str | None:
+    return os.environ.get('SCODA_METRICS_DIR', '').strip() or None
+
+
+def _snapshot_path(directory: str) -> str:
+    return os.path.join(directory, f'{SNAPSHOT_PREFIX}{os.getpid()}.json')
+
+
+def flush():
+    """Write this process's snapshot to SCODA_METRICS_DIR (atomic replace)."""
+    directory = _directory()
+    if not directory:
+        return
+    try:
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(snapshot(), f, separators=(',', ':'))
+        os.replace(tmp, _snapshot_path(directory))
+    except OSError as e:
+        logger.warning("Cannot write metrics snapshot to %s: %s", directory, e)
+
+
+def _started():
+    """Start this process's periodic flusher on its first observation."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _flusher_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+        if not _directory():
+            return
+        interval = float(os.environ.get('SCODA_METRICS_FLUSH_SECONDS', '')
+                         or DEFAULT_FLUSH_SECONDS)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                flush()
+
+        threading.Thread(target=run, name='scoda-metrics-flush', daemon=True).start()
+        atexit.register(flush)
+
+
+def prepare_directory(directory: str, uid: int | None = None, gid: int | None = None):
+    """Create the snapshot directory and remove snapshots of earlier runs.
+
+    The directory is private (mode 0700). When running as root, ``uid`` and
+    ``gid`` hand it to the user the workers run as. An existing path that
+    is a symlink, not a directory, or owned by anyone else is refused.
+    """
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode):
+        raise RuntimeError(f'Metrics directory {directory} is not a directory')
+    owner = os.geteuid() if uid is None else uid
+    if st.st_uid != owner:
+        if os.geteuid() != 0 or st.st_uid != 0:
+            raise RuntimeError(f'Metrics directory {directory} is owned by '
+                               f'uid {st.st_uid}, expected {owner}')
+        os.chown(directory, owner, -1 if gid is None else gid)
+    os.chmod(directory, 0o700)
+    for path in glob.glob(os.path.join(directory, SNAPSHOT_PREFIX + '*.json')):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def reset():
+    """Clear all recorded values of this process (for tests)."""
+    for metric in _metrics.values():
+        metric.clear()
+
+
+def _install():
+    from scoda_engine_core import instrument
+    instrument.add_observer(_on_core_event)
+
+
+if _enabled:
+    _install()
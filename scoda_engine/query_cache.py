@@ -0,0 +1,219 @@
+"""
+Query Cache — LRU, byte-budgeted cache of named-query results.
+
+Canonical package data does not change for a given package generation, so
+re-running the same named query with the same parameters is wasted work.
+Entries are keyed by (database generation token, query name, normalized
+params). The generation token identifies every database attached to the
+connection by path, size, mtime and SQLite's file change counter, so:
+
+  - re-registering or updating a package yields new keys (old entries
+    age out through LRU eviction);
+  - queries that read ``overlay.*`` tables include the overlay's token,
+    so a write to the overlay — by this or any other worker process —
+    invalidates them, while queries on canonical data stay cached.
+
+Per-query opt-out lives in the UI manifest::
+
+    "query_cache": {"exclude": ["random_pick"]}    # or  "query_cache": false
+
+Environment variables:
+  SCODA_QUERY_CACHE_BYTES — memory budget, e.g. "64M" (default: 64M, 0 = off)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 64 * 1024 ** 2
+
+_OVERLAY_RE = re.compile(r'\boverlay\s*\.', re.IGNORECASE)
+_PARAM_RE = re.compile(r'[:@$]([A-Za-z_][A-Za-z0-9_]*)')
+_SIZE_RE = re.compile(r'^\s*(\d+)\s*([KMG]?)B?\s*$', re.IGNORECASE)
+
+
+def _parse_size(value: str) -> int:
+    m = _SIZE_RE.match(value)
+    if not m:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(m.group(1)) * 1024 ** ' KMG'.index(m.group(2).upper() or ' ')
+
+
+def _file_token(path: str):
+    """(size, mtime_ns, change counter) of a SQLite file, or None if unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            f.seek(24)
+            counter = f.read(4)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns, counter
+
+
+def reads_overlay(sql: str) -> bool:
+    """True if the SQL references ``overlay.`` tables."""
+    return bool(_OVERLAY_RE.search(sql))
+
+
+def bound_params(sql: str) -> set:
+    """Names of the named parameters (``:name``) the SQL binds."""
+    return set(_PARAM_RE.findall(sql))
+
+
+def normalize_params(sql: str | None, params: dict) -> tuple:
+    """Reduce params to the ones the SQL binds, in a hashable canonical form."""
+    if sql is not None:
+        used = bound_params(sql)
+        params = {k: v for k, v in params.items() if k in used}
+    return tuple(sorted((k, v if isinstance(v, (str, int, float, type(None))) else repr(v))
+                        for k, v in params.items()))
+
+
+def db_token(conn, include_overlay: bool):
+    """Generation token for the databases attached to conn.
+
+    Returns None when a database is in-memory or unreadable (not cacheable).
+    """
+    token = []
+    for row in conn.execute("PRAGMA database_list").fetchall():
+        name, path = row[1], row[2]
+        if name == 'temp' or (name == 'overlay' and not include_overlay):
+            continue
+        if not path:
+            return None
+        file_token = _file_token(path)
+        if file_token is None:
+            return None
+        token.append((name, path) + file_token)
+    return tuple(token)
+
+
+class GenerationCache:
+    """Values derived from a database generation, memoized per db_token.
+
+    Entries never go stale (a write changes the token), so the cache is
+    simply emptied when it reaches ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, token, kind, loader):
+        """Return loader() memoized per (token, kind); uncached if token is None."""
+        if token is None:
+            return loader()
+        key = (token, kind)
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+        value = loader()
+        with self._lock:
+            if len(self._values) >= self.max_entries:
+                self._values.clear()
+            self._values[key] = value
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+# Manifests, entity schemas, view plans and query limits per canonical DB
+# generation, shared by the REST app and the MCP server
+generations = GenerationCache()
+
+
+class QueryCache:
+    """Thread-safe LRU of query results bounded by an approximate byte budget."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict = OrderedDict()   # key → (result, size)
+        self._policies = GenerationCache()           # canonical token → exclusions
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> 'QueryCache':
+        value = os.environ.get('SCODA_QUERY_CACHE_BYTES', '').strip()
+        return cls(_parse_size(value) if value else DEFAULT_MAX_BYTES)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, result: dict):
+        try:
+            size = len(json.dumps(result, default=str))
+        except (TypeError, ValueError):
+            return
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (result, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def policy(self, token, loader):
+        """Return the excluded query names for a package generation.
+
+        ``loader()`` returns the UI manifest dict (or None); its result is
+        remembered per token. ``None`` means caching is off for the package.
+        """
+        def exclusions():
+            setting = (loader() or {}).get('query_cache', True)
+            if setting is False:
+                return None
+            if isinstance(setting, dict):
+                return frozenset(setting.get('exclude', []))
+            return frozenset()
+        return self._policies.get(token, 'policy', exclusions)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        self._policies.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'enabled': self.enabled,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
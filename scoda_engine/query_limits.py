@@ -0,0 +1,241 @@
+"""
+Query Limits — time and VM-step budgets for SQL execution.
+
+A runaway named query (or an MCP ``single`` tool with a heavy recursive
+CTE) would otherwise pin a worker thread until it finishes.  While a
+budgeted statement runs, a SQLite progress handler is called every
+PROGRESS_INTERVAL virtual machine instructions; it counts steps and
+checks the deadline, and returning non-zero aborts the statement exactly
+like ``Connection.interrupt()`` ("interrupted").  The abort surfaces as
+QueryInterrupted, which the API turns into a structured 503 response:
+
+    {"error": "Query 'x' exceeded its time budget (5000 ms)",
+     "code": "query_timeout", "query": "x", "timeout_ms": 5000,
+     "max_steps": 0, "elapsed_ms": 5003, "steps": 1234000, "status": 503}
+
+(``code`` is ``query_step_limit`` for the step budget.)  408 is not used:
+browsers retry it automatically, which would run the same heavy query
+again.
+
+Budgets, most specific first (0 = unlimited):
+  1. optional ``timeout_ms`` / ``max_steps`` columns of ``ui_queries``
+     (``timeout_ms`` / ``max_steps`` keys of an MCP dynamic tool);
+  2. UI manifest ``"query_limits": {"queries": {"name": {...}}}``;
+  3. UI manifest ``"query_limits": {"timeout_ms": ..., "max_steps": ...}``;
+  4. SCODA_QUERY_TIMEOUT_MS / SCODA_QUERY_MAX_STEPS.
+
+Only time spent inside a limited block counts, so a streamed result is
+charged for fetching rows, not for a slow client.  Interruptions are
+counted per reason and per query (``stats()``).
+
+Environment variables:
+  SCODA_QUERY_TIMEOUT_MS — default time budget per query (default: 30000, 0 = off)
+  SCODA_QUERY_MAX_STEPS  — default VM-step budget per query (default: 0 = off)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, replace
+
+from scoda_engine import query_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_MS = 30000
+PROGRESS_INTERVAL = 1000        # VM instructions between progress handler calls
+STATUS = 503
+
+_KEYS = ('timeout_ms', 'max_steps')
+
+
+@dataclass(frozen=True)
+class Budget:
+    timeout_ms: int = 0
+    max_steps: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout_ms > 0 or self.max_steps > 0
+
+    def override(self, values: dict | None) -> Budget:
+        """This budget with the ``timeout_ms`` / ``max_steps`` given in values."""
+        if not values:
+            return self
+        changes = {}
+        for key in _KEYS:
+            value = values.get(key)
+            if value is not None:
+                try:
+                    changes[key] = max(0, int(value))
+                except (TypeError, ValueError):
+                    logger.warning("Ignoring invalid %s: %r", key, value)
+        return replace(self, **changes) if changes else self
+
+    @classmethod
+    def from_env(cls) -> Budget:
+        timeout = os.environ.get('SCODA_QUERY_TIMEOUT_MS', '').strip()
+        steps = os.environ.get('SCODA_QUERY_MAX_STEPS', '').strip()
+        return cls(int(timeout) if timeout else DEFAULT_TIMEOUT_MS, int(steps) if steps else 0)
+
+
+class QueryInterrupted(Exception):
+    """A statement was aborted for exceeding its budget."""
+
+    def __init__(self, query: str, reason: str, budget: Budget, elapsed_ms: int, steps: int):
+        self.query = query
+        self.reason = reason            # 'timeout' or 'steps'
+        self.budget = budget
+        self.elapsed_ms = elapsed_ms
+        self.steps = steps
+        if reason == 'timeout':
+            message = f"Query '{query}' exceeded its time budget ({budget.timeout_ms} ms)"
+        else:
+            message = f"Query '{query}' exceeded its step budget ({budget.max_steps} steps)"
+        super().__init__(message)
+
+    def to_dict(self) -> dict:
+        return {
+            'error': str(self),
+            'code': 'query_timeout' if self.reason == 'timeout' else 'query_step_limit',
+            'query': self.query,
+            'timeout_ms': self.budget.timeout_ms,
+            'max_steps': self.budget.max_steps,
+            'elapsed_ms': self.elapsed_ms,
+            'steps': self.steps,
+            'status': STATUS,
+        }
+
+
+_counts = Counter()             # reason → interruptions
+_by_query = Counter()           # (reason, query) → interruptions
+_counts_lock = threading.Lock()
+
+
+def _record(error: QueryInterrupted):
+    with _counts_lock:
+        _counts[error.reason] += 1
+        _by_query[(error.reason, error.query)] += 1
+    logger.warning("%s (%d ms, %d steps)", error, error.elapsed_ms, error.steps)
+
+
+def stats() -> dict:
+    with _counts_lock:
+        return {
+            'defaults': Budget.from_env().__dict__,
+            'interrupted': {'timeout': _counts['timeout'], 'steps': _counts['steps']},
+            'queries': [{'query': query, 'reason': reason, 'count': count}
+                        for (reason, query), count in _by_query.most_common()],
+        }
+
+
+def reset_stats():
+    with _counts_lock:
+        _counts.clear()
+        _by_query.clear()
+
+
+class Limiter:
+    """Enforces a Budget on a connection; re-enter it for each chunk of work.
+
+    ::
+
+        limiter = Limiter(conn, budget, 'query_name')
+        with limiter:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+
+    Raises QueryInterrupted from the ``with`` block when the budget runs
+    out. Elapsed time and steps accumulate over all blocks.
+    """
+
+    def __init__(self, conn, budget: Budget, query: str = ''):
+        self.conn = conn
+        self.budget = budget
+        self.query = query
+        self.elapsed = 0.0
+        self.steps = 0
+        self.reason = None
+        self._resumed = None
+
+    def _progress(self):
+        self.steps += PROGRESS_INTERVAL
+        if self.budget.max_steps and self.steps > self.budget.max_steps:
+            self.reason = 'steps'
+            return 1
+        if (self.budget.timeout_ms and (self.elapsed + time.monotonic() - self._resumed) * 1000
+                > self.budget.timeout_ms):
+            self.reason = 'timeout'
+            return 1
+        return 0
+
+    def __enter__(self):
+        if self.budget.enabled:
+            self._resumed = time.monotonic()
+            self.conn.set_progress_handler(self._progress, PROGRESS_INTERVAL)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self.budget.enabled:
+            return False
+        self.conn.set_progress_handler(None, 0)
+        self.elapsed += time.monotonic() - self._resumed
+        if self.reason and (exc_type is None or issubclass(exc_type, sqlite3.OperationalError)):
+            error = QueryInterrupted(self.query, self.reason, self.budget,
+                                     int(self.elapsed * 1000), self.steps)
+            _record(error)
+            raise error from exc
+        return False
+
+
+def load_overrides(conn) -> tuple:
+    """``(manifest default, {query name: override})`` for a package connection.
+
+    Per-query overrides combine the manifest's ``query_limits.queries``
+    with the optional ``timeout_ms`` / ``max_steps`` columns of
+    ui_queries (which win).
+    """
+    config = {}
+    try:
+        row = conn.execute(
+            "SELECT manifest_json FROM ui_manifest WHERE name = 'default'").fetchone()
+        if row and row[0]:
+            config = json.loads(row[0]).get('query_limits') or {}
+    except (sqlite3.Error, json.JSONDecodeError, AttributeError):
+        config = {}
+    if not isinstance(config, dict):
+        config = {}
+    queries = {name: dict(values) for name, values in (config.get('queries') or {}).items()
+               if isinstance(values, dict)}
+    try:
+        columns = {r[1] for r in conn.execute('PRAGMA table_info(ui_queries)')}
+    except sqlite3.Error:
+        columns = set()
+    present = [key for key in _KEYS if key in columns]
+    if present:
+        for row in conn.execute(f"SELECT name, {', '.join(present)} FROM ui_queries"):
+            values = {key: row[i + 1] for i, key in enumerate(present) if row[i + 1] is not None}
+            if values:
+                queries.setdefault(row[0], {}).update(values)
+    return {key: config[key] for key in _KEYS if key in config}, queries
+
+
+def cached_overrides(conn, token) -> tuple:
+    """load_overrides(conn), memoized per canonical DB generation.
+
+    ``token`` is ``query_cache.db_token(conn, include_overlay=False)``,
+    computed once by the caller (None disables memoization).
+    """
+    return query_cache.generations.get(token, 'query_limits', lambda: load_overrides(conn))
+
+
+def budget_for(query: str, overrides: tuple, extra: dict | None = None) -> Budget:
+    """Budget of a query given (cached_)load_overrides() output and a final override."""
+    default, queries = overrides
+    return Budget.from_env().override(default).override(queries.get(query)).override(extra)
@@ -0,0 +1,87 @@
+"""
+Query Stream — constant-memory streaming of named-query results.
+
+A regular query response materializes every row as a dict, validates the
+list and serializes it in one piece. Streaming responses instead pull
+rows from the cursor with ``fetchmany()`` and encode them batch by batch,
+so a request holds at most one batch in memory whatever the row count.
+
+Formats:
+  ndjson — one JSON object per row (``application/x-ndjson``); selected
+           with ``Accept: application/x-ndjson`` or ``?stream=1``
+  json   — the regular QueryResult document with ``rows`` written
+           incrementally and the counts after the last row; selected with
+           ``?stream=json`` (drop-in for existing clients)
+
+Environment variables:
+  SCODA_STREAM_BATCH_ROWS — rows per fetchmany() batch (default: 500)
+"""
+
+from __future__ import annotations
+
+import os
+
+from scoda_engine.result_format import dumps as _dumps
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+DEFAULT_BATCH_ROWS = 500
+
+_OFF = ('0', 'false', 'no', 'off')
+_NDJSON = ('', '1', 'true', 'yes', 'on', 'ndjson')
+
+
+def batch_rows() -> int:
+    value = os.environ.get('SCODA_STREAM_BATCH_ROWS', '').strip()
+    return max(1, int(value)) if value else DEFAULT_BATCH_ROWS
+
+
+def stream_format(accept: str | None, stream: str | None) -> str | None:
+    """Return 'ndjson', 'json' or None (no streaming) for a request.
+
+    ``stream`` is the value of the ``stream`` query parameter (None if
+    absent); it takes precedence over the Accept header.
+    """
+    if stream is not None:
+        value = stream.strip().lower()
+        if value in _OFF:
+            return None
+        if value == 'json':
+            return 'json'
+        if value in _NDJSON:
+            return 'ndjson'
+        raise ValueError(f"Invalid stream format: {stream!r} (expected ndjson or json)")
+    if accept and NDJSON_MEDIA_TYPE in accept:
+        return 'ndjson'
+    return None
+
+
+def iter_batches(cursor, batch_size: int):
+    """Yield lists of row dicts from an executed cursor, batch_size at a time."""
+    columns = [desc[0] for desc in cursor.description]
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        yield [dict(zip(columns, row)) for row in batch]
+
+
+def encode_ndjson(cursor, batch_size: int):
+    """Yield NDJSON bytes, one chunk per batch."""
+    for rows in iter_batches(cursor, batch_size):
+        yield ''.join(_dumps(row) + '\n' for row in rows).encode()
+
+
+def encode_json(cursor, head: dict, tail, batch_size: int):
+    """Yield a JSON object as bytes: ``head`` fields, ``rows``, then tail fields.
+
+    ``tail(row_count)`` returns the (non-empty) dict of fields written
+    after the rows, once the number of rows is known.
+    """
+    opening = _dumps(head)[:-1] + (',' if head else '') + '"rows":['
+    yield opening.encode()
+    count = 0
+    for rows in iter_batches(cursor, batch_size):
+        chunk = ','.join(_dumps(row) for row in rows)
+        yield ((',' if count else '') + chunk).encode()
+        count += len(rows)
+    yield ('],' + _dumps(tail(count))[1:]).encode()
@@ -0,0 +1,63 @@
+"""
+Result Format — row encodings for query results.
+
+The default encoding repeats every column name in every row. For large
+results that is most of the payload and most of the serialization work,
+so query endpoints accept ``format=`` to send the column names once:
+
+  rows      — default; ``rows`` is a list of {column: value} objects
+  columnar  — ``data`` holds one array per column, aligned with ``columns``
+  compact   — ``rows`` holds one array per row, aligned with ``columns``
+
+Compact formats are built straight from cursor tuples (no per-row dicts)
+and serialized without response-model validation.
+"""
+
+from __future__ import annotations
+
+import json
+
+from fastapi.responses import JSONResponse
+
+from scoda_engine import server_timing
+
+FORMATS = ('rows', 'columnar', 'compact')
+
+
+def parse_format(value: str | None) -> str:
+    """Validate a ``format`` parameter (None or empty → 'rows')."""
+    if not value:
+        return 'rows'
+    value = value.strip().lower()
+    if value not in FORMATS:
+        raise ValueError(f"Invalid format: {value!r} (expected one of {', '.join(FORMATS)})")
+    return value
+
+
+def shape(columns: list, rows: list, fmt: str) -> dict:
+    """Return the result fields carrying ``rows`` (tuples) in format fmt."""
+    if fmt == 'columnar':
+        data = [list(col) for col in zip(*rows)] if rows else [[] for _ in columns]
+        return {'data': data}
+    if fmt == 'compact':
+        return {'rows': [list(row) for row in rows]}
+    return {'rows': [dict(zip(columns, row)) for row in rows]}
+
+
+def _default(value):
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return str(value)
+
+
+def dumps(obj) -> str:
+    """Compact JSON encoding used for compact and streamed results."""
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':'))
+
+
+class CompactJSONResponse(JSONResponse):
+    """JSONResponse without whitespace that tolerates BLOB values."""
+
+    def render(self, content) -> bytes:
+        with server_timing.phase('serialize', 'json'):
+            return dumps(content).encode('utf-8')
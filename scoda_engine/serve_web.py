@@ -21,6 +21,54 @@ Environment variables:
     SCODA_HUB_SYNC  — Set to "1" to sync packages from Hub on startup
     SCODA_HUB_SYNC_INTERVAL — Periodic sync interval in seconds (default: 0 = disabled)
                                Example: 86400 = once a day
+    SCODA_LAZY_LOAD — Set to "1" to read only manifests at startup and
+                      extract/verify each package on its first request
+    SCODA_LOAD_WORKERS — Number of packages extracted/verified concurrently
+                         at startup (default: min(4, CPU count))
+    SCODA_POOL_MIN  — Warm connections kept per package (default: 1)
+    SCODA_POOL_MAX  — Idle connections kept per package (default: 8, 0 = no pooling)
+    SCODA_DB_PROFILE — SQLite connection profile for package data: "readonly"
+                       (default here: immutable, mmap'd) or "default"
+    SCODA_DB_MMAP_SIZE / SCODA_DB_CACHE_SIZE / SCODA_DB_TEMP_STORE /
+    SCODA_DB_QUERY_ONLY — Override individual profile settings
+    SCODA_QUERY_CACHE_BYTES — Named-query result cache budget (default: 64M, 0 = off)
+    SCODA_STREAM_BATCH_ROWS — Rows fetched per batch for streamed query results
+                              (default: 500)
+    SCODA_HTTP_MAX_AGE — Cache-Control max-age for canonical package responses
+                         (default: 0 = always revalidate with the ETag)
+    SCODA_HTTP_ETAGS — Set to "0" to disable ETags and conditional GET
+    SCODA_COMPOSITE_PARALLEL — Sub-queries of a composite/entity detail run
+                               concurrently (default: 4, 1 = sequential)
+    SCODA_COMPOSITE_THREADS — Shared sub-query thread pool size (default: 8)
+    SCODA_QUERY_TIMEOUT_MS — Time budget per named query; longer queries are
+                             interrupted with a 503 (default: 30000, 0 = off)
+    SCODA_QUERY_MAX_STEPS — SQLite VM-step budget per named query (default: 0 = off)
+    SCODA_COMPRESS  — Set to "0" to disable gzip/brotli response compression
+    SCODA_COMPRESS_MIN_BYTES — Smallest response body compressed (default: 1024)
+    SCODA_COMPRESS_CACHE_BYTES — Compressed-body cache budget (default: 32M, 0 = off)
+    SCODA_INDEX_ADVISOR — "report" logs EXPLAIN QUERY PLAN findings for every
+                          package at startup; "sidecar" also builds indexed
+                          table copies and routes improved queries to them
+    SCODA_INDEX_DIR — Sidecar directory (default: next to each overlay DB)
+    SCODA_SLOW_QUERY_MS — Log queries/statements at least this slow, with their
+                          plan (default: 1000, 0 = off)
+    SCODA_SLOW_QUERY_LOG — Rotating JSON-lines slow-query log file (default:
+                           application log; SCODA_SLOW_QUERY_LOG_BYTES /
+                           SCODA_SLOW_QUERY_LOG_BACKUPS: 10M / 5)
+    SCODA_METRICS   — Set to "0" to disable the Prometheus /metrics endpoint
+    SCODA_METRICS_DIR — Metrics snapshot directory shared by workers (default:
+                        a temporary directory when --workers > 1)
+    SCODA_METRICS_FLUSH_SECONDS — Worker snapshot interval (default: 5)
+    SCODA_SERVER_TIMING — Server-Timing header: "request" (only for requests
+                          sending the token in X-Scoda-Timing), "always" or
+                          "off" (default: "request" with a token, else "off")
+    SCODA_SERVER_TIMING_TOKEN — Required X-Scoda-Timing value (default: unset,
+                                no request is sampled)
+    SCODA_VERIFY_LEDGER — Trusted-checksum ledger path; packages whose file
+                          identity is unchanged skip SHA-256 verification
+    SCODA_REVERIFY  — Set to "1" to ignore the ledger and re-hash on startup
+    SCODA_REVERIFY_INTERVAL — Background re-verification interval in seconds
+                              (default: 0 = disabled)
 """
 
 import logging
@@ -33,6 +81,7 @@ logger = logging.getLogger(__name__)
 
 # Background scheduler state
 _hub_sync_timer = None
+_reverify_timer = None
 
 
 def _sync_hub_packages(scoda_path):
@@ -42,7 +91,22 @@ def _sync_hub_packages(scoda_path):
     and downloads any new or updated packages.
 
     Only runs when SCODA_HUB_SYNC=1 and scoda_path is a directory.
+    Durations are recorded in scoda_hub_sync_duration_seconds (see metrics).
     """
+    from scoda_engine import metrics
+
+    start = _time.perf_counter()
+    outcome = 'error'
+    try:
+        synced = _run_hub_sync(scoda_path)
+        outcome = 'ok' if synced is not None else 'unreachable'
+        return synced or 0
+    finally:
+        metrics.HUB_SYNC_SECONDS.observe(_time.perf_counter() - start, outcome=outcome)
+
+
+def _run_hub_sync(scoda_path):
+    """Body of _sync_hub_packages; None if the Hub index could not be fetched."""
     from scoda_engine_core.hub_client import (
         fetch_hub_index,
         compare_with_local,
@@ -50,6 +114,7 @@ def _sync_hub_packages(scoda_path):
         HubError,
     )
     from scoda_engine_core import get_registry
+    from scoda_engine import metrics
 
     ssl_noverify = os.environ.get('SCODA_HUB_SSL_VERIFY', '1').strip() == '0'
 
@@ -57,7 +122,7 @@ def _sync_hub_packages(scoda_path):
         index = fetch_hub_index(ssl_noverify=ssl_noverify)
     except HubError as e:
         logger.warning("Hub sync: failed to fetch index — %s", e)
-        return 0
+        return None
 
     # Scan local packages for comparison
     registry = get_registry()
@@ -92,6 +157,7 @@ def _sync_hub_packages(scoda_path):
 
     # Re-scan after downloads so registry picks up new files
     registry.scan(scoda_path)
+    metrics.HUB_SYNC_PACKAGES.inc(len(to_download))
     logger.info("Hub sync: done — %d package(s) synced", len(to_download))
     return len(to_download)
 
@@ -118,6 +184,32 @@ def _start_periodic_sync(scoda_path, interval):
     logger.info("Hub sync: periodic sync enabled — every %d seconds", interval)
 
 
+def _start_periodic_reverify(interval):
+    """Start a background thread that re-hashes loaded packages at the given interval."""
+    global _reverify_timer
+
+    def _run():
+        global _reverify_timer
+        from scoda_engine_core import get_registry
+        try:
+            results = get_registry().reverify()
+            failed = [name for name, ok in results.items() if not ok]
+            if failed:
+                logger.error("Re-verification: quarantined %s", ', '.join(failed))
+            else:
+                logger.info("Re-verification: %d package(s) OK", len(results))
+        except Exception as e:
+            logger.warning("Re-verification (scheduled): error — %s", e)
+        _reverify_timer = threading.Timer(interval, _run)
+        _reverify_timer.daemon = True
+        _reverify_timer.start()
+
+    _reverify_timer = threading.Timer(interval, _run)
+    _reverify_timer.daemon = True
+    _reverify_timer.start()
+    logger.info("Re-verification: enabled — every %d seconds", interval)
+
+
 def create_app():
     """Application factory for gunicorn.
 
@@ -132,6 +224,9 @@ def create_app():
     os.environ['SCODA_MODE'] = 'viewer'
     os.environ['SCODA_ENGINE_NAME'] = 'SCODA Server'
 
+    # Observe package load/extraction timings from here on
+    from scoda_engine import metrics  # noqa: F401
+
     scoda_path = os.environ.get('SCODA_PATH')
     if scoda_path:
         if os.path.isdir(scoda_path):
@@ -157,6 +252,21 @@ def create_app():
             from scoda_engine_core import register_scoda_path
             register_scoda_path(scoda_path)
 
+        # Viewer mode never writes canonical data: open it immutable + mmap'd
+        from scoda_engine_core import get_registry
+        from scoda_engine_core.conn_profile import ConnectionProfile
+        get_registry().set_profile(ConnectionProfile.from_env(default='readonly'))
+
+        advisor_mode = os.environ.get('SCODA_INDEX_ADVISOR', '').strip().lower()
+        if advisor_mode in ('report', 'sidecar'):
+            from scoda_engine import index_advisor
+            index_advisor.startup(get_registry(), advisor_mode,
+                                  os.environ.get('SCODA_INDEX_DIR') or None)
+
+    reverify_interval = int(os.environ.get('SCODA_REVERIFY_INTERVAL', '0'))
+    if reverify_interval > 0 and scoda_path:
+        _start_periodic_reverify(reverify_interval)
+
     # Start periodic Hub sync if interval is set
     sync_interval = int(os.environ.get('SCODA_HUB_SYNC_INTERVAL', '0'))
     if sync_interval > 0 and scoda_path and os.path.isdir(scoda_path):
@@ -197,6 +307,8 @@ def main():
                         help='Number of workers (overrides SCODA_WORKERS env, default: 2)')
     parser.add_argument('--log-level', type=str, default=None,
                         help='Log level (overrides SCODA_LOG_LEVEL env, default: info)')
+    parser.add_argument('--reverify', action='store_true',
+                        help='Ignore the verification ledger and re-hash every package')
     args = parser.parse_args()
 
     # CLI args override env vars
@@ -208,6 +320,8 @@ def main():
         os.environ['SCODA_WORKERS'] = str(args.workers)
     if args.log_level:
         os.environ['SCODA_LOG_LEVEL'] = args.log_level
+    if args.reverify:
+        os.environ['SCODA_REVERIFY'] = '1'
 
     port = int(os.environ.get('SCODA_PORT', '8000'))
     workers = int(os.environ.get('SCODA_WORKERS', '2'))
@@ -232,6 +346,14 @@ def main():
     print("=" * 60)
     print()
 
+    # Worker processes share metrics through snapshot files
+    if workers > 1 and not os.environ.get('SCODA_METRICS_DIR'):
+        import tempfile
+        os.environ['SCODA_METRICS_DIR'] = tempfile.mkdtemp(prefix='scoda-metrics-')
+    if os.environ.get('SCODA_METRICS_DIR'):
+        from scoda_engine.metrics import prepare_directory
+        prepare_directory(os.environ['SCODA_METRICS_DIR'])
+
     import uvicorn
     uvicorn.run(
         'scoda_engine.serve_web:create_app',
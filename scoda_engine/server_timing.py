@@ -0,0 +1,212 @@
+"""
+Server-Timing — per-request phase breakdown in a response header.
+
+A request with timing enabled gets a ``Server-Timing`` header (shown by
+browser dev tools under Network → Timing) with one entry per phase::
+
+    Server-Timing: registry;dur=0.01;desc="registry lookup",
+        conn;dur=0.52;desc="connection acquire", attach;dur=0.47;desc="open + ATTACH",
+        manifest;dur=0.03;desc="manifest load", sql-1;dur=2.91;desc="items_list count",
+        sql-2;dur=1.84;desc="items_list", rows;dur=0.66;desc="items_list",
+        serialize;dur=0.41;desc="json", total;dur=7.12
+
+Phases (durations in milliseconds):
+  registry  — package registry lookup
+  conn      — connection acquire (pool checkout or new connection)
+  attach    — opening a new connection with overlay/dependencies ATTACHed
+  manifest  — UI manifest load (cached per DB generation)
+  sql       — one SQL statement, up to its first row (desc: query name)
+  rows      — fetching the remaining rows and shaping the result
+  serialize — encoding the response body (desc: json / msgpack)
+  total     — request start until the response headers are sent
+
+Repeated phases are numbered in order (sql-1, sql-2, ...).  Statements of
+parallel sub-queries (composite detail, batch) overlap, so phase
+durations need not add up to ``total``.  Streamed responses only report
+phases before their first chunk.
+
+Nothing is collected for requests without timing enabled.  Timings
+reveal internals (query names, cache behaviour), so sampling requires a
+shared secret: with SCODA_SERVER_TIMING_TOKEN set, a client, load
+balancer or tracer samples individual requests by sending
+``X-Scoda-Timing: <token>``.  Without a token the default mode is off.
+
+Environment variables:
+  SCODA_SERVER_TIMING — "request" (only requests sending the token in
+      X-Scoda-Timing; the default when a token is set), "always" or "off"
+      (the default without a token)
+  SCODA_SERVER_TIMING_TOKEN — value X-Scoda-Timing must carry; request
+      mode samples nothing while it is unset
+"""
+
+from __future__ import annotations
+
+import hmac
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import MutableHeaders
+
+REQUEST_HEADER = 'X-Scoda-Timing'
+MODES = ('request', 'always', 'off')
+MAX_ENTRIES = 64
+
+_REQUEST_HEADER = REQUEST_HEADER.lower().encode('latin-1')
+
+# Phase names and default descriptions of core instrument events
+_CORE_EVENTS = {
+    'connection_setup': ('conn', 'connection acquire'),
+    'connection_open': ('attach', 'open + ATTACH'),
+}
+
+
+class Timeline:
+    """Phases recorded for one request (appended from any thread)."""
+
+    __slots__ = ('entries', 'omitted', '_lock')
+
+    def __init__(self):
+        self.entries = []           # [(name, seconds, desc)]
+        self.omitted = 0
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float, desc: str | None = None):
+        with self._lock:
+            if len(self.entries) < MAX_ENTRIES:
+                self.entries.append((name, seconds, desc))
+            else:
+                self.omitted += 1
+
+    def header(self, total: float | None = None) -> str:
+        """The Server-Timing header value."""
+        with self._lock:
+            entries = list(self.entries)
+            omitted = self.omitted
+        counts = {}
+        for name, _, _ in entries:
+            counts[name] = counts.get(name, 0) + 1
+        seen = {}
+        parts = []
+        for name, seconds, desc in entries:
+            if counts[name] > 1:
+                seen[name] = seen.get(name, 0) + 1
+                name = f'{name}-{seen[name]}'
+            parts.append(_entry(name, seconds, desc))
+        if omitted:
+            parts.append(_entry('omitted', None, f'{omitted} phases'))
+        if total is not None:
+            parts.append(_entry('total', total))
+        return ', '.join(parts)
+
+
+def _entry(name, seconds=None, desc=None) -> str:
+    entry = name
+    if seconds is not None:
+        entry += f';dur={seconds * 1000:.2f}'
+    if desc:
+        escaped = str(desc).replace('\\', '\\\\').replace('"', '\\"')
+        entry += f';desc="{escaped}"'
+    return entry
+
+
+_current: ContextVar[Timeline | None] = ContextVar('scoda_server_timing', default=None)
+
+
+def current() -> Timeline | None:
+    """The timeline of the request being handled, if timing is enabled."""
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str, desc: str | None = None):
+    """Record the duration of the ``with`` block (also when it raises)."""
+    timeline = _current.get()
+    if timeline is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timeline.add(name, time.perf_counter() - start, desc)
+
+
+def _token() -> str:
+    return os.environ.get('SCODA_SERVER_TIMING_TOKEN', '').strip()
+
+
+def mode() -> str:
+    value = (os.environ.get('SCODA_SERVER_TIMING', '').strip().lower()
+             or ('request' if _token() else 'off'))
+    if value not in MODES:
+        raise ValueError(f"SCODA_SERVER_TIMING must be one of: {', '.join(MODES)}")
+    return value
+
+
+def requested(scope) -> bool:
+    """Whether timings are collected for this request."""
+    current_mode = mode()
+    if current_mode != 'request':
+        return current_mode == 'always'
+    token = _token()
+    if not token:
+        return False
+    for key, value in scope.get('headers', ()):
+        if key == _REQUEST_HEADER:
+            return hmac.compare_digest(value.decode('latin-1').strip(), token)
+    return False
+
+
+class ServerTimingMiddleware:
+    """ASGI middleware adding the Server-Timing header to sampled requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        timeline = Timeline()
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing',
+                               timeline.header(total=time.perf_counter() - start))
+            await send(message)
+
+        token = _current.set(timeline)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+
+
+class TimedJSONResponse(JSONResponse):
+    """JSONResponse that records its body encoding as the ``serialize`` phase."""
+
+    def render(self, content) -> bytes:
+        with phase('serialize', 'json'):
+            return super().render(content)
+
+
+def _on_core_event(event, seconds, labels):
+    timeline = _current.get()
+    if timeline is not None and event in _CORE_EVENTS:
+        name, desc = _CORE_EVENTS[event]
+        timeline.add(name, seconds, desc)
+
+
+def _install():
+    from scoda_engine_core import instrument
+    instrument.add_observer(_on_core_event)
+
+
+_install()
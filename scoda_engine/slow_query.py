@@ -0,0 +1,226 @@
+"""
+Slow Query Log — structured records of statements over a time threshold.
+
+Named queries (REST API and MCP), CRUD statements and MCP dynamic SQL
+that take at least SCODA_SLOW_QUERY_MS are logged as one JSON object
+per line:
+
+    {"ts": "2026-10-17T09:12:03.512+00:00", "kind": "named",
+     "package": "trilobase", "query": "genera_by_family",
+     "params": {"family": "Olenidae"}, "duration_ms": 1834.2, "rows": 412,
+     "plan": ["SCAN genus", "USE TEMP B-TREE FOR ORDER BY"],
+     "sql": "SELECT ..."}
+
+``kind`` is ``named``, ``crud`` (query ``{table}.{operation}``) or
+``mcp`` (query = tool name); failed or interrupted statements carry
+``error``.  ``plan`` is the ``EXPLAIN QUERY PLAN`` output, captured once
+per (package, SQL text).  Long parameter values and SQL are truncated.
+
+Records go to a size-rotated file when SCODA_SLOW_QUERY_LOG is set,
+otherwise to this module's logger (WARNING).  Per process, offenders are
+also aggregated by (kind, package, query) for the admin endpoint
+``GET /api/slow-queries`` (see top()).
+
+Environment variables:
+  SCODA_SLOW_QUERY_MS — threshold in milliseconds (default: 1000, 0 = off)
+  SCODA_SLOW_QUERY_LOG — JSON-lines log file (rotated; default: application log)
+  SCODA_SLOW_QUERY_LOG_BYTES — rotate at this size (default: 10M)
+  SCODA_SLOW_QUERY_LOG_BACKUPS — rotated files kept (default: 5)
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from scoda_engine import index_advisor
+from scoda_engine import metrics
+from scoda_engine.query_cache import GenerationCache, _parse_size
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD_MS = 1000
+DEFAULT_LOG_BYTES = 10 * 1024 * 1024
+DEFAULT_LOG_BACKUPS = 5
+MAX_VALUE_CHARS = 200
+MAX_SQL_CHARS = 2000
+MAX_PLANS = 512
+
+_lock = threading.Lock()
+_offenders: dict = {}           # (kind, package, query) → aggregate
+_plans = GenerationCache(MAX_PLANS)   # (package, sql) → plan lines
+_log = None                     # configured logger (file or module logger)
+
+
+def threshold_ms() -> float:
+    value = os.environ.get('SCODA_SLOW_QUERY_MS', '').strip()
+    return float(value) if value else DEFAULT_THRESHOLD_MS
+
+
+def _package() -> str:
+    package = metrics.current_package.get()
+    if package:
+        return package
+    from scoda_engine_core import get_active_package_name
+    return get_active_package_name() or ''
+
+
+def _truncate(value):
+    if isinstance(value, str) and len(value) > MAX_VALUE_CHARS:
+        return value[:MAX_VALUE_CHARS] + '…'
+    if isinstance(value, bytes):
+        return f'<{len(value)} bytes>'
+    return value
+
+
+def _params(params):
+    if isinstance(params, dict):
+        return {key: _truncate(value) for key, value in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_truncate(value) for value in params]
+    return params
+
+
+def _plan(conn, package, sql, params) -> list:
+    def explain():
+        try:
+            return index_advisor.explain(conn, sql, params if params is not None else ())
+        except Exception as e:
+            return [f'EXPLAIN failed: {e}']
+    return _plans.get(package, sql, explain)
+
+
+def _logger():
+    """The logger records are written to (configured on first use)."""
+    global _log
+    if _log is not None:
+        return _log
+    with _lock:
+        if _log is None:
+            path = os.environ.get('SCODA_SLOW_QUERY_LOG', '').strip()
+            if not path:
+                _log = logger
+            else:
+                size = os.environ.get('SCODA_SLOW_QUERY_LOG_BYTES', '').strip()
+                backups = os.environ.get('SCODA_SLOW_QUERY_LOG_BACKUPS', '').strip()
+                handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=_parse_size(size) if size else DEFAULT_LOG_BYTES,
+                    backupCount=int(backups) if backups else DEFAULT_LOG_BACKUPS,
+                    encoding='utf-8')
+                handler.setFormatter(logging.Formatter('%(message)s'))
+                file_logger = logging.getLogger(__name__ + '.file')
+                file_logger.addHandler(handler)
+                file_logger.setLevel(logging.INFO)
+                file_logger.propagate = False
+                _log = file_logger
+    return _log
+
+
+def check(conn, kind: str, query: str, sql: str, params, seconds: float,
+          rows: int | None = None, error: str | None = None) -> dict | None:
+    """Log the execution if it took at least the threshold; return the record.
+
+    conn must still be open: the plan is captured on it.
+    """
+    threshold = threshold_ms()
+    duration_ms = seconds * 1000
+    if threshold <= 0 or duration_ms < threshold:
+        return None
+    package = _package()
+    record = {
+        'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'kind': kind,
+        'package': package,
+        'query': query,
+        'params': _params(params),
+        'duration_ms': round(duration_ms, 1),
+        'rows': rows,
+        'plan': _plan(conn, package, sql, params),
+        'sql': sql if len(sql) <= MAX_SQL_CHARS else sql[:MAX_SQL_CHARS] + '…',
+    }
+    if error:
+        record['error'] = error
+    _logger().warning('%s', json.dumps(record, default=str, ensure_ascii=False))
+    _aggregate(record)
+    return record
+
+
+def _aggregate(record: dict):
+    key = (record['kind'], record['package'], record['query'])
+    with _lock:
+        entry = _offenders.get(key)
+        if entry is None:
+            entry = _offenders[key] = {
+                'kind': key[0], 'package': key[1], 'query': key[2],
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+            }
+        entry['count'] += 1
+        entry['total_ms'] = round(entry['total_ms'] + record['duration_ms'], 1)
+        if record['duration_ms'] >= entry['max_ms']:
+            entry['max_ms'] = record['duration_ms']
+            entry['slowest'] = {field: record.get(field)
+                                for field in ('ts', 'params', 'rows', 'plan', 'error')}
+        entry['last_ts'] = record['ts']
+
+
+class _Probe:
+    rows = None
+
+
+@contextmanager
+def watch(conn, kind: str, query: str, sql: str, params=None):
+    """Time the ``with`` block and check() it; an exception is recorded as ``error``.
+
+    ::
+
+        with slow_query.watch(conn, 'crud', 'items.list', sql, params) as probe:
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            probe.rows = len(rows)
+    """
+    probe = _Probe()
+    start = time.perf_counter()
+    try:
+        yield probe
+    except Exception as e:
+        check(conn, kind, query, sql, params, time.perf_counter() - start, error=str(e))
+        raise
+    check(conn, kind, query, sql, params, time.perf_counter() - start, probe.rows)
+
+
+SORT_KEYS = ('total_ms', 'max_ms', 'count')
+
+
+def top(limit: int = 20, sort: str = 'total_ms') -> list:
+    """Aggregated offenders, worst first."""
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of: {', '.join(SORT_KEYS)}")
+    with _lock:
+        entries = [dict(entry) for entry in _offenders.values()]
+    entries.sort(key=lambda entry: entry[sort], reverse=True)
+    for entry in entries:
+        entry['avg_ms'] = round(entry['total_ms'] / entry['count'], 1)
+    return entries[:limit]
+
+
+def reset():
+    with _lock:
+        _offenders.clear()
+    _plans.clear()
+
+
+def _reset_logger():
+    """Forget the configured log destination (for tests)."""
+    global _log
+    with _lock:
+        if _log is not None and _log is not logger:
+            for handler in list(_log.handlers):
+                _log.removeHandler(handler)
+                handler.close()
+        _log = None
@@ -36,6 +36,14 @@ let tableViewData = [];
 let tableViewSort = null;
 let tableViewSearchTerm = '';
 
+// Remote paging: table views whose query returns more rows than the threshold
+// are paged, sorted and searched on the server instead of in the browser.
+// Per-view overrides: view.remote_paging_threshold, view.page_size
+const REMOTE_PAGING_THRESHOLD = 5000;
+const REMOTE_PAGE_SIZE = 200;
+let tableRemote = null;  // {viewKey, total, offset, pageSize, seq} while paging remotely
+let tableSearchTimer = null;
+
 // Shared query cache — fetch once, reuse across search index + tab views
 let queryCache = {};
 
@@ -300,27 +308,252 @@ function _hideLoading() {
     }
 }
 
-async function fetchQuery(queryName, params) {
+function _queryCacheKey(queryName, params) {
     const mergedParams = { ...globalControls, ...params };
     const hasParams = Object.keys(mergedParams).length > 0;
-    const cacheKey = hasParams ? `${queryName}?${new URLSearchParams(mergedParams)}` : queryName;
+    return hasParams ? `${queryName}?${new URLSearchParams(mergedParams)}` : queryName;
+}
+
+async function fetchQuery(queryName, params) {
+    const cacheKey = _queryCacheKey(queryName, params);
+    if (queryCache[cacheKey]) return queryCache[cacheKey];
+    const result = await _fetchColumnar(queryName, params);
+    queryCache[cacheKey] = rowsFromColumnar(result);
+    return queryCache[cacheKey];
+}
+
+/**
+ * Fetch a named query as columns ({columns, data}: one array per column).
+ * Cheaper than fetchQuery when only a few columns are read.
+ */
+async function fetchQueryColumns(queryName, params) {
+    const cacheKey = _queryCacheKey(queryName, params) + '#columnar';
     if (queryCache[cacheKey]) return queryCache[cacheKey];
+    const result = await _fetchColumnar(queryName, params);
+    queryCache[cacheKey] = { columns: result.columns || [], data: result.data || [] };
+    return queryCache[cacheKey];
+}
+
+// Micro-batching: _fetchColumnar calls made in the same tick are sent as one
+// POST ${API_BASE}/batch. A lone request keeps the plain GET, which the
+// browser and server can cache and revalidate by ETag.
+const QUERY_BATCH_MAX = 100;  // server-side BATCH_MAX_QUERIES
+const MSGPACK_ACCEPT = 'application/msgpack, application/json;q=0.9';
+let _queryBatch = null;        // requests queued for the next flush
+let _queryBatchUnsupported = false;
+
+function _fetchColumnar(queryName, params) {
+    const mergedParams = { ...globalControls, ...params, format: 'columnar' };
+    return new Promise((resolve, reject) => {
+        if (!_queryBatch) {
+            _queryBatch = [];
+            setTimeout(_flushQueryBatch, 0);
+        }
+        _queryBatch.push({ queryName, params: mergedParams, resolve, reject });
+    });
+}
+
+function _flushQueryBatch() {
+    const items = _queryBatch;
+    _queryBatch = null;
+    if (items.length === 1 || _queryBatchUnsupported) {
+        items.forEach(_fetchColumnarItem);
+        return;
+    }
+    for (let i = 0; i < items.length; i += QUERY_BATCH_MAX) {
+        _fetchColumnarBatch(items.slice(i, i + QUERY_BATCH_MAX));
+    }
+}
+
+async function _fetchColumnarItem(item) {
+    _showLoading();
+    try {
+        const url = `${API_BASE}/queries/${item.queryName}/execute?` + new URLSearchParams(item.params);
+        // Prefer typed MessagePack; servers without it answer with columnar JSON
+        const response = await fetch(url, { headers: { 'Accept': MSGPACK_ACCEPT } });
+        if (!response.ok) throw new Error(`Query failed: ${item.queryName}`);
+        item.resolve(await _readQueryResponse(response));
+    } catch (e) {
+        item.reject(e);
+    } finally {
+        _hideLoading();
+    }
+}
+
+async function _fetchColumnarBatch(items) {
     _showLoading();
     try {
-        let url = `${API_BASE}/queries/${queryName}/execute`;
-        if (hasParams) {
-            url += '?' + new URLSearchParams(mergedParams);
+        // Parameters go as strings, exactly as in the GET query string
+        const queries = items.map((item, i) => ({
+            id: String(i),
+            query: item.queryName,
+            params: Object.fromEntries(new URLSearchParams(item.params)),
+        }));
+        const response = await fetch(`${API_BASE}/batch`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'Accept': MSGPACK_ACCEPT },
+            body: JSON.stringify({ queries }),
+        });
+        if (response.status === 404 || response.status === 405) {
+            // Server without the batch endpoint: fall back to one GET each
+            _queryBatchUnsupported = true;
+            items.forEach(_fetchColumnarItem);
+            return;
         }
-        const response = await fetch(url);
-        if (!response.ok) throw new Error(`Query failed: ${queryName}`);
-        const data = await response.json();
-        queryCache[cacheKey] = data.rows || [];
-        return queryCache[cacheKey];
+        if (!response.ok) throw new Error('Batch query failed');
+        const { results } = await _readQueryResponse(response);
+        items.forEach((item, i) => {
+            const result = results[String(i)];
+            if (!result || result.error) item.reject(new Error(`Query failed: ${item.queryName}`));
+            else item.resolve(result);
+        });
+    } catch (e) {
+        items.forEach(item => item.reject(e));
     } finally {
         _hideLoading();
     }
 }
 
+async function _readQueryResponse(response) {
+    if ((response.headers.get('Content-Type') || '').includes('msgpack')) {
+        return decodeMsgpackResult(await response.arrayBuffer());
+    }
+    return await response.json();
+}
+
+/**
+ * Decode a MessagePack query result (see scoda_engine/binary_format.py).
+ * Typed column extensions (float64, int32, text) become plain arrays.
+ */
+function decodeMsgpackResult(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const view = new DataView(buffer);
+    const utf8 = new TextDecoder();
+    let pos = 0;
+
+    const str = n => { const s = utf8.decode(bytes.subarray(pos, pos + n)); pos += n; return s; };
+    const arr = n => { const a = new Array(n); for (let i = 0; i < n; i++) a[i] = read(); return a; };
+    const map = n => {
+        const o = {};
+        for (let i = 0; i < n; i++) { const k = read(); o[k] = read(); }
+        return o;
+    };
+    const ext = n => {
+        const code = view.getInt8(pos);
+        const start = pos + 1;
+        pos = start + n;
+        return _decodeColumnExt(code, bytes.subarray(start, start + n), utf8);
+    };
+    const u8 = () => view.getUint8(pos++);
+    const u16 = () => { const v = view.getUint16(pos); pos += 2; return v; };
+    const u32 = () => { const v = view.getUint32(pos); pos += 4; return v; };
+
+    function read() {
+        const b = bytes[pos++];
+        if (b <= 0x7f) return b;
+        if (b >= 0xe0) return b - 0x100;
+        if (b <= 0x8f) return map(b & 0x0f);
+        if (b <= 0x9f) return arr(b & 0x0f);
+        if (b <= 0xbf) return str(b & 0x1f);
+        let v;
+        switch (b) {
+            case 0xc0: return null;
+            case 0xc2: return false;
+            case 0xc3: return true;
+            // bin (BLOBs) decode as UTF-8 text, like the JSON encoding
+            case 0xc4: return str(u8());
+            case 0xc5: return str(u16());
+            case 0xc6: return str(u32());
+            case 0xc7: return ext(u8());
+            case 0xc8: return ext(u16());
+            case 0xc9: return ext(u32());
+            case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+            case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+            case 0xcc: return u8();
+            case 0xcd: return u16();
+            case 0xce: return u32();
+            case 0xcf: v = Number(view.getBigUint64(pos)); pos += 8; return v;
+            case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+            case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+            case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+            case 0xd3: v = Number(view.getBigInt64(pos)); pos += 8; return v;
+            case 0xd9: return str(u8());
+            case 0xda: return str(u16());
+            case 0xdb: return str(u32());
+            case 0xdc: return arr(u16());
+            case 0xdd: return arr(u32());
+            case 0xde: return map(u16());
+            case 0xdf: return map(u32());
+        }
+        throw new Error(`Unsupported MessagePack byte 0x${b.toString(16)}`);
+    }
+
+    return read();
+}
+
+function _decodeColumnExt(code, bytes, utf8) {
+    const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    const count = view.getUint32(0, true);
+    let pos = 5;
+    let nulls = null;
+    if (view.getUint8(4)) {
+        nulls = bytes.subarray(pos, pos + ((count + 7) >> 3));
+        pos += (count + 7) >> 3;
+    }
+    const values = new Array(count);
+    if (code === 1) {
+        for (let i = 0; i < count; i++) values[i] = view.getFloat64(pos + 8 * i, true);
+    } else if (code === 2) {
+        for (let i = 0; i < count; i++) values[i] = view.getInt32(pos + 4 * i, true);
+    } else if (code === 3) {
+        const textStart = pos + 4 * (count + 1);
+        const textBytes = bytes.subarray(textStart);
+        const text = utf8.decode(textBytes);
+        // ASCII-only text: byte offsets are string offsets, slice once-decoded text
+        const ascii = text.length === textBytes.length;
+        for (let i = 0; i < count; i++) {
+            const a = view.getUint32(pos + 4 * i, true);
+            const b = view.getUint32(pos + 4 * (i + 1), true);
+            values[i] = ascii ? text.slice(a, b) : utf8.decode(textBytes.subarray(a, b));
+        }
+    } else {
+        throw new Error(`Unknown column extension ${code}`);
+    }
+    if (nulls) {
+        for (let i = 0; i < count; i++) {
+            if (nulls[i >> 3] & (1 << (i & 7))) values[i] = null;
+        }
+    }
+    return values;
+}
+
+/**
+ * Build row objects from a columnar query result
+ */
+function rowsFromColumnar(result) {
+    const columns = result.columns || [];
+    const data = result.data || [];
+    const count = data.length ? data[0].length : 0;
+    const rows = new Array(count);
+    for (let i = 0; i < count; i++) {
+        const row = {};
+        for (let c = 0; c < columns.length; c++) row[columns[c]] = data[c][i];
+        rows[i] = row;
+    }
+    return rows;
+}
+
+/**
+ * Fetch one page of a named query with server-side paging controls
+ * (limit, offset, sort, dir, q, q_cols). Not cached.
+ * @returns {Promise<Object>} Full query result including total_count
+ */
+async function fetchQueryPage(queryName, params) {
+    const result = await _fetchColumnar(queryName, params);
+    result.rows = rowsFromColumnar(result);
+    return result;
+}
+
 /**
  * Normalize legacy view definitions to unified hierarchy type.
  * type:"tree" + tree_options → type:"hierarchy", display:"tree", hierarchy_options + tree_display
@@ -2010,14 +2243,71 @@ async function renderTableView(viewKey) {
     // Load data (from shared cache or fetch)
     body.innerHTML = '<div class="loading">Loading...</div>';
 
+    tableRemote = null;
     try {
-        tableViewData = await fetchQuery(view.source_query);
+        const cacheKey = _queryCacheKey(view.source_query);
+        if (queryCache[cacheKey]) {
+            tableViewData = queryCache[cacheKey];
+        } else {
+            // Fetch up to the threshold; if the query has more rows, page remotely
+            const threshold = view.remote_paging_threshold ?? REMOTE_PAGING_THRESHOLD;
+            const probe = await fetchQueryPage(view.source_query, { limit: threshold });
+            if (probe.total_count > probe.row_count) {
+                tableRemote = { viewKey, total: probe.total_count, offset: 0,
+                                pageSize: view.page_size || REMOTE_PAGE_SIZE, seq: 0 };
+                await loadRemoteTablePage();
+                return;
+            }
+            tableViewData = probe.rows || [];
+            queryCache[cacheKey] = tableViewData;
+        }
         renderTableViewRows(viewKey);
     } catch (error) {
         body.innerHTML = `<div class="text-danger">Error: ${error.message}</div>`;
     }
 }
 
+/**
+ * Fetch the current remote page (with sort and search) and render it
+ */
+async function loadRemoteTablePage() {
+    const remote = tableRemote;
+    if (!remote) return;
+    const view = manifest.views[remote.viewKey];
+    const params = { limit: remote.pageSize, offset: remote.offset };
+    if (tableViewSort) {
+        params.sort = tableViewSort.key;
+        params.dir = tableViewSort.direction;
+    }
+    if (tableViewSearchTerm) {
+        params.q = tableViewSearchTerm;
+        const searchableCols = view.columns.filter(c => c.searchable).map(c => c.key);
+        if (searchableCols.length) params.q_cols = searchableCols.join(',');
+    }
+    const seq = ++remote.seq;
+    try {
+        const data = await fetchQueryPage(view.source_query, params);
+        if (tableRemote !== remote || remote.seq !== seq) return;  // superseded
+        remote.total = data.total_count;
+        tableViewData = data.rows || [];
+        renderTableViewRows(remote.viewKey);
+    } catch (error) {
+        document.getElementById('table-view-body').innerHTML =
+            `<div class="text-danger">Error: ${error.message}</div>`;
+    }
+}
+
+/**
+ * Move the remote table by delta pages
+ */
+function onTablePage(delta) {
+    if (!tableRemote) return;
+    const offset = tableRemote.offset + delta * tableRemote.pageSize;
+    if (offset < 0 || offset >= tableRemote.total) return;
+    tableRemote.offset = offset;
+    loadRemoteTablePage();
+}
+
 /**
  * Render table rows with current sort and search applied
  */
@@ -2027,9 +2317,10 @@ function renderTableViewRows(viewKey) {
 
     const body = document.getElementById('table-view-body');
     let rows = [...tableViewData];
+    const remote = tableRemote && tableRemote.viewKey === viewKey ? tableRemote : null;
 
-    // Apply search
-    if (tableViewSearchTerm) {
+    // Apply search (remote pages arrive already searched and sorted)
+    if (tableViewSearchTerm && !remote) {
         const term = tableViewSearchTerm.toLowerCase();
         const searchableCols = view.columns.filter(c => c.searchable).map(c => c.key);
         rows = rows.filter(row =>
@@ -2041,7 +2332,7 @@ function renderTableViewRows(viewKey) {
     }
 
     // Apply sort
-    if (tableViewSort) {
+    if (tableViewSort && !remote) {
         const { key, direction } = tableViewSort;
         rows.sort((a, b) => {
             let va = a[key], vb = b[key];
@@ -2059,7 +2350,20 @@ function renderTableViewRows(viewKey) {
     }
 
     // Build table
-    let html = `<div class="table-view-stats text-muted mb-2">${rows.length} of ${tableViewData.length} records</div>`;
+    let html;
+    if (remote) {
+        const from = rows.length ? remote.offset + 1 : 0;
+        const to = remote.offset + rows.length;
+        html = `<div class="table-view-stats text-muted mb-2 d-flex align-items-center gap-2">
+            <span>${from}–${to} of ${remote.total} records</span>
+            <button class="btn btn-sm btn-outline-secondary py-0" ${remote.offset === 0 ? 'disabled' : ''}
+                    onclick="onTablePage(-1)"><i class="bi bi-chevron-left"></i></button>
+            <button class="btn btn-sm btn-outline-secondary py-0" ${to >= remote.total ? 'disabled' : ''}
+                    onclick="onTablePage(1)"><i class="bi bi-chevron-right"></i></button>
+        </div>`;
+    } else {
+        html = `<div class="table-view-stats text-muted mb-2">${rows.length} of ${tableViewData.length} records</div>`;
+    }
     html += '<table class="manifest-table"><thead><tr>';
 
     view.columns.forEach(col => {
@@ -2131,6 +2435,11 @@ function onTableSort(viewKey, key) {
     } else {
         tableViewSort = { key, direction: 'asc' };
     }
+    if (tableRemote && tableRemote.viewKey === viewKey) {
+        tableRemote.offset = 0;
+        loadRemoteTablePage();
+        return;
+    }
     renderTableViewRows(viewKey);
 }
 
@@ -2139,6 +2448,14 @@ function onTableSort(viewKey, key) {
  */
 function onTableSearch(value) {
     tableViewSearchTerm = value;
+    if (tableRemote && tableRemote.viewKey === currentView) {
+        clearTimeout(tableSearchTimer);
+        tableSearchTimer = setTimeout(() => {
+            tableRemote.offset = 0;
+            loadRemoteTablePage();
+        }, 250);
+        return;
+    }
     renderTableViewRows(currentView);
 }
 
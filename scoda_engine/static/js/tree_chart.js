@@ -15,7 +15,7 @@ function ensureD3Loaded() {
     d3Ready = new Promise((resolve, reject) => {
         if (window.d3) return resolve();
         const script = document.createElement('script');
-        script.src = '/static/vendor/d3.v7.min.js';
+        script.src = typeof D3_URL !== 'undefined' ? D3_URL : '/static/vendor/d3.v7.min.js';
         script.onload = resolve;
         script.onerror = () => reject(new Error('Failed to load D3.js'));
         document.head.appendChild(script);
@@ -713,15 +713,18 @@ class TreeChartInstance {
                     ? (effectiveControls[v.slice(1)] ?? v) : v;
             }
             console.log(`[tree_chart] edge_query="${edgeQuery}" resolvedParams=`, JSON.stringify(resolvedParams), 'overrideParams=', JSON.stringify(this.overrideParams));
-            const edges = await fetchQuery(edgeQuery, { ...this.overrideParams, ...resolvedParams });
-            console.log(`[tree_chart] edge_query="${edgeQuery}" returned ${edges.length} edges`);
+            // Edges are read column-wise; only diff mode needs whole rows
+            const edgeCols = await fetchQueryColumns(edgeQuery, { ...this.overrideParams, ...resolvedParams });
             const childKey = tcOpts.edge_child_key || 'child_id';
             const parentKey = tcOpts.edge_parent_key || 'parent_id';
+            const edgeChildren = edgeCols.data[edgeCols.columns.indexOf(childKey)] || [];
+            const edgeParents = edgeCols.data[edgeCols.columns.indexOf(parentKey)] || [];
+            console.log(`[tree_chart] edge_query="${edgeQuery}" returned ${edgeChildren.length} edges`);
 
             // For diff mode, build diff status map
             const diffStatusMap = diffCfg ? new Map() : null;
             if (diffCfg) {
-                for (const e of edges) {
+                for (const e of rowsFromColumnar(edgeCols)) {
                     diffStatusMap.set(String(e[childKey]), {
                         diff_status: e.diff_status || 'same',
                         parent_id_a: e.parent_id_a,
@@ -731,8 +734,8 @@ class TreeChartInstance {
             }
 
             // Use String keys to avoid number/string type mismatch between queries
-            const parentMap = new Map(edges.map(e => [String(e[childKey]), e[parentKey]]));
-            const edgeChildIds = new Set(edges.map(e => String(e[childKey])));
+            const parentMap = new Map(edgeChildren.map((c, i) => [String(c), edgeParents[i]]));
+            const edgeChildIds = new Set(edgeChildren.map(String));
             rows.forEach(n => {
                 const nid = String(n[hOpts.id_key]);
                 const mapped = parentMap.get(nid);
@@ -751,7 +754,7 @@ class TreeChartInstance {
             });
 
             // Remove orphan nodes (not part of the classification tree)
-            const edgeParentIds = new Set(edges.map(e => String(e[parentKey])));
+            const edgeParentIds = new Set(edgeParents.map(String));
             const before = rows.length;
             const filtered = rows.filter(n => {
                 const id = String(n[hOpts.id_key]);
@@ -0,0 +1,104 @@
+"""
+Static Assets — content-hashed URLs for files under ``/static``.
+
+Templates reference static files through ``asset_url('js/app.js')``, which
+returns a fingerprinted URL such as ``/static/js/app.3f2a9c1d0b4e.js``.
+The fingerprint is a prefix of the file's SHA-256, so the URL changes
+exactly when the content does and browsers can keep the file forever:
+
+  fingerprinted request, current hash  → Cache-Control: public, max-age=31536000, immutable
+  fingerprinted request, stale hash    → current file, Cache-Control: no-cache
+  plain request (/static/js/app.js)    → served as before (ETag revalidation)
+
+Hashes are computed on first use and remembered per (size, mtime), so an
+edited file gets a new URL without a restart.  Because the fingerprint is
+stripped before the file is looked up, precompressed ``.gz``/``.br``
+siblings (see compression) are used for fingerprinted URLs as well.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+
+from scoda_engine.compression import PrecompressedStaticFiles
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+DIGEST_LENGTH = 12
+
+_FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<ext>\.[^./]+)$'
+                             % DIGEST_LENGTH)
+
+
+def split_fingerprint(path: str):
+    """('js/app.<digest>.js') → ('js/app.js', digest); (path, None) if not fingerprinted."""
+    m = _FINGERPRINT_RE.match(path)
+    if not m:
+        return path, None
+    return m.group('stem') + m.group('ext'), m.group('digest')
+
+
+class AssetManifest:
+    """Content hashes of the files in a static directory.
+
+    Args:
+        directory: Static files directory.
+        url_prefix: URL path the directory is mounted at.
+    """
+
+    def __init__(self, directory: str, url_prefix: str = '/static'):
+        self.directory = directory
+        self.url_prefix = url_prefix.rstrip('/')
+        self._digests: dict = {}    # relative path → (size, mtime_ns, digest)
+        self._lock = threading.Lock()
+
+    def digest(self, path: str) -> str | None:
+        """Fingerprint of a file relative to the directory (None if missing)."""
+        full_path = os.path.realpath(os.path.join(self.directory, path))
+        if not full_path.startswith(os.path.realpath(self.directory) + os.sep):
+            return None
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        with self._lock:
+            entry = self._digests.get(path)
+        if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+            return entry[2]
+        h = hashlib.sha256()
+        with open(full_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                h.update(block)
+        digest = h.hexdigest()[:DIGEST_LENGTH]
+        with self._lock:
+            self._digests[path] = (st.st_size, st.st_mtime_ns, digest)
+        return digest
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL for path (plain URL if the file does not exist)."""
+        path = path.lstrip('/')
+        digest = self.digest(path)
+        if digest is None:
+            return f'{self.url_prefix}/{path}'
+        stem, ext = os.path.splitext(path)
+        return f'{self.url_prefix}/{stem}.{digest}{ext}'
+
+
+class FingerprintedStaticFiles(PrecompressedStaticFiles):
+    """Static files that also answer fingerprinted paths from an AssetManifest."""
+
+    def __init__(self, *, manifest: AssetManifest, **kwargs):
+        super().__init__(**kwargs)
+        self.manifest = manifest
+
+    async def get_response(self, path, scope):
+        original, digest = split_fingerprint(path)
+        current = self.manifest.digest(original) if digest else None
+        if current is None:
+            return await super().get_response(path, scope)
+        response = await super().get_response(original, scope)
+        if response.status_code in (200, 304):
+            response.headers['cache-control'] = IMMUTABLE if digest == current else 'no-cache'
+        return response
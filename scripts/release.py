@@ -222,8 +222,12 @@ def generate_readme(version, sha256_hash, stats, artifact_id=None, name=None):
     return "\n".join(lines)
 
 
-def create_release(db_path, output_dir):
-    """Main orchestration: create a release package."""
+def create_release(db_path, output_dir, compression='deflated'):
+    """Main orchestration: create a release package.
+
+    compression='stored' writes data.db uncompressed inside the .scoda
+    so the engine can open it without decompression.
+    """
     # 1. Validate
     db_path = os.path.abspath(db_path)
     if not os.path.exists(db_path):
@@ -285,7 +289,7 @@ def create_release(db_path, output_dir):
 
     # 11. Create .scoda package in release directory
     scoda_dest = os.path.join(release_dir, scoda_filename)
-    ScodaPackage.create(db_path, scoda_dest)
+    ScodaPackage.create(db_path, scoda_dest, compression=compression)
 
     # 12. Summary
     print(f"Release created: {release_dir}")
@@ -316,6 +320,10 @@ def main():
     parser.add_argument(
         '--dry-run', action='store_true',
         help='Preview release without creating files')
+    parser.add_argument(
+        '--compression', choices=['deflated', 'stored'], default='deflated',
+        help='data.db compression inside the .scoda (stored = page-aligned, '
+             'no decompression on open; default: deflated)')
     args = parser.parse_args()
 
     db_path = os.path.abspath(args.db) if args.db else None
@@ -359,7 +367,7 @@ def main():
             print(f"  {key}: {value}")
         return
 
-    create_release(db_path, output_dir)
+    create_release(db_path, output_dir, compression=args.compression)
 
 
 if __name__ == '__main__':
@@ -979,6 +979,30 @@ def crud_viewer_client(crud_db):
     scoda_package._reset_paths()
 
 
+@pytest.fixture
+def crud_scoda_client(crud_db, tmp_path):
+    """Test client in admin mode on a .scoda package built from crud_db.
+
+    Yields (client, package name). Writes go to the extracted data.db, so
+    the manifest checksum no longer describes the served data.
+    """
+    from starlette.testclient import TestClient
+    from scoda_engine.app import _set_scoda_mode
+    scoda_path = str(tmp_path / "crud-data.scoda")
+    ScodaPackage.create(crud_db[0], scoda_path)
+    scoda_package._reset_registry()
+    scoda_package._reset_paths()
+    name = scoda_package.register_scoda_path(scoda_path)
+    _set_scoda_mode('admin')
+    try:
+        with TestClient(app) as client:
+            yield client, name
+    finally:
+        _set_scoda_mode('viewer')
+        scoda_package._reset_registry()
+        scoda_package._reset_paths()
+
+
 @pytest.fixture
 def generic_scoda_with_mcp_tools(generic_db, generic_mcp_tools_data, tmp_path):
     """Create a .scoda package that includes mcp_tools.json (generic version)."""
@@ -0,0 +1,104 @@
+"""
+Tests for the batch query endpoint (POST /api/{package}/batch).
+"""
+
+from unittest import mock
+
+from scoda_engine import app as app_module
+from scoda_engine import binary_format, exec_plan
+
+
+def _batch(client, queries, url='/api/test/batch', **kwargs):
+    return client.post(url, json={'queries': queries}, **kwargs)
+
+
+class TestBatchEndpoint:
+
+    def test_results_match_single_requests(self, generic_client):
+        response = _batch(generic_client, [
+            {'id': 'items', 'query': 'items_list'},
+            {'id': 'cat', 'query': 'category_items', 'params': {'category_id': '2'}},
+            {'id': 'page', 'query': 'items_list', 'params': {'limit': '2', 'format': 'columnar'}},
+        ])
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert list(results) == ['items', 'cat', 'page']
+        single = generic_client.get('/api/test/queries/items_list/execute').json()
+        assert results['items']['rows'] == single['rows']
+        cat = generic_client.get('/api/test/queries/category_items/execute',
+                                 params={'category_id': '2'}).json()
+        assert (results['cat']['rows'], results['cat']['row_count']) == \
+            (cat['rows'], cat['row_count'])
+        assert results['page']['format'] == 'columnar'
+        assert results['page']['limit'] == 2 and len(results['page']['data'][0]) == 2
+
+    def test_item_errors_and_default_ids(self, generic_client):
+        results = _batch(generic_client, [
+            {'query': 'missing_query'},
+            {'query': 'items_list', 'params': {'format': 'bogus'}},
+            {'query': 'items_list'},
+        ]).json()['results']
+        assert results['0']['status'] == 404
+        assert results['1']['status'] == 400
+        assert results['2']['row_count'] > 0
+
+    def test_request_validation(self, generic_client):
+        assert _batch(generic_client, [{'id': 'a', 'query': 'items_list'},
+                                       {'id': 'a', 'query': 'category_tree'}]).status_code == 400
+        too_many = [{'query': 'items_list'}] * (app_module.BATCH_MAX_QUERIES + 1)
+        assert _batch(generic_client, too_many).status_code == 400
+        assert generic_client.post('/api/test/batch', json={}).status_code == 422
+
+    def test_identical_items_run_once(self, generic_client):
+        with mock.patch.object(app_module, '_execute_query',
+                               wraps=app_module._execute_query) as execute:
+            results = _batch(generic_client, [
+                {'id': 'a', 'query': 'items_list'},
+                {'id': 'b', 'query': 'items_list'},
+                {'id': 'c', 'query': 'category_tree'},
+            ]).json()['results']
+        assert execute.call_count == 2
+        assert results['a'] == results['b']
+
+    def test_result_cache_applies(self, generic_client):
+        app_module._query_cache.clear()
+        queries = [{'id': 'a', 'query': 'items_list'}, {'id': 'b', 'query': 'category_tree'}]
+        _batch(generic_client, queries)
+        hits = app_module._query_cache.stats()['hits']
+        _batch(generic_client, queries)
+        assert app_module._query_cache.stats()['hits'] == hits + 2
+
+    def test_sequential_matches_parallel(self, generic_client, monkeypatch):
+        queries = [{'id': str(i), 'query': 'category_items', 'params': {'category_id': str(i)}}
+                   for i in range(1, 6)]
+        with mock.patch.object(exec_plan, 'fan_out', wraps=exec_plan.fan_out) as fan_out:
+            parallel = _batch(generic_client, queries).json()
+        assert fan_out.call_args[0][3] == exec_plan.DEFAULT_PARALLEL
+        monkeypatch.setenv('SCODA_COMPOSITE_PARALLEL', '1')
+        assert _batch(generic_client, queries).json() == parallel
+
+    def test_msgpack(self, generic_client):
+        response = _batch(generic_client, [{'id': 'a', 'query': 'items_list'},
+                                           {'id': 'b', 'query': 'missing_query'}],
+                          headers={'Accept': binary_format.MEDIA_TYPE})
+        assert response.headers['content-type'] == binary_format.MEDIA_TYPE
+        results = binary_format.unpack(response.content)['results']
+        assert results['b']['status'] == 404
+        single = generic_client.get('/api/test/queries/items_list/execute',
+                                    headers={'Accept': binary_format.MEDIA_TYPE})
+        assert binary_format.pack(results['a']) == single.content
+
+    def test_legacy_route(self, no_manifest_client):
+        response = _batch(no_manifest_client, [{'id': 'a', 'query': 'auto__species_list'},
+                                               {'id': 'b', 'query': 'auto__nothing_list'}],
+                          url='/api/batch')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert results['a']['row_count'] > 0
+        assert results['b']['status'] == 404
+
+    def test_response_compressed(self, generic_client):
+        queries = [{'id': str(i), 'query': 'items_list'} for i in range(10)]
+        response = _batch(generic_client, queries, headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['content-encoding'] == 'gzip'
+        assert len(response.json()['results']) == 10
@@ -0,0 +1,81 @@
+"""
+Smoke tests for the benchmark suite (benchmarks/) on a tiny generated package.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+
+import pytest
+
+from scoda_engine_core import ScodaPackage, validate_db
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                         'benchmarks')
+
+
+@pytest.fixture(scope='module')
+def bench():
+    """Import benchmarks/bench_suite.py without leaking its env defaults."""
+    saved = dict(os.environ)
+    sys.path.insert(0, BENCH_DIR)
+    try:
+        import bench_suite
+    finally:
+        sys.path.remove(BENCH_DIR)
+        os.environ.clear()
+        os.environ.update(saved)
+    return bench_suite
+
+
+@pytest.fixture(scope='module')
+def generated(bench, tmp_path_factory):
+    return bench.gen.generate(str(tmp_path_factory.mktemp('bench')), 300)
+
+
+class TestGenerator:
+
+    def test_scale_and_manifest(self, bench, generated):
+        assert bench.gen.parse_count('1M') == 1_000_000
+        assert bench.gen.parse_count('2.5k') == 2500
+        assert sum(count for _, count in generated['levels'].values()) == 300
+        with ScodaPackage(generated['packages']['benchbase']) as pkg:
+            assert pkg.manifest['dependencies'][0]['alias'] == 'pc'
+            assert pkg.mcp_tools['tools']
+            errors, _ = validate_db(pkg.db_path)
+            assert errors == []
+            conn = sqlite3.connect(pkg.db_path)
+            edges = conn.execute("SELECT profile_id, COUNT(*) FROM classification_edge_cache "
+                                 "GROUP BY profile_id").fetchall()
+            conn.close()
+        assert edges == [(1, 300), (2, 300)]
+
+    def test_reused_when_unchanged(self, bench, generated):
+        out_dir = os.path.dirname(generated['packages']['benchbase'])
+        assert bench.gen.load_or_generate(out_dir, 300) == generated
+
+
+class TestSuite:
+
+    def test_run_and_compare(self, bench, generated, tmp_path):
+        results = bench.Suite(generated, repeat=2).run()
+        assert {'open.benchbase', 'get_db.fresh', 'query.taxonomy_tree',
+                'composite.taxon_detail', 'tree.composite_tree',
+                'mcp.get_taxon_detail'} <= set(results)
+        assert results['tree.children']['per_s'] > 0
+
+        baseline = {'taxa': 300, 'results': results}
+        slower = {'taxa': 300, 'results': {
+            name: dict(r, median_ms=r['median_ms'] * 2 + 1) for name, r in results.items()}}
+        rows = bench.compare_results.compare(baseline, slower)
+        assert {row['status'] for row in rows} == {'regression'}
+        assert not bench.compare_results.regressions(
+            bench.compare_results.compare(baseline, baseline))
+
+        (tmp_path / 'base.json').write_text(json.dumps(baseline))
+        (tmp_path / 'slow.json').write_text(json.dumps(slower))
+        assert bench.compare_results.main([str(tmp_path / 'base.json'),
+                                           str(tmp_path / 'slow.json')]) == 1
+        with pytest.raises(ValueError, match='Scale differs'):
+            bench.compare_results.compare(baseline, dict(slower, taxa=10))
@@ -0,0 +1,96 @@
+"""
+Tests for MessagePack query results (scoda_engine.binary_format).
+"""
+
+import pytest
+
+from scoda_engine import binary_format
+from scoda_engine.binary_format import (
+    ExtType, accepts_msgpack, decode_result, encode_result, pack, sniff_type, unpack)
+
+MSGPACK = {'Accept': 'application/msgpack'}
+
+
+class TestMsgpackEndpoints:
+
+    def test_query_negotiates_msgpack(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        response = generic_client.get(url, headers=MSGPACK)
+        assert response.status_code == 200
+        assert response.headers['content-type'] == 'application/msgpack'
+        doc = decode_result(response.content)
+        assert doc['columns'] == regular['columns']
+        assert doc['row_count'] == regular['row_count']
+        assert len(doc['types']) == len(doc['columns'])
+        rows = [dict(zip(doc['columns'], values)) for values in zip(*doc['data'])]
+        assert rows == regular['rows']
+
+    def test_paging(self, generic_client):
+        doc = decode_result(generic_client.get(
+            '/api/test/queries/items_list/execute',
+            params={'limit': 2}, headers=MSGPACK).content)
+        assert doc['row_count'] == 2
+        assert doc['next_cursor']
+
+    def test_legacy_route(self, no_manifest_client):
+        response = no_manifest_client.get('/api/queries/auto__species_list/execute',
+                                          headers=MSGPACK)
+        assert decode_result(response.content)['row_count'] > 0
+
+    def test_errors_stay_json(self, generic_client):
+        response = generic_client.get('/api/test/queries/no_such/execute', headers=MSGPACK)
+        assert response.status_code == 404
+        assert 'error' in response.json()
+
+    def test_json_preferred_without_msgpack(self, generic_client):
+        response = generic_client.get('/api/test/queries/items_list/execute',
+                                      headers={'Accept': 'application/msgpack;q=0, */*'})
+        assert response.headers['content-type'] == 'application/json'
+
+
+class TestBinaryFormat:
+
+    def test_typed_columns_round_trip(self):
+        result = {
+            'query': 'q', 'columns': ['i', 'f', 't', 'big', 'blob', 'mix', 'none'],
+            'row_count': 3, 'format': 'columnar',
+            'data': [[1, None, -5], [1.5, 2, None], ['a', 'été', None],
+                     [2 ** 40, 1, 2 ** 60], [b'x', None, b'yz'], [1, 'a', None],
+                     [None, None, None]],
+        }
+        encoded = encode_result(result)
+        raw = unpack(encoded)
+        assert raw['types'] == ['integer', 'real', 'text', 'integer', 'blob', 'mixed', 'null']
+        assert [type(col) for col in raw['data'][:3]] == [ExtType] * 3
+        assert isinstance(raw['data'][3], list)    # beyond float64's exact range
+        doc = decode_result(encoded)
+        assert doc['data'] == [[1, None, -5], [1.5, 2.0, None], ['a', 'été', None],
+                               [2 ** 40, 1, 2 ** 60], [b'x', None, b'yz'],
+                               [1, 'a', None], [None, None, None]]
+
+    def test_int64_column_as_float64(self):
+        doc = decode_result(encode_result({'columns': ['n'], 'data': [[2 ** 40, -3]]}))
+        assert doc['data'] == [[2 ** 40, -3]]
+        assert all(isinstance(v, int) for v in doc['data'][0])
+
+    @pytest.mark.parametrize('value', [
+        0, 127, 128, -1, -32, -33, -200, 70000, -70000, 2 ** 33, -2 ** 33,
+        2 ** 64 - 1, 1.25, None, True, False, 'x' * 40, 'y' * 70000,
+        b'z' * 300, list(range(20)), {str(i): i for i in range(20)}])
+    def test_pack_round_trip(self, value):
+        assert unpack(pack(value)) == value
+
+    def test_sniff_type(self):
+        assert sniff_type([1, None, 2]) == 'integer'
+        assert sniff_type([1, 2.5]) == 'real'
+        assert sniff_type(['a', 1]) == 'mixed'
+        assert sniff_type([None]) == 'null'
+
+    def test_accepts_msgpack(self):
+        assert accepts_msgpack('application/msgpack')
+        assert accepts_msgpack('application/json;q=0.9, application/x-msgpack')
+        assert not accepts_msgpack('application/json')
+        assert not accepts_msgpack('application/msgpack;q=0')
+        assert not accepts_msgpack(None)
+        assert binary_format.MEDIA_TYPE == 'application/msgpack'
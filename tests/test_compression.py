@@ -0,0 +1,153 @@
+"""
+Tests for response compression (scoda_engine.compression).
+"""
+
+import gzip
+import os
+from unittest import mock
+
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.testclient import TestClient
+
+from scoda_engine import app as app_module
+from scoda_engine import compression
+from scoda_engine.compression import (
+    CompressedBodyCache, PrecompressedStaticFiles, accepted_encodings, clean_dir,
+    precompress_dir)
+from scoda_engine_core import PackageRegistry
+
+GZIP = {'Accept-Encoding': 'gzip'}
+IDENTITY = {'Accept-Encoding': 'identity'}
+
+
+class TestCompressionMiddleware:
+
+    def test_gzip_json(self, generic_client):
+        plain = generic_client.get('/api/test/manifest', headers=IDENTITY)
+        assert 'content-encoding' not in plain.headers
+        response = generic_client.get('/api/test/manifest', headers=GZIP)
+        assert response.headers['content-encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['vary']
+        assert response.headers['etag'] == 'W/' + plain.headers['etag']
+        assert int(response.headers['content-length']) < len(plain.content)
+        assert response.json() == plain.json()
+
+    def test_cached_body_served_before_routing(self, generic_client):
+        app_module._compressed_cache.clear()
+        first = generic_client.get('/api/test/manifest', headers=GZIP)
+        hits = app_module._compressed_cache.hits
+        with mock.patch.object(PackageRegistry, 'get_db') as get_db:
+            second = generic_client.get('/api/test/manifest', headers=GZIP)
+        get_db.assert_not_called()
+        assert app_module._compressed_cache.hits == hits + 1
+        assert second.content == first.content
+        assert second.headers['etag'] == first.headers['etag']
+
+    def test_admin_write_then_gzip_get(self, crud_scoda_client):
+        client, name = crud_scoda_client
+        url = f'/api/{name}/entities/item/1'
+        hits = app_module._compressed_cache.hits
+        app_module._compressed_cache.clear()
+        # Large enough to be compressed
+        assert client.patch(url, json={'author': 'a' * 2000}).status_code == 200
+        for _ in range(2):
+            before = client.get(url, headers=GZIP)
+        assert before.headers['content-encoding'] == 'gzip'
+        assert client.patch(url, json={'author': 'b' * 2000}).status_code == 200
+        after = client.get(url, headers=GZIP)
+        assert after.json()['author'] == 'b' * 2000
+        assert client.get(url, headers=IDENTITY).json() == after.json()
+        # Admin mode neither fills nor reads the body cache
+        assert app_module._compressed_cache.stats()['entries'] == 0
+        assert app_module._compressed_cache.hits == hits
+
+    def test_weak_etag_revalidates(self, generic_client):
+        etag = generic_client.get('/api/test/manifest', headers=GZIP).headers['etag']
+        response = generic_client.get('/api/test/manifest',
+                                      headers=dict(GZIP, **{'If-None-Match': etag}))
+        assert response.status_code == 304
+        assert 'Accept-Encoding' in response.headers['vary']
+
+    def test_small_bodies_uncompressed(self, generic_client):
+        response = generic_client.get('/api/test/provenance', headers=GZIP)
+        assert 'content-encoding' not in response.headers
+
+    def test_stream_compressed(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        response = generic_client.get(url, params={'stream': 'json'}, headers=GZIP)
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.json() == regular
+
+    def test_static_compressed_and_cached(self, generic_client):
+        cache = app_module._compressed_cache
+        cache.clear()
+        first = generic_client.get('/static/js/app.js', headers=GZIP)
+        assert first.headers['content-encoding'] == 'gzip'
+        hits = cache.hits
+        second = generic_client.get('/static/js/app.js', headers=GZIP)
+        assert second.content == first.content
+        assert cache.hits == hits + 1
+
+
+class TestPrecompressedStatic:
+
+    @pytest.fixture
+    def static_dir(self, tmp_path):
+        (tmp_path / 'app.js').write_text('var x = 1;\n' * 500)
+        (tmp_path / 'tiny.css').write_text('a{}')
+        (tmp_path / 'logo.png').write_bytes(b'\x89PNG' + b'\0' * 4000)
+        return tmp_path
+
+    def _client(self, directory):
+        return TestClient(Starlette(routes=[
+            Mount('/static', PrecompressedStaticFiles(directory=str(directory)))]))
+
+    def test_precompress_and_serve(self, static_dir):
+        written = precompress_dir(str(static_dir))
+        assert str(static_dir / 'app.js.gz') in written
+        assert not (static_dir / 'tiny.css.gz').exists()
+        assert not (static_dir / 'logo.png.gz').exists()
+
+        client = self._client(static_dir)
+        response = client.get('/static/app.js', headers=GZIP)
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['content-type'].startswith('text/javascript')
+        assert response.text == (static_dir / 'app.js').read_text()
+        plain = client.get('/static/app.js', headers=IDENTITY)
+        assert 'content-encoding' not in plain.headers
+
+        assert clean_dir(str(static_dir)) == [str(static_dir / 'app.js.gz')]
+
+    def test_stale_sibling_ignored(self, static_dir):
+        precompress_dir(str(static_dir))
+        source = static_dir / 'app.js'
+        stat = source.stat()
+        os.utime(source.with_name('app.js.gz'), (stat.st_atime, stat.st_mtime - 10))
+        response = self._client(static_dir).get('/static/app.js', headers=GZIP)
+        assert 'content-encoding' not in response.headers
+
+
+class TestCompressionHelpers:
+
+    def test_accepted_encodings(self):
+        assert accepted_encodings('gzip, deflate', ('br', 'gzip')) == ['gzip']
+        assert accepted_encodings('gzip;q=0.5, br', ('br', 'gzip')) == ['br', 'gzip']
+        assert accepted_encodings('*', ('br', 'gzip')) == ['br', 'gzip']
+        assert accepted_encodings('gzip;q=0', ('br', 'gzip')) == []
+        assert accepted_encodings(None) == []
+
+    @pytest.mark.skipif(compression.brotli is None, reason='brotli not installed')
+    def test_brotli_preferred(self):
+        assert compression.negotiate('gzip, br') == 'br'
+
+    def test_body_cache_budget(self):
+        cache = CompressedBodyCache(max_bytes=10)
+        cache.put('a', 200, [], b'123456')
+        cache.put('b', 200, [], b'123456')
+        assert cache.get('a') is None
+        assert cache.get('b')[2] == b'123456'
+        assert cache.stats()['evictions'] == 1
+        assert gzip.decompress(compression.compress(b'x' * 100, 'gzip')) == b'x' * 100
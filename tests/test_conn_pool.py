@@ -0,0 +1,190 @@
+"""
+Tests for scoda_engine_core.conn_pool and conn_profile — connection pools and profiles.
+"""
+
+import sqlite3
+from unittest import mock
+
+import pytest
+
+from scoda_engine_core import PackageRegistry
+from scoda_engine_core.conn_pool import ConnectionPool, PooledConnection
+from scoda_engine_core.conn_profile import ConnectionProfile
+
+
+@pytest.fixture
+def registry(generic_db, tmp_path):
+    canonical_db, overlay_db = generic_db
+    reg = PackageRegistry(pool_min=1, pool_max=2)
+    reg.register_db('sample', canonical_db, overlay_db)
+    yield reg
+    reg.close_all()
+
+
+class TestConnectionPool:
+
+    def test_close_returns_connection_for_reuse(self, registry):
+        conn = registry.get_db('sample')
+        assert isinstance(conn, PooledConnection)
+        conn.close()
+        again = registry.get_db('sample')
+        assert again is conn
+        assert again.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+        again.close()
+        stats = registry.pool_stats()['sample']
+        assert stats['created'] == 1
+        assert stats['reused'] == 1
+
+    def test_double_close_is_idempotent(self, registry):
+        conn = registry.get_db('sample')
+        conn.close()
+        conn.close()
+        stats = registry.pool_stats()['sample']
+        assert stats['idle'] == 1 and stats['in_use'] == 0
+        first, second = registry.get_db('sample'), registry.get_db('sample')
+        assert first is not second
+        assert registry.pool_stats()['sample']['in_use'] == 2
+        first.close()
+        second.close()
+
+    def test_reuse_skips_attach(self, registry):
+        registry.get_db('sample').close()
+        with mock.patch.object(PackageRegistry, '_resolve_and_validate_deps') as deps, \
+                mock.patch('scoda_engine_core.scoda_package._ensure_overlay_for_package') as ensure:
+            conn = registry.get_db('sample')
+            assert conn.execute("SELECT COUNT(*) FROM overlay.overlay_metadata").fetchone()
+            conn.close()
+        deps.assert_not_called()
+        ensure.assert_not_called()
+
+    def test_overflow_connections_closed(self, registry):
+        conns = [registry.get_db('sample') for _ in range(4)]
+        for conn in conns:
+            conn.close()
+        stats = registry.pool_stats()['sample']
+        assert stats['idle'] == 2
+        assert stats['overflow'] == 2
+        assert stats['in_use'] == 0
+
+    def test_release_rolls_back_and_resets(self, registry):
+        conn = registry.get_db('sample')
+        conn.row_factory = None
+        conn.execute("INSERT INTO overlay.overlay_metadata VALUES ('k', 'v')")
+        assert conn.in_transaction
+        conn.close()
+        conn = registry.get_db('sample')
+        assert conn.row_factory is sqlite3.Row
+        assert not conn.in_transaction
+        assert conn.execute(
+            "SELECT COUNT(*) FROM overlay.overlay_metadata WHERE key = 'k'").fetchone()[0] == 0
+        conn.close()
+
+    def test_reregister_invalidates(self, registry, generic_db):
+        canonical_db, overlay_db = generic_db
+        old = registry.get_db('sample')
+        old.close()
+        registry.register_db('sample', canonical_db, overlay_db)
+        new = registry.get_db('sample')
+        assert new is not old
+        new.close()
+        with pytest.raises(sqlite3.ProgrammingError):
+            old.execute("SELECT 1")
+
+    def test_in_use_connection_closed_after_invalidate(self, registry):
+        conn = registry.get_db('sample')
+        pool = registry._pools['sample']
+        registry.invalidate_pools()
+        conn.close()
+        assert pool.stats()['idle'] == 0
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    def test_health_check_drops_broken_connection(self):
+        pool = ConnectionPool(
+            lambda factory: sqlite3.connect(':memory:', factory=factory),
+            min_size=0, max_size=2, health_check_interval=0)
+        conn = pool.acquire()
+        conn.close()
+        with mock.patch.object(pool, '_healthy', return_value=False):
+            fresh = pool.acquire()
+        assert fresh is not conn
+        assert pool.stats()['discarded'] == 1
+        pool.close()
+
+    def test_min_size_primed(self, generic_db):
+        canonical_db, overlay_db = generic_db
+        reg = PackageRegistry(pool_min=3, pool_max=4)
+        reg.register_db('sample', canonical_db, overlay_db)
+        reg.get_db('sample').close()
+        assert reg.pool_stats()['sample']['idle'] == 3
+        reg.close_all()
+
+    def test_pooling_disabled(self, generic_db):
+        canonical_db, overlay_db = generic_db
+        reg = PackageRegistry(pool_max=0)
+        reg.register_db('sample', canonical_db, overlay_db)
+        conn = reg.get_db('sample')
+        assert not isinstance(conn, PooledConnection)
+        conn.close()
+        assert reg.pool_stats() == {}
+        reg.close_all()
+
+
+class TestConnectionProfile:
+
+    def _registry(self, generic_db, profile):
+        canonical_db, overlay_db = generic_db
+        reg = PackageRegistry(profile=profile)
+        reg.register_db('sample', canonical_db, overlay_db,
+                        extra_dbs={'dep': canonical_db})
+        return reg
+
+    def test_readonly_profile(self, generic_db):
+        reg = self._registry(generic_db, ConnectionProfile.preset('readonly'))
+        conn = reg.get_db('sample')
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+        assert conn.execute("SELECT COUNT(*) FROM dep.items").fetchone()[0] > 0
+        assert conn.execute("PRAGMA main.mmap_size").fetchone()[0] == 256 * 1024 ** 2
+        assert conn.execute("PRAGMA dep.cache_size").fetchone()[0] == -64 * 1024
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM items")
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("DELETE FROM dep.items")
+        # Overlay stays writable
+        conn.execute("INSERT INTO overlay.overlay_metadata VALUES ('k', 'v')")
+        conn.rollback()
+        conn.close()
+        reg.close_all()
+
+    def test_query_only_blocks_overlay_writes(self, generic_db):
+        reg = self._registry(generic_db, ConnectionProfile(query_only=True))
+        conn = reg.get_db('sample')
+        with pytest.raises(sqlite3.OperationalError):
+            conn.execute("INSERT INTO overlay.overlay_metadata VALUES ('k', 'v')")
+        conn.close()
+        reg.close_all()
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv('SCODA_DB_PROFILE', 'readonly')
+        monkeypatch.setenv('SCODA_DB_MMAP_SIZE', '64M')
+        monkeypatch.setenv('SCODA_DB_TEMP_STORE', 'file')
+        monkeypatch.setenv('SCODA_DB_QUERY_ONLY', '1')
+        profile = ConnectionProfile.from_env()
+        assert profile.immutable is True
+        assert profile.mmap_size == 64 * 1024 ** 2
+        assert profile.temp_store == 'file'
+        assert profile.query_only is True
+        monkeypatch.delenv('SCODA_DB_PROFILE')
+        assert ConnectionProfile.from_env().immutable is False
+        assert ConnectionProfile.from_env(default='readonly').immutable is True
+        monkeypatch.setenv('SCODA_DB_PROFILE', 'bogus')
+        with pytest.raises(ValueError):
+            ConnectionProfile.from_env()
+
+    def test_database_uri_escapes_path(self, tmp_path):
+        path = str(tmp_path / "odd #name?.db")
+        sqlite3.connect(path).execute("CREATE TABLE t (x)").connection.close()
+        conn = ConnectionProfile.preset('readonly').connect(path)
+        assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+        conn.close()
@@ -0,0 +1,171 @@
+"""
+Tests for compiled entity-detail / composite execution plans (scoda_engine.exec_plan).
+"""
+
+import sqlite3
+import threading
+import time
+from unittest import mock
+
+from scoda_engine import exec_plan
+from scoda_engine.exec_plan import (
+    Binding, CompiledQuery, Step, ViewPlan, compile_composite, compile_entity, run_steps)
+
+
+class TestPlanEndpoints:
+
+    def test_plans_introspection(self, generic_client):
+        plans = generic_client.get('/api/test/plans').json()
+        composite = plans['composite']['item_detail']
+        assert composite['main']['name'] == 'item_detail'
+        assert 'SELECT' in composite['main']['sql']
+        steps = {step['key']: step for step in composite['steps']}
+        assert steps['related_items']['bindings'] == {'category_id': 'result.category_id'}
+        assert steps['tags']['bindings'] == {'item_id': 'id'}
+
+        entity = plans['entity']['item']
+        assert entity['main']['name'] == 'item_detail'
+        assert entity['forward_request_params'] is False
+        assert {step['key'] for step in entity['steps']} >= {'tags', 'relations'}
+
+    def test_composite_compiled_once(self, generic_client):
+        with mock.patch.object(exec_plan, 'compile_query',
+                               wraps=exec_plan.compile_query) as compile_query:
+            first = generic_client.get('/api/test/composite/item_detail', params={'id': 1})
+            compiled = compile_query.call_count
+            second = generic_client.get('/api/test/composite/item_detail', params={'id': 2})
+            assert compile_query.call_count == compiled
+        assert first.status_code == second.status_code == 200
+        assert second.json()['id'] == 2
+
+    def test_entity_detail_compiled_once(self, generic_client):
+        with mock.patch.object(exec_plan, 'compile_entity',
+                               wraps=exec_plan.compile_entity) as compile_entity:
+            assert generic_client.get('/api/test/item/1').status_code == 200
+            assert generic_client.get('/api/test/item/2').status_code == 200
+            assert generic_client.get('/api/test/nothing/1').status_code == 404
+            assert compile_entity.call_count == 2
+
+    def test_parallel_matches_sequential(self, generic_client, monkeypatch):
+        url = '/api/test/composite/item_detail'
+        parallel = generic_client.get(url, params={'id': 1}).json()
+        monkeypatch.setenv('SCODA_COMPOSITE_PARALLEL', '1')
+        sequential = generic_client.get(url, params={'id': 1}).json()
+        assert parallel == sequential
+        assert list(parallel) == list(sequential)
+        assert generic_client.get('/api/test/item/1').json() == \
+            generic_client.get('/api/test/item/1').json()
+
+    def test_query_edit_recompiles(self, generic_db, generic_client):
+        canonical_db, _ = generic_db
+        assert 'tags' in generic_client.get('/api/test/item/1').json()
+        conn = sqlite3.connect(canonical_db)
+        conn.execute("UPDATE ui_queries SET name = 'other_tags' WHERE name = 'item_tags'")
+        conn.commit()
+        conn.close()
+        assert 'tags' not in generic_client.get('/api/test/item/1').json()
+
+
+class TestCompile:
+
+    def _conn(self):
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE ui_queries (name TEXT, sql TEXT, params_json TEXT);
+            CREATE TABLE genus (id INTEGER);
+            INSERT INTO ui_queries VALUES
+                ('genus_detail', 'SELECT * FROM genus WHERE id = :genus_id', '{"genus_id": 1}'),
+                ('genus_children', 'SELECT :genus_id, :family', '["genus_id", "family"]'),
+                ('genus_broken', 'SELECT 1', '{not json');
+        """)
+        return conn
+
+    def test_compile_entity(self):
+        plan = compile_entity(self._conn().cursor(), 'genus')
+        assert plan.main.declared == ('genus_id',)
+        steps = {step.key: step for step in plan.steps}
+        assert steps['children'].bindings == (Binding('genus_id', 'id'),
+                                              Binding('family', 'field', 'family'))
+        assert steps['children'].params(7, {'family': 'F'}, {}) == {'genus_id': 7, 'family': 'F'}
+        assert steps['broken'].query.error
+        assert compile_entity(self._conn().cursor(), 'nothing').main is None
+
+    def test_compile_composite(self):
+        view = {'source_query': 'auto__genus_list', 'source_param': 'genus_id',
+                'sub_queries': {'kids': {'query': 'genus_children',
+                                         'params': {'genus_id': 'id', 'family': 'result.fam',
+                                                    'limit': 5}},
+                                'gone': {'query': 'missing'}}}
+        plan = compile_composite(self._conn().cursor(), 'v', view)
+        assert plan.main.auto and plan.main.bind({'x': 1}) == {}
+        kids, gone = plan.steps
+        assert kids.params(3, {}, {'id': '3'}) == {'id': '3', 'genus_id': 3, 'family': '',
+                                                   'limit': 5}
+        assert gone.query is None
+        assert plan.describe()['steps'][1]['query'] == {'name': 'missing', 'missing': True}
+
+    def test_bind_defaults(self):
+        query = CompiledQuery('q', 'SELECT :a, :b', ('a', 'b'))
+        assert query.bind({'a': 1}) == {'a': 1, 'b': None}
+
+
+class _FakeConn:
+
+    def __init__(self, log):
+        self.log = log
+
+    def close(self):
+        self.log.append('closed')
+
+
+class TestRunSteps:
+
+    def _plan(self, steps, max_parallel=None):
+        return ViewPlan('composite', 'v', None, 'main', 'id', True,
+                        exec_plan._link_steps(steps), max_parallel=max_parallel)
+
+    def _run(self, plan, delay=0.05):
+        active, peak, order, log = [0], [0], [], []
+        lock = threading.Lock()
+
+        def execute(conn, step, params):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(delay)
+            with lock:
+                active[0] -= 1
+                order.append(step.key)
+            return {'params': params}
+
+        def merge(data, step, result):
+            data[step.key] = result['params']
+
+        data = run_steps(plan, 7, {'name': 'row'}, {}, execute, merge,
+                         _FakeConn(log), lambda: _FakeConn(log))
+        return data, peak[0], order, log
+
+    def test_independent_steps_fan_out(self):
+        steps = [Step(f's{i}', 'q', None, (Binding('id', 'id'),)) for i in range(4)]
+        data, peak, _, log = self._run(self._plan(steps))
+        assert peak > 1
+        assert list(data) == ['name', 's0', 's1', 's2', 's3']
+        assert data['s3'] == {'id': 7}
+        assert log == ['closed'] * log.count('closed') and 0 < len(log) <= 3
+
+    def test_dependencies_respected(self):
+        steps = [Step('a', 'q', None, (Binding('id', 'id'),)),
+                 Step('b', 'q', None, (Binding('x', 'field', 'a'),)),
+                 Step('c', 'q', None, (Binding('y', 'field', 'name'),))]
+        plan = self._plan(steps)
+        assert [s.after for s in plan.steps] == [(), (0,), ()]
+        assert plan.waves == [[0, 2], [1]]
+        data, _, order, _ = self._run(plan)
+        assert order.index('b') > order.index('a')
+        assert data['b'] == {'x': {'id': 7}}
+        assert data['c'] == {'y': 'row'}
+
+    def test_cap_one_is_sequential(self):
+        steps = [Step(f's{i}', 'q', None) for i in range(3)]
+        _, peak, order, log = self._run(self._plan(steps, max_parallel=1), delay=0)
+        assert peak == 1 and order == ['s0', 's1', 's2'] and log == []
@@ -0,0 +1,186 @@
+"""
+Tests for scoda_engine_core.extract_cache — persistent extraction cache.
+"""
+
+import os
+import subprocess
+import sys
+import time
+import zipfile
+from unittest import mock
+
+import pytest
+
+import scoda_engine_core
+from scoda_engine_core import ScodaPackage, ScodaChecksumError
+from scoda_engine_core.extract_cache import (
+    ExtractionCache,
+    _FileLock,
+    _parse_size,
+    get_default_cache,
+    main,
+)
+
+
+@pytest.fixture
+def scoda_file(generic_db, tmp_path):
+    canonical_db, _ = generic_db
+    path = str(tmp_path / "cached.scoda")
+    ScodaPackage.create(canonical_db, path)
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ExtractionCache(str(tmp_path / "cache"), max_bytes=0)
+
+
+class TestExtractionCache:
+
+    def test_miss_populates_entry(self, scoda_file, cache):
+        with ScodaPackage(scoda_file, extraction_cache=cache) as pkg:
+            assert pkg._tmp_dir is None
+            assert pkg.db_path == cache.entry_path(pkg.data_checksum)
+            assert os.path.exists(pkg.db_path)
+        entries = cache.entries()
+        assert len(entries) == 1
+        # close() must not remove the persistent entry
+        assert os.path.exists(entries[0]['path'])
+
+    def test_hit_skips_extract_and_hash(self, scoda_file, cache):
+        ScodaPackage(scoda_file, extraction_cache=cache).close()
+        with mock.patch.object(ExtractionCache, '_populate') as populate, \
+                mock.patch.object(zipfile.ZipFile, 'extract') as extract, \
+                mock.patch('scoda_engine_core.scoda_package._sha256_file') as sha:
+            with ScodaPackage(scoda_file, extraction_cache=cache) as pkg:
+                assert os.path.exists(pkg.db_path)
+            populate.assert_not_called()
+            extract.assert_not_called()
+            sha.assert_not_called()
+
+    def test_entry_is_read_only(self, scoda_file, cache):
+        with ScodaPackage(scoda_file, extraction_cache=cache) as pkg:
+            assert oct(os.stat(pkg.db_path).st_mode & 0o222) == '0o0'
+
+    def test_checksum_mismatch_not_cached(self, generic_db, tmp_path, cache):
+        canonical_db, _ = generic_db
+        path = str(tmp_path / "bad.scoda")
+        ScodaPackage.create(canonical_db, path,
+                            metadata={'data_checksum_sha256': 'ab' * 32})
+        with pytest.raises(ScodaChecksumError):
+            ScodaPackage(path, extraction_cache=cache)
+        assert cache.entries() == []
+        assert not [f for f in os.listdir(cache.cache_dir) if f.endswith('.tmp')]
+
+    def test_lru_eviction_keeps_recent(self, scoda_file, cache):
+        real = cache.warm(scoda_file)
+        size = cache.entries()[0]['size']
+        # Two fake entries of the same size, older than the real one
+        for key, age in (('1' * 64, 300), ('2' * 64, 200)):
+            path = cache.entry_path(key)
+            with open(path, 'wb') as f:
+                f.write(b'\0' * size)
+            mtime = os.path.getmtime(path) - age
+            os.utime(path, (mtime, mtime))
+
+        assert cache.evict(size * 2) == ['1' * 64]
+        assert {e['checksum'] for e in cache.entries()} == {'2' * 64, real}
+
+    def test_hit_records_recency_on_lock_file(self, scoda_file, cache):
+        checksum = cache.warm(scoda_file)
+        db_path, lock_path = cache.entry_path(checksum), cache._lock_path(checksum)
+        old = time.time() - 3600
+        os.utime(db_path, (old, old))
+        os.utime(lock_path, (old, old))
+        before = os.stat(db_path).st_mtime_ns
+        cache.warm(scoda_file)
+        # The database (and so its generation token) is left alone
+        assert os.stat(db_path).st_mtime_ns == before
+        assert cache.entries()[0]['last_used'] > old + 60
+
+    def test_eviction_keeps_lock_files(self, scoda_file, cache):
+        checksum = cache.warm(scoda_file)
+        lock_path = cache._lock_path(checksum)
+        inode = os.stat(lock_path).st_ino
+        assert cache.evict(0) == [checksum]
+        assert os.stat(lock_path).st_ino == inode
+        assert cache.warm(scoda_file) == checksum
+        assert os.stat(lock_path).st_ino == inode
+
+    def test_in_use_entry_not_evicted(self, scoda_file, cache):
+        with ScodaPackage(scoda_file, extraction_cache=cache) as pkg:
+            if os.name != 'nt':
+                assert cache.evict(0) == []
+                assert os.path.exists(pkg.db_path)
+        assert len(cache.evict(0)) == 1
+        assert cache.entries() == []
+
+    @pytest.mark.skipif(os.name == 'nt', reason='shared flock is POSIX only')
+    def test_concurrent_cold_open_does_not_block(self, scoda_file, cache, tmp_path):
+        """Processes opening the same package on a cold cache share one extraction.
+
+        Each keeps its package open, and a shared lock on the still-missing
+        entry is held throughout; nobody may wait for another to let go.
+        """
+        hold = 5
+        script = (
+            "import sys, time\n"
+            "from scoda_engine_core import ScodaPackage\n"
+            "from scoda_engine_core.extract_cache import ExtractionCache\n"
+            "populate = ExtractionCache._populate\n"
+            "def slow_populate(*args):\n"
+            "    time.sleep(0.5)  # every process sees the entry missing\n"
+            "    populate(*args)\n"
+            "ExtractionCache._populate = slow_populate\n"
+            "pkg = ScodaPackage(sys.argv[1], extraction_cache=ExtractionCache(sys.argv[2], 0))\n"
+            "open(sys.argv[3], 'w').write(pkg.db_path)\n"
+            f"time.sleep({hold})\n"
+            "pkg.close()\n")
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(
+            [os.path.dirname(os.path.dirname(scoda_engine_core.__file__)),
+             os.environ.get('PYTHONPATH', '')]))
+        with ScodaPackage(scoda_file, lazy=True) as pkg:
+            checksum = pkg.data_checksum
+        holder = _FileLock(cache._lock_path(checksum))
+        holder.acquire(exclusive=False)
+        ready = [tmp_path / f'ready-{i}' for i in range(3)]
+        start = time.monotonic()
+        procs = [subprocess.Popen([sys.executable, '-c', script, scoda_file,
+                                   cache.cache_dir, str(path)], env=env)
+                 for path in ready]
+        try:
+            while not all(path.exists() for path in ready) and \
+                    time.monotonic() - start < hold:
+                time.sleep(0.05)
+            opened = [path.exists() for path in ready]
+        finally:
+            holder.release()
+            for proc in procs:
+                proc.wait(timeout=60)
+        assert opened == [True, True, True]
+        assert len({path.read_text() for path in ready}) == 1
+        assert all(proc.returncode == 0 for proc in procs)
+        assert len(cache.entries()) == 1
+
+    def test_prune_all_and_cli(self, scoda_file, cache, capsys):
+        assert main(['--cache-dir', cache.cache_dir, 'warm', scoda_file]) == 0
+        assert len(cache.entries()) == 1
+        assert main(['--cache-dir', cache.cache_dir, 'list']) == 0
+        assert '1 entry' in capsys.readouterr().out
+        assert main(['--cache-dir', cache.cache_dir, 'prune', '--all']) == 0
+        assert cache.entries() == []
+
+    def test_default_cache_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('SCODA_CACHE_DIR', raising=False)
+        assert get_default_cache() is None
+        monkeypatch.setenv('SCODA_CACHE_DIR', str(tmp_path / "envcache"))
+        monkeypatch.setenv('SCODA_CACHE_MAX_BYTES', '512M')
+        cache = get_default_cache()
+        assert cache.cache_dir == str(tmp_path / "envcache")
+        assert cache.max_bytes == 512 * 1024 ** 2
+
+    def test_parse_size(self):
+        assert _parse_size('1024') == 1024
+        assert _parse_size('2K') == 2048
+        assert _parse_size('1.5G') == int(1.5 * 1024 ** 3)
+        assert _parse_size('10GB') == 10 * 1024 ** 3
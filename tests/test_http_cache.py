@@ -0,0 +1,138 @@
+"""
+Tests for ETags and conditional GET (scoda_engine.http_cache).
+"""
+
+import sqlite3
+from unittest import mock
+
+from scoda_engine import app as app_module
+from scoda_engine.http_cache import cache_control, etag_matches, make_etag
+from scoda_engine_core import PackageRegistry, get_registry
+
+
+class TestConditionalGet:
+
+    def test_etag_and_304_without_sql(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        first = generic_client.get(url)
+        etag = first.headers['etag']
+        assert first.headers['cache-control'] == 'public, no-cache'
+        assert 'Accept' in first.headers['vary']
+        with mock.patch.object(PackageRegistry, 'get_db') as get_db:
+            second = generic_client.get(url, headers={'If-None-Match': etag})
+        get_db.assert_not_called()
+        assert second.status_code == 304
+        assert second.content == b''
+        assert second.headers['etag'] == etag
+
+    def test_etag_depends_on_route_params_and_accept(self, generic_client):
+        base = '/api/test/queries/category_children/execute'
+        etags = {
+            generic_client.get(base, params={'category_id': 1}).headers['etag'],
+            generic_client.get(base, params={'category_id': 2}).headers['etag'],
+            generic_client.get(base, params={'category_id': 1},
+                               headers={'Accept': 'application/msgpack'}).headers['etag'],
+            generic_client.get('/api/test/manifest').headers['etag'],
+        }
+        assert len(etags) == 4
+        # Parameter order does not matter
+        a = generic_client.get(base, params=[('category_id', 1), ('format', 'columnar')])
+        b = generic_client.get(base, params=[('format', 'columnar'), ('category_id', 1)])
+        assert a.headers['etag'] == b.headers['etag']
+
+    def test_overlay_write_changes_etag(self, generic_client):
+        url = '/api/test/annotations/item/1'
+        before = generic_client.get(url)
+        assert before.headers['cache-control'] == 'private, no-cache'
+        generic_client.post('/api/test/annotations', json={
+            'entity_type': 'item', 'entity_id': 1,
+            'annotation_type': 'note', 'content': 'x'})
+        response = generic_client.get(url, headers={'If-None-Match': before.headers['etag']})
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+
+    def test_canonical_change_changes_etag(self, generic_db, generic_client):
+        canonical_db, _ = generic_db
+        url = '/api/test/queries/items_list/execute'
+        etag = generic_client.get(url).headers['etag']
+        conn = sqlite3.connect(canonical_db)
+        conn.execute("DELETE FROM items WHERE id = 1")
+        conn.commit()
+        conn.close()
+        assert generic_client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+    def test_admin_write_to_scoda_package_changes_etag(self, crud_scoda_client):
+        client, name = crud_scoda_client
+        url = f'/api/{name}/entities/item/1'
+        client.get(url)     # creates the overlay, which is part of the ETag
+        etag = client.get(url).headers['etag']
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+        assert client.patch(url, json={'author': 'CHANGED'}).status_code == 200
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json()['author'] == 'CHANGED'
+
+    def test_legacy_routes_use_active_package(self, generic_client):
+        # Direct-path testing mode has no active package: no ETag
+        assert 'etag' not in generic_client.get('/api/manifest').headers
+        with mock.patch('scoda_engine_core.scoda_package.get_active_package_name',
+                        return_value='test'):
+            assert 'etag' in generic_client.get('/api/manifest').headers
+
+    def test_errors_and_globals_untouched(self, generic_client):
+        assert 'etag' not in generic_client.get('/api/test/queries/nope/execute').headers
+        assert 'etag' not in generic_client.get('/api/packages').headers
+        assert 'etag' not in generic_client.get('/api/nope/manifest').headers
+
+    def test_max_age_and_disable(self, generic_client, monkeypatch):
+        monkeypatch.setattr(app_module, '_HTTP_MAX_AGE', 300)
+        response = generic_client.get('/api/test/provenance')
+        assert response.headers['cache-control'] == 'public, max-age=300'
+        monkeypatch.setattr(app_module, '_HTTP_ETAGS', False)
+        assert 'etag' not in generic_client.get('/api/test/provenance').headers
+
+    def test_admin_mode_private(self, generic_client):
+        app_module._set_scoda_mode('admin')
+        try:
+            response = generic_client.get('/api/test/manifest')
+        finally:
+            app_module._set_scoda_mode('viewer')
+        assert response.headers['cache-control'] == 'private, no-cache'
+
+
+class TestDataToken:
+
+    def test_checksum_identifies_scoda_package(self, generic_scoda_package):
+        registry = PackageRegistry()
+        name = registry.register_path(generic_scoda_package)
+        pkg = registry._packages[name]['pkg']
+        assert registry.data_token(name) == (('sha256', pkg.data_checksum),)
+        assert registry.overlay_token(name) is None     # created on first connect
+        registry.get_db(name).close()
+        assert registry.overlay_token(name) is not None
+        registry.close_all()
+
+    def test_unknown_package(self):
+        try:
+            get_registry().data_token('no-such-package')
+        except KeyError:
+            pass
+        else:
+            raise AssertionError('KeyError expected')
+
+
+class TestHttpCacheHelpers:
+
+    def test_etag_matches(self):
+        etag = make_etag('a', 1)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"x", W/{etag}', etag)
+        assert etag_matches('*', etag)
+        assert not etag_matches('"other"', etag)
+        assert not etag_matches(None, etag)
+        assert make_etag('a', 1) == etag != make_etag('a', 2)
+
+    def test_cache_control(self):
+        assert cache_control(True, 60) == 'private, no-cache'
+        assert cache_control(False) == 'public, no-cache'
+        assert cache_control(False, 60) == 'public, max-age=60'
@@ -0,0 +1,171 @@
+"""
+Tests for the EXPLAIN QUERY PLAN index advisor and sidecar databases
+(scoda_engine.index_advisor).
+"""
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from scoda_engine import app as app_module
+from scoda_engine import index_advisor
+from scoda_engine.index_advisor import IndexProposal, Report, analyze, analyze_query
+from scoda_engine_core import PackageRegistry
+
+
+def _sidecars(directory):
+    return [os.path.join(directory, p) for p in os.listdir(directory)
+            if p.endswith(index_advisor.SIDECAR_SUFFIX)]
+
+
+def _by_name(report):
+    return {query.name: query for query in report.queries}
+
+
+class TestAnalyze:
+
+    def test_flags_scans_and_temp_btrees(self, generic_db):
+        report = analyze(sqlite3.connect(generic_db[0]))
+        queries = _by_name(report)
+        kinds = {f.kind for f in queries['items_list'].findings}
+        assert kinds == {'scan', 'temp_btree'}
+        assert queries['items_list'].findings[0].table == 'items'
+        assert not queries['item_detail'].findings
+        assert queries['category_items'].proposals[0].columns[:2] == ('category_id', 'name')
+        assert queries['items_list'].proposals[0].columns[0] == 'name'
+
+    def test_alias_and_join_order(self, generic_db):
+        relations = _by_name(analyze(sqlite3.connect(generic_db[0])))['item_relations']
+        assert relations.findings[0].table == 'item_relations'
+        # The parameter comparison leads, the join column follows
+        assert relations.proposals[0].columns[:2] == ('source_item_id', 'target_item_id')
+
+    def test_existing_index_not_proposed(self):
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE t (id INTEGER PRIMARY KEY, a INT, b TEXT, c TEXT);
+            CREATE INDEX t_ab ON t (a, b);
+        """)
+        query = analyze_query(conn, 'q', 'SELECT * FROM t WHERE c = :c', '{"c": "text"}')
+        assert query.params == {'c': 'a'}
+        assert query.proposals == [IndexProposal('t', ('c',))]
+        covered = analyze_query(conn, 'q', 'SELECT a FROM t WHERE a > 1 ORDER BY a', None)
+        assert covered.proposals == []
+
+    def test_quoted_identifiers(self):
+        conn = sqlite3.connect(':memory:')
+        conn.executescript("""
+            CREATE TABLE t (id INTEGER PRIMARY KEY, a INT, b TEXT);
+            CREATE TABLE "t two" (id INTEGER PRIMARY KEY, a INT);
+        """)
+        query = analyze_query(conn, 'q', 'SELECT "b" FROM [t] AS "x" WHERE "x"."a" = :a', None)
+        assert query.findings[0].table == 't'
+        assert query.proposals == [IndexProposal('t', ('a', 'b'), covering=True)]
+        # Not understood: reported, never guessed at
+        spaced = analyze_query(conn, 'q', 'SELECT * FROM "t two" WHERE a = :a', None)
+        assert spaced.findings[0].table == 't two'
+        assert spaced.proposals == [] and '"t two"' in spaced.unsupported
+        assert '(no proposal: quoted identifier "t two")' in index_advisor.format_report(
+            Report([spaced]))
+
+    def test_prefix_proposals_merged(self):
+        short = IndexProposal('t', ('a', 'b'))
+        long = IndexProposal('t', ('a', 'b', 'c'), covering=True)
+        report = Report([index_advisor.QueryAdvice('q1', '', proposals=[short]),
+                         index_advisor.QueryAdvice('q2', '', proposals=[long])])
+        assert report.proposals == [long]
+
+    def test_invalid_sql_reported(self):
+        conn = sqlite3.connect(':memory:')
+        assert analyze_query(conn, 'q', 'SELECT * FROM missing', None).error
+
+
+class TestSidecar:
+
+    @pytest.fixture
+    def advised(self, generic_client, generic_db, tmp_path):
+        registry = PackageRegistry(pool_max=0)
+        registry.register_db('test', *generic_db)
+        reports = index_advisor.startup(registry, 'sidecar', str(tmp_path))
+        yield reports['test'], tmp_path
+        index_advisor.clear()
+
+    def test_sidecar_routes_improved_queries(self, generic_client, advised):
+        report, directory = advised
+        paths = _sidecars(directory)
+        assert len(paths) == 1 and os.path.basename(paths[0]).startswith('test.')
+        (stats,) = index_advisor.stats().values()
+        assert 'items_list' in stats['routes'] and 'item_detail' not in stats['routes']
+
+        side = sqlite3.connect(paths[0])
+        tables = {r[0] for r in side.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+        assert 'items' in tables and 'ui_queries' not in tables
+
+    def test_routed_results_unchanged(self, generic_client, generic_db, tmp_path):
+        url = '/api/test/queries/category_items/execute'
+        app_module._query_cache.clear()
+        plain = generic_client.get(url, params={'category_id': 2, 'sort': 'year'}).json()
+        registry = PackageRegistry(pool_max=0)
+        registry.register_db('test', *generic_db)
+        index_advisor.startup(registry, 'sidecar', str(tmp_path))
+        try:
+            app_module._query_cache.clear()
+            routed = generic_client.get(url, params={'category_id': 2, 'sort': 'year'}).json()
+            assert routed == plain
+            assert generic_client.get('/api/index-advisor').json()['test']['hits'] >= 1
+        finally:
+            index_advisor.clear()
+
+    def test_canonical_write_stops_routing(self, generic_client, advised, generic_db):
+        url = '/api/test/queries/items_list/execute'
+        app_module._query_cache.clear()
+        generic_client.get(url)
+        hits = index_advisor.stats()['test']['hits']
+        assert hits >= 1
+        conn = sqlite3.connect(generic_db[0])
+        conn.execute("UPDATE items SET name = 'CHANGED' WHERE id = 1")
+        conn.commit()
+        conn.close()
+        names = {row['name'] for row in generic_client.get(url).json()['rows']}
+        assert 'CHANGED' in names
+        assert index_advisor.stats()['test']['hits'] == hits
+
+        # Restarting builds a sidecar for the new generation
+        registry = PackageRegistry(pool_max=0)
+        registry.register_db('test', *generic_db)
+        index_advisor.startup(registry, 'sidecar', str(advised[1]))
+        assert len(_sidecars(advised[1])) == 1
+        generic_client.get(url, params={'limit': 1000})
+        assert index_advisor.stats()['test']['hits'] == 1     # the new sidecar
+
+    def test_sidecar_reused_per_data_token(self, generic_client, advised, generic_db):
+        _, directory = advised
+        (path,) = _sidecars(directory)
+        mtime = os.stat(path).st_mtime_ns
+        registry = PackageRegistry(pool_max=0)
+        registry.register_db('test', *generic_db)
+        index_advisor.startup(registry, 'sidecar', str(directory))
+        assert _sidecars(directory) == [path]
+        assert os.stat(path).st_mtime_ns == mtime
+
+    def test_report_mode_builds_nothing(self, generic_db, tmp_path):
+        registry = PackageRegistry(pool_max=0)
+        registry.register_db('test', *generic_db)
+        reports = index_advisor.startup(registry, 'report', str(tmp_path))
+        assert reports['test'].flagged
+        assert _sidecars(tmp_path) == [] and index_advisor.stats() == {}
+
+
+class TestCli:
+
+    def test_json_report_and_sidecar(self, generic_db, tmp_path, capsys):
+        sidecar = tmp_path / 'side.db'
+        assert index_advisor.main([generic_db[0], '--json', '--sidecar', str(sidecar)]) == 0
+        out = capsys.readouterr().out
+        report = json.loads(out[:out.rindex('}') + 1])
+        assert 'items_list' in report['flagged']
+        indexes = {r[0] for r in sqlite3.connect(sidecar).execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {p['sql'].split('"')[1] for p in report['proposals']} <= indexes
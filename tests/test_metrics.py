@@ -0,0 +1,144 @@
+"""
+Tests for the Prometheus metrics subsystem (scoda_engine.metrics).
+"""
+
+import json
+import os
+import stat
+from unittest import mock
+
+import pytest
+
+from scoda_engine import app as app_module
+from scoda_engine import metrics, serve_web
+from scoda_engine_core import ScodaPackage, instrument
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.delenv('SCODA_METRICS_DIR', raising=False)
+    metrics.reset()
+    app_module._query_cache.clear()
+    app_module._query_cache.hits = app_module._query_cache.misses = 0
+    yield
+    metrics.reset()
+
+
+def _lines(text):
+    return {line.rsplit(' ', 1)[0]: line.rsplit(' ', 1)[1]
+            for line in text.splitlines() if not line.startswith('#')}
+
+
+class TestEndpoint:
+
+    def test_request_and_query_metrics(self, generic_client):
+        assert generic_client.get('/api/test/queries/items_list/execute').status_code == 200
+        assert generic_client.get('/api/test/queries/items_list/execute').status_code == 200
+        response = generic_client.get('/metrics')
+        assert response.headers['content-type'] == metrics.CONTENT_TYPE
+        lines = _lines(response.text)
+
+        route = 'route="/api/{package}/queries/{name}/execute"'
+        assert lines[f'scoda_http_request_duration_seconds_count{{method="GET",{route},'
+                     f'status="200"}}'] == '2'
+        # The second request is a result cache hit
+        assert lines['scoda_query_duration_seconds_count{package="test",query="items_list"}'] == '1'
+        assert lines['scoda_query_rows_bucket{package="test",query="items_list",le="+Inf"}'] == '1'
+        assert int(lines['scoda_connection_setup_seconds_count{package="test"}']) >= 2
+        assert lines['scoda_cache_hits_total{cache="query_result"}'] == '1'
+        assert lines['scoda_cache_hit_ratio{cache="query_result"}'] == '0.5'
+        assert 'scoda_query_interrupted_total{reason="timeout"}' in lines
+
+    def test_unmatched_and_parallel_labels(self, generic_client):
+        generic_client.get('/no/such/path')
+        generic_client.post('/api/test/batch', json={'queries': [
+            {'query': 'category_items', 'params': {'category_id': str(i)}} for i in range(1, 4)]})
+        lines = _lines(metrics.render())
+        assert any('route="<unmatched>"' in key for key in lines)
+        # Batch items on worker threads keep the request's package label
+        assert lines['scoda_query_duration_seconds_count{package="test",'
+                     'query="category_items"}'] == '3'
+
+    def test_disabled(self, generic_client, monkeypatch):
+        monkeypatch.setattr(metrics, '_enabled', False)
+        assert generic_client.get('/metrics').status_code == 404
+
+
+class TestFormat:
+
+    def test_histogram_and_escaping(self):
+        histogram = metrics.Histogram('test_seconds', 'Help', ('name',), buckets=(0.1, 1))
+        counter = metrics.Counter('test_total', 'Counted')
+        try:
+            histogram.observe(0.05, name='a"b')
+            histogram.observe(5, name='a"b')
+            counter.inc(3)
+            text = metrics.render()
+        finally:
+            del metrics._metrics['test_seconds'], metrics._metrics['test_total']
+        assert '# TYPE test_seconds histogram' in text
+        lines = _lines(text)
+        assert lines['test_seconds_bucket{name="a\\"b",le="0.1"}'] == '1'
+        assert lines['test_seconds_bucket{name="a\\"b",le="1.0"}'] == '1'
+        assert lines['test_seconds_bucket{name="a\\"b",le="+Inf"}'] == '2'
+        assert lines['test_seconds_sum{name="a\\"b"}'] == '5.05'
+        assert lines['test_total'] == '3'
+
+
+class TestMultiprocess:
+
+    def test_snapshots_are_summed(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('SCODA_METRICS_DIR', str(tmp_path))
+        metrics.QUERY_SECONDS.observe(0.002, package='p', query='q')
+        other = metrics.snapshot()
+        (tmp_path / 'metrics-999999.json').write_text(json.dumps(other))
+        lines = _lines(metrics.render())
+        assert lines['scoda_query_duration_seconds_count{package="p",query="q"}'] == '2'
+        assert os.path.exists(tmp_path / f'metrics-{os.getpid()}.json')
+
+        metrics.prepare_directory(str(tmp_path))
+        assert not list(tmp_path.glob('metrics-*.json'))
+
+    def test_directory_is_private(self, tmp_path):
+        directory = tmp_path / 'metrics'
+        metrics.prepare_directory(str(directory))
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+        os.chmod(directory, 0o1777)
+        metrics.prepare_directory(str(directory))
+        assert stat.S_IMODE(os.stat(directory).st_mode) == 0o700
+
+        link = tmp_path / 'link'
+        link.symlink_to(directory)
+        with pytest.raises(RuntimeError, match='not a directory'):
+            metrics.prepare_directory(str(link))
+
+
+class TestTimings:
+
+    def test_package_load_and_extract(self, generic_db, tmp_path):
+        path = str(tmp_path / 'timed.scoda')
+        ScodaPackage.create(generic_db[0], path)
+        with ScodaPackage(path) as pkg:
+            name = pkg.name
+        lines = _lines(metrics.render())
+        assert lines[f'scoda_package_load_seconds_count{{package="{name}"}}'] == '1'
+        assert lines[f'scoda_package_extract_seconds_count{{package="{name}",'
+                     f'source="zip"}}'] == '1'
+
+    def test_observer_errors_are_contained(self):
+        def broken(event, seconds, labels):
+            raise RuntimeError('boom')
+        instrument.add_observer(broken)
+        try:
+            instrument.observe('connection_setup', 0.1, package='x')
+        finally:
+            instrument.remove_observer(broken)
+        assert 'scoda_connection_setup_seconds_count{package="x"}' in _lines(metrics.render())
+
+    def test_hub_sync_duration(self, tmp_path):
+        from scoda_engine_core.hub_client import HubError
+        with mock.patch('scoda_engine_core.hub_client.fetch_hub_index',
+                        side_effect=HubError('offline')):
+            assert serve_web._sync_hub_packages(str(tmp_path)) == 0
+        lines = _lines(metrics.render())
+        assert lines['scoda_hub_sync_duration_seconds_count{outcome="unreachable"}'] == '1'
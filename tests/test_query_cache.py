@@ -0,0 +1,201 @@
+"""
+Tests for the named-query result cache (scoda_engine.query_cache).
+"""
+
+import json
+import sqlite3
+from unittest import mock
+
+import pytest
+
+from scoda_engine import app as app_module
+from scoda_engine import query_cache
+from scoda_engine.query_cache import GenerationCache, QueryCache, normalize_params
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = QueryCache(max_bytes=1024 * 1024)
+    monkeypatch.setattr(app_module, '_query_cache', cache)
+    return cache
+
+
+def _add_query(db_path, name, sql, params_json=None):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO ui_queries (name, description, sql, params_json, created_at) "
+        "VALUES (?, '', ?, ?, '2026-01-01')", (name, sql, params_json))
+    conn.commit()
+    conn.close()
+
+
+class TestQueryCacheEndpoints:
+
+    def test_execute_hits_on_repeat(self, generic_client, cache):
+        first = generic_client.get('/api/test/queries/items_list/execute').json()
+        second = generic_client.get('/api/test/queries/items_list/execute').json()
+        assert first == second
+        stats = generic_client.get('/api/query-cache').json()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['entries'] == 1
+
+    def test_generation_token_computed_once(self, generic_client, cache, monkeypatch):
+        calls = []
+        db_token = query_cache.db_token
+        monkeypatch.setattr(query_cache, 'db_token', lambda conn, include_overlay: (
+            calls.append(include_overlay) or db_token(conn, include_overlay)))
+        # Miss: result cache, query limits and index advisor share one token
+        generic_client.get('/api/test/queries/items_list/execute')
+        assert calls == [False]
+
+    def test_params_are_part_of_key(self, generic_client, cache):
+        url = '/api/test/queries/category_children/execute'
+        a = generic_client.get(url, params={'category_id': 1}).json()
+        b = generic_client.get(url, params={'category_id': 2}).json()
+        assert a != b
+        assert cache.stats()['hits'] == 0
+        # Parameters the SQL does not bind do not fragment the cache
+        generic_client.get(url, params={'category_id': 1, '_': '123'})
+        assert cache.stats()['hits'] == 1
+
+    def test_detail_composite_and_entity_detail_cached(self, generic_client, cache):
+        for _ in range(2):
+            assert generic_client.get('/api/test/detail/item_detail',
+                                      params={'item_id': 1}).status_code == 200
+            assert generic_client.get('/api/test/composite/item_detail',
+                                      params={'id': 1}).status_code == 200
+            generic_client.get('/api/test/item/1')
+        stats = cache.stats()
+        assert stats['hits'] >= stats['misses'] > 0
+
+    def test_overlay_write_invalidates(self, generic_db, generic_client, cache):
+        canonical_db, _ = generic_db
+        _add_query(canonical_db, 'note_count',
+                   "SELECT COUNT(*) AS n FROM overlay.user_annotations")
+        url = '/api/test/queries/note_count/execute'
+        assert generic_client.get(url).json()['rows'][0]['n'] == 0
+        assert generic_client.get(url).json()['rows'][0]['n'] == 0
+        assert cache.stats()['hits'] == 1
+
+        generic_client.post('/api/test/annotations', json={
+            'entity_type': 'item', 'entity_id': 1,
+            'annotation_type': 'note', 'content': 'x'})
+        assert generic_client.get(url).json()['rows'][0]['n'] == 1
+        # Canonical-only queries survive overlay writes
+        generic_client.get('/api/test/queries/items_list/execute')
+        generic_client.get('/api/test/queries/items_list/execute')
+        generic_client.post('/api/test/annotations', json={
+            'entity_type': 'item', 'entity_id': 2,
+            'annotation_type': 'note', 'content': 'y'})
+        hits = cache.stats()['hits']
+        generic_client.get('/api/test/queries/items_list/execute')
+        assert cache.stats()['hits'] == hits + 1
+
+    def test_manifest_opt_out(self, generic_db, generic_client, cache):
+        canonical_db, _ = generic_db
+        conn = sqlite3.connect(canonical_db)
+        manifest = json.loads(conn.execute(
+            "SELECT manifest_json FROM ui_manifest WHERE name = 'default'").fetchone()[0])
+        manifest['query_cache'] = {'exclude': ['items_list']}
+        conn.execute("UPDATE ui_manifest SET manifest_json = ? WHERE name = 'default'",
+                     (json.dumps(manifest),))
+        conn.commit()
+        conn.close()
+
+        for _ in range(2):
+            generic_client.get('/api/test/queries/items_list/execute')
+            generic_client.get('/api/test/queries/category_tree/execute')
+        stats = cache.stats()
+        assert stats['hits'] == 1
+        assert stats['entries'] == 1
+
+    def test_errors_not_cached(self, generic_db, generic_client, cache):
+        canonical_db, _ = generic_db
+        _add_query(canonical_db, 'broken', "SELECT * FROM no_such_table")
+        for _ in range(2):
+            assert generic_client.get('/api/test/queries/broken/execute').status_code == 400
+        assert cache.stats()['entries'] == 0
+
+
+class TestManifestCache:
+
+    def test_manifest_parsed_once_per_generation(self, generic_db, generic_client):
+        canonical_db, _ = generic_db
+        with mock.patch.object(app_module, '_load_manifest',
+                               wraps=app_module._load_manifest) as load:
+            first = generic_client.get('/api/test/manifest').json()
+            generic_client.get('/api/test/manifest')
+            generic_client.get('/api/test/composite/item_detail', params={'id': 1})
+            assert load.call_count == 1
+
+            manifest = dict(first['manifest'], default_view='changed')
+            conn = sqlite3.connect(canonical_db)
+            conn.execute("UPDATE ui_manifest SET manifest_json = ? WHERE name = 'default'",
+                         (json.dumps(manifest),))
+            conn.commit()
+            conn.close()
+            second = generic_client.get('/api/test/manifest').json()
+            assert load.call_count == 2
+        assert second['manifest']['default_view'] == 'changed'
+
+    def test_entity_schemas_cached(self, crud_client):
+        with mock.patch.object(app_module, 'parse_editable_entities',
+                               wraps=app_module.parse_editable_entities) as parse:
+            crud_client.get('/api/test/entities')
+            crud_client.get('/api/test/entities')
+            assert parse.call_count == 1
+
+
+class TestQueryCache:
+
+    def test_lru_respects_byte_budget(self):
+        cache = QueryCache(max_bytes=300)
+        payload = {'rows': ['x' * 100]}
+        for key in ('a', 'b', 'c'):
+            cache.put(key, payload)
+        assert cache.get('a') is None
+        assert cache.get('c') == payload
+        cache.put('d', payload)
+        assert cache.get('b') is None      # least recently used
+        assert cache.get('c') == payload
+        assert cache.stats()['evictions'] == 2
+        assert cache.stats()['bytes'] <= 300
+
+    def test_generation_cache(self):
+        generations = GenerationCache(max_entries=2)
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return len(loads)
+        assert generations.get('t1', 'kind', loader) == 1
+        assert generations.get('t1', 'kind', loader) == 1
+        assert generations.get('t1', 'other', loader) == 2
+        assert generations.get(None, 'kind', loader) == 3    # not cacheable
+        assert generations.get(None, 'kind', loader) == 4
+        generations.get('t2', 'kind', loader)                # full: starts over
+        assert generations.get('t1', 'kind', loader) == 6
+
+    def test_oversized_result_skipped(self):
+        cache = QueryCache(max_bytes=10)
+        cache.put('a', {'rows': ['x' * 100]})
+        assert cache.stats()['entries'] == 0
+
+    def test_disabled(self, generic_client, monkeypatch):
+        cache = QueryCache(max_bytes=0)
+        monkeypatch.setattr(app_module, '_query_cache', cache)
+        generic_client.get('/api/test/queries/items_list/execute')
+        generic_client.get('/api/test/queries/items_list/execute')
+        assert cache.stats()['hits'] == cache.stats()['misses'] == 0
+
+    def test_normalize_params(self):
+        sql = "SELECT * FROM t WHERE a = :a AND b = :b"
+        assert normalize_params(sql, {'b': 2, 'a': '1', 'junk': 'x'}) == \
+            (('a', '1'), ('b', 2))
+
+    def test_from_env(self, monkeypatch):
+        monkeypatch.setenv('SCODA_QUERY_CACHE_BYTES', '2M')
+        assert QueryCache.from_env().max_bytes == 2 * 1024 ** 2
+        monkeypatch.setenv('SCODA_QUERY_CACHE_BYTES', '0')
+        assert not QueryCache.from_env().enabled
@@ -0,0 +1,175 @@
+"""
+Tests for query time/step budgets (scoda_engine.query_limits).
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+import scoda_engine_core as scoda_package
+from scoda_engine import app as app_module
+from scoda_engine import query_cache
+from scoda_engine import query_limits
+from scoda_engine.query_limits import Budget, Limiter, QueryInterrupted
+
+HEAVY_SQL = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 50000000) "
+             "SELECT count(*) AS n FROM c")
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.delenv('SCODA_QUERY_TIMEOUT_MS', raising=False)
+    monkeypatch.delenv('SCODA_QUERY_MAX_STEPS', raising=False)
+    query_limits.reset_stats()
+    app_module._query_cache.clear()
+    yield
+    query_limits.reset_stats()
+
+
+@pytest.fixture
+def heavy_db(generic_db):
+    conn = sqlite3.connect(generic_db[0])
+    conn.execute("INSERT INTO ui_queries (name, description, sql, params_json, created_at) "
+                 "VALUES ('heavy', 'Runaway CTE', ?, NULL, '2026-01-01')", (HEAVY_SQL,))
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _execute(client, name, **params):
+    return client.get(f'/api/test/queries/{name}/execute', params=params)
+
+
+class TestEndpoints:
+
+    def test_step_budget_returns_503(self, generic_client, heavy_db, monkeypatch):
+        monkeypatch.setenv('SCODA_QUERY_MAX_STEPS', '200000')
+        response = _execute(generic_client, 'heavy')
+        assert response.status_code == 503
+        body = response.json()
+        assert body['code'] == 'query_step_limit' and body['query'] == 'heavy'
+        assert body['steps'] > 200000
+        assert _execute(generic_client, 'items_list').status_code == 200
+        assert _execute(generic_client, 'heavy', stream='ndjson').status_code == 503
+
+        stats = generic_client.get('/api/query-limits').json()
+        assert stats['interrupted'] == {'timeout': 0, 'steps': 2}
+        assert stats['queries'] == [{'query': 'heavy', 'reason': 'steps', 'count': 2}]
+        assert stats['defaults']['max_steps'] == 200000
+
+    def test_timeout_returns_503(self, generic_client, heavy_db, monkeypatch):
+        monkeypatch.setenv('SCODA_QUERY_TIMEOUT_MS', '50')
+        response = _execute(generic_client, 'heavy')
+        assert response.status_code == 503
+        assert response.json()['code'] == 'query_timeout'
+        assert response.json()['elapsed_ms'] >= 50
+
+    def test_manifest_and_column_overrides(self, generic_client, heavy_db):
+        (manifest,) = heavy_db.execute(
+            "SELECT manifest_json FROM ui_manifest WHERE name = 'default'").fetchone()
+        manifest = json.loads(manifest)
+        manifest['query_limits'] = {'max_steps': 0,
+                                    'queries': {'heavy': {'max_steps': 100000}}}
+        heavy_db.execute("UPDATE ui_manifest SET manifest_json = ? WHERE name = 'default'",
+                         (json.dumps(manifest),))
+        heavy_db.commit()
+        assert _execute(generic_client, 'heavy').json()['max_steps'] == 100000
+
+        heavy_db.execute("ALTER TABLE ui_queries ADD COLUMN max_steps INTEGER")
+        heavy_db.execute("UPDATE ui_queries SET max_steps = 300000 WHERE name = 'heavy'")
+        heavy_db.commit()
+        assert _execute(generic_client, 'heavy').json()['max_steps'] == 300000
+
+    def test_batch_item_status(self, generic_client, heavy_db, monkeypatch):
+        monkeypatch.setenv('SCODA_QUERY_MAX_STEPS', '200000')
+        results = generic_client.post('/api/test/batch', json={'queries': [
+            {'id': 'a', 'query': 'heavy'}, {'id': 'b', 'query': 'items_list'}]}).json()['results']
+        assert results['a']['status'] == 503
+        assert results['b']['row_count'] > 0
+
+
+class TestLimiter:
+
+    def test_budget_accumulates_across_blocks(self):
+        conn = sqlite3.connect(':memory:')
+        limiter = Limiter(conn, Budget(max_steps=50000), 'q')
+        with limiter:
+            conn.execute('WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c '
+                         'WHERE x < 2000) SELECT count(*) FROM c').fetchone()
+        used = limiter.steps
+        assert 0 < used < 50000
+        with pytest.raises(QueryInterrupted) as info:
+            with limiter:
+                conn.execute(HEAVY_SQL).fetchone()
+        assert info.value.reason == 'steps' and limiter.steps > used
+        # The handler is removed afterwards
+        assert conn.execute('SELECT 1').fetchone() == (1,)
+
+    def test_unlimited_budget_is_a_no_op(self):
+        conn = sqlite3.connect(':memory:')
+        with Limiter(conn, Budget(), 'q') as limiter:
+            conn.execute('SELECT 1').fetchone()
+        assert limiter.steps == 0
+
+    def test_override_precedence(self, monkeypatch):
+        monkeypatch.setenv('SCODA_QUERY_TIMEOUT_MS', '1000')
+        overrides = ({'max_steps': 10}, {'q': {'timeout_ms': 20}})
+        assert query_limits.budget_for('q', overrides) == Budget(20, 10)
+        assert query_limits.budget_for('other', overrides, {'max_steps': 5}) == Budget(1000, 5)
+
+
+class TestMcp:
+
+    def test_dynamic_tool_limited(self, generic_db):
+        from scoda_engine.mcp_server import _execute_dynamic_tool
+        scoda_package._set_paths_for_testing(*generic_db)
+        try:
+            result = _execute_dynamic_tool(
+                {'name': 'count_all', 'query_type': 'single', 'sql': HEAVY_SQL,
+                 'max_steps': 100000}, {})
+        finally:
+            scoda_package._reset_paths()
+        assert result['code'] == 'query_step_limit' and result['query'] == 'count_all'
+        assert query_limits.stats()['interrupted']['steps'] == 1
+
+    def test_composite_sub_query_limited(self, generic_db, heavy_db):
+        from scoda_engine.mcp_server import _execute_composite_for_mcp
+        heavy_db.execute("UPDATE ui_queries SET sql = ? WHERE name = 'item_hierarchy'",
+                         (HEAVY_SQL.replace('count(*) AS n', 'count(*) AS n, :item_id AS id'),))
+        heavy_db.execute("ALTER TABLE ui_queries ADD COLUMN max_steps INTEGER")
+        heavy_db.execute("UPDATE ui_queries SET max_steps = 10000 WHERE name = 'item_hierarchy'")
+        heavy_db.commit()
+        scoda_package._set_paths_for_testing(*generic_db)
+        try:
+            conn = scoda_package.get_db()
+            result = _execute_composite_for_mcp(conn, 'item_detail', 1)
+            conn.close()
+        finally:
+            scoda_package._reset_paths()
+        # Not the detail with an empty hierarchy
+        assert result['code'] == 'query_step_limit' and result['query'] == 'item_hierarchy'
+        assert result['status'] == 503 and 'tags' not in result
+
+    def test_overrides_cached_per_generation(self, generic_db, heavy_db, monkeypatch):
+        from scoda_engine.mcp_server import _execute_named_query_internal
+        calls = []
+        load = query_limits.load_overrides
+        monkeypatch.setattr(query_limits, 'load_overrides',
+                            lambda conn: calls.append(1) or load(conn))
+        query_cache.generations.clear()
+        scoda_package._set_paths_for_testing(*generic_db)
+        try:
+            conn = scoda_package.get_db()
+            for _ in range(3):
+                assert _execute_named_query_internal(conn, 'items_list')['row_count'] > 0
+            assert len(calls) == 1
+
+            heavy_db.execute("ALTER TABLE ui_queries ADD COLUMN max_steps INTEGER")
+            heavy_db.execute("UPDATE ui_queries SET max_steps = 100000 WHERE name = 'heavy'")
+            heavy_db.commit()
+            assert _execute_named_query_internal(conn, 'heavy')['max_steps'] == 100000
+            assert len(calls) == 2
+            conn.close()
+        finally:
+            scoda_package._reset_paths()
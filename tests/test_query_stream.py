@@ -0,0 +1,118 @@
+"""
+Tests for streaming named-query responses (scoda_engine.query_stream).
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from scoda_engine import query_stream
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestQueryStreamEndpoints:
+
+    def test_ndjson_via_accept_header(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        response = generic_client.get(url, headers={'Accept': 'application/x-ndjson'})
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('application/x-ndjson')
+        assert _ndjson(response) == regular['rows']
+        assert json.loads(response.headers['x-query-columns']) == regular['columns']
+
+    def test_ndjson_via_stream_param(self, generic_client):
+        url = '/api/test/queries/category_children/execute'
+        regular = generic_client.get(url, params={'category_id': 1}).json()
+        response = generic_client.get(url, params={'category_id': 1, 'stream': 1})
+        assert _ndjson(response) == regular['rows']
+
+    def test_json_variant_matches_regular_response(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        streamed = generic_client.get(url, params={'stream': 'json'}).json()
+        assert streamed == regular
+
+    def test_json_variant_with_paging(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        params = {'limit': 2, 'sort': 'id', 'dir': 'desc'}
+        regular = generic_client.get(url, params=params).json()
+        streamed = generic_client.get(url, params=dict(params, stream='json')).json()
+        assert streamed == regular
+        assert streamed['row_count'] == 2
+        assert streamed['next_cursor']
+
+    def test_legacy_route_streams(self, no_manifest_client):
+        response = no_manifest_client.get('/api/queries/auto__species_list/execute',
+                                          params={'stream': 'ndjson'})
+        assert response.status_code == 200
+        assert len(_ndjson(response)) > 0
+
+    def test_errors_before_streaming(self, generic_client):
+        base = '/api/test/queries'
+        assert generic_client.get(f'{base}/no_such/execute',
+                                  params={'stream': 1}).status_code == 404
+        assert generic_client.get(f'{base}/items_list/execute',
+                                  params={'stream': 1, 'sort': 'nope'}).status_code == 400
+        assert generic_client.get(f'{base}/items_list/execute',
+                                  params={'stream': 'xml'}).status_code == 400
+
+    def test_stream_param_off(self, generic_client):
+        response = generic_client.get('/api/test/queries/items_list/execute',
+                                      params={'stream': 0})
+        assert response.headers['content-type'] == 'application/json'
+        assert 'rows' in response.json()
+
+
+class TestQueryStream:
+
+    @pytest.fixture
+    def cursor(self):
+        conn = sqlite3.connect(':memory:')
+        conn.execute("CREATE TABLE t (id INTEGER, name TEXT, data BLOB)")
+        conn.executemany("INSERT INTO t VALUES (?, ?, ?)",
+                         [(i, f'n{i}', b'x') for i in range(5)])
+        yield conn.execute("SELECT * FROM t ORDER BY id")
+        conn.close()
+
+    def test_ndjson_chunks_per_batch(self, cursor):
+        chunks = list(query_stream.encode_ndjson(cursor, batch_size=2))
+        assert len(chunks) == 3
+        rows = [json.loads(line) for line in b''.join(chunks).decode().splitlines()]
+        assert rows[0] == {'id': 0, 'name': 'n0', 'data': 'x'}
+        assert len(rows) == 5
+
+    def test_json_document(self, cursor):
+        chunks = query_stream.encode_json(
+            cursor, {'query': 't'}, lambda n: {'row_count': n}, batch_size=2)
+        doc = json.loads(b''.join(chunks))
+        assert doc['query'] == 't'
+        assert doc['row_count'] == 5
+        assert [r['id'] for r in doc['rows']] == list(range(5))
+
+    def test_json_document_empty(self):
+        conn = sqlite3.connect(':memory:')
+        cursor = conn.execute("SELECT 1 AS x WHERE 0")
+        doc = json.loads(b''.join(query_stream.encode_json(
+            cursor, {}, lambda n: {'row_count': n}, batch_size=10)))
+        assert doc == {'rows': [], 'row_count': 0}
+        conn.close()
+
+    def test_stream_format(self):
+        assert query_stream.stream_format(None, None) is None
+        assert query_stream.stream_format('application/json', None) is None
+        assert query_stream.stream_format('application/x-ndjson', None) == 'ndjson'
+        assert query_stream.stream_format(None, '1') == 'ndjson'
+        assert query_stream.stream_format('application/x-ndjson', '0') is None
+        assert query_stream.stream_format(None, 'json') == 'json'
+        with pytest.raises(ValueError):
+            query_stream.stream_format(None, 'csv')
+
+    def test_batch_rows_from_env(self, monkeypatch):
+        assert query_stream.batch_rows() == query_stream.DEFAULT_BATCH_ROWS
+        monkeypatch.setenv('SCODA_STREAM_BATCH_ROWS', '50')
+        assert query_stream.batch_rows() == 50
@@ -0,0 +1,88 @@
+"""
+Tests for compact query result formats (scoda_engine.result_format).
+"""
+
+import pytest
+
+from scoda_engine.result_format import parse_format, shape
+
+
+def _rows_from_columnar(result):
+    return [dict(zip(result['columns'], values)) for values in zip(*result['data'])]
+
+
+class TestResultFormatEndpoints:
+
+    def test_columnar_query(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        columnar = generic_client.get(url, params={'format': 'columnar'}).json()
+        assert columnar['format'] == 'columnar'
+        assert 'rows' not in columnar
+        assert columnar['columns'] == regular['columns']
+        assert len(columnar['data']) == len(columnar['columns'])
+        assert columnar['row_count'] == regular['row_count']
+        assert _rows_from_columnar(columnar) == regular['rows']
+
+    def test_compact_query(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        regular = generic_client.get(url).json()
+        compact = generic_client.get(url, params={'format': 'compact'}).json()
+        assert compact['rows'] == [[row[c] for c in regular['columns']]
+                                   for row in regular['rows']]
+
+    def test_columnar_with_paging(self, generic_client):
+        url = '/api/test/queries/items_list/execute'
+        params = {'limit': 2, 'sort': 'id', 'dir': 'desc'}
+        regular = generic_client.get(url, params=params).json()
+        columnar = generic_client.get(url, params=dict(params, format='columnar')).json()
+        assert _rows_from_columnar(columnar) == regular['rows']
+        assert columnar['total_count'] == regular['total_count']
+        assert columnar['next_cursor'] == regular['next_cursor']
+
+    def test_legacy_route(self, no_manifest_client):
+        url = '/api/queries/auto__species_list/execute'
+        regular = no_manifest_client.get(url).json()
+        columnar = no_manifest_client.get(url, params={'format': 'columnar'}).json()
+        assert _rows_from_columnar(columnar) == regular['rows']
+
+    def test_composite_sub_queries(self, generic_client):
+        url = '/api/test/composite/item_detail'
+        regular = generic_client.get(url, params={'id': 1}).json()
+        columnar = generic_client.get(url, params={'id': 1, 'format': 'columnar'}).json()
+        assert columnar['name'] == regular['name']
+        tags = columnar['tags']
+        assert set(tags) == {'columns', 'data'}
+        assert _rows_from_columnar(tags) == regular['tags']
+
+    def test_entity_detail_sub_queries(self, generic_client):
+        regular = generic_client.get('/api/test/item/1').json()
+        compact = generic_client.get('/api/test/item/1', params={'format': 'compact'}).json()
+        assert compact['name'] == regular['name']
+        relations = compact['relations']
+        assert [dict(zip(relations['columns'], r)) for r in relations['rows']] == \
+            regular['relations']
+
+    def test_invalid_format(self, generic_client):
+        for url, params in (('/api/test/queries/items_list/execute', {}),
+                            ('/api/test/composite/item_detail', {'id': 1})):
+            response = generic_client.get(url, params=dict(params, format='xml'))
+            assert response.status_code == 400
+
+
+class TestResultFormat:
+
+    def test_shape(self):
+        columns = ['a', 'b']
+        rows = [(1, 'x'), (2, 'y')]
+        assert shape(columns, rows, 'columnar') == {'data': [[1, 2], ['x', 'y']]}
+        assert shape(columns, rows, 'compact') == {'rows': [[1, 'x'], [2, 'y']]}
+        assert shape(columns, rows, 'rows') == {'rows': [{'a': 1, 'b': 'x'},
+                                                         {'a': 2, 'b': 'y'}]}
+        assert shape(columns, [], 'columnar') == {'data': [[], []]}
+
+    def test_parse_format(self):
+        assert parse_format(None) == 'rows'
+        assert parse_format('Columnar') == 'columnar'
+        with pytest.raises(ValueError):
+            parse_format('csv')
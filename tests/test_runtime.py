@@ -269,6 +269,74 @@ class TestApiQueryExecute:
         assert 'name' in row
 
 
+class TestApiQueryPaging:
+    """Server-side limit/offset/cursor, sort and filters on /queries/{name}/execute."""
+
+    URL = '/api/test/queries/items_list/execute'
+
+    def test_unpaged_has_total_count(self, generic_client):
+        data = generic_client.get(self.URL).json()
+        assert data['total_count'] == data['row_count'] == 5
+
+    def test_limit_offset(self, generic_client):
+        data = generic_client.get(self.URL, params={'limit': 2, 'offset': 1}).json()
+        assert data['row_count'] == 2
+        assert data['total_count'] == 5
+        assert [r['name'] for r in data['rows']] == ['Evolution', 'Gravity']
+        assert data['next_cursor']
+
+    def test_cursor_walks_all_pages(self, generic_client):
+        names, params = [], {'limit': 2}
+        while True:
+            data = generic_client.get(self.URL, params=params).json()
+            names += [r['name'] for r in data['rows']]
+            if not data['next_cursor']:
+                break
+            params = {'limit': 2, 'cursor': data['next_cursor']}
+        assert names == sorted(names)
+        assert len(names) == 5
+
+    def test_sort_desc(self, generic_client):
+        data = generic_client.get(self.URL, params={'sort': 'id', 'dir': 'desc',
+                                                    'limit': 1}).json()
+        assert data['rows'][0]['name'] == 'Alchemy'
+
+    def test_filters_and_search(self, generic_client):
+        data = generic_client.get(self.URL, params={'filter[status]': 'active'}).json()
+        assert data['total_count'] == 4
+        data = generic_client.get(self.URL, params={'q': 'ein', 'q_cols': 'author'}).json()
+        assert [r['name'] for r in data['rows']] == ['Relativity']
+        # LIKE wildcards in the search term are literal
+        data = generic_client.get(self.URL, params={'q': '%'}).json()
+        assert data['total_count'] == 0
+
+    def test_auto_list_paged(self, no_manifest_client):
+        url = '/api/test/queries/auto__species_list/execute'
+        full = no_manifest_client.get(url).json()
+        data = no_manifest_client.get(url, params={'limit': 1}).json()
+        assert data['row_count'] == 1
+        assert data['total_count'] == full['row_count']
+
+    def test_invalid_controls(self, generic_client):
+        for params in ({'sort': 'nope'}, {'filter[nope]': 'x'}, {'limit': '-1'},
+                       {'sort': 'name', 'dir': 'sideways'}, {'cursor': '!!'}):
+            assert generic_client.get(self.URL, params=params).status_code == 400
+
+    def test_bound_param_named_limit_not_treated_as_paging(self, generic_db, generic_client):
+        canonical_db, _ = generic_db
+        conn = sqlite3.connect(canonical_db)
+        conn.execute(
+            "INSERT INTO ui_queries (name, description, sql, params_json, created_at) "
+            "VALUES ('top_items', '', 'SELECT name FROM items ORDER BY id LIMIT :limit', "
+            "'{\"limit\": \"integer\"}', '2026-01-01')")
+        conn.commit()
+        conn.close()
+        data = generic_client.get('/api/test/queries/top_items/execute',
+                                  params={'limit': 2}).json()
+        assert data['row_count'] == 2
+        assert data['total_count'] == 2
+
+
 # --- /api/test/manifest ---
 
 
@@ -2900,3 +2968,261 @@ class TestChangelog:
 
         with zipfile.ZipFile(scoda_path, 'r') as zf:
             assert 'CHANGELOG.md' not in zf.namelist()
+
+
+# ---------------------------------------------------------------------------
+# STORED data.db (no decompression on open)
+# ---------------------------------------------------------------------------
+
+class TestStoredPackage:
+    """Tests for compression='stored' packages and the byte-range open path."""
+
+    def test_create_stored_is_page_aligned(self, generic_db, tmp_path):
+        from scoda_engine_core.scoda_package import _stored_data_offset
+        canonical_db, _ = generic_db
+        scoda_path = str(tmp_path / "stored.scoda")
+        ScodaPackage.create(canonical_db, scoda_path, compression='stored')
+
+        with zipfile.ZipFile(scoda_path) as zf:
+            info = zf.getinfo('data.db')
+            assert info.compress_type == zipfile.ZIP_STORED
+            offset = _stored_data_offset(zf, info)
+            assert offset % 4096 == 0
+            with open(scoda_path, 'rb') as f:
+                f.seek(offset)
+                assert f.read(16) == b'SQLite format 3\x00'
+            assert zf.testzip() is None
+
+    def test_open_stored_skips_decompression(self, generic_db, tmp_path):
+        from unittest import mock
+        canonical_db, _ = generic_db
+        scoda_path = str(tmp_path / "stored.scoda")
+        ScodaPackage.create(canonical_db, scoda_path, compression='stored')
+
+        with mock.patch('scoda_engine_core.scoda_package._copy_byte_range',
+                        wraps=scoda_package.scoda_package._copy_byte_range) as copy:
+            with ScodaPackage(scoda_path) as pkg:
+                copy.assert_called_once()
+                conn = sqlite3.connect(pkg.db_path)
+                assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+                conn.close()
+
+    def test_deflated_falls_back_to_extract(self, generic_db, tmp_path):
+        from unittest import mock
+        canonical_db, _ = generic_db
+        scoda_path = str(tmp_path / "deflated.scoda")
+        ScodaPackage.create(canonical_db, scoda_path)
+
+        with mock.patch('scoda_engine_core.scoda_package._copy_byte_range') as copy:
+            with ScodaPackage(scoda_path) as pkg:
+                assert pkg.verify_checksum()
+            copy.assert_not_called()
+
+    def test_stored_checksum_mismatch(self, generic_db, tmp_path):
+        canonical_db, _ = generic_db
+        scoda_path = str(tmp_path / "stored_bad.scoda")
+        ScodaPackage.create(canonical_db, scoda_path, compression='stored',
+                            metadata={'data_checksum_sha256': '0' * 64})
+        with pytest.raises(scoda_package.ScodaChecksumError):
+            ScodaPackage(scoda_path)
+
+    def test_stored_with_extraction_cache(self, generic_db, tmp_path):
+        from scoda_engine_core.extract_cache import ExtractionCache
+        canonical_db, _ = generic_db
+        scoda_path = str(tmp_path / "stored.scoda")
+        ScodaPackage.create(canonical_db, scoda_path, compression='stored')
+        cache = ExtractionCache(str(tmp_path / "cache"), max_bytes=0)
+
+        with ScodaPackage(scoda_path, extraction_cache=cache) as pkg:
+            with open(pkg.db_path, 'rb') as f, open(canonical_db, 'rb') as orig:
+                assert f.read() == orig.read()
+
+    def test_invalid_compression_rejected(self, generic_db, tmp_path):
+        canonical_db, _ = generic_db
+        with pytest.raises(ValueError):
+            ScodaPackage.create(canonical_db, str(tmp_path / "x.scoda"),
+                                compression='lzma')
+
+
+# ---------------------------------------------------------------------------
+# Lazy PackageRegistry (manifest-only scan)
+# ---------------------------------------------------------------------------
+
+class TestLazyRegistry:
+    """Tests for PackageRegistry(lazy=True)."""
+
+    def _make_dir(self, generic_db, tmp_path, **create_kwargs):
+        canonical_db, _ = generic_db
+        pkg_dir = tmp_path / "lazy_pkgs"
+        pkg_dir.mkdir()
+        ScodaPackage.create(canonical_db, str(pkg_dir / "sample.scoda"), **create_kwargs)
+        return str(pkg_dir)
+
+    def test_scan_reads_manifest_only(self, generic_db, tmp_path):
+        from unittest import mock
+        pkg_dir = self._make_dir(generic_db, tmp_path)
+        reg = PackageRegistry(lazy=True)
+        with mock.patch('scoda_engine_core.scoda_package._extract_member') as extract:
+            reg.scan(pkg_dir)
+            pkgs = reg.list_packages()
+            info = reg.get_package('sample-data')
+        extract.assert_not_called()
+        assert [p['name'] for p in pkgs] == ['sample-data']
+        assert pkgs[0]['record_count'] > 0
+        assert info['loaded'] is False
+        assert info['db_path'] is None
+        reg.close_all()
+
+    def test_get_db_loads_on_first_use(self, generic_db, tmp_path):
+        pkg_dir = self._make_dir(generic_db, tmp_path)
+        reg = PackageRegistry(lazy=True)
+        reg.scan(pkg_dir)
+        pkg = reg._packages['sample-data']['pkg']
+        assert not pkg.is_loaded
+
+        conn = reg.get_db('sample-data')
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+        conn.close()
+        assert pkg.is_loaded
+        assert reg.get_package('sample-data')['db_path'] == pkg.db_path
+        reg.close_all()
+
+    def test_concurrent_first_use_extracts_once(self, generic_db, tmp_path):
+        import threading
+        from unittest import mock
+        pkg_dir = self._make_dir(generic_db, tmp_path)
+        reg = PackageRegistry(lazy=True)
+        reg.scan(pkg_dir)
+
+        real_extract = scoda_package.scoda_package._extract_member
+        barrier = threading.Barrier(8)
+        errors = []
+
+        def worker():
+            try:
+                barrier.wait()
+                reg.get_db('sample-data').close()
+            except Exception as e:  # pragma: no cover - reported below
+                errors.append(e)
+
+        with mock.patch('scoda_engine_core.scoda_package._extract_member',
+                        wraps=real_extract) as extract:
+            threads = [threading.Thread(target=worker) for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        assert errors == []
+        assert extract.call_count == 1
+        reg.close_all()
+
+    def test_bad_checksum_surfaces_on_get_db(self, generic_db, tmp_path):
+        pkg_dir = self._make_dir(generic_db, tmp_path,
+                                 metadata={'data_checksum_sha256': '0' * 64})
+        reg = PackageRegistry(lazy=True)
+        reg.scan(pkg_dir)
+        assert [p['name'] for p in reg.list_packages()] == ['sample-data']
+        with pytest.raises(scoda_package.ScodaChecksumError):
+            reg.get_db('sample-data')
+        # Failure is sticky: no second extraction attempt
+        with pytest.raises(scoda_package.ScodaChecksumError):
+            reg.get_db('sample-data')
+        reg.close_all()
+
+    def test_default_registry_lazy_from_env(self, monkeypatch):
+        monkeypatch.setenv('SCODA_LAZY_LOAD', '1')
+        assert scoda_package.scoda_package._new_default_registry().lazy is True
+        monkeypatch.setenv('SCODA_LAZY_LOAD', '0')
+        assert scoda_package.scoda_package._new_default_registry().lazy is False
+
+
+class TestParallelRegistryLoading:
+    """Tests for concurrent package loading in PackageRegistry."""
+
+    def _make_dir(self, generic_db, tmp_path, names):
+        canonical_db, _ = generic_db
+        pkg_dir = tmp_path / "parallel_pkgs"
+        pkg_dir.mkdir()
+        for name, deps in names:
+            meta = {'name': name}
+            if deps:
+                meta['dependencies'] = [{'name': d} for d in deps]
+            ScodaPackage.create(canonical_db, str(pkg_dir / f"{name}.scoda"),
+                                metadata=meta)
+        return str(pkg_dir)
+
+    def test_scan_loads_all_on_pool(self, generic_db, tmp_path):
+        import threading
+        from unittest import mock
+        pkg_dir = self._make_dir(generic_db, tmp_path,
+                                 [('alpha', None), ('beta', None), ('gamma', None)])
+        real_extract = scoda_package.scoda_package._extract_member
+        threads = set()
+
+        def extract(*args):
+            threads.add(threading.current_thread().name)
+            return real_extract(*args)
+
+        reg = PackageRegistry(max_workers=3)
+        with mock.patch('scoda_engine_core.scoda_package._extract_member',
+                        side_effect=extract):
+            reg.scan(pkg_dir)
+        assert [p['name'] for p in reg.list_packages()] == ['alpha', 'beta', 'gamma']
+        assert all(name.startswith('scoda-load') for name in threads)
+        for name in ('alpha', 'beta', 'gamma'):
+            assert reg.get_package(name)['loaded'] is True
+        reg.close_all()
+
+    def test_scan_logs_load_timings(self, generic_db, tmp_path, caplog):
+        import logging
+        pkg_dir = self._make_dir(generic_db, tmp_path, [('alpha', None), ('beta', None)])
+        reg = PackageRegistry(max_workers=2)
+        with caplog.at_level(logging.INFO, logger='scoda_engine_core.scoda_package'):
+            reg.scan(pkg_dir)
+        messages = [r.getMessage() for r in caplog.records]
+        assert any(m.startswith("Loaded package 'alpha'") for m in messages)
+        assert any(m.startswith("Loaded package 'beta'") for m in messages)
+        assert any(m.startswith("Scanned 2 package file(s)") for m in messages)
+        reg.close_all()
+
+    def test_scan_skips_invalid_package(self, generic_db, tmp_path):
+        pkg_dir = self._make_dir(generic_db, tmp_path, [('alpha', None)])
+        with open(os.path.join(pkg_dir, 'broken.scoda'), 'wb') as f:
+            f.write(b'not a zip')
+        reg = PackageRegistry(max_workers=2)
+        reg.scan(pkg_dir)
+        assert [p['name'] for p in reg.list_packages()] == ['alpha']
+        reg.close_all()
+
+    def test_register_path_loads_deps_concurrently(self, generic_db, tmp_path):
+        pkg_dir = self._make_dir(generic_db, tmp_path,
+                                 [('base', None), ('child', ['base'])])
+        reg = PackageRegistry(max_workers=2)
+        name = reg.register_path(os.path.join(pkg_dir, 'child.scoda'))
+        assert name == 'child'
+        assert reg.get_package('base')['loaded'] is True
+        conn = reg.get_db('child')
+        assert conn.execute("SELECT COUNT(*) FROM base.items").fetchone()[0] > 0
+        conn.close()
+        reg.close_all()
+
+    def test_register_path_failure_keeps_existing(self, generic_db, tmp_path):
+        canonical_db, _ = generic_db
+        pkg_dir = self._make_dir(generic_db, tmp_path, [('alpha', None)])
+        reg = PackageRegistry(max_workers=2)
+        reg.register_path(os.path.join(pkg_dir, 'alpha.scoda'))
+        bad = os.path.join(pkg_dir, 'alpha-bad.scoda')
+        ScodaPackage.create(canonical_db, bad,
+                            metadata={'name': 'alpha', 'data_checksum_sha256': '0' * 64})
+        with pytest.raises(scoda_package.ScodaChecksumError):
+            reg.register_path(bad)
+        conn = reg.get_db('alpha')
+        assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] > 0
+        conn.close()
+        reg.close_all()
+
+    def test_default_registry_workers_from_env(self, monkeypatch):
+        monkeypatch.setenv('SCODA_LOAD_WORKERS', '6')
+        assert scoda_package.scoda_package._new_default_registry().max_workers == 6
+        monkeypatch.delenv('SCODA_LOAD_WORKERS')
+        assert scoda_package.scoda_package._new_default_registry().max_workers >= 1
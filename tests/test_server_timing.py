@@ -0,0 +1,119 @@
+"""
+Tests for Server-Timing headers (scoda_engine.server_timing).
+"""
+
+import re
+
+import pytest
+
+from scoda_engine import app as app_module
+from scoda_engine import server_timing
+
+TOKEN = 's3cret'
+TIMING = {'X-Scoda-Timing': TOKEN}
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    monkeypatch.delenv('SCODA_SERVER_TIMING', raising=False)
+    monkeypatch.setenv('SCODA_SERVER_TIMING_TOKEN', TOKEN)
+    app_module._query_cache.clear()
+
+
+def _phases(response):
+    """[(name, dur_ms, desc)] parsed from the Server-Timing header."""
+    phases = []
+    for entry in response.headers['server-timing'].split(', '):
+        name, *params = entry.split(';')
+        fields = dict(param.split('=', 1) for param in params)
+        dur = float(fields['dur']) if 'dur' in fields else None
+        phases.append((name, dur, fields.get('desc', '').strip('"') or None))
+    return phases
+
+
+class TestSampling:
+
+    def test_off_without_request_header(self, generic_client):
+        response = generic_client.get('/api/test/queries/items_list/execute')
+        assert response.status_code == 200
+        assert 'server-timing' not in response.headers
+
+    def test_always_and_off_modes(self, generic_client, monkeypatch):
+        monkeypatch.setenv('SCODA_SERVER_TIMING', 'always')
+        assert 'server-timing' in generic_client.get('/api/test/manifest').headers
+        monkeypatch.setenv('SCODA_SERVER_TIMING', 'off')
+        assert 'server-timing' not in generic_client.get('/api/test/manifest',
+                                                         headers=TIMING).headers
+
+    def test_token(self, generic_client):
+        assert 'server-timing' not in generic_client.get(
+            '/api/test/manifest', headers={'X-Scoda-Timing': '1'}).headers
+        assert 'server-timing' in generic_client.get('/api/test/manifest',
+                                                     headers=TIMING).headers
+
+    def test_off_without_token(self, generic_client, monkeypatch):
+        monkeypatch.delenv('SCODA_SERVER_TIMING_TOKEN')
+        assert server_timing.mode() == 'off'
+        for value in ('1', TOKEN):
+            assert 'server-timing' not in generic_client.get(
+                '/api/test/manifest', headers={'X-Scoda-Timing': value}).headers
+        # Request mode never samples without a token either
+        monkeypatch.setenv('SCODA_SERVER_TIMING', 'request')
+        assert 'server-timing' not in generic_client.get(
+            '/api/test/manifest', headers={'X-Scoda-Timing': '1'}).headers
+
+
+class TestPhases:
+
+    def test_named_query(self, generic_client):
+        response = generic_client.get('/api/test/queries/items_list/execute',
+                                      headers=TIMING)
+        phases = _phases(response)
+        names = [name for name, _, _ in phases]
+        assert names[0] == 'registry' and names[-1] == 'total'
+        assert {'conn', 'sql', 'rows', 'serialize'} <= set(names)
+        assert ('sql', 'items_list') in {(name, desc) for name, _, desc in phases}
+        assert all(dur >= 0 for _, dur, _ in phases)
+
+    def test_paged_query_numbers_statements(self, generic_client):
+        response = generic_client.get('/api/test/queries/items_list/execute',
+                                      params={'limit': 2}, headers=TIMING)
+        descs = {name: desc for name, _, desc in _phases(response)}
+        assert descs['sql-1'] == 'items_list count'
+        assert descs['sql-2'] == 'items_list'
+
+    def test_manifest_and_msgpack(self, generic_client):
+        phases = _phases(generic_client.get('/api/test/manifest', headers=TIMING))
+        assert ('manifest', 'manifest load') in {(n, d) for n, _, d in phases}
+        response = generic_client.get('/api/test/queries/items_list/execute',
+                                      headers=dict(TIMING, Accept='application/msgpack'))
+        assert ('serialize', 'msgpack') in {(n, d) for n, _, d in _phases(response)}
+
+    def test_crud_statements(self, crud_client):
+        response = crud_client.get('/api/test/entities/item', headers=TIMING)
+        descs = {desc for name, _, desc in _phases(response) if name.startswith('sql')}
+        assert {'items.count', 'items.list'} <= descs
+
+
+class TestTimeline:
+
+    def test_header_format(self):
+        timeline = server_timing.Timeline()
+        timeline.add('sql', 0.0012345, 'say "hi"')
+        timeline.add('sql', 0.002)
+        timeline.add('rows', 0.0005)
+        assert timeline.header(total=0.01) == (
+            'sql-1;dur=1.23;desc="say \\"hi\\"", sql-2;dur=2.00, '
+            'rows;dur=0.50, total;dur=10.00')
+
+    def test_entry_cap(self, monkeypatch):
+        monkeypatch.setattr(server_timing, 'MAX_ENTRIES', 2)
+        timeline = server_timing.Timeline()
+        for _ in range(5):
+            timeline.add('sql', 0.001)
+        assert re.search(r'omitted;desc="3 phases"$', timeline.header())
+
+    def test_phase_outside_request_is_noop(self):
+        assert server_timing.current() is None
+        with server_timing.phase('sql', 'x'):
+            pass
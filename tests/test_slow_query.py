@@ -0,0 +1,116 @@
+"""
+Tests for the slow-query log (scoda_engine.slow_query).
+"""
+
+import json
+
+import pytest
+
+import scoda_engine_core as scoda_package
+from scoda_engine import app as app_module
+from scoda_engine import slow_query
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch):
+    # Every statement counts as slow
+    monkeypatch.setenv('SCODA_SLOW_QUERY_MS', '0.000001')
+    monkeypatch.delenv('SCODA_SLOW_QUERY_LOG', raising=False)
+    slow_query.reset()
+    slow_query._reset_logger()
+    app_module._query_cache.clear()
+    yield
+    slow_query.reset()
+    slow_query._reset_logger()
+
+
+@pytest.fixture
+def admin(monkeypatch):
+    monkeypatch.setattr(app_module, 'SCODA_MODE', 'admin')
+
+
+class TestNamedQueries:
+
+    def test_offenders_endpoint(self, generic_client, admin):
+        generic_client.get('/api/test/queries/category_items/execute',
+                           params={'category_id': 2})
+        generic_client.get('/api/test/queries/items_list/execute')
+        app_module._query_cache.clear()
+        generic_client.get('/api/test/queries/items_list/execute')
+
+        body = generic_client.get('/api/slow-queries', params={'sort': 'count'}).json()
+        assert body['threshold_ms'] == 0.000001
+        first = body['queries'][0]
+        assert (first['kind'], first['package'], first['query'], first['count']) == \
+            ('named', 'test', 'items_list', 2)
+        category = next(q for q in body['queries'] if q['query'] == 'category_items')
+        assert category['slowest']['params']['category_id'] == '2'
+        assert category['slowest']['rows'] > 0
+        assert any('items' in line for line in category['slowest']['plan'])
+
+        assert len(generic_client.get('/api/slow-queries', params={'limit': 1}).json()
+                   ['queries']) == 1
+        assert generic_client.get('/api/slow-queries',
+                                  params={'sort': 'bogus'}).status_code == 400
+        assert generic_client.delete('/api/slow-queries').status_code == 200
+        assert generic_client.get('/api/slow-queries').json()['queries'] == []
+
+    def test_paged_query_logs_executed_statement(self, generic_client, tmp_path,
+                                                 monkeypatch):
+        path = tmp_path / 'slow.log'
+        monkeypatch.setenv('SCODA_SLOW_QUERY_LOG', str(path))
+        generic_client.get('/api/test/queries/items_list/execute',
+                           params={'limit': 2, 'sort': 'name'})
+        (line,) = path.read_text().splitlines()
+        record = json.loads(line)
+        assert record['sql'].endswith('LIMIT :__limit OFFSET :__offset')
+        assert record['params'] == {'__limit': 2, '__offset': 0}
+        assert 'USE TEMP B-TREE FOR ORDER BY' in record['plan']
+
+    def test_admin_only(self, generic_client):
+        assert generic_client.get('/api/slow-queries').status_code == 403
+
+    def test_below_threshold_not_logged(self, generic_client, monkeypatch):
+        monkeypatch.setenv('SCODA_SLOW_QUERY_MS', '60000')
+        generic_client.get('/api/test/queries/items_list/execute')
+        assert slow_query.top() == []
+
+    def test_rotating_log_file(self, generic_client, tmp_path, monkeypatch):
+        path = tmp_path / 'slow.log'
+        monkeypatch.setenv('SCODA_SLOW_QUERY_LOG', str(path))
+        generic_client.get('/api/test/queries/items_list/execute')
+        (line,) = path.read_text().splitlines()
+        record = json.loads(line)
+        assert record['query'] == 'items_list' and record['package'] == 'test'
+        assert record['duration_ms'] >= 0 and record['plan'] and 'SELECT' in record['sql']
+
+
+class TestOtherStatements:
+
+    def test_crud_statements(self, crud_client):
+        crud_client.get('/api/test/entities/item', params={'search': 'a'})
+        crud_client.post('/api/test/entities/item', json={'name': 'Slow', 'category_id': 1})
+        names = {q['query'] for q in slow_query.top(100) if q['kind'] == 'crud'}
+        assert {'items.count', 'items.list', 'items.create', 'items.read'} <= names
+        listed = next(q for q in slow_query.top(100) if q['query'] == 'items.list')
+        assert listed['slowest']['params'][-2:] == [50, 0]
+
+    def test_mcp_dynamic_sql_and_errors(self, generic_db):
+        from scoda_engine.mcp_server import _execute_dynamic_tool
+        scoda_package._set_paths_for_testing(*generic_db)
+        try:
+            _execute_dynamic_tool({'name': 'find', 'query_type': 'single',
+                                   'sql': 'SELECT * FROM items WHERE name LIKE :p'},
+                                  {'p': 'G%'})
+            interrupted = _execute_dynamic_tool(
+                {'name': 'runaway', 'query_type': 'single', 'max_steps': 10000,
+                 'sql': 'WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) '
+                        'SELECT count(*) FROM c'}, {})
+        finally:
+            scoda_package._reset_paths()
+        assert interrupted['code'] == 'query_step_limit'
+        offenders = {q['query']: q for q in slow_query.top() if q['kind'] == 'mcp'}
+        assert offenders['find']['slowest']['params'] == {'p': 'G%'}
+        assert offenders['find']['slowest']['plan'] == ['SCAN items']
+        assert offenders['runaway']['slowest']['rows'] is None
+        assert 'step budget' in offenders['runaway']['slowest']['error']
@@ -0,0 +1,63 @@
+"""
+Tests for content-hashed static asset URLs (scoda_engine.static_assets).
+"""
+
+import os
+import re
+
+from scoda_engine import app as app_module
+from scoda_engine.static_assets import IMMUTABLE, AssetManifest, split_fingerprint
+
+
+class TestFingerprintedStatic:
+
+    def test_page_references_fingerprinted_assets(self, generic_client):
+        html = generic_client.get('/test/').text
+        assert 'cache_bust' not in html and '?v=' not in html
+        urls = re.findall(r'(?:src|href)="(/static/[^"]+)"', html)
+        assert app_module._assets.url('js/app.js') in urls
+        assert app_module._assets.url('css/style.css') in urls
+        for url in urls:
+            assert split_fingerprint(url)[1] is not None
+
+    def test_fingerprinted_url_is_immutable(self, generic_client):
+        url = app_module._assets.url('js/app.js')
+        response = generic_client.get(url)
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == IMMUTABLE
+        assert response.content == generic_client.get('/static/js/app.js').content
+
+    def test_stale_fingerprint_not_immutable(self, generic_client):
+        response = generic_client.get('/static/js/app.000000000000.js')
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == 'no-cache'
+
+    def test_plain_url_unchanged(self, generic_client):
+        response = generic_client.get('/static/js/app.js')
+        assert response.status_code == 200
+        assert 'immutable' not in response.headers.get('cache-control', '')
+        assert generic_client.get('/static/js/missing.0123456789ab.js').status_code == 404
+
+
+class TestAssetManifest:
+
+    def test_digest_follows_content(self, tmp_path):
+        path = tmp_path / 'a.js'
+        path.write_text('one')
+        manifest = AssetManifest(str(tmp_path))
+        first = manifest.url('a.js')
+        assert re.fullmatch(r'/static/a\.[0-9a-f]{12}\.js', first)
+        assert manifest.url('a.js') == first
+        path.write_text('two!')
+        st = path.stat()
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+        assert manifest.url('a.js') != first
+
+    def test_missing_and_outside_paths(self, tmp_path):
+        manifest = AssetManifest(str(tmp_path))
+        assert manifest.url('nope.js') == '/static/nope.js'
+        assert manifest.digest('../etc/passwd') is None
+
+    def test_split_fingerprint(self):
+        assert split_fingerprint('js/app.0123456789ab.js') == ('js/app.js', '0123456789ab')
+        assert split_fingerprint('vendor/d3.v7.min.js') == ('vendor/d3.v7.min.js', None)
@@ -0,0 +1,102 @@
+"""
+Tests for scoda_engine_core.verify_ledger — trusted-checksum ledger.
+"""
+
+import os
+from unittest import mock
+
+import pytest
+
+from scoda_engine_core import ScodaPackage, PackageRegistry, ScodaChecksumError
+from scoda_engine_core.scoda_package import _sha256_file
+from scoda_engine_core.verify_ledger import (
+    VerificationLedger,
+    get_default_ledger,
+    main,
+)
+
+
+@pytest.fixture
+def scoda_file(generic_db, tmp_path):
+    canonical_db, _ = generic_db
+    path = str(tmp_path / "verified.scoda")
+    ScodaPackage.create(canonical_db, path)
+    return path
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return VerificationLedger(str(tmp_path / "ledger" / "verified.db"))
+
+
+def _open_counting_hashes(scoda_file, **kwargs):
+    with mock.patch('scoda_engine_core.scoda_package._sha256_file',
+                    wraps=_sha256_file) as sha:
+        ScodaPackage(scoda_file, **kwargs).close()
+    return sha.call_count
+
+
+class TestVerificationLedger:
+
+    def test_second_open_skips_hash(self, scoda_file, ledger):
+        assert _open_counting_hashes(scoda_file, ledger=ledger) == 1
+        assert len(ledger.entries()) == 1
+        assert _open_counting_hashes(scoda_file, ledger=ledger) == 0
+
+    def test_identity_change_forces_hash(self, scoda_file, ledger):
+        ScodaPackage(scoda_file, ledger=ledger).close()
+        st = os.stat(scoda_file)
+        os.utime(scoda_file, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+        assert not ledger.is_verified(scoda_file, ledger.entries()[0]['checksum'])
+        assert _open_counting_hashes(scoda_file, ledger=ledger) == 1
+
+    def test_reverify_ignores_ledger(self, scoda_file, ledger):
+        ScodaPackage(scoda_file, ledger=ledger).close()
+        assert _open_counting_hashes(scoda_file, ledger=ledger, reverify=True) == 1
+
+    def test_failed_verification_not_recorded(self, generic_db, tmp_path, ledger):
+        canonical_db, _ = generic_db
+        path = str(tmp_path / "bad.scoda")
+        ScodaPackage.create(canonical_db, path,
+                            metadata={'data_checksum_sha256': 'ab' * 32})
+        with pytest.raises(ScodaChecksumError):
+            ScodaPackage(path, ledger=ledger)
+        assert ledger.entries() == []
+
+    def test_registry_reverify_quarantines_corrupt_db(self, scoda_file, ledger):
+        reg = PackageRegistry()
+        reg.register_path(scoda_file)
+        pkg = reg._packages['sample-data']['pkg']
+        pkg._ledger = ledger
+        assert reg.reverify() == {'sample-data': True}
+
+        os.chmod(pkg.db_path, 0o644)
+        with open(pkg.db_path, 'ab') as f:
+            f.write(b'corrupt')
+        assert reg.reverify() == {'sample-data': False}
+        with pytest.raises(ScodaChecksumError):
+            reg.get_db('sample-data')
+        assert ledger.entries() == []
+        reg.close_all()
+
+    def test_cli_verify_list_forget(self, scoda_file, ledger, capsys):
+        assert main(['--ledger', ledger.path, 'verify', scoda_file]) == 0
+        assert main(['--ledger', ledger.path, 'list']) == 0
+        assert '1 verified package(s)' in capsys.readouterr().out
+        assert main(['--ledger', ledger.path, 'forget']) == 0
+        assert ledger.entries() == []
+
+    def test_default_ledger_from_env(self, tmp_path, monkeypatch):
+        monkeypatch.delenv('SCODA_VERIFY_LEDGER', raising=False)
+        assert get_default_ledger() is None
+        monkeypatch.setenv('SCODA_VERIFY_LEDGER', str(tmp_path / "env.db"))
+        assert get_default_ledger().path == str(tmp_path / "env.db")
+
+    def test_sha256_file_matches_hashlib(self, tmp_path):
+        import hashlib
+        empty = tmp_path / "empty"
+        empty.write_bytes(b'')
+        data = tmp_path / "data"
+        data.write_bytes(os.urandom(100_000))
+        for path in (empty, data):
+            assert _sha256_file(str(path)) == hashlib.sha256(path.read_bytes()).hexdigest()